@@ -13,16 +13,23 @@
 # limitations under the License.
 
 import asyncio
+import base64
+import binascii
 import json
 import logging
-from collections.abc import Callable
+import os
+import tempfile
+import time
+from collections.abc import AsyncIterator, Callable, Coroutine
+from contextlib import AbstractAsyncContextManager, AsyncExitStack
+from dataclasses import asdict
 from pathlib import Path
 from typing import Any, Literal
 
 import backoff
-from fastapi import FastAPI, HTTPException, WebSocket
+from fastapi import FastAPI, HTTPException, Request, WebSocket
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, StreamingResponse
 from fastapi.staticfiles import StaticFiles
 from google.cloud import logging as google_cloud_logging
 from google.genai import types
@@ -31,11 +38,49 @@ from pydantic import BaseModel
 from websockets.exceptions import ConnectionClosedError
 
 # Google ADK imports for proper agent usage
+from google.adk.agents.run_config import RunConfig, StreamingMode
 from google.adk.runners import Runner
-from google.adk.sessions import InMemorySessionService
 
 from app.technical_agent import MODEL_ID, genai_client, live_connect_config, tool_functions
-from app.turkish_airlines_text_agent.turkish_airlines_text_agent import root_agent
+from app.turkish_airlines_text_agent.turkish_airlines_text_agent import (
+    chat_model,
+    fast_path,
+    history_compactor,
+    root_agent,
+    tool_memo,
+    tool_projector,
+)
+from app.utils.admission import AdmissionController, AdmissionRejected, CircuitBreaker
+from app.utils.audio_codecs import (
+    SUPPORTED_CODECS,
+    DownlinkAudioEncoder,
+    negotiate_codec,
+)
+from app.utils.barge_in import BINARY_FLUSH_FRAME, JSON_FLUSH_FRAME, ModelTurn
+from app.utils.chat_stream import (
+    NDJSON_MEDIA_TYPE,
+    SSE_MEDIA_TYPE,
+    encode_message,
+    event_messages,
+    final_text,
+)
+from app.utils.coalescer import AudioCoalescer
+from app.utils.frames import model_audio, model_audio_frame, needs_decode
+from app.utils.hedging import deadline_scope
+from app.utils.live_pool import LiveSessionPool
+from app.utils.media_protocol import (
+    BINARY_MEDIA_SUBPROTOCOL,
+    decode_media_frame,
+    negotiate_subprotocol,
+    realtime_input_message,
+)
+from app.utils.metrics import LatencyRecorder
+from app.utils.relay_queue import RelayQueue
+from app.utils.resumption import ReplayBuffer, ResumptionState
+from app.utils.run_gate import RunGate
+from app.utils.session_service import TieredSessionService
+from app.utils.tool_executor import ToolExecutor
+from app.utils.vad import VoiceActivityGate
 
 app = FastAPI()
 app.add_middleware(
@@ -71,48 +116,402 @@ except Exception:
 
 # Setup Turkish Airlines agent with proper session management
 APP_NAME = "turkish_airlines_app"
-session_service = InMemorySessionService()
+# Chat sessions live in a bounded in-memory tier backed by a SQLite file that
+# all workers on the host share
+CHAT_SESSION_DB = os.getenv(
+    "CHAT_SESSION_DB", os.path.join(tempfile.gettempdir(), "chat_sessions.sqlite3")
+)
+CHAT_SESSION_HOT_MAX = int(os.getenv("CHAT_SESSION_HOT_MAX", "10000"))
+CHAT_SESSION_HOT_TTL_SECONDS = float(os.getenv("CHAT_SESSION_HOT_TTL_SECONDS", "1800"))
+CHAT_SESSION_FLUSH_MS = float(os.getenv("CHAT_SESSION_FLUSH_MS", "50"))
+session_service = TieredSessionService(
+    CHAT_SESSION_DB,
+    max_hot=CHAT_SESSION_HOT_MAX,
+    hot_ttl=CHAT_SESSION_HOT_TTL_SECONDS,
+    flush_interval=CHAT_SESSION_FLUSH_MS / 1000,
+)
+# The streaming chat endpoint relays partial model output unless disabled
+CHAT_STREAM_PARTIAL = os.getenv("CHAT_STREAM_PARTIAL", "true").lower() == "true"
+chat_stream_run_config = RunConfig(
+    streaming_mode=StreamingMode.SSE if CHAT_STREAM_PARTIAL else StreamingMode.NONE
+)
+# Chat latency: whole JSON responses, and first and last byte when streaming
+chat_latency = LatencyRecorder()
+chat_stream_ttfb = LatencyRecorder()
+chat_stream_total = LatencyRecorder()
+# Agent runs are serialized per session; a resubmitted message joins the
+# identical run still in flight if it arrives within this window
+CHAT_COALESCE_WINDOW_SECONDS = float(os.getenv("CHAT_COALESCE_WINDOW_SECONDS", "10"))
+chat_run_gate = RunGate(window=CHAT_COALESCE_WINDOW_SECONDS)
+# A chat request that has not been answered in time, queueing included, is
+# cancelled and its model calls time out upstream
+CHAT_DEADLINE_SECONDS = float(os.getenv("CHAT_DEADLINE_SECONDS", "60"))
 turkish_airlines_runner = Runner(agent=root_agent, app_name=APP_NAME, session_service=session_service)
 
+# Relay queue watermarks, in frames. Stale microphone audio is dropped on the
+# way up; model output makes the Gemini reader wait on the way down.
+UPSTREAM_HIGH_WATERMARK = int(os.getenv("RELAY_UPSTREAM_HIGH_WATERMARK", "25"))
+UPSTREAM_LOW_WATERMARK = int(os.getenv("RELAY_UPSTREAM_LOW_WATERMARK", "10"))
+DOWNSTREAM_HIGH_WATERMARK = int(os.getenv("RELAY_DOWNSTREAM_HIGH_WATERMARK", "200"))
+DOWNSTREAM_LOW_WATERMARK = int(os.getenv("RELAY_DOWNSTREAM_LOW_WATERMARK", "100"))
+
+# Tool execution limits for live sessions
+TOOL_EXECUTOR_MAX_WORKERS = int(os.getenv("TOOL_EXECUTOR_MAX_WORKERS", "4"))
+TOOL_TIMEOUT_SECONDS = float(os.getenv("TOOL_TIMEOUT_SECONDS", "30"))
+
+# Pre-warmed live sessions. Disabled by default since idle sessions count
+# against the upstream concurrent session quota.
+LIVE_POOL_SIZE = int(os.getenv("LIVE_POOL_SIZE", "0"))
+LIVE_POOL_IDLE_TTL_SECONDS = float(os.getenv("LIVE_POOL_IDLE_TTL_SECONDS", "60"))
+
+live_pool = LiveSessionPool(
+    lambda: genai_client.aio.live.connect(model=MODEL_ID, config=live_connect_config),
+    max_size=LIVE_POOL_SIZE,
+    idle_ttl=LIVE_POOL_IDLE_TTL_SECONDS,
+)
+# Time from a connection attempt to "Backend is ready for conversation"
+time_to_ready = LatencyRecorder()
+
+# Client audio frames held while a dropped model connection is resumed
+RECONNECT_BUFFER_FRAMES = int(os.getenv("RECONNECT_BUFFER_FRAMES", "64"))
+# Time from a model connection drop until the conversation is resumed
+reconnect_time = LatencyRecorder()
+
+# Server-side voice activity detection holding back silent microphone audio
+VAD_ENABLED = os.getenv("VAD_ENABLED", "true").lower() == "true"
+VAD_HANGOVER_MS = float(os.getenv("VAD_HANGOVER_MS", "1000"))
+VAD_KEEPALIVE_MS = float(os.getenv("VAD_KEEPALIVE_MS", "2000"))
+# Cut the model's turn short as soon as the VAD hears the user speak over it,
+# without waiting for the model to report the interruption
+BARGE_IN_ON_VAD = os.getenv("BARGE_IN_ON_VAD", "false").lower() == "true"
+
+# Codecs offered for model audio to clients using the binary sub-protocol,
+# in preference order; empty to always relay the JSON frames
+DOWNLINK_AUDIO_CODECS = [
+    codec
+    for codec in os.getenv(
+        "DOWNLINK_AUDIO_CODECS", ",".join(SUPPORTED_CODECS)
+    ).split(",")
+    if codec
+]
+
+# Merging of consecutive model audio chunks into fewer client messages,
+# disabled unless a time budget is set
+DOWNLINK_COALESCE_MS = float(os.getenv("DOWNLINK_COALESCE_MS", "0"))
+DOWNLINK_COALESCE_BYTES = int(os.getenv("DOWNLINK_COALESCE_BYTES", "9600"))
+
+# Admission control: concurrent live sessions per process, the fair waiting
+# queue in front of them, and the breaker shedding load while upstream fails
+LIVE_MAX_SESSIONS = int(os.getenv("LIVE_MAX_SESSIONS", "50"))
+LIVE_MAX_QUEUE = int(os.getenv("LIVE_MAX_QUEUE", "50"))
+LIVE_QUEUE_TIMEOUT_SECONDS = float(os.getenv("LIVE_QUEUE_TIMEOUT_SECONDS", "120"))
+LIVE_BREAKER_ERROR_RATE = float(os.getenv("LIVE_BREAKER_ERROR_RATE", "0.5"))
+LIVE_BREAKER_MIN_REQUESTS = int(os.getenv("LIVE_BREAKER_MIN_REQUESTS", "10"))
+LIVE_BREAKER_OPEN_SECONDS = float(os.getenv("LIVE_BREAKER_OPEN_SECONDS", "30"))
+
+admission = AdmissionController(
+    max_concurrent=LIVE_MAX_SESSIONS,
+    max_queue=LIVE_MAX_QUEUE,
+    queue_timeout=LIVE_QUEUE_TIMEOUT_SECONDS,
+    breaker=CircuitBreaker(
+        error_rate=LIVE_BREAKER_ERROR_RATE,
+        min_requests=LIVE_BREAKER_MIN_REQUESTS,
+        open_seconds=LIVE_BREAKER_OPEN_SECONDS,
+    ),
+)
+
+# Live sessions currently relaying, used to expose per-session queue metrics
+active_sessions: set["GeminiSession"] = set()
+
+
+def _is_audio_only(data: dict[str, Any]) -> bool:
+    """Whether a JSON client message only carries microphone audio."""
+    chunks = data.get("realtimeInput", {}).get("mediaChunks") or []
+    return bool(chunks) and all(
+        str(chunk.get("mimeType", "")).startswith("audio/") for chunk in chunks
+    )
+
+
+def _pcm_payload(data: dict[str, Any]) -> bytes | None:
+    """Decode the PCM of a JSON message carrying a single microphone chunk."""
+    chunks = data.get("realtimeInput", {}).get("mediaChunks") or []
+    if len(chunks) != 1 or not str(chunks[0].get("mimeType", "")).startswith(
+        "audio/pcm"
+    ):
+        return None
+    try:
+        return base64.b64decode(chunks[0].get("data", ""), validate=True)
+    except (binascii.Error, TypeError):
+        return None
+
 
 class GeminiSession:
-    """Manages bidirectional communication between a client and the Gemini model."""
+    """Manages bidirectional communication between a client and the Gemini model.
+
+    The client side lives as long as the client websocket, while the model
+    side is attached once per live connection. A dropped model connection can
+    therefore be resumed without restarting the conversation for the client.
+    """
 
     def __init__(
-        self, session: Any, websocket: WebSocket, tool_functions: dict[str, Callable]
+        self,
+        session: Any,
+        websocket: WebSocket,
+        tool_functions: dict[str, Callable[..., Any]],
+        subprotocol: str | None = None,
     ) -> None:
         """Initialize the Gemini session.
 
         Args:
-            session: The Gemini session
+            session: The Gemini session, or None until the first connection
             websocket: The client websocket connection
             user_id: Unique identifier for this client
             tool_functions: Dictionary of available tool functions
+            subprotocol: The websocket sub-protocol negotiated with the client
         """
         self.session = session
         self.websocket = websocket
+        self.binary_media = subprotocol == BINARY_MEDIA_SUBPROTOCOL
         self.run_id = "n/a"
         self.user_id = "n/a"
         self.tool_functions = tool_functions
-        self._tool_tasks: list[asyncio.Task] = []
+        self.tool_executor = ToolExecutor(
+            tool_functions,
+            max_workers=TOOL_EXECUTOR_MAX_WORKERS,
+            default_timeout=TOOL_TIMEOUT_SECONDS,
+        )
+        self._tool_tasks: set[asyncio.Task] = set()
+        self.upstream = RelayQueue(
+            UPSTREAM_HIGH_WATERMARK, UPSTREAM_LOW_WATERMARK, drop_oldest=True
+        )
+        self.downstream = RelayQueue(
+            DOWNSTREAM_HIGH_WATERMARK, DOWNSTREAM_LOW_WATERMARK
+        )
+        self.resumption = ResumptionState()
+        self.replay_buffer = ReplayBuffer(RECONNECT_BUFFER_FRAMES)
+        self.downlink: DownlinkAudioEncoder | None = None
+        self.coalescer = (
+            AudioCoalescer(DOWNLINK_COALESCE_BYTES, DOWNLINK_COALESCE_MS / 1000)
+            if DOWNLINK_COALESCE_MS > 0
+            else None
+        )
+        self.vad: VoiceActivityGate[str] | None = (
+            VoiceActivityGate(
+                hangover_ms=VAD_HANGOVER_MS, keepalive_ms=VAD_KEEPALIVE_MS
+            )
+            if VAD_ENABLED
+            else None
+        )
+        self.turn = ModelTurn()
+        self.reconnecting = False
+        self.reconnects = 0
+        self._disconnected_at: float | None = None
+
+    def queue_stats(self) -> dict[str, Any]:
+        """Return per-direction queue depth and drop counters for this session."""
+        return {
+            "run_id": self.run_id,
+            "user_id": self.user_id,
+            "upstream": self.upstream.snapshot(),
+            "downstream": self.downstream.snapshot(),
+            "reconnects": self.reconnects,
+            "replay": {
+                "held": len(self.replay_buffer),
+                "replayed": self.replay_buffer.replayed,
+                "dropped": self.replay_buffer.dropped,
+            },
+            "vad": asdict(self.vad.stats) if self.vad else None,
+            "downlink": self.downlink.snapshot() if self.downlink else None,
+            "coalescing": self.coalescer.snapshot() if self.coalescer else None,
+            "barge_in": asdict(self.turn.stats),
+        }
+
+    async def run(
+        self, connect_and_relay: Callable[[], Coroutine[Any, Any, None]] | None = None
+    ) -> None:
+        """Relay until the client goes away.
+
+        Args:
+            connect_and_relay: Connects to Gemini, with retries, and relays
+                over each connection; defaults to relaying over self.session
+        """
+        active_sessions.add(self)
+        receiver = asyncio.create_task(self.receive_from_client())
+        sender = asyncio.create_task(self.send_to_client())
+        model = asyncio.create_task(
+            connect_and_relay() if connect_and_relay else self.relay(self.session)
+        )
+        try:
+            await asyncio.wait({receiver, model}, return_when=asyncio.FIRST_COMPLETED)
+            if model.done():
+                # Surface connection failures, otherwise Gemini ended the
+                # conversation and we wait for the client to hang up.
+                model.result()
+                await receiver
+        finally:
+            active_sessions.discard(self)
+            self.upstream.close()
+            self.downstream.close()
+            for task in (receiver, sender, model, *self._tool_tasks):
+                task.cancel()
+            await asyncio.gather(receiver, sender, model, return_exceptions=True)
+            await self.tool_executor.shutdown()
+            logging.info(f"Relay queue stats: {self.queue_stats()}")
+
+    async def relay(self, session: Any) -> None:
+        """Relay between the client queues and one live connection until it closes.
+
+        Raises:
+            ConnectionClosedError: If the model connection dropped; client
+                messages are held from then on until the next relay() call
+        """
+        self.session = session
+        await self._resume(session)
+        sender = asyncio.create_task(self.send_to_gemini())
+        receiver = asyncio.create_task(self.receive_from_gemini())
+        try:
+            done, _ = await asyncio.wait(
+                {sender, receiver}, return_when=asyncio.FIRST_COMPLETED
+            )
+            for task in done:
+                task.result()
+        except ConnectionClosedError:
+            self._begin_reconnect()
+            raise
+        finally:
+            for task in (sender, receiver):
+                task.cancel()
+            await asyncio.gather(sender, receiver, return_exceptions=True)
+
+    def _begin_reconnect(self) -> None:
+        """Start holding client messages until the model connection is back."""
+        if not self.reconnecting:
+            self.reconnecting = True
+            self._disconnected_at = time.perf_counter()
+        for message, droppable in self.upstream.drain():
+            self.replay_buffer.append(message, droppable)
+        logging.warning(
+            f"Model connection for {self.user_id} dropped, holding client input"
+        )
+
+    async def _resume(self, session: Any) -> None:
+        """Re-seed a new connection and replay the client input held meanwhile."""
+        if self._disconnected_at is None:
+            return
+        if (replay := self.resumption.replay_message()) is not None:
+            await session._ws.send(replay)
+        # New input keeps landing in the buffer until it has been emptied
+        while self.replay_buffer:
+            message = self.replay_buffer.popleft()
+            try:
+                await session._ws.send(message)
+            except BaseException:
+                self.replay_buffer.appendleft(message)
+                raise
+        self.reconnecting = False
+        elapsed = time.perf_counter() - self._disconnected_at
+        self._disconnected_at = None
+        self.reconnects += 1
+        reconnect_time.record(elapsed)
+        logging.info(
+            f"Model connection for {self.user_id} resumed in {elapsed * 1000:.1f} ms "
+            f"({'handle' if self.resumption.handle else 'history replay'})"
+        )
+
+    async def _forward(self, message: str, droppable: bool = False) -> None:
+        """Queue a message for Gemini, or hold it while reconnecting."""
+        if self.reconnecting:
+            self.replay_buffer.append(message, droppable)
+        else:
+            await self.upstream.put(message, droppable=droppable)
+
+    async def _forward_audio(self, pcm: bytes, message: str) -> None:
+        """Queue a microphone chunk for Gemini unless the VAD holds it back."""
+        if self.vad is None:
+            await self._forward(message, droppable=True)
+            return
+        was_speaking = self.vad.speaking
+        held = self.vad.push(pcm, message)
+        if (
+            BARGE_IN_ON_VAD
+            and self.vad.speaking
+            and not was_speaking
+            and self.turn.active
+            and not self.turn.muted
+        ):
+            await self._barge_in()
+        for item in held:
+            await self._forward(item, droppable=True)
+
+    async def _barge_in(self) -> None:
+        """Drop the model audio still pending and tell the client to flush."""
+        self.turn.barge_in(self._discard_model_audio())
+        await self.downstream.put(
+            BINARY_FLUSH_FRAME if self.binary_media else JSON_FLUSH_FRAME
+        )
+        logging.info(f"User {self.user_id} barged in, flushed model audio")
 
     async def receive_from_client(self) -> None:
         """Listen for and process messages from the client.
 
-        Continuously receives messages and forwards audio data to Gemini.
-        Handles connection errors gracefully.
+        Continuously receives messages and queues audio data for Gemini.
+        Binary messages carry raw media when the binary sub-protocol was
+        negotiated; text messages are JSON. Handles connection errors gracefully.
         """
+        try:
+            await self._receive_from_client()
+        finally:
+            self.upstream.close()
+
+    async def _receive_from_client(self) -> None:
         while True:
             try:
-                data = await self.websocket.receive_json()
+                message = await self.websocket.receive()
+                if message["type"] == "websocket.disconnect":
+                    logging.info(f"Client {self.user_id} disconnected")
+                    break
+                if message.get("bytes") is not None:
+                    if not self.binary_media:
+                        logging.warning(
+                            f"Dropping binary message from client {self.user_id}: "
+                            "binary media sub-protocol was not negotiated"
+                        )
+                        continue
+                    try:
+                        mime_type, payload = decode_media_frame(message["bytes"])
+                    except ValueError as e:
+                        logging.warning(f"Invalid media from {self.user_id}: {e}")
+                        continue
+                    media = realtime_input_message(mime_type, payload)
+                    if mime_type.startswith("audio/pcm"):
+                        await self._forward_audio(payload, media)
+                    else:
+                        await self._forward(
+                            media, droppable=mime_type.startswith("audio/")
+                        )
+                    continue
 
+                data = json.loads(message["text"])
                 if isinstance(data, dict) and (
                     "realtimeInput" in data or "clientContent" in data
                 ):
-                    await self.session._ws.send(json.dumps(data))
+                    if "clientContent" in data:
+                        self.resumption.observe_client_content(data["clientContent"])
+                    pcm = _pcm_payload(data)
+                    if pcm is not None:
+                        await self._forward_audio(pcm, json.dumps(data))
+                    else:
+                        await self._forward(
+                            json.dumps(data), droppable=_is_audio_only(data)
+                        )
                 elif "setup" in data:
                     self.run_id = data["setup"]["run_id"]
                     self.user_id = data["setup"]["user_id"]
+                    codec = negotiate_codec(
+                        data["setup"].get("audio_codecs"), DOWNLINK_AUDIO_CODECS
+                    )
+                    if self.binary_media and codec:
+                        self.downlink = DownlinkAudioEncoder(codec)
                     # Log setup info to both standard and Google Cloud logging
                     logger.info(f"Setup: {data['setup']}")
                     if gcp_logger:
@@ -128,68 +527,147 @@ class GeminiSession:
                 logging.error(f"Error receiving from client {self.user_id}: {e!s}")
                 break
 
-    def _get_func(self, action_label: str | None) -> Callable | None:
-        """Get the tool function for a given action label."""
-        if action_label is None or action_label == "":
-            return None
-        return self.tool_functions.get(action_label)
-
-    async def _handle_tool_call(
-        self, session: Any, tool_call: LiveServerToolCall
-    ) -> None:
-        """Process tool calls from Gemini and send back responses."""
-        if tool_call.function_calls is None:
-            logging.debug("No function calls in tool_call")
+    async def _handle_tool_call(self, tool_call: LiveServerToolCall) -> None:
+        """Run the tool call on the executor and send back one batched response."""
+        tool_response = await self.tool_executor.execute(tool_call)
+        if tool_response is None:
             return
+        logging.debug(f"Tool response: {tool_response}")
+        # The connection may have been resumed while the tools ran
+        await self.session.send(input=tool_response)
 
-        for fc in tool_call.function_calls:
-            logging.debug(f"Calling tool function: {fc.name} with args: {fc.args}")
-            func = self._get_func(fc.name)
-            if func is None:
-                logging.error(f"Function {fc.name} not found")
-                continue
-            args = fc.args if fc.args is not None else {}
-
-            # Handle both async and sync functions appropriately
-            if asyncio.iscoroutinefunction(func):
-                # Function is already async
-                response = await func(**args)
-            else:
-                # Run sync function in a thread pool to avoid blocking
-                response = await asyncio.to_thread(func, **args)
+    async def send_to_gemini(self) -> None:
+        """Forward queued client messages to the current Gemini connection."""
+        while (entry := await self.upstream.get_entry()) is not None:
+            message, droppable = entry
+            try:
+                await self.session._ws.send(message)
+            except ConnectionClosedError:
+                # Keep the in-flight message for replay after reconnecting
+                self.replay_buffer.appendleft(message, droppable)
+                raise
+            except asyncio.CancelledError:
+                # Cancelled by a dropped connection, or because the relay ends
+                if self.reconnecting:
+                    self.replay_buffer.appendleft(message, droppable)
+                raise
 
-            tool_response = types.LiveClientToolResponse(
-                function_responses=[
-                    types.FunctionResponse(name=fc.name, id=fc.id, response=response)
-                ]
-            )
-            logging.debug(f"Tool response: {tool_response}")
-            await session.send(input=tool_response)
+    async def send_to_client(self) -> None:
+        """Forward queued Gemini frames to the client."""
+        try:
+            while (frame := await self.downstream.get()) is not None:
+                await self.websocket.send_bytes(frame)
+        finally:
+            self.downstream.close()
 
     async def receive_from_gemini(self) -> None:
         """Listen for and process messages from Gemini without blocking."""
-        while result := await self.session._ws.recv(decode=False):
-            await self.websocket.send_bytes(result)
+        while result := await self._recv_from_gemini():
+            # Audio chunks are forwarded untouched, or re-encoded and merged
+            # for the client; only frames carrying control keys are worth a
+            # full JSON decode.
+            if not needs_decode(result):
+                if self.turn.output():
+                    await self._forward_model_audio(result)
+                continue
             raw_message = json.loads(result)
+            server_content = raw_message.get("serverContent") or {}
+            if server_content.get("interrupted"):
+                # Audio the user already talked over must not reach the client
+                self.turn.interrupted(self._discard_model_audio())
+            else:
+                await self._flush_model_audio()
+                if server_content.get("turnComplete"):
+                    self.turn.complete()
+            await self.downstream.put(result)
+            self.resumption.observe_server_message(raw_message)
+            if "usageMetadata" in raw_message:
+                logging.debug(f"Usage metadata: {raw_message['usageMetadata']}")
+            if "toolCallCancellation" in raw_message:
+                ids = raw_message["toolCallCancellation"].get("ids")
+                cancelled = self.tool_executor.cancel(ids)
+                logging.info(f"Tool call cancellation for {ids}: {cancelled} cancelled")
             if "toolCall" in raw_message:
                 message = types.LiveServerMessage.model_validate(raw_message)
                 tool_call = LiveServerToolCall.model_validate(message.tool_call)
                 # Create a separate task to handle the tool call without blocking
-                task = asyncio.create_task(
-                    self._handle_tool_call(self.session, tool_call)
+                task = asyncio.create_task(self._handle_tool_call(tool_call))
+                self._tool_tasks.add(task)
+                task.add_done_callback(self._tool_tasks.discard)
+
+        await self._flush_model_audio()
+
+    async def _recv_from_gemini(self) -> bytes | None:
+        """Receive the next Gemini frame, flushing merged audio when it is due."""
+        while self.coalescer and (delay := self.coalescer.time_left()) is not None:
+            try:
+                return await asyncio.wait_for(
+                    self.session._ws.recv(decode=False), delay
                 )
-                self._tool_tasks.append(task)
+            except asyncio.TimeoutError:
+                await self._flush_model_audio()
+        return await self.session._ws.recv(decode=False)
 
-     
-def get_connect_and_run_callable(websocket: WebSocket) -> Callable:
+    async def _forward_model_audio(self, frame: bytes) -> None:
+        """Queue a frame without control keys, merging audio when enabled."""
+        if self.coalescer is None:
+            if self.downlink is not None:
+                frame = self.downlink.encode_frame(frame) or frame
+            await self.downstream.put(frame, droppable=True)
+            return
+        audio = model_audio(frame)
+        if audio is None:
+            await self._flush_model_audio()
+            await self.downstream.put(frame, droppable=True)
+            return
+        for chunk in self.coalescer.push(*audio, source_bytes=len(frame)):
+            await self.downstream.put(self._model_audio_frame(*chunk), droppable=True)
+
+    async def _flush_model_audio(self) -> None:
+        """Queue any merged model audio ahead of the next frame."""
+        if self.coalescer is not None and (chunk := self.coalescer.flush()):
+            await self.downstream.put(self._model_audio_frame(*chunk), droppable=True)
+
+    def _discard_model_audio(self) -> int:
+        """Drop the model output not yet sent to the client.
+
+        Returns:
+            The number of Gemini frames dropped
+        """
+        discarded = self.coalescer.discard() if self.coalescer else 0
+        return discarded + self.downstream.discard_droppable()
+
+    def _model_audio_frame(
+        self, mime_type: str, pcm: bytes, source_bytes: int
+    ) -> bytes:
+        """Build the client frame for merged model audio."""
+        if self.downlink is not None:
+            return self.downlink.encode_audio(mime_type, pcm, source_bytes)
+        return model_audio_frame(mime_type, pcm)
+
+
+def get_connect_and_run_callable(
+    websocket: WebSocket, subprotocol: str | None = None
+) -> Callable:
     """Create a callable that handles Gemini connection with retry logic.
 
+    The first connection comes from the pre-warmed pool. When the model
+    connection drops, retries resume the same conversation with the latest
+    session resumption handle while the client's input is held and replayed.
+
     Args:
         websocket: The client websocket connection
+        subprotocol: The websocket sub-protocol negotiated with the client
 
     Returns:
         Callable: An async function that establishes and manages the Gemini connection
     """
+    gemini_session = GeminiSession(
+        session=None,
+        websocket=websocket,
+        tool_functions=tool_functions,
+        subprotocol=subprotocol,
+    )
 
     async def on_backoff(details: backoff._typing.Details) -> None:
         await websocket.send_json(
@@ -198,22 +676,41 @@ def get_connect_and_run_callable(websocket: WebSocket) -> Callable:
             }
         )
 
+    def open_live_session() -> AbstractAsyncContextManager[Any]:
+        if not gemini_session.reconnecting:
+            return live_pool.session()
+        return genai_client.aio.live.connect(
+            model=MODEL_ID,
+            config=gemini_session.resumption.connect_config(live_connect_config),
+        )
+
     @backoff.on_exception(
         backoff.expo, ConnectionClosedError, max_tries=10, on_backoff=on_backoff
     )
-    async def connect_and_run() -> None:
-        async with genai_client.aio.live.connect(
-            model=MODEL_ID, config=live_connect_config
-        ) as session:
+    async def connect_and_relay() -> None:
+        started = time.perf_counter()
+        reconnecting = gemini_session.reconnecting
+        async with AsyncExitStack() as stack:
+            try:
+                session = await stack.enter_async_context(open_live_session())
+            except Exception:
+                admission.record_upstream(False)
+                raise
+            admission.record_upstream(True)
             await websocket.send_json({"status": "Backend is ready for conversation"})
-            gemini_session = GeminiSession(
-                session=session, websocket=websocket, tool_functions=tool_functions
-            )
+            if not reconnecting:
+                elapsed = time.perf_counter() - started
+                time_to_ready.record(elapsed)
+                logging.info(f"Live session ready in {elapsed * 1000:.1f} ms")
             logging.info("Starting bidirectional communication")
-            await asyncio.gather(
-                gemini_session.receive_from_client(),
-                gemini_session.receive_from_gemini(),
-            )
+            try:
+                await gemini_session.relay(session)
+            except ConnectionClosedError:
+                admission.record_upstream(False)
+                raise
+
+    async def connect_and_run() -> None:
+        await gemini_session.run(connect_and_relay)
 
     return connect_and_run
 
@@ -221,9 +718,30 @@ def get_connect_and_run_callable(websocket: WebSocket) -> Callable:
 @app.websocket("/ws")
 async def websocket_endpoint(websocket: WebSocket) -> None:
     """Handle new websocket connections."""
-    await websocket.accept()
-    connect_and_run = get_connect_and_run_callable(websocket)
-    await connect_and_run()
+    subprotocol = negotiate_subprotocol(websocket.scope.get("subprotocols"))
+    await websocket.accept(subprotocol=subprotocol)
+
+    async def on_wait(position: int, estimated_wait: float) -> None:
+        await websocket.send_json(
+            {
+                "status": f"All agents are busy, you are number {position} in the "
+                f"queue (about {estimated_wait:.0f} seconds)",
+                "queue_position": position,
+                "estimated_wait_seconds": round(estimated_wait),
+            }
+        )
+
+    try:
+        async with admission.admit(on_wait=on_wait):
+            connect_and_run = get_connect_and_run_callable(websocket, subprotocol)
+            await connect_and_run()
+    except AdmissionRejected as e:
+        logging.warning(f"Live session rejected: {e.reason}")
+        await websocket.send_json(
+            {"status": "Service is busy, please try again later", "rejected": e.reason}
+        )
+        # 1013: try again later
+        await websocket.close(code=1013)
 
 
 class Feedback(BaseModel):
@@ -254,14 +772,74 @@ def collect_feedback(feedback: Feedback) -> dict[str, str]:
     return {"status": "success"}
 
 
+@app.get("/api/live/sessions")
+def live_session_metrics() -> dict[str, Any]:
+    """Expose relay queue, admission, session pool and time-to-ready metrics."""
+    return {
+        "sessions": [session.queue_stats() for session in active_sessions],
+        "admission": admission.snapshot(),
+        "pool": live_pool.snapshot(),
+        "time_to_ready": time_to_ready.summary(),
+        "reconnect_time": reconnect_time.summary(),
+    }
+
+
+@app.on_event("startup")
+async def start_live_pool() -> None:
+    """Pre-warm live sessions before the first client connects."""
+    live_pool.start()
+
+
+@app.on_event("shutdown")
+async def close_live_pool() -> None:
+    """Close pre-warmed live sessions on shutdown."""
+    await live_pool.close()
+
+
+@app.on_event("shutdown")
+async def close_session_service() -> None:
+    """Persist pending chat session changes on shutdown."""
+    await session_service.close()
+
+
+@app.get("/api/turkish-airlines/metrics")
+def chat_metrics() -> dict[str, Any]:
+    """Expose chat session store, run gate, fast path, compaction, tool and latency metrics."""
+    return {
+        "store": session_service.snapshot(),
+        "runs": chat_run_gate.snapshot(),
+        "model": chat_model.snapshot(),
+        "fast_path": fast_path.snapshot(),
+        "history": history_compactor.snapshot(),
+        "tools": tool_projector.snapshot(),
+        "tool_memo": tool_memo.snapshot(),
+        "latency": chat_latency.summary(),
+        "stream_ttfb": chat_stream_ttfb.summary(),
+        "stream_total": chat_stream_total.summary(),
+    }
+
+
 class ChatMessage(BaseModel):
     """Represents a chat message."""
     message: str
     user_id: str | None = None
 
 
+async def _ensure_chat_session(user_id: str) -> str:
+    """Create the user's chat session unless it exists; return its id."""
+    session_id = f"session_{user_id}"
+    try:
+        session = await session_service.get_session(app_name=APP_NAME, user_id=user_id, session_id=session_id)
+        if session is None:
+            await session_service.create_session(app_name=APP_NAME, user_id=user_id, session_id=session_id)
+    except Exception:
+        # If get_session fails, create a new one
+        await session_service.create_session(app_name=APP_NAME, user_id=user_id, session_id=session_id)
+    return session_id
+
+
 @app.post("/api/turkish-airlines/chat")
-async def turkish_airlines_chat(chat_message: ChatMessage) -> dict[str, str]:
+async def turkish_airlines_chat(chat_message: ChatMessage) -> dict[str, Any]:
     """Handle chat requests to Turkish Airlines agent.
     
     Args:
@@ -270,51 +848,148 @@ async def turkish_airlines_chat(chat_message: ChatMessage) -> dict[str, str]:
     Returns:
         Response from the Turkish Airlines agent
     """
+    started = time.perf_counter()
+    deadline = asyncio.get_running_loop().time() + CHAT_DEADLINE_SECONDS
+    user_id = chat_message.user_id or "default_user"
+    session_id = f"session_{user_id}"
+
+    async def run() -> tuple[str, int]:
+        async with deadline_scope(deadline):
+            await _ensure_chat_session(user_id)
+
+            # Create content from user message
+            content = types.Content(role='user', parts=[types.Part(text=chat_message.message)])
+
+            # Run the agent using async method
+            events = []
+            async for event in turkish_airlines_runner.run_async(user_id=user_id, session_id=session_id, new_message=content):
+                events.append(event)
+
+            # Extract text from all parts of the final responses
+            response_text = "".join(final_text(event) for event in events)
+
+            tokens_saved = (
+                history_compactor.tokens_saved(events[0].invocation_id) if events else 0
+            )
+            logger.info(f"Chat history compaction saved {tokens_saved} tokens for {user_id}")
+        return response_text, tokens_saved
+
     try:
-        # Create or get session for the user
-        user_id = chat_message.user_id or "default_user"
-        session_id = f"session_{user_id}"
-        
-        # Ensure session exists (async)
-        try:
-            session = await session_service.get_session(app_name=APP_NAME, user_id=user_id, session_id=session_id)
-            if session is None:
-                session = await session_service.create_session(app_name=APP_NAME, user_id=user_id, session_id=session_id)
-        except Exception:
-            # If get_session fails, create a new one
-            session = await session_service.create_session(app_name=APP_NAME, user_id=user_id, session_id=session_id)
-        
-        # Create content from user message
-        content = types.Content(role='user', parts=[types.Part(text=chat_message.message)])
-        
-        # Run the agent using async method
-        events = []
-        async for event in turkish_airlines_runner.run_async(user_id=user_id, session_id=session_id, new_message=content):
-            events.append(event)
-        
-        response_text = ""
-        for event in events:
-            if event.is_final_response() and event.content:
-                # Extract text from all parts
-                for part in event.content.parts:
-                    if hasattr(part, 'text') and part.text:
-                        response_text += part.text
-        
+        # Runs for one session never overlap, and a double submit shares one run
+        response_text, tokens_saved = await chat_run_gate.run(
+            session_id, chat_message.message, run
+        )
+        chat_latency.record(time.perf_counter() - started)
+
         return {
             "status": "success",
             "response": response_text if response_text else "No response from agent",
-            "user_id": chat_message.user_id
+            "user_id": chat_message.user_id,
+            "tokens_saved": tokens_saved,
+        }
+    except asyncio.TimeoutError:
+        logger.warning(f"Turkish Airlines chat for {user_id} missed its deadline")
+        return {
+            "status": "error",
+            "reason": "deadline_exceeded",
+            "error": f"No answer within {CHAT_DEADLINE_SECONDS:g} seconds",
+            "user_id": chat_message.user_id,
         }
     except Exception as e:
         # Log error using standard logging
         logger.error(f"Error in Turkish Airlines chat: {str(e)}")
         return {
             "status": "error",
+            "reason": "agent_error",
             "error": str(e),
             "user_id": chat_message.user_id
         }
 
 
+@app.post("/api/turkish-airlines/chat/stream")
+async def turkish_airlines_chat_stream(
+    chat_message: ChatMessage, request: Request
+) -> StreamingResponse:
+    """Stream a chat answer as it is produced.
+
+    Partial text, tool progress markers and the final response are sent as
+    server-sent events when the client accepts text/event-stream, and as
+    newline delimited JSON otherwise.
+
+    Args:
+        chat_message: The chat message data
+        request: The HTTP request, used for content negotiation
+
+    Returns:
+        The streaming response
+    """
+    sse = SSE_MEDIA_TYPE in request.headers.get("accept", "")
+    started = time.perf_counter()
+    deadline = asyncio.get_running_loop().time() + CHAT_DEADLINE_SECONDS
+    user_id = chat_message.user_id or "default_user"
+    session_id = f"session_{user_id}"
+    content = types.Content(role="user", parts=[types.Part(text=chat_message.message)])
+
+    async def stream() -> AsyncIterator[bytes]:
+        first = True
+        invocation_id = None
+        response_text = ""
+        try:
+            # Streams are not shared, but still wait for the session's turn
+            async with chat_run_gate.serialize(session_id):
+                async with deadline_scope(deadline):
+                    await _ensure_chat_session(user_id)
+                    async for event in turkish_airlines_runner.run_async(
+                        user_id=user_id,
+                        session_id=session_id,
+                        new_message=content,
+                        run_config=chat_stream_run_config,
+                    ):
+                        invocation_id = invocation_id or event.invocation_id
+                        response_text += final_text(event)
+                        for message in event_messages(event):
+                            if first:
+                                chat_stream_ttfb.record(time.perf_counter() - started)
+                                first = False
+                            yield encode_message(message, sse)
+            tokens_saved = (
+                history_compactor.tokens_saved(invocation_id) if invocation_id else 0
+            )
+            final = {
+                "type": "final",
+                "status": "success",
+                "response": response_text or "No response from agent",
+                "user_id": chat_message.user_id,
+                "tokens_saved": tokens_saved,
+            }
+        except asyncio.TimeoutError:
+            logger.warning(f"Turkish Airlines chat stream for {user_id} missed its deadline")
+            final = {
+                "type": "error",
+                "reason": "deadline_exceeded",
+                "error": f"No answer within {CHAT_DEADLINE_SECONDS:g} seconds",
+                "user_id": chat_message.user_id,
+            }
+        except Exception as e:
+            logger.error(f"Error in Turkish Airlines chat stream: {e!s}")
+            final = {
+                "type": "error",
+                "reason": "agent_error",
+                "error": str(e),
+                "user_id": chat_message.user_id,
+            }
+        if first:
+            chat_stream_ttfb.record(time.perf_counter() - started)
+        yield encode_message(final, sse)
+        chat_stream_total.record(time.perf_counter() - started)
+
+    return StreamingResponse(
+        stream(),
+        media_type=SSE_MEDIA_TYPE if sse else NDJSON_MEDIA_TYPE,
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 @app.get("/")
 async def serve_frontend_root() -> FileResponse:
     """Serve the frontend index.html at the root path."""
@@ -13,12 +13,16 @@
 # limitations under the License.
 
 import os
+from collections.abc import Callable
+from typing import Any
 
 import google.auth
 import vertexai
 from google import genai
 from google.genai import types
 
+from app.utils.vector_index import LocalRetrieval
+
 # Constants
 VERTEXAI = os.getenv("VERTEXAI", "true").lower() == "true"
 LOCATION = "us-central1"
@@ -35,6 +39,14 @@ else:
     genai_client = genai.Client(http_options={"api_version": "v1alpha"})
 
  
+# Manual chunks come from the Vertex AI RAG corpus, or from a local
+# memory-mapped VectorIndex built with app.utils.vector_index when
+# RAG_BACKEND is "local"; RAG_INDEX_NPROBE > 0 searches its IVF lists
+RAG_BACKEND = os.getenv("RAG_BACKEND", "vertex")
+RAG_INDEX_PATH = os.getenv("RAG_INDEX_PATH", "")
+RAG_INDEX_NPROBE = int(os.getenv("RAG_INDEX_NPROBE", "0"))
+RAG_TOP_K = int(os.getenv("RAG_TOP_K", "10"))
+
 rag_store=types.VertexRagStore(
    rag_resources=[
        types.VertexRagStoreRagResource(
@@ -43,9 +55,30 @@ rag_store=types.VertexRagStore(
    ]
 )
 
-user_manual = types.Tool(retrieval=types.Retrieval(vertex_rag_store=rag_store))
+# Functions the live relay runs for the model's tool calls, by name
+tool_functions: dict[str, Callable[..., Any]] = {}
 
-tool_functions = {"user_manual": user_manual}
+if RAG_BACKEND == "local":
+    local_retrieval = LocalRetrieval.open(
+        RAG_INDEX_PATH, top_k=RAG_TOP_K, nprobe=RAG_INDEX_NPROBE
+    )
+    user_manual = types.Tool(
+        function_declarations=[
+            types.FunctionDeclaration(
+                name="user_manual",
+                description="Retrieve passages of the Samsung air conditioner manuals relevant to a query.",
+                parameters=types.Schema(
+                    type=types.Type.OBJECT,
+                    properties={"query": types.Schema(type=types.Type.STRING)},
+                    required=["query"],
+                ),
+            )
+        ]
+    )
+    tool_functions["user_manual"] = local_retrieval
+else:
+    # Vertex AI RAG retrieval runs inside the model; there is nothing to call
+    user_manual = types.Tool(retrieval=types.Retrieval(vertex_rag_store=rag_store))
 
 SYSTEM_INSTRUCTION = """
 You are Mahmut, a friendly and expert Samsung air conditioner technical advisor from the CUSTOMER support team.
@@ -95,4 +128,6 @@ live_connect_config = types.LiveConnectConfig(
         )
     ),
     enable_affective_dialog=True,
+    # Lets a dropped connection resume the same conversation
+    session_resumption=types.SessionResumptionConfig(),
 )
@@ -13,6 +13,7 @@
 # limitations under the License.
 
 import os
+from collections.abc import Callable
 
 import google.auth
 from google.adk.agents import Agent
@@ -25,6 +26,33 @@ os.environ.setdefault("GOOGLE_GENAI_USE_VERTEXAI", "True")
 from google.adk.tools.retrieval.vertex_ai_rag_retrieval import VertexAiRagRetrieval
 from vertexai.preview import rag
 
+from app.utils.semantic_cache import HashingEmbedder, SemanticCache
+from app.utils.vector_index import LocalRetrieval
+
+RAG_CORPUS = os.getenv(
+    "RAG_CORPUS",
+    "projects/qwiklabs-gcp-01-68d9cba6571b/locations/us-east4/ragCorpora/2305843009213693952",
+)
+
+# Manual chunks come from the Vertex AI RAG corpus, or from a local
+# memory-mapped VectorIndex built with app.utils.vector_index when
+# RAG_BACKEND is "local"; RAG_INDEX_NPROBE > 0 searches its IVF lists
+RAG_BACKEND = os.getenv("RAG_BACKEND", "vertex")
+RAG_INDEX_PATH = os.getenv("RAG_INDEX_PATH", "")
+RAG_INDEX_NPROBE = int(os.getenv("RAG_INDEX_NPROBE", "0"))
+
+# Answers to first questions are cached by question similarity and served
+# without retrieval or generation; bump RAG_CORPUS_VERSION when the corpus
+# is re-imported so answers from the old documents are dropped. Off by
+# default: the local hashing embedder matches words, not meaning, so enable
+# it only after checking the threshold on real traffic
+ANSWER_CACHE = os.getenv("ANSWER_CACHE", "false").lower() == "true"
+ANSWER_CACHE_THRESHOLD = float(os.getenv("ANSWER_CACHE_THRESHOLD", "0.8"))
+ANSWER_CACHE_TTL = float(os.getenv("ANSWER_CACHE_TTL", "86400"))
+ANSWER_CACHE_MAX_ENTRIES = int(os.getenv("ANSWER_CACHE_MAX_ENTRIES", "2000"))
+ANSWER_CACHE_MAX_BYTES = int(os.getenv("ANSWER_CACHE_MAX_BYTES", str(32 * 1024 * 1024)))
+RAG_CORPUS_VERSION = os.getenv("RAG_CORPUS_VERSION", "1")
+
 ask_vertex_retrieval = VertexAiRagRetrieval(
     name="retrieve_rag_documentation",
     description=(
@@ -35,13 +63,44 @@ ask_vertex_retrieval = VertexAiRagRetrieval(
             # please fill in your own rag corpus
             # here is a sample rag corpus for testing purpose
             # e.g. projects/123/locations/us-central1/ragCorpora/456
-            rag_corpus="projects/qwiklabs-gcp-01-68d9cba6571b/locations/us-east4/ragCorpora/2305843009213693952"
+            rag_corpus=RAG_CORPUS
         )
     ],
     similarity_top_k=10,
     vector_distance_threshold=0.6,
 )
 
+
+def local_rag_retrieval() -> Callable[[str], list[str] | str]:
+    """
+    Build the retrieval tool over the local vector index.
+
+    Returns:
+        function: retrieve_rag_documentation, answering from RAG_INDEX_PATH
+    """
+    retrieval = LocalRetrieval.open(
+        RAG_INDEX_PATH,
+        top_k=ask_vertex_retrieval.vertex_rag_store.similarity_top_k,
+        nprobe=RAG_INDEX_NPROBE
+    )
+
+    def retrieve_rag_documentation(query: str) -> list[str] | str:
+        """
+        Use this tool to retrieve documentation and reference materials for samsung air conditioner related questions.
+
+        Args:
+            query (str): The query to retrieve documentation for
+
+        Returns:
+            list: Texts of the most relevant manual chunks, or a no-match message
+        """
+        return retrieval(query)
+
+    return retrieve_rag_documentation
+
+
+retrieval_tool = local_rag_retrieval() if RAG_BACKEND == "local" else ask_vertex_retrieval
+
 SYSTEM_INSTRUCTION = """
 You are a friendly and highly knowledgeable air conditioner advisor agent for CUSTOMER, specializing in Samsung air conditioner products. Your goal is to help users with their inquiries.
 Introduce you as Mahmut from the CUSTOMER team.
@@ -51,9 +110,21 @@ Only answer questions based on this knowledge base.
 Speak Turkish.
 """
 
+answer_cache = SemanticCache(
+    HashingEmbedder(),
+    threshold=ANSWER_CACHE_THRESHOLD,
+    ttl=ANSWER_CACHE_TTL,
+    max_entries=ANSWER_CACHE_MAX_ENTRIES,
+    max_bytes=ANSWER_CACHE_MAX_BYTES,
+    corpus_version=RAG_CORPUS_VERSION,
+    enabled=ANSWER_CACHE,
+)
+
 technical_service_text_agent = Agent(
     name="technical_service_text_agent",
     model="gemini-2.5-flash",
     instruction=SYSTEM_INSTRUCTION,
-    tools=[ask_vertex_retrieval],
+    tools=[retrieval_tool],
+    before_model_callback=answer_cache.before_model,
+    after_model_callback=answer_cache.after_model,
 )
@@ -12,16 +12,35 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-import datetime
 import os
+import re
+from collections.abc import Iterable
 from datetime import datetime, timedelta
+from typing import Any
 from zoneinfo import ZoneInfo
 
 import google.auth
 from google.adk.agents.llm_agent import LlmAgent
+from google.adk.models.google_llm import Gemini
 from google.adk.planners import BuiltInPlanner
+from google.adk.tools.tool_context import ToolContext
 from google.genai.types import ThinkingConfig
 
+from app.utils.customer_store import (
+    CustomerStore,
+    format_phone,
+    format_ticket,
+    normalize_phone,
+    ticket_key,
+)
+from app.utils.fare_engine import OPERATIONS, FareEngine
+from app.utils.fast_path import Action, FastPath, Intent, Turn
+from app.utils.hedging import HedgedLlm
+from app.utils.history import HistoryCompactor
+from app.utils.itinerary_search import Itinerary, ItinerarySearch, format_duration
+from app.utils.tool_memo import ToolMemo, normalize_value
+from app.utils.tool_projection import Projection, ProjectionSpec, ToolProjector
+
 _, project_id = google.auth.default()
 os.environ.setdefault("GOOGLE_CLOUD_PROJECT", project_id)
 os.environ.setdefault("GOOGLE_CLOUD_LOCATION", "global")
@@ -30,6 +49,29 @@ os.environ.setdefault("GOOGLE_GENAI_USE_VERTEXAI", "True")
 phone_number = "05551234567"  # Default phone number for Ugur Akın Eren
 customer = None  # Global variable to store customer data after phone number is provided
 
+# Rolling compaction of the history sent to the model on every request
+CHAT_HISTORY_COMPACTION = os.getenv("CHAT_HISTORY_COMPACTION", "true").lower() == "true"
+CHAT_HISTORY_KEEP_TURNS = int(os.getenv("CHAT_HISTORY_KEEP_TURNS", "6"))
+CHAT_HISTORY_MAX_TOKENS = int(os.getenv("CHAT_HISTORY_MAX_TOKENS", "8000"))
+history_compactor = HistoryCompactor(
+    keep_turns=CHAT_HISTORY_KEEP_TURNS,
+    max_tokens=CHAT_HISTORY_MAX_TOKENS,
+    enabled=CHAT_HISTORY_COMPACTION,
+)
+
+# Model calls honour the chat request deadline; when hedging is on, a call
+# slower than the given latency percentile is sent once more and the first
+# answer wins, for at most CHAT_HEDGE_BUDGET of all calls
+CHAT_HEDGE_ENABLED = os.getenv("CHAT_HEDGE_ENABLED", "false").lower() == "true"
+CHAT_HEDGE_PERCENTILE = float(os.getenv("CHAT_HEDGE_PERCENTILE", "95"))
+CHAT_HEDGE_BUDGET = float(os.getenv("CHAT_HEDGE_BUDGET", "0.1"))
+chat_model = HedgedLlm(
+    inner=Gemini(model="gemini-2.5-flash"),
+    hedge=CHAT_HEDGE_ENABLED,
+    percentile=CHAT_HEDGE_PERCENTILE,
+    budget=CHAT_HEDGE_BUDGET,
+)
+
 SYSTEM_INSTRUCTION ="""
 You are a friendly and highly knowledgeable airline call center agent for TURKISH AIRLINES. Your goal is to help users with all aspects of their flight reservations and travel needs.
 Introduce yourself as Alex from the TURKISH AIRLINES support team.
@@ -86,6 +128,7 @@ GOLDEN RULES:
 - NEVER reveal technical implementation details to customers
 
 For all customer service scenarios (changes, cancellations, baggage, upgrades), maintain the same precise approach - use the exact stored phone number, present only actual flight details, and provide clear, polite guidance in the user's language.
+{verified_customer?}
 """
 
 
@@ -148,17 +191,59 @@ CUSTOMER_DATA = {
     }
 }
 
+# Customers are served from a memory-mapped store written by
+# CustomerStore.save when CUSTOMER_STORE_PATH is set, else from CUSTOMER_DATA
+CUSTOMER_STORE_PATH = os.getenv("CUSTOMER_STORE_PATH")
+customer_store = (
+    CustomerStore.open(CUSTOMER_STORE_PATH)
+    if CUSTOMER_STORE_PATH
+    else CustomerStore.from_records(CUSTOMER_DATA.values())
+)
+
+# Flight alternatives are searched in the daily timetable, expanded over
+# TIMETABLE_DAYS days from yesterday
+DATA_DIR = os.path.join(os.path.dirname(__file__), "data")
+AIRPORTS_PATH = os.getenv("AIRPORTS_PATH", os.path.join(DATA_DIR, "airports.csv"))
+TIMETABLE_PATH = os.getenv("TIMETABLE_PATH", os.path.join(DATA_DIR, "timetable.csv"))
+TIMETABLE_DAYS = int(os.getenv("TIMETABLE_DAYS", "90"))
+itinerary_search = ItinerarySearch.from_files(
+    AIRPORTS_PATH,
+    TIMETABLE_PATH,
+    start=(datetime.now() - timedelta(days=1)).date(),
+    days=TIMETABLE_DAYS,
+)
+
+# Fees and fares are quoted from the rule tables, compiled into lookup arrays
+FEE_RULES_PATH = os.getenv("FEE_RULES_PATH", os.path.join(DATA_DIR, "fee_rules.csv"))
+FARES_PATH = os.getenv("FARES_PATH", os.path.join(DATA_DIR, "fares.csv"))
+fare_engine = FareEngine.from_files(FEE_RULES_PATH, FARES_PATH, AIRPORTS_PATH)
+
+# Tool results are cut down to what the model needs at each stage of the
+# conversation (TOOL_PROJECTIONS) before they enter the prompt
+CHAT_TOOL_PROJECTION = os.getenv("CHAT_TOOL_PROJECTION", "true").lower() == "true"
+
+# Structured turns (confirming the number, ID digits, picking a flight) are
+# answered from tools and templates without a model call
+CHAT_FAST_PATH = os.getenv("CHAT_FAST_PATH", "true").lower() == "true"
+
+# Results of read-only tools are memoized per session, and the verified
+# customer is kept in the instruction so the model need not look it up again
+CHAT_TOOL_MEMO = os.getenv("CHAT_TOOL_MEMO", "true").lower() == "true"
+
+# Session state key listing the phone numbers verified in this conversation;
+# ticket tools only serve bookings held under one of them
+VERIFIED_PHONES_STATE_KEY = "verified_phones"
+
 # Customer data functions
 def get_customer_by_phone(phone_number):
     """
     Retrieve customer data based on phone number.
     Args:
-        phone_number: Customer's phone number.
+        phone_number: Customer's phone number, in any spoken or written form.
     Returns:
         dict: Customer data or None if not found.
     """
-    # phone_number = phone_number or "05551234567"
-    return CUSTOMER_DATA.get(phone_number)
+    return customer_store.by_phone(phone_number)
 
 def validate_id_or_passport(customer_data, id_last_5_digits):
     """
@@ -169,25 +254,10 @@ def validate_id_or_passport(customer_data, id_last_5_digits):
     Returns:
         bool: True if valid, False otherwise.
     """
-
-    # Ensure id_last_5_digits is a string and remove any whitespace
-    id_last_5_digits = str(id_last_5_digits).strip()
-    
-    # Check if identity_number exists before accessing it
-    id_last_5 = customer_data.get("identity_number")[-5:] if customer_data.get("identity_number") else ""
-    
-    # Check if passport exists before accessing it
-    passport_last_5 = customer_data.get("passport")[-5:] if customer_data.get("passport") else ""
-    
-    # Check if the last 5 digits match identity number
-    if id_last_5 and id_last_5 == id_last_5_digits:
-        return True
-    
-    # Check if the last 5 digits match passport
-    if passport_last_5 and passport_last_5 == id_last_5_digits:
-        return True
-    
-    return False
+    row = customer_store.customer_row(customer_data.get("phone_number", ""))
+    if row is None:
+        return False
+    return customer_store.has_id_suffix(row, id_last_5_digits)
 
 def get_customer_flights(customer_data):
     """
@@ -197,7 +267,111 @@ def get_customer_flights(customer_data):
     Returns:
         list: List of flights or empty list if none found.
     """
-    return customer_data.get("flights", [])
+    row = customer_store.customer_row(customer_data.get("phone_number", ""))
+    if row is None:
+        return []
+    return customer_store.flights(row)
+
+
+def get_booking(ticket_number: str) -> dict[str, Any] | None:
+    """
+    Retrieve a booking by ticket number from the ticket index.
+    Args:
+        ticket_number: The ticket number, e.g. "235-1234567890".
+    Returns:
+        dict: The flight with the holder's name and phone, or None if not found.
+    """
+    return customer_store.booking(ticket_number)
+
+
+def authorized_booking(
+    ticket_number: str, tool_context: ToolContext
+) -> tuple[dict[str, Any] | None, dict[str, Any] | None]:
+    """
+    Retrieve a booking held by a customer verified in this conversation.
+    Args:
+        ticket_number: The ticket number, e.g. "235-1234567890".
+        tool_context: Context of the tool call, holding the verified phones.
+    Returns:
+        tuple: The booking and None, or None and the response refusing it.
+    """
+    verified = tool_context.state.get(VERIFIED_PHONES_STATE_KEY) or []
+    if not verified:
+        return None, {
+            "ticket_number": ticket_number,
+            "status": "not_verified",
+            "message": "Please verify the customer with their phone number and the last five digits of their ID or passport first."
+        }
+    booking = get_booking(ticket_number)
+    # Tickets of other customers are reported as missing, not as someone else's
+    if not booking or booking["phone_number"] not in verified:
+        return None, booking_not_found(ticket_number)
+    return booking, None
+
+
+def booking_not_found(ticket_number: str) -> dict[str, Any]:
+    """
+    Build the response for a ticket number that matches no booking.
+    Args:
+        ticket_number: The ticket number the model asked about.
+    Returns:
+        dict: Not found status and message.
+    """
+    return {
+        "ticket_number": ticket_number,
+        "status": "not_found",
+        "message": "No booking found with this ticket number."
+    }
+
+
+def booking_details(booking: dict[str, Any]) -> dict[str, Any]:
+    """
+    Summarize the booked flight for tool responses.
+    Args:
+        booking: Booking as returned by get_booking.
+    Returns:
+        dict: Flight, route, date, departure time and class.
+    """
+    return {
+        "flight_number": booking["flight_number"],
+        "origin": booking["origin"],
+        "destination": booking["destination"],
+        "date": booking["date"],
+        "departure_time": booking["departure_time"],
+        "class": booking["class"]
+    }
+
+
+def days_until(date: Any) -> int:
+    """
+    Count the days left until a booked flight.
+    Args:
+        date: Flight date as "YYYY-MM-DD".
+    Returns:
+        int: Days from today, 0 for today, past or unreadable dates.
+    """
+    try:
+        day = datetime.strptime(str(date), "%Y-%m-%d").date()
+    except ValueError:
+        return 0
+    return max((day - datetime.now().date()).days, 0)
+
+
+def quote_booking(booking: dict[str, Any], operation: str) -> dict[str, int]:
+    """
+    Quote an operation on a booked ticket.
+    Args:
+        booking: Booking as returned by get_booking.
+        operation: One of OPERATIONS.
+    Returns:
+        dict: Fee, fare difference, refund, taxes and total in USD.
+    """
+    return fare_engine.quote(
+        operation,
+        booking["class"].lower(),
+        fare_engine.route_bands(booking["origin"], booking["destination"]),
+        days_until(booking["date"]),
+    ).row(0)
 
 
 def get_customer_info_tool(phone_number: str):
@@ -218,6 +392,7 @@ def get_customer_info_tool(phone_number: str):
     
     return {
         "status": "found",
+        "name": customer["name"],
         "message": f"Customer {customer['name']} found.",
         "phone_number": customer.get("phone_number"),
         "identity_number": customer.get("identity_number"),
@@ -227,12 +402,13 @@ def get_customer_info_tool(phone_number: str):
     }
 
 
-def verify_id_tool(phone_number: str, id_last_5_digits: str):
+def verify_id_tool(phone_number: str, id_last_5_digits: str, tool_context: ToolContext):
     """
     Verify customer identity using phone number and last 5 digits of ID/passport.
     Args:
         phone_number: Customer's phone number.
         id_last_5_digits: Last 5 digits of ID or passport number.
+        tool_context: Context of the tool call; a verified phone is kept in its state.
     Returns:
         dict: Verification result.
     """
@@ -245,6 +421,9 @@ def verify_id_tool(phone_number: str, id_last_5_digits: str):
         }
     
     is_valid = validate_id_or_passport(customer, id_last_5_digits)
+    verified = tool_context.state.get(VERIFIED_PHONES_STATE_KEY) or []
+    if is_valid and customer["phone_number"] not in verified:
+        tool_context.state[VERIFIED_PHONES_STATE_KEY] = [*verified, customer["phone_number"]]
     return {
         "status": "verified" if is_valid else "invalid",
         "name": customer["name"],
@@ -278,7 +457,77 @@ def get_customer_flights_tool(phone_number: str):
     }
 
 
-def change_flight_tool(ticket_number: str, new_time: str, origin: str, destination: str, date: str, direct_only: bool = False):
+def parse_travel_time(date: Any, time_of_day: Any = None) -> datetime | None:
+    """
+    Parse the travel date and optional time the model passes to flight tools.
+    Args:
+        date: Travel date as "YYYY-MM-DD".
+        time_of_day: Departure time as "HH:MM", or None for the start of the day.
+    Returns:
+        datetime: The local date and time, or None if the date is not valid.
+    """
+    try:
+        day = datetime.strptime(str(date).strip(), "%Y-%m-%d")
+    except ValueError:
+        return None
+    match = re.search(r"(\d{1,2})[:.](\d{2})", str(time_of_day or ""))
+    if match and int(match.group(1)) < 24 and int(match.group(2)) < 60:
+        return day.replace(hour=int(match.group(1)), minute=int(match.group(2)))
+    return day
+
+
+def itinerary_details(itinerary: Itinerary) -> dict[str, Any]:
+    """
+    Describe an itinerary with local times for tool responses.
+    Args:
+        itinerary: Itinerary found by itinerary_search.
+    Returns:
+        dict: Flight numbers, segments, times, stops and transfers.
+    """
+    def local(code: str, minutes: int) -> str:
+        return itinerary_search.local_time(code, minutes).strftime("%Y-%m-%d %H:%M")
+
+    first, last = itinerary.legs[0], itinerary.legs[-1]
+    return {
+        "flight_number": " / ".join(leg.flight_number for leg in itinerary.legs),
+        "segments": [
+            {
+                "flight_number": leg.flight_number,
+                "from": leg.origin,
+                "to": leg.destination,
+                "departure": local(leg.origin, leg.departure),
+                "arrival": local(leg.destination, leg.arrival)
+            }
+            for leg in itinerary.legs
+        ],
+        "departure": local(first.origin, first.departure),
+        "arrival": local(last.destination, last.arrival),
+        "stops": itinerary.stops,
+        "transfer_airports": itinerary.transfer_airports,
+        "layover_times": [format_duration(minutes) for minutes in itinerary.layovers],
+        "total_travel_time": format_duration(itinerary.duration),
+        "direct": itinerary.stops == 0
+    }
+
+
+def describe_itinerary(itinerary: Itinerary) -> str:
+    """
+    Summarize an itinerary in one sentence.
+    Args:
+        itinerary: Itinerary found by itinerary_search.
+    Returns:
+        str: Direct flight or the transfer airports and layovers.
+    """
+    if not itinerary.stops:
+        return "Direct flight available."
+    transfers = ", ".join(
+        f"{itinerary_search.airports[code].name} ({code}, {format_duration(layover)} layover)"
+        for code, layover in zip(itinerary.transfer_airports, itinerary.layovers, strict=True)
+    )
+    return f"Transfer at {transfers}."
+
+
+def change_flight_tool(ticket_number: str, new_time: str, origin: str, destination: str, date: str, tool_context: ToolContext, direct_only: bool = False):
     """
     Change flight and get alternative options.
     Args:
@@ -287,90 +536,86 @@ def change_flight_tool(ticket_number: str, new_time: str, origin: str, destinati
         origin: Origin airport code.
         destination: Destination airport code.
         date: Travel date.
+        tool_context: Context of the tool call, holding the verified phones.
         direct_only: Whether to show only direct flights.
     Returns:
         dict: Flight change options.
     """
-    # Simple heuristic: include at least one direct (if available) and two transfer options
-    alternatives = []
+    origin, destination = origin.strip().upper(), destination.strip().upper()
+    depart_after = parse_travel_time(date, new_time)
+    if depart_after is None or origin not in itinerary_search.airports:
+        return {
+            "ticket_number": ticket_number,
+            "status": "invalid_request",
+            "message": "Please provide a valid origin airport and a travel date as YYYY-MM-DD."
+        }
+    booking, refusal = authorized_booking(ticket_number, tool_context)
+    if booking is None:
+        return refusal
+
+    fare_class = booking["class"].lower()
+    route_band = fare_engine.route_bands(booking["origin"], booking["destination"])
+    paid_fare = int(fare_engine.fare(fare_class, route_band))
 
-    # Example direct option (only include if not forcing transfers)
-    if not direct_only:
-        alternatives.append(
+    def alternatives(direct_only: bool) -> list[dict[str, Any]]:
+        itineraries = itinerary_search.search(
+            origin,
+            destination,
+            itinerary_search.local_minutes(origin, depart_after),
+            k=3,
+            direct_only=direct_only,
+        )
+        if not itineraries:
+            return []
+        # Price every alternative in one batch
+        quotes = fare_engine.quote(
+            "change",
+            fare_class,
+            route_band,
+            days_until(booking["date"]),
+            new_route_band=fare_engine.route_bands(
+                [itinerary.legs[0].origin for itinerary in itineraries],
+                [itinerary.legs[-1].destination for itinerary in itineraries],
+            ),
+            stops=[itinerary.stops for itinerary in itineraries],
+        )
+        return [
             {
-                "flight_number": "TK234",
-                "segments": [{"from": origin, "to": destination}],
-                "departure": f"{date} 16:00",
-                "arrival": f"{date} 18:30",
-                "stops": 0,
-                "total_travel_time": "2h 30m",
-                "price_difference": 350,
-                "estimated_total_price": 1200 + 350,
-                "seats_available": 5,
-                "meal_service": "Included",
-                "direct": True,
-                "message": "Direct flight available."
+                **itinerary_details(itinerary),
+                "change_fee": int(quotes.fee[n]),
+                "fare_difference": int(quotes.fare_difference[n] + quotes.taxes[n]),
+                "price_difference": int(quotes.total[n]),
+                "estimated_total_price": paid_fare + int(quotes.total[n]),
+                "message": describe_itinerary(itinerary)
             }
-        )
+            for n, itinerary in enumerate(itineraries)
+        ]
 
-    # First connecting option (single transfer)
-    alternatives.append(
-        {
-            "flight_number": "TK567",
-            "segments": [
-                {"from": origin, "to": "FRA", "departure": f"{date} 09:00", "arrival": f"{date} 11:00"},
-                {"from": "FRA", "to": destination, "departure": f"{date} 14:00", "arrival": f"{date} 18:30"},
-            ],
-            "departure": f"{date} 09:00",
-            "arrival": f"{date} 18:30",
-            "stops": 1,
-            "transfer_airports": ["FRA"],
-            "layover_times": ["3h"],
-            "total_travel_time": "9h 30m",
-            "price_difference": 250,
-            "estimated_total_price": 1200 + 250,
-            "seats_available": 2,
-            "meal_service": "Included",
-            "direct": False,
-            "message": "Transfer at Frankfurt (FRA). Reasonable layover for connection."
-        }
-    )
+    options = alternatives(direct_only)
 
-    # Second connecting option (single transfer, later arrival)
-    alternatives.append(
-        {
-            "flight_number": "TK890",
-            "segments": [
-                {"from": origin, "to": "LHR", "departure": f"{date} 12:00", "arrival": f"{date} 14:00"},
-                {"from": "LHR", "to": destination, "departure": f"{date} 16:00", "arrival": f"{date} 20:30"},
-            ],
-            "departure": f"{date} 12:00",
-            "arrival": f"{date} 20:30",
-            "stops": 1,
-            "transfer_airports": ["LHR"],
-            "layover_times": ["2h"],
-            "total_travel_time": "8h 30m",
-            "price_difference": 150,
-            "estimated_total_price": 1200 + 150,
-            "seats_available": 8,
-            "meal_service": "Not included",
-            "direct": False,
-            "message": "Transfer at London Heathrow (LHR). Shorter total travel time but later arrival."
-        }
-    )
-
-    # If the user explicitly requested direct_only but none exist, return helpful message
-    if direct_only and all(a.get("direct") is False for a in alternatives):
+    # If the user explicitly requested direct_only but none exist, show connections
+    if direct_only and not options:
         return {
             "ticket_number": ticket_number,
             "status": "No direct flights available",
             "origin": origin,
             "destination": destination,
             "date": date,
-            "alternatives": alternatives,
+            "alternatives": alternatives(direct_only=False),
             "info": "No direct flights were found for the requested time. Showing connecting options instead."
         }
 
+    if not options:
+        return {
+            "ticket_number": ticket_number,
+            "status": "No flights available",
+            "origin": origin,
+            "destination": destination,
+            "date": date,
+            "alternatives": [],
+            "info": "No flights were found for this route within a day of the requested time."
+        }
+
     return {
         "ticket_number": ticket_number,
         "status": "Flight change options",
@@ -378,103 +623,134 @@ def change_flight_tool(ticket_number: str, new_time: str, origin: str, destinati
         "origin": origin,
         "destination": destination,
         "date": date,
-        "alternatives": alternatives,
-        "info": "Below are your alternative flights including transfer airports, layover times, seat availability and estimated total price."
+        "alternatives": options,
+        "info": "Below are your alternative flights including transfer airports, layover times and estimated total price."
     }
 
 
-def cancel_flight_tool(ticket_number: str):
+def cancel_flight_tool(ticket_number: str, tool_context: ToolContext):
     """
     Cancel a flight and calculate fees/refunds.
     Args:
         ticket_number: The ticket number to cancel.
+        tool_context: Context of the tool call, holding the verified phones.
     Returns:
         dict: Cancellation details.
     """
-    cancellation_fee = 500
-    refund_amount = 1200
+    booking, refusal = authorized_booking(ticket_number, tool_context)
+    if booking is None:
+        return refusal
+
+    quote = quote_booking(booking, "cancel")
+    cancellation_fee = quote["fee"]
+    refund_amount = quote["refund"]
     return {
         "ticket_number": ticket_number,
         "status": "Cancelled",
+        **booking_details(booking),
         "cancellation_fee": cancellation_fee,
         "refund_amount": refund_amount,
-        "message": f"Your flight has been cancelled. Cancellation fee: {cancellation_fee} USD. Refund amount: {refund_amount} USD."
+        "message": f"Your flight {booking['flight_number']} on {booking['date']} has been cancelled. Cancellation fee: {cancellation_fee} USD. Refund amount: {refund_amount} USD."
     }
 
 
-def open_ticket_tool(ticket_number: str):
+def open_ticket_tool(ticket_number: str, tool_context: ToolContext):
     """
     Convert ticket to open ticket.
     Args:
         ticket_number: The ticket number to open.
+        tool_context: Context of the tool call, holding the verified phones.
     Returns:
         dict: Open ticket details.
     """
-    open_ticket_fee = 200
+    booking, refusal = authorized_booking(ticket_number, tool_context)
+    if booking is None:
+        return refusal
+
+    open_ticket_fee = quote_booking(booking, "open_ticket")["fee"]
     validity_period = "1 year"
     return {
         "ticket_number": ticket_number,
         "status": "Open",
+        **booking_details(booking),
         "open_ticket_fee": open_ticket_fee,
         "validity_period": validity_period,
-        "message": f"Your ticket is now open. Fee: {open_ticket_fee} USD. Valid for {validity_period}."
+        "message": f"Your ticket for {booking['origin']}-{booking['destination']} is now open. Fee: {open_ticket_fee} USD. Valid for {validity_period}."
     }
 
 
-def calculate_fee_tool(ticket_number: str, operation: str):
+def calculate_fee_tool(ticket_number: str, operation: str, tool_context: ToolContext):
     """
     Calculate fees for various operations.
     Args:
         ticket_number: The ticket number.
-        operation: Type of operation ('change', 'cancel', 'upgrade', etc.).
+        operation: Type of operation ('change', 'cancel', 'upgrade' or 'open_ticket').
+        tool_context: Context of the tool call, holding the verified phones.
     Returns:
         dict: Fee calculation details.
     """
-    base_fee = 1000
-    taxes = 120
-    service_charge = 50
-    if operation == "change":
-        fee = base_fee + 350 + taxes + service_charge
-    elif operation == "cancel":
-        fee = base_fee - 500 + taxes
-    elif operation == "upgrade":
-        fee = base_fee + 800 + taxes + service_charge
-    else:
-        fee = base_fee + taxes
+    booking, refusal = authorized_booking(ticket_number, tool_context)
+    if booking is None:
+        return refusal
+
+    operation = re.sub(r"[\s-]+", "_", operation.strip().lower())
+    if operation not in OPERATIONS:
+        return {
+            "ticket_number": ticket_number,
+            "operation": operation,
+            "status": "unsupported_operation",
+            "message": f"Fees can be calculated for: {', '.join(OPERATIONS)}."
+        }
+
+    quote = quote_booking(booking, operation)
+    breakdown = {
+        "fee": quote["fee"],
+        "fare_difference": quote["fare_difference"],
+        "taxes": quote["taxes"]
+    }
+    if operation == "cancel":
+        breakdown["refund_amount"] = quote["refund"]
     return {
         "ticket_number": ticket_number,
         "operation": operation,
-        "calculated_fee": fee,
-        "breakdown": {
-            "base_fee": base_fee,
-            "taxes": taxes,
-            "service_charge": service_charge
-        },
-        "message": f"Calculated fee for {operation}: {fee} USD."
+        **booking_details(booking),
+        "calculated_fee": quote["total"],
+        "breakdown": breakdown,
+        "message": f"Calculated fee for {operation}: {quote['total']} USD."
     }
 
 
-def transfer_support_tool(ticket_number: str):
+def transfer_support_tool(ticket_number: str, tool_context: ToolContext):
     """
     Get transfer and connection information.
     Args:
         ticket_number: The ticket number.
+        tool_context: Context of the tool call, holding the verified phones.
     Returns:
         dict: Transfer information.
     """
+    booking, refusal = authorized_booking(ticket_number, tool_context)
+    if booking is None:
+        return refusal
+
+    # Bookings hold a single nonstop segment, so there is nothing to transfer
     transfer_info = {
         "segments": [
-            {"from": "IST", "to": "FRA", "departure": "2025-09-14 09:00"},
-            {"from": "FRA", "to": "JFK", "departure": "2025-09-14 13:00"},
+            {
+                "from": booking["origin"],
+                "to": booking["destination"],
+                "departure": f"{booking['date']} {booking['departure_time']}",
+                "arrival_time": booking["arrival_time"]
+            }
         ],
-        "total_travel_time": "14h 30m",
-        "layover_time": "4h",
-        "transfer_airport": "Frankfurt (FRA)",
-        "message": "Your connecting flights and transfer details are provided."
+        "layover_time": None,
+        "transfer_airport": None,
+        "message": f"Flight {booking['flight_number']} from {booking['origin']} to {booking['destination']} is a direct flight with no transfer."
     }
     return {
         "ticket_number": ticket_number,
         "status": "Transfer Info",
+        **booking_details(booking),
         **transfer_info
     }
 
@@ -489,104 +765,564 @@ def suggest_alternatives_tool(origin: str, destination: str, date: str):
     Returns:
         dict: Alternative flight options.
     """
-    # Example alternative flights
+    origin, destination = origin.strip().upper(), destination.strip().upper()
+    day = parse_travel_time(date)
+    if day is None or origin not in itinerary_search.airports:
+        return {
+            "origin": origin,
+            "destination": destination,
+            "date": date,
+            "alternatives": [],
+            "message": "Please provide a valid origin airport and a travel date as YYYY-MM-DD."
+        }
+
+    itineraries = itinerary_search.search(
+        origin, destination, itinerary_search.local_minutes(origin, day), k=3
+    )
+    # Economy fares of every alternative in one batch
+    prices: Iterable[int] = fare_engine.fare(
+        "economy",
+        fare_engine.route_bands(
+            [itinerary.legs[0].origin for itinerary in itineraries],
+            [itinerary.legs[-1].destination for itinerary in itineraries],
+        ),
+        [itinerary.stops for itinerary in itineraries],
+    ) if itineraries else []
     alternatives = [
         {
-            "flight_number": "TK234",
-            "departure": f"{date} 16:00",
-            "arrival": f"{date} 18:30",
-            "price": 1200,
-            "direct": True,
-            "seats_available": 5,
-            "meal_service": "Included"
-        },
-        {
-            "flight_number": "TK567",
-            "departure": f"{date} 19:00",
-            "arrival": f"{date} 22:30",
-            "price": 1100,
-            "direct": False,
-            "transfer": "FRA",
-            "seats_available": 2,
-            "meal_service": "Included"
-        },
-        {
-            "flight_number": "TK890",
-            "departure": f"{date} 21:00",
-            "arrival": f"{date} 01:30",
-            "price": 950,
-            "direct": False,
-            "transfer": "LHR",
-            "seats_available": 8,
-            "meal_service": "Not included"
+            **itinerary_details(itinerary),
+            "price": int(price)
         }
+        for itinerary, price in zip(itineraries, prices, strict=True)
     ]
     return {
         "origin": origin,
         "destination": destination,
         "date": date,
         "alternatives": alternatives,
-        "message": "Here are alternative flight options with seat availability and meal service details."
+        "message": "Here are alternative flight options with transfer and travel time details." if alternatives else "No flights were found for this route on that day."
     }
 
 
-def baggage_info_tool(ticket_number: str):
+def baggage_info_tool(ticket_number: str, tool_context: ToolContext):
     """
     Get baggage allowance and fee information.
     Args:
         ticket_number: The ticket number.
+        tool_context: Context of the tool call, holding the verified phones.
     Returns:
         dict: Baggage information.
     """
-    baggage_allowance = "30kg checked, 8kg cabin"
+    booking, refusal = authorized_booking(ticket_number, tool_context)
+    if booking is None:
+        return refusal
+
+    baggage_allowance = f"{booking['baggage_allowance']} checked, 8kg cabin"
     excess_fee = 25
     return {
         "ticket_number": ticket_number,
+        **booking_details(booking),
         "baggage_allowance": baggage_allowance,
         "excess_fee_per_kg": excess_fee,
         "message": f"Baggage allowance: {baggage_allowance}. Excess baggage fee: {excess_fee} USD per kg."
     }
 
 
-def upgrade_request_tool(ticket_number: str):
+def upgrade_request_tool(ticket_number: str, tool_context: ToolContext):
     """
     Request seat or class upgrade.
     Args:
         ticket_number: The ticket number.
+        tool_context: Context of the tool call, holding the verified phones.
     Returns:
         dict: Upgrade information.
     """
-    upgrade_fee = 800
-    available_classes = ["Business", "First"]
+    booking, refusal = authorized_booking(ticket_number, tool_context)
+    if booking is None:
+        return refusal
+
+    # Only classes above the booked one can be offered
+    classes = ["economy", "business", "first"]
+    booked = classes.index(booking["class"]) if booking["class"] in classes else 0
+    available_classes = [name.capitalize() for name in classes[booked + 1:]]
+    if not available_classes:
+        return {
+            "ticket_number": ticket_number,
+            **booking_details(booking),
+            "upgrade_fee": 0,
+            "available_classes": [],
+            "message": f"Your ticket is already in {booking['class'].capitalize()} class; no upgrade is available."
+        }
+    upgrade_fee = quote_booking(booking, "upgrade")["total"]
     return {
         "ticket_number": ticket_number,
+        **booking_details(booking),
         "upgrade_fee": upgrade_fee,
         "available_classes": available_classes,
         "message": f"Upgrade available to {', '.join(available_classes)}. Fee: {upgrade_fee} USD."
     }
 
 
-def special_assistance_tool(ticket_number: str):
+def special_assistance_tool(ticket_number: str, tool_context: ToolContext):
     """
     Request special assistance services.
     Args:
         ticket_number: The ticket number.
+        tool_context: Context of the tool call, holding the verified phones.
     Returns:
         dict: Special assistance information.
     """
+    booking, refusal = authorized_booking(ticket_number, tool_context)
+    if booking is None:
+        return refusal
+
     assistance_types = ["Wheelchair", "Special meal", "Unaccompanied minor"]
     contact_number = "+1-800-555-1234"
     return {
         "ticket_number": ticket_number,
+        **booking_details(booking),
         "assistance_types": assistance_types,
         "contact_number": contact_number,
-        "message": "Special assistance options are available. Please contact support for arrangements."
+        "message": f"Special assistance options are available for flight {booking['flight_number']} on {booking['date']}. Please contact support for arrangements."
     }
 
 
+# Fields of each tool result sent to the model. Identity numbers never are:
+# verify_id_tool checks them. Flights are listed once the customer is verified.
+FLIGHT_FIELDS = Projection(fields=(
+    "ticket_number", "flight_number", "origin", "destination", "date",
+    "departure_time", "arrival_time", "class", "status"
+))
+ITINERARY_FIELDS = Projection(fields=(
+    "flight_number", "departure", "arrival", "stops", "transfer_airports",
+    "layover_times", "total_travel_time", "change_fee", "price_difference",
+    "estimated_total_price", "price"
+))
+BOOKING_FIELDS = ("ticket_number", "status", "flight_number", "date")
+TOOL_PROJECTIONS = ProjectionSpec(
+    stages=("identify", "verified"),
+    tools={
+        "get_customer_info_tool": {
+            "identify": Projection(fields=("status", "name", "phone_number", "flight_count")),
+            "verified": Projection(
+                fields=("status", "name", "phone_number", "flight_count", "flights"),
+                items={"flights": FLIGHT_FIELDS},
+                max_items=5
+            )
+        },
+        "verify_id_tool": {"*": Projection(fields=("status", "name"))},
+        "get_customer_flights_tool": {
+            "*": Projection(
+                fields=("status", "name", "flight_count", "flights"),
+                items={"flights": FLIGHT_FIELDS},
+                max_items=5
+            )
+        },
+        "change_flight_tool": {
+            "*": Projection(
+                fields=("ticket_number", "status", "origin", "destination", "date", "alternatives"),
+                items={"alternatives": ITINERARY_FIELDS}
+            )
+        },
+        "suggest_alternatives_tool": {
+            "*": Projection(
+                fields=("origin", "destination", "date", "alternatives"),
+                items={"alternatives": ITINERARY_FIELDS}
+            )
+        },
+        "cancel_flight_tool": {
+            "*": Projection(fields=(*BOOKING_FIELDS, "cancellation_fee", "refund_amount"))
+        },
+        "open_ticket_tool": {
+            "*": Projection(fields=(*BOOKING_FIELDS, "open_ticket_fee", "validity_period"))
+        },
+        "calculate_fee_tool": {
+            "*": Projection(fields=(*BOOKING_FIELDS, "operation", "calculated_fee", "breakdown", "message"))
+        },
+        "transfer_support_tool": {
+            "*": Projection(fields=(*BOOKING_FIELDS, "origin", "destination", "transfer_airport", "layover_time"))
+        },
+        "baggage_info_tool": {
+            "*": Projection(fields=(*BOOKING_FIELDS, "class", "baggage_allowance", "excess_fee_per_kg"))
+        },
+        "upgrade_request_tool": {
+            "*": Projection(fields=(*BOOKING_FIELDS, "class", "available_classes", "upgrade_fee"))
+        },
+        "special_assistance_tool": {
+            "*": Projection(fields=(*BOOKING_FIELDS, "assistance_types", "contact_number"))
+        }
+    },
+    transitions={
+        ("verify_id_tool", "verified"): "verified",
+        ("verify_id_tool", "invalid"): "identify",
+        ("get_customer_info_tool", "not_found"): "identify"
+    }
+)
+tool_projector = ToolProjector(TOOL_PROJECTIONS, enabled=CHAT_TOOL_PROJECTION)
+
+
+# Fast path for the structured turns of the workflow. Words are matched on
+# casefolded text; anything else in a message sends it to the model.
+TURKISH_LETTERS = set("çğıöşü")
+LANGUAGE_WORDS = {
+    "tr": {
+        "evet", "hayır", "hayir", "merhaba", "selam", "tamam", "olur", "uçuş",
+        "ucus", "bilet", "birinci", "ikinci", "ilk", "istiyorum", "lütfen",
+        "lutfen", "teşekkürler", "numara", "numaram", "yok"
+    },
+    "en": {
+        "yes", "no", "hello", "hi", "okay", "sure", "flight", "ticket", "first",
+        "second", "please", "thanks", "want", "the", "my", "number", "yeah"
+    }
+}
+YES_WORDS = {
+    "evet", "tabii", "tabi", "olur", "aynen", "doğru", "dogru", "tamam", "yes",
+    "yeah", "yep", "sure", "correct", "ok", "okay"
+}
+NO_WORDS = {"hayır", "hayir", "yok", "no", "nope"}
+FILLER_WORDS = {
+    "lütfen", "lutfen", "bu", "şu", "o", "numara", "numaralı", "numarası",
+    "numaram", "numarayla", "uçuş", "uçuşu", "uçuşum", "ucus", "olan", "tane",
+    "istiyorum", "seçiyorum", "seçtim", "ile", "devam", "edelim", "ilgili",
+    "please", "the", "one", "flight", "that", "this", "it", "is", "i", "want",
+    "choose", "pick", "take", "select", "option", "number", "no", "would", "like",
+    "to", "with", "go", "let", "s", "thanks", "thank", "you"
+}
+CHOICE_WORDS = {
+    "bir": 1, "birinci": 1, "birincisi": 1, "ilk": 1, "ilki": 1, "iki": 2,
+    "ikinci": 2, "ikincisi": 2, "üç": 3, "üçüncü": 3, "üçüncüsü": 3,
+    "son": -1, "sonuncu": -1, "sonuncusu": -1, "first": 1, "1st": 1,
+    "second": 2, "2nd": 2, "two": 2, "third": 3, "3rd": 3, "three": 3, "last": -1
+}
+# Text of the agent's question about the calling number, in each language
+CALLING_NUMBER_QUESTIONS = ("aradığınız numara", "calling from")
+FAST_PATH_REPLIES = {
+    "tr": {
+        "ask_digits": "Teşekkürler, Sayın {name}. Kimlik numaranızın son beş hanesini veya pasaport numaranızın son beş hanesini söyler misiniz?",
+        "not_registered": "Bu numara sistemimizde kayıtlı değil. Başka bir numara denemek ister misiniz?",
+        "ask_number": "Elbette. Hangi telefon numarası üzerinden işlem yapmak istersiniz?",
+        "invalid_id": "Üzgünüm, bu bilgiler kayıtlarımızla eşleşmedi. Kimlik numaranızın veya pasaport numaranızın son beş hanesini tekrar söyler misiniz?",
+        "flights": "Teşekkürler Sayın {name}, kimliğiniz doğrulandı. Adınıza kayıtlı {count} uçuş bulunuyor:\n{lines}\nHangi uçuşunuzla ilgili işlem yapmak istersiniz?",
+        "one_flight": "Teşekkürler Sayın {name}, kimliğiniz doğrulandı. Adınıza kayıtlı uçuşunuz:\n{lines}\nBu uçuşla ilgili işlem yapmak ister misiniz?",
+        "no_flights": "Teşekkürler Sayın {name}, kimliğiniz doğrulandı. Adınıza kayıtlı bir uçuş bulunmuyor. Size başka nasıl yardımcı olabilirim?",
+        "flight": "{flight_number} {origin} → {destination}, {date} {departure_time}-{arrival_time}, {class} (bilet {ticket_number})",
+        "selected": "{flight_number} {origin} → {destination}, {date} {departure_time} uçuşunuzu seçtiniz. Bu uçuş için değişiklik, iptal, açık bilet, bagaj bilgisi, sınıf yükseltme veya özel yardım işlemlerinden hangisini yapmak istersiniz?"
+    },
+    "en": {
+        "ask_digits": "Thank you, Dear {name}. Could you please provide the last five digits of your ID or passport number?",
+        "not_registered": "This number is not registered in our system. Would you like to try another number?",
+        "ask_number": "Of course. Which phone number would you like to proceed with?",
+        "invalid_id": "I'm sorry, that does not match our records. Could you please repeat the last five digits of your ID or passport number?",
+        "flights": "Thank you, Dear {name}, your identity is verified. You have {count} flights booked:\n{lines}\nWhich flight would you like to manage?",
+        "one_flight": "Thank you, Dear {name}, your identity is verified. You have one flight booked:\n{lines}\nWould you like to manage this flight?",
+        "no_flights": "Thank you, Dear {name}, your identity is verified. There are no flights booked under your name. How else can I help you?",
+        "flight": "{flight_number} {origin} → {destination}, {date} {departure_time}-{arrival_time}, {class} (ticket {ticket_number})",
+        "selected": "You selected flight {flight_number} {origin} → {destination} on {date} at {departure_time}. Would you like to change or cancel it, make it an open ticket, or ask about baggage, an upgrade or special assistance?"
+    }
+}
+
+
+def words(text: str) -> list[str]:
+    """
+    Split a message into casefolded words.
+    Args:
+        text: The message.
+    Returns:
+        list: Words, Turkish dotted capital I folded to i.
+    """
+    return re.findall(r"\w+", text.replace("İ", "i").casefold())
+
+
+def detect_language(text: str) -> str | None:
+    """
+    Tell Turkish from English by letters and common words.
+    Args:
+        text: A message.
+    Returns:
+        str: "tr", "en" or None if the text does not tell.
+    """
+    folded = text.replace("İ", "i").casefold()
+    if TURKISH_LETTERS & set(folded):
+        return "tr"
+    found = set(words(folded))
+    turkish = len(found & LANGUAGE_WORDS["tr"])
+    english = len(found & LANGUAGE_WORDS["en"])
+    if turkish == english:
+        return None
+    return "tr" if turkish > english else "en"
+
+
+def address_name(name: Any) -> str:
+    """
+    Pick the name to address a customer by.
+    Args:
+        name: Full name, e.g. "Ugur Akın Eren".
+    Returns:
+        str: The last given name, e.g. "Akın".
+    """
+    parts = str(name).split()
+    return (parts[:-1] or parts)[-1] if parts else ""
+
+
+def only_words(text: str, allowed: set[str]) -> bool:
+    """
+    Check that a message has no words but numbers and the allowed ones.
+    Args:
+        text: The message.
+        allowed: Words the message may contain.
+    Returns:
+        bool: True if every word is a number or allowed.
+    """
+    return all(word.isdigit() or word in allowed for word in words(text))
+
+
+def identified_customer(turn: Turn) -> dict[str, Any] | None:
+    """
+    Find the customer identified and not yet verified in this conversation.
+    Args:
+        turn: The fast path turn.
+    Returns:
+        dict: The latest customer info result, or None.
+    """
+    info = turn.results.get("get_customer_info_tool")
+    if not info or info.get("status") != "found":
+        return None
+    names = list(turn.results)
+    verify = turn.results.get("verify_id_tool")
+    if verify and verify.get("status") == "verified" and names.index("verify_id_tool") > names.index("get_customer_info_tool"):
+        return None
+    return info
+
+
+def confirm_calling_number(turn: Turn) -> Action | None:
+    """Look up the calling number when the customer confirms it."""
+    asked = turn.agent_text.replace("İ", "i").casefold()
+    if not any(question in asked for question in CALLING_NUMBER_QUESTIONS):
+        return None
+    found = set(words(turn.message))
+    if not found or not found & YES_WORDS or not only_words(turn.message, YES_WORDS | FILLER_WORDS):
+        return None
+    return Action(tool="get_customer_info_tool", args={"phone_number": phone_number})
+
+
+def decline_calling_number(turn: Turn) -> Action | None:
+    """Ask for another number when the customer declines the calling one."""
+    asked = turn.agent_text.replace("İ", "i").casefold()
+    if not turn.language or not any(question in asked for question in CALLING_NUMBER_QUESTIONS):
+        return None
+    found = set(words(turn.message))
+    if not found & NO_WORDS or not only_words(turn.message, NO_WORDS | FILLER_WORDS) or re.search(r"\d", turn.message):
+        return None
+    return Action(reply=FAST_PATH_REPLIES[turn.language]["ask_number"])
+
+
+def give_phone_number(turn: Turn) -> Action | None:
+    """Look up a phone number the customer gives."""
+    if identified_customer(turn) or "verify_id_tool" in turn.results:
+        return None
+    key = normalize_phone(turn.message)
+    if key is None or not only_words(turn.message, FILLER_WORDS | {"evet", "yes", "hayır", "hayir", "no"}):
+        return None
+    return Action(tool="get_customer_info_tool", args={"phone_number": format_phone(key)})
+
+
+def give_id_digits(turn: Turn) -> Action | None:
+    """Verify the five ID or passport digits of the identified customer."""
+    info = identified_customer(turn)
+    digits = re.sub(r"\D", "", turn.message)
+    if not info or len(digits) != 5 or len(turn.message) > 60 or "?" in turn.message:
+        return None
+    return Action(tool="verify_id_tool", args={"phone_number": info["phone_number"], "id_last_5_digits": digits})
+
+
+def choose_flight(turn: Turn) -> Action | None:
+    """Confirm the flight the customer picks from the listed ones."""
+    last = turn.last_result()
+    if not turn.language or not last or last[0] != "get_customer_flights_tool":
+        return None
+    flights = last[1].get("flights") or []
+    folded = turn.message.casefold()
+    chosen = [
+        flight for flight in flights
+        if flight.get("flight_number", "").casefold() in folded
+        or flight.get("ticket_number", "") in turn.message
+    ]
+    if not chosen:
+        if not only_words(turn.message, FILLER_WORDS | set(CHOICE_WORDS)):
+            return None
+        choices = {CHOICE_WORDS.get(word, int(word) if word.isdigit() else 0) for word in words(turn.message)}
+        choices.discard(0)
+        if len(choices) != 1:
+            return None
+        choice = choices.pop()
+        if not -1 <= choice <= len(flights) or not flights:
+            return None
+        chosen = [flights[choice if choice < 0 else choice - 1]]
+    if len(chosen) != 1:
+        return None
+    return Action(reply=FAST_PATH_REPLIES[turn.language]["selected"].format_map(chosen[0]))
+
+
+def customer_found(result: dict[str, Any], turn: Turn, args: dict[str, Any]) -> Action | None:
+    """Ask the identified customer for their ID digits."""
+    if not turn.language:
+        return None
+    replies = FAST_PATH_REPLIES[turn.language]
+    if result.get("status") == "not_found":
+        return Action(reply=replies["not_registered"])
+    if result.get("status") != "found":
+        return None
+    return Action(reply=replies["ask_digits"].format(name=address_name(result.get("name", ""))))
+
+
+def id_checked(result: dict[str, Any], turn: Turn, args: dict[str, Any]) -> Action | None:
+    """List the flights of a verified customer, or ask for the digits again."""
+    if turn.language and result.get("status") == "invalid":
+        return Action(reply=FAST_PATH_REPLIES[turn.language]["invalid_id"])
+    if result.get("status") != "verified":
+        return None
+    return Action(tool="get_customer_flights_tool", args={"phone_number": args["phone_number"]})
+
+
+def flights_listed(result: dict[str, Any], turn: Turn, args: dict[str, Any]) -> Action | None:
+    """Read out the flights of the verified customer."""
+    if not turn.language or result.get("status") != "success":
+        return None
+    replies = FAST_PATH_REPLIES[turn.language]
+    flights = result.get("flights") or []
+    lines = "\n".join(
+        f"{n}. " + replies["flight"].format_map({**flight, "class": str(flight.get("class", "")).capitalize()})
+        for n, flight in enumerate(flights, start=1)
+    )
+    template = "no_flights" if not flights else "one_flight" if len(flights) == 1 else "flights"
+    return Action(reply=replies[template].format(name=address_name(result.get("name", "")), count=len(flights), lines=lines))
+
+
+fast_path = FastPath(
+    intents=[
+        Intent("confirm_calling_number", confirm_calling_number),
+        Intent("decline_calling_number", decline_calling_number),
+        Intent("give_phone_number", give_phone_number),
+        Intent("give_id_digits", give_id_digits),
+        Intent("choose_flight", choose_flight)
+    ],
+    handlers={
+        "get_customer_info_tool": customer_found,
+        "verify_id_tool": id_checked,
+        "get_customer_flights_tool": flights_listed
+    },
+    detect_language=detect_language,
+    enabled=CHAT_FAST_PATH,
+)
+
+
+def normalize_phone_arg(phone: Any) -> Any:
+    """
+    Normalize a phone number argument for the tool memo.
+    Args:
+        phone: Phone number as the model passed it.
+    Returns:
+        str: The stored "05551234567" form, or the trimmed text if not a number.
+    """
+    key = normalize_phone(phone)
+    return format_phone(key) if key is not None else normalize_value(phone)
+
+
+def normalize_ticket_arg(ticket_number: Any) -> Any:
+    """
+    Normalize a ticket number argument for the tool memo.
+    Args:
+        ticket_number: Ticket number as the model passed it.
+    Returns:
+        str: The "235-1234567890" form, or the trimmed text if not a ticket.
+    """
+    key = ticket_key(ticket_number)
+    return format_ticket(key) if key is not None else normalize_value(ticket_number)
+
+
+def describe_verified_customer(entries: list[dict[str, Any]]) -> str:
+    """
+    Render the verified customer of the conversation for the instruction.
+    Args:
+        entries: Tool memo entries with tool, args and result, oldest first.
+    Returns:
+        str: The customer's name, phone and flights, or "" before verification.
+    """
+    verified = [
+        entry for entry in entries
+        if entry["tool"] == "verify_id_tool" and entry["result"].get("status") == "verified"
+    ]
+    if not verified:
+        return ""
+    phone = verified[-1]["args"].get("phone_number")
+    lines = [
+        "VERIFIED CUSTOMER (identified and verified earlier in this conversation; do not ask for the phone number or ID digits again):",
+        f"- Name: {verified[-1]['result'].get('name', '')}",
+        f"- Phone number: {phone}"
+    ]
+    flights = [
+        entry["result"] for entry in entries
+        if entry["tool"] == "get_customer_flights_tool"
+        and entry["args"].get("phone_number") == phone
+        and entry["result"].get("status") == "success"
+    ]
+    if flights:
+        lines.append("- Flights (use these instead of looking them up again):")
+        lines.extend(
+            f"  * {flight['flight_number']} {flight['origin']}-{flight['destination']} on {flight['date']} "
+            f"{flight['departure_time']}-{flight['arrival_time']}, {flight['class']}, ticket {flight['ticket_number']}, {flight['status']}"
+            for flight in flights[-1].get("flights", [])
+        )
+    return "\n".join(lines)
+
+
+READ_ONLY_TOOLS = (
+    "get_customer_info_tool",
+    "verify_id_tool",
+    "get_customer_flights_tool",
+    "calculate_fee_tool",
+    "transfer_support_tool",
+    "suggest_alternatives_tool",
+    "baggage_info_tool",
+    "upgrade_request_tool",
+    "special_assistance_tool"
+)
+# Cancelling or opening a ticket changes the customer's flights and the fees
+TICKET_WRITE_INVALIDATES = (
+    "get_customer_info_tool",
+    "get_customer_flights_tool",
+    "calculate_fee_tool",
+    "upgrade_request_tool"
+)
+# Ticket tools refuse callers not verified yet, so verifying drops those answers
+VERIFY_INVALIDATES = (
+    "calculate_fee_tool",
+    "transfer_support_tool",
+    "baggage_info_tool",
+    "upgrade_request_tool",
+    "special_assistance_tool"
+)
+tool_memo = ToolMemo(
+    read_only=READ_ONLY_TOOLS,
+    invalidates={
+        "verify_id_tool": VERIFY_INVALIDATES,
+        "cancel_flight_tool": TICKET_WRITE_INVALIDATES,
+        "open_ticket_tool": TICKET_WRITE_INVALIDATES
+    },
+    normalizers={
+        "phone_number": normalize_phone_arg,
+        "ticket_number": normalize_ticket_arg,
+        "id_last_5_digits": lambda digits: re.sub(r"\D", "", str(digits))
+    },
+    context=describe_verified_customer,
+    context_key="verified_customer",
+    enabled=CHAT_TOOL_MEMO,
+)
+
+
 root_agent = LlmAgent(
     name="root_agent",
-    model="gemini-2.5-flash",
+    model=chat_model,
     instruction=SYSTEM_INSTRUCTION,
     tools=[
         get_customer_info_tool,
@@ -602,4 +1338,7 @@ root_agent = LlmAgent(
         upgrade_request_tool,
         special_assistance_tool
     ],
+    before_model_callback=[fast_path.before_model, history_compactor.before_model],
+    before_tool_callback=tool_memo.before_tool,
+    after_tool_callback=[tool_memo.after_tool, tool_projector.after_tool],
 )
\ No newline at end of file
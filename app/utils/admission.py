@@ -0,0 +1,299 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Admission control for live sessions.
+
+Every live session holds an upstream Gemini Live connection, so a spike of
+callers can exhaust the upstream quota and degrade every conversation at once.
+The AdmissionController caps concurrent sessions per process, parks extra
+callers in a FIFO queue with position and estimated wait updates, and sheds
+load quickly through a circuit breaker while upstream connections are failing.
+"""
+
+import asyncio
+import contextlib
+import time
+from collections import deque
+from collections.abc import AsyncIterator, Awaitable, Callable
+from dataclasses import asdict, dataclass
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class AdmissionRejected(Exception):
+    """Raised when a session cannot be admitted."""
+
+    def __init__(self, reason: str) -> None:
+        super().__init__(reason)
+        self.reason = reason
+
+
+class CircuitBreaker:
+    """Opens when the recent upstream error rate is too high.
+
+    After open_seconds the breaker lets a single trial session through; its
+    outcome closes the breaker again or re-opens it. A trial that ends without
+    an outcome is released, so the next session can take it.
+    """
+
+    def __init__(
+        self,
+        error_rate: float = 0.5,
+        window: int = 20,
+        min_requests: int = 10,
+        open_seconds: float = 30.0,
+    ) -> None:
+        """Initialize the breaker.
+
+        Args:
+            error_rate: Failure ratio over the window that opens the breaker
+            window: Number of recent upstream outcomes considered
+            min_requests: Outcomes needed before the breaker may open
+            open_seconds: Seconds to reject before allowing a trial session
+        """
+        self.error_rate = error_rate
+        self.min_requests = min_requests
+        self.open_seconds = open_seconds
+        self._outcomes: deque[bool] = deque(maxlen=window)
+        self._state = CLOSED
+        self._opened_at = 0.0
+        self._trial_in_flight = False
+        # Number of trials granted, identifying the one in flight
+        self.trials = 0
+
+    @property
+    def state(self) -> str:
+        """Current state, moving from open to half-open once the cooldown ends."""
+        cooled_down = time.monotonic() - self._opened_at >= self.open_seconds
+        if self._state == OPEN and cooled_down:
+            self._state = HALF_OPEN
+            self._trial_in_flight = False
+        return self._state
+
+    def allow(self) -> bool:
+        """Whether a new session may try the upstream."""
+        state = self.state
+        if state == CLOSED:
+            return True
+        if state == HALF_OPEN and not self._trial_in_flight:
+            self._trial_in_flight = True
+            self.trials += 1
+            return True
+        return False
+
+    def release_trial(self, trial: int) -> None:
+        """Give up a trial that ended without recording an outcome.
+
+        Args:
+            trial: Value of ``trials`` when the trial was granted
+        """
+        if self._state == HALF_OPEN and self._trial_in_flight and trial == self.trials:
+            self._trial_in_flight = False
+
+    def record(self, success: bool) -> None:
+        """Record the outcome of an upstream connection attempt."""
+        if self.state == HALF_OPEN:
+            if success:
+                self._state = CLOSED
+                self._outcomes.clear()
+            else:
+                self._open()
+            return
+        self._outcomes.append(success)
+        failures = self._outcomes.count(False)
+        if (
+            self._state == CLOSED
+            and len(self._outcomes) >= self.min_requests
+            and failures / len(self._outcomes) >= self.error_rate
+        ):
+            self._open()
+
+    def _open(self) -> None:
+        self._state = OPEN
+        self._opened_at = time.monotonic()
+        self._trial_in_flight = False
+
+
+@dataclass
+class AdmissionStats:
+    """Counters describing admission decisions."""
+
+    active: int = 0
+    waiting: int = 0
+    admitted: int = 0
+    queued: int = 0
+    rejected: int = 0
+    rejected_queue_full: int = 0
+    rejected_timeout: int = 0
+    rejected_circuit_open: int = 0
+
+
+class AdmissionController:
+    """Caps concurrent live sessions and queues the rest fairly."""
+
+    def __init__(
+        self,
+        max_concurrent: int,
+        max_queue: int,
+        queue_timeout: float = 60.0,
+        breaker: CircuitBreaker | None = None,
+        notify_interval: float = 5.0,
+        default_session_seconds: float = 180.0,
+    ) -> None:
+        """Initialize the controller.
+
+        Args:
+            max_concurrent: Maximum number of live sessions admitted at once
+            max_queue: Maximum number of callers waiting for a free slot
+            queue_timeout: Seconds a caller may wait before being rejected
+            breaker: Circuit breaker fed with upstream connection outcomes
+            notify_interval: Seconds between position updates while waiting
+            default_session_seconds: Session length assumed for wait estimates
+                until real sessions have completed
+        """
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.breaker = breaker or CircuitBreaker()
+        self.notify_interval = notify_interval
+        self._avg_session_seconds = default_session_seconds
+        self._waiters: deque[asyncio.Future] = deque()
+        self._moved: asyncio.Event | None = None
+        self._stats = AdmissionStats()
+
+    @property
+    def stats(self) -> AdmissionStats:
+        """Current counters, including live active and waiting counts."""
+        self._stats.waiting = len(self._waiters)
+        return self._stats
+
+    def snapshot(self) -> dict[str, int | str]:
+        """Return the counters and breaker state for logging and metrics."""
+        return {**asdict(self.stats), "breaker": self.breaker.state}
+
+    def estimated_wait(self, position: int) -> float:
+        """Estimate the seconds until the caller at position gets a slot."""
+        return position * self._avg_session_seconds / max(1, self.max_concurrent)
+
+    def record_upstream(self, success: bool) -> None:
+        """Feed the outcome of an upstream connection attempt to the breaker."""
+        self.breaker.record(success)
+
+    @contextlib.asynccontextmanager
+    async def admit(
+        self, on_wait: Callable[[int, float], Awaitable[None]] | None = None
+    ) -> AsyncIterator[None]:
+        """Hold a session slot for the duration of the context.
+
+        Args:
+            on_wait: Called with the queue position and estimated wait in
+                seconds while the caller is queued
+
+        Raises:
+            AdmissionRejected: If the breaker is open, the queue is full or
+                the caller waited longer than queue_timeout
+        """
+        free = self._stats.active < self.max_concurrent and not self._waiters
+        # Capacity first, so a rejected caller never takes the half-open trial
+        if not free and len(self._waiters) >= self.max_queue:
+            self._reject("queue_full")
+        trial = self.breaker.state == HALF_OPEN
+        if not self.breaker.allow():
+            self._reject("circuit_open")
+        trial_id = self.breaker.trials if trial else None
+        try:
+            if free:
+                self._stats.active += 1
+            else:
+                await self._wait_for_slot(on_wait)
+            self._stats.admitted += 1
+            started = time.monotonic()
+            try:
+                yield
+            finally:
+                duration = time.monotonic() - started
+                self._avg_session_seconds += 0.1 * (
+                    duration - self._avg_session_seconds
+                )
+                self._release()
+        finally:
+            # A trial that never reached the upstream leaves no outcome
+            if trial_id is not None:
+                self.breaker.release_trial(trial_id)
+
+    async def _wait_for_slot(
+        self, on_wait: Callable[[int, float], Awaitable[None]] | None
+    ) -> None:
+        slot: asyncio.Future = asyncio.get_running_loop().create_future()
+        self._waiters.append(slot)
+        self._stats.queued += 1
+        deadline = time.monotonic() + self.queue_timeout
+        last_position = 0
+        last_notified = 0.0
+        try:
+            while not slot.done():
+                position = self._waiters.index(slot) + 1
+                now = time.monotonic()
+                if on_wait and (
+                    position != last_position
+                    or now - last_notified >= self.notify_interval
+                ):
+                    await on_wait(position, self.estimated_wait(position))
+                    last_position, last_notified = position, now
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self._reject("timeout")
+                moved = self._moved_event()
+                mover = asyncio.ensure_future(moved.wait())
+                try:
+                    await asyncio.wait(
+                        {slot, mover},
+                        timeout=min(remaining, self.notify_interval),
+                        return_when=asyncio.FIRST_COMPLETED,
+                    )
+                finally:
+                    mover.cancel()
+        except BaseException:
+            if slot in self._waiters:
+                self._waiters.remove(slot)
+            elif slot.done() and not slot.cancelled():
+                # The slot was handed over just as we gave up; pass it on
+                self._release()
+            raise
+
+    def _moved_event(self) -> asyncio.Event:
+        if self._moved is None:
+            self._moved = asyncio.Event()
+        return self._moved
+
+    def _release(self) -> None:
+        """Hand the slot to the longest waiting caller, or free it."""
+        while self._waiters:
+            slot = self._waiters.popleft()
+            if not slot.done():
+                slot.set_result(None)
+                break
+        else:
+            self._stats.active -= 1
+        if self._moved is not None:
+            self._moved.set()
+            self._moved = None
+
+    def _reject(self, reason: str) -> None:
+        self._stats.rejected += 1
+        counter = f"rejected_{reason}"
+        setattr(self._stats, counter, getattr(self._stats, counter) + 1)
+        raise AdmissionRejected(reason)
@@ -0,0 +1,361 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Audio codecs for model audio sent to the browser.
+
+Gemini returns 16-bit PCM that is relayed base64 encoded inside JSON, which
+inflates egress by a third on top of the raw 48 kB/s of 24 kHz PCM. Clients
+using the binary media sub-protocol can list the codecs they decode in their
+setup message, and model audio is then sent as binary frames instead:
+
+* ``mulaw`` / ``alaw``: G.711 companding, 8 bits per sample. Encoding is a
+  single NumPy lookup into a 64k entry table.
+* ``ima-adpcm``: IMA ADPCM, 4 bits per sample. Each frame payload starts with
+  the encoder state (predictor, step index, sample count) so frames can be
+  decoded independently. ADPCM is sequential by nature, so the stdlib
+  ``audioop`` C implementation is used when available, with a table-driven
+  pure Python encoder producing identical output as the fallback.
+
+Clients that do not offer a codec keep receiving the JSON frames untouched.
+"""
+
+import re
+import struct
+import warnings
+from collections.abc import Sequence
+from types import ModuleType
+
+import numpy as np
+
+from app.utils.frames import model_audio
+from app.utils.media_protocol import (
+    KIND_AUDIO_ALAW,
+    KIND_AUDIO_IMA_ADPCM,
+    KIND_AUDIO_MULAW,
+    encode_media_frame,
+)
+
+audioop: ModuleType | None
+try:
+    with warnings.catch_warnings():
+        # Deprecated in Python 3.11 and removed in 3.13, where the audioop-lts
+        # backport provides it.
+        warnings.simplefilter("ignore", DeprecationWarning)
+        import audioop
+except ImportError:  # pragma: no cover - depends on the Python version
+    audioop = None
+
+CODEC_MULAW = "mulaw"
+CODEC_ALAW = "alaw"
+CODEC_IMA_ADPCM = "ima-adpcm"
+
+# Server preference order, best compression first
+SUPPORTED_CODECS = (CODEC_IMA_ADPCM, CODEC_MULAW, CODEC_ALAW)
+
+_CODEC_KINDS = {
+    CODEC_MULAW: KIND_AUDIO_MULAW,
+    CODEC_ALAW: KIND_AUDIO_ALAW,
+    CODEC_IMA_ADPCM: KIND_AUDIO_IMA_ADPCM,
+}
+_RATE = re.compile(r"rate=(\d+)")
+
+# predictor, step index, padding, number of samples (32 bits, since one
+# model chunk can hold more than 65535 samples)
+ADPCM_HEADER = struct.Struct("!hBxI")
+
+_SEGMENT_ENDS_ULAW = np.array(
+    [0x3F, 0x7F, 0xFF, 0x1FF, 0x3FF, 0x7FF, 0xFFF, 0x1FFF], dtype=np.int32
+)
+_SEGMENT_ENDS_ALAW = np.array(
+    [0x1F, 0x3F, 0x7F, 0xFF, 0x1FF, 0x3FF, 0x7FF, 0xFFF], dtype=np.int32
+)
+
+_ADPCM_STEPS = (
+    7, 8, 9, 10, 11, 12, 13, 14, 16, 17, 19, 21, 23, 25, 28, 31, 34, 37, 41,
+    45, 50, 55, 60, 66, 73, 80, 88, 97, 107, 118, 130, 143, 157, 173, 190, 209,
+    230, 253, 279, 307, 337, 371, 408, 449, 494, 544, 598, 658, 724, 796, 876,
+    963, 1060, 1166, 1282, 1411, 1552, 1707, 1878, 2066, 2272, 2499, 2749,
+    3024, 3327, 3660, 4026, 4428, 4871, 5358, 5894, 6484, 7132, 7845, 8630,
+    9493, 10442, 11487, 12635, 13899, 15289, 16818, 18500, 20350, 22385,
+    24623, 27086, 29794, 32767,
+)  # fmt: skip
+_ADPCM_INDEX_SHIFT = (-1, -1, -1, -1, 2, 4, 6, 8) * 2
+
+
+def _build_mulaw_table() -> np.ndarray:
+    """G.711 mu-law code for every 16-bit sample, indexed by its uint16 view."""
+    pcm = np.arange(65536, dtype=np.uint16).view(np.int16).astype(np.int32) >> 2
+    mask = np.where(pcm < 0, 0x7F, 0xFF)
+    magnitude = np.minimum(np.abs(pcm), 8159) + 0x21
+    segment = np.searchsorted(_SEGMENT_ENDS_ULAW, magnitude)
+    code = (segment << 4) | ((magnitude >> (segment + 1)) & 0xF)
+    code = np.where(segment >= 8, 0x7F, code)
+    return (code ^ mask).astype(np.uint8)
+
+
+def _build_alaw_table() -> np.ndarray:
+    """G.711 A-law code for every 16-bit sample, indexed by its uint16 view."""
+    pcm = np.arange(65536, dtype=np.uint16).view(np.int16).astype(np.int32) >> 3
+    mask = np.where(pcm >= 0, 0xD5, 0x55)
+    magnitude = np.where(pcm >= 0, pcm, -pcm - 1)
+    segment = np.searchsorted(_SEGMENT_ENDS_ALAW, magnitude)
+    shift = np.maximum(segment, 1)
+    code = (segment << 4) | ((magnitude >> shift) & 0xF)
+    code = np.where(segment >= 8, 0x7F, code)
+    return (code ^ mask).astype(np.uint8)
+
+
+def _build_mulaw_expand() -> np.ndarray:
+    """16-bit sample for every G.711 mu-law code."""
+    code = ~np.arange(256, dtype=np.int32) & 0xFF
+    magnitude = (((code & 0xF) << 3) + 0x84) << ((code & 0x70) >> 4)
+    return np.where(code & 0x80, 0x84 - magnitude, magnitude - 0x84).astype(np.int16)
+
+
+def _build_alaw_expand() -> np.ndarray:
+    """16-bit sample for every G.711 A-law code."""
+    code = np.arange(256, dtype=np.int32) ^ 0x55
+    segment = (code & 0x70) >> 4
+    magnitude = ((code & 0xF) << 4) + np.where(segment == 0, 8, 0x108)
+    magnitude = magnitude << np.maximum(segment - 1, 0)
+    return np.where(code & 0x80, magnitude, -magnitude).astype(np.int16)
+
+
+_MULAW_TABLE = _build_mulaw_table()
+_ALAW_TABLE = _build_alaw_table()
+_MULAW_EXPAND = _build_mulaw_expand()
+_ALAW_EXPAND = _build_alaw_expand()
+
+
+def _build_adpcm_tables() -> tuple[list[list[int]], list[list[int]]]:
+    """Signed predictor change and next step index for each (index, code)."""
+    deltas, next_index = [], []
+    for index, step in enumerate(_ADPCM_STEPS):
+        row_delta, row_next = [], []
+        for code in range(16):
+            delta = step >> 3
+            if code & 4:
+                delta += step
+            if code & 2:
+                delta += step >> 1
+            if code & 1:
+                delta += step >> 2
+            row_delta.append(-delta if code & 8 else delta)
+            row_next.append(min(88, max(0, index + _ADPCM_INDEX_SHIFT[code])))
+        deltas.append(row_delta)
+        next_index.append(row_next)
+    return deltas, next_index
+
+
+_ADPCM_DELTAS, _ADPCM_NEXT_INDEX = _build_adpcm_tables()
+
+
+def mulaw_encode(pcm: bytes) -> bytes:
+    """Encode little-endian 16-bit PCM as G.711 mu-law."""
+    samples = np.frombuffer(pcm, dtype="<u2", count=len(pcm) // 2)
+    return _MULAW_TABLE[samples].tobytes()
+
+
+def alaw_encode(pcm: bytes) -> bytes:
+    """Encode little-endian 16-bit PCM as G.711 A-law."""
+    samples = np.frombuffer(pcm, dtype="<u2", count=len(pcm) // 2)
+    return _ALAW_TABLE[samples].tobytes()
+
+
+def mulaw_decode(data: bytes) -> bytes:
+    """Decode G.711 mu-law to little-endian 16-bit PCM."""
+    return _MULAW_EXPAND[np.frombuffer(data, dtype=np.uint8)].astype("<i2").tobytes()
+
+
+def alaw_decode(data: bytes) -> bytes:
+    """Decode G.711 A-law to little-endian 16-bit PCM."""
+    return _ALAW_EXPAND[np.frombuffer(data, dtype=np.uint8)].astype("<i2").tobytes()
+
+
+def _adpcm_encode_python(
+    samples: list[int], predictor: int, index: int
+) -> tuple[bytes, int, int]:
+    """Reference IMA ADPCM encoder, bit-exact with audioop.lin2adpcm."""
+    out = bytearray()
+    steps, deltas, next_index = _ADPCM_STEPS, _ADPCM_DELTAS, _ADPCM_NEXT_INDEX
+    high = -1
+    for sample in samples:
+        step = steps[index]
+        diff = sample - predictor
+        if diff < 0:
+            code, diff = 8, -diff
+        else:
+            code = 0
+        if diff >= step:
+            code |= 4
+            diff -= step
+        if diff >= step >> 1:
+            code |= 2
+            diff -= step >> 1
+        if diff >= step >> 2:
+            code |= 1
+        predictor += deltas[index][code]
+        if predictor > 32767:
+            predictor = 32767
+        elif predictor < -32768:
+            predictor = -32768
+        index = next_index[index][code]
+        if high < 0:
+            high = code << 4
+        else:
+            out.append(high | code)
+            high = -1
+    if high >= 0:
+        out.append(high)
+    return bytes(out), predictor, index
+
+
+class ImaAdpcmEncoder:
+    """Streaming IMA ADPCM encoder carrying its state across frames."""
+
+    def __init__(self, use_audioop: bool = True) -> None:
+        """Initialize the encoder.
+
+        Args:
+            use_audioop: Use the C implementation from audioop when available
+        """
+        self.predictor = 0
+        self.index = 0
+        self.use_audioop = use_audioop and audioop is not None
+
+    def encode(self, pcm: bytes) -> bytes:
+        """Encode little-endian 16-bit PCM into a self-contained ADPCM payload.
+
+        Returns:
+            ADPCM_HEADER with the state at the start of the frame, followed by
+            the 4-bit codes, first sample in the high nibble
+        """
+        count = len(pcm) // 2
+        header = ADPCM_HEADER.pack(self.predictor, self.index, count)
+        codes = b""
+        start = 0
+        if self.use_audioop and audioop is not None:
+            # audioop only emits whole bytes, so an odd last sample is left to
+            # the Python encoder
+            start = count - count % 2
+            codes, (self.predictor, self.index) = audioop.lin2adpcm(
+                pcm[: start * 2], 2, (self.predictor, self.index)
+            )
+        if start < count:
+            samples = np.frombuffer(pcm, dtype="<i2", count=count)[start:].tolist()
+            tail, self.predictor, self.index = _adpcm_encode_python(
+                samples, self.predictor, self.index
+            )
+            codes += tail
+        return header + codes
+
+
+def ima_adpcm_decode(payload: bytes) -> bytes:
+    """Decode a payload produced by ImaAdpcmEncoder to 16-bit PCM."""
+    predictor, index, count = ADPCM_HEADER.unpack_from(payload)
+    out = np.empty(count, dtype="<i2")
+    codes = payload[ADPCM_HEADER.size :]
+    for i in range(count):
+        code = (codes[i >> 1] >> 4) if i % 2 == 0 else codes[i >> 1] & 0xF
+        predictor = min(32767, max(-32768, predictor + _ADPCM_DELTAS[index][code]))
+        index = _ADPCM_NEXT_INDEX[index][code]
+        out[i] = predictor
+    return out.tobytes()
+
+
+def negotiate_codec(
+    offered: list[str] | None, enabled: Sequence[str] = SUPPORTED_CODECS
+) -> str | None:
+    """Pick the downlink codec from the ones offered by the client.
+
+    Args:
+        offered: Codecs listed in the client's setup message
+        enabled: Codecs the server may use, in preference order
+
+    Returns:
+        The first enabled codec the client offered, or None for plain JSON
+    """
+    if not offered:
+        return None
+    for codec in enabled:
+        if codec in SUPPORTED_CODECS and codec in offered:
+            return codec
+    return None
+
+
+class DownlinkAudioEncoder:
+    """Turns audio-only Gemini frames into binary codec frames for one client."""
+
+    def __init__(self, codec: str) -> None:
+        """Initialize the encoder.
+
+        Args:
+            codec: One of SUPPORTED_CODECS
+        """
+        self.codec = codec
+        self.kind = _CODEC_KINDS[codec]
+        self._adpcm = ImaAdpcmEncoder() if codec == CODEC_IMA_ADPCM else None
+        self.frames = 0
+        self.bytes_in = 0
+        self.bytes_out = 0
+
+    def snapshot(self) -> dict[str, int | str]:
+        """Return the codec and byte counters for logging and metrics."""
+        return {
+            "codec": self.codec,
+            "frames": self.frames,
+            "bytes_in": self.bytes_in,
+            "bytes_out": self.bytes_out,
+        }
+
+    def encode_frame(self, frame: bytes | str) -> bytes | None:
+        """Encode a raw Gemini frame if it only carries model audio.
+
+        Args:
+            frame: Raw JSON frame as received from the Gemini websocket
+
+        Returns:
+            A binary media frame, or None if the frame must be relayed as is
+        """
+        audio = model_audio(frame)
+        if audio is None:
+            return None
+        return self.encode_audio(*audio, source_bytes=len(frame))
+
+    def encode_audio(self, mime_type: str, pcm: bytes, source_bytes: int) -> bytes:
+        """Build the binary media frame for a chunk of model audio.
+
+        Args:
+            mime_type: Gemini mime type of the PCM, carrying its sample rate
+            pcm: Little-endian 16-bit PCM
+            source_bytes: Size of the JSON frames the chunk replaces
+
+        Returns:
+            The media header followed by the encoded audio
+        """
+        rate_match = _RATE.search(mime_type)
+        rate = int(rate_match.group(1)) if rate_match else 24000
+        encoded = encode_media_frame(self.kind, self.encode(pcm), rate)
+        self.frames += 1
+        self.bytes_in += source_bytes
+        self.bytes_out += len(encoded)
+        return encoded
+
+    def encode(self, pcm: bytes) -> bytes:
+        """Encode raw 16-bit PCM with the negotiated codec."""
+        if self._adpcm is not None:
+            return self._adpcm.encode(pcm)
+        if self.codec == CODEC_MULAW:
+            return mulaw_encode(pcm)
+        return alaw_encode(pcm)
@@ -0,0 +1,97 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Tracking of the model turn being relayed, so it can be cut short.
+
+Gemini streams model audio faster than real time, so by the time the user
+starts talking over the model, seconds of audio for the turn may still be
+waiting in the relay (in the downstream queue or the coalescer) and in the
+browser's playback buffer. When the model reports ``interrupted``, or the
+relay's own voice activity gate hears the user start speaking, everything
+still pending for the turn is discarded and the client is told to flush its
+playback buffer, instead of playing out audio the user already talked over.
+"""
+
+from dataclasses import dataclass
+
+from app.utils.media_protocol import KIND_CONTROL_FLUSH, encode_media_frame
+
+# Flush message for binary media clients, and for JSON clients the same
+# interruption frame the model itself sends
+BINARY_FLUSH_FRAME = encode_media_frame(KIND_CONTROL_FLUSH, b"")
+JSON_FLUSH_FRAME = b'{"serverContent":{"interrupted":true}}'
+
+
+@dataclass
+class BargeInStats:
+    """Counters describing how often model turns were cut short."""
+
+    turns: int = 0
+    interruptions: int = 0
+    vad_barge_ins: int = 0
+    discarded_frames: int = 0
+
+
+class ModelTurn:
+    """State of the model turn currently relayed to the client.
+
+    A turn starts with the first model output after the previous one ended,
+    and ends with ``turnComplete`` or ``interrupted``. Once cut short by the
+    relay, the rest of the turn is muted until the model ends it.
+    """
+
+    def __init__(self) -> None:
+        """Initialize with no turn in progress."""
+        self.active = False
+        self.muted = False
+        self.stats = BargeInStats()
+
+    def output(self) -> bool:
+        """Record model output for the turn.
+
+        Returns:
+            Whether the output should be relayed to the client
+        """
+        if self.muted:
+            self.stats.discarded_frames += 1
+            return False
+        if not self.active:
+            self.active = True
+            self.stats.turns += 1
+        return True
+
+    def complete(self) -> None:
+        """End the turn after ``turnComplete``."""
+        self.active = False
+        self.muted = False
+
+    def interrupted(self, discarded: int) -> None:
+        """End the turn after the model reported an interruption.
+
+        Args:
+            discarded: Frames of the turn dropped before reaching the client
+        """
+        self.stats.interruptions += 1
+        self.stats.discarded_frames += discarded
+        self.complete()
+
+    def barge_in(self, discarded: int) -> None:
+        """Cut the turn short because the user started speaking.
+
+        Args:
+            discarded: Frames of the turn dropped before reaching the client
+        """
+        self.stats.vad_barge_ins += 1
+        self.stats.discarded_frames += discarded
+        self.muted = True
@@ -0,0 +1,68 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Incremental encoding of agent runs for the streaming chat endpoint.
+
+Each ADK event of a run becomes zero or more small JSON messages:
+
+    {"type": "partial", "text": "..."}        text chunk of a streamed answer
+    {"type": "tool_call", "name": "..."}      the agent started a tool
+    {"type": "tool_result", "name": "..."}    the tool finished
+    {"type": "final", "response": "...", ...} full answer, always last
+    {"type": "error", "error": "..."}         the run failed, always last
+
+Messages are written either as newline delimited JSON or as server-sent
+events, whichever the client asked for.
+"""
+
+import json
+from typing import Any
+
+from google.adk.events.event import Event
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+SSE_MEDIA_TYPE = "text/event-stream"
+
+
+def event_messages(event: Event) -> list[dict[str, Any]]:
+    """Return the stream messages for one agent event.
+
+    Text of non-partial events is not repeated here; it is what makes up the
+    final message.
+    """
+    messages: list[dict[str, Any]] = []
+    if event.partial and event.content:
+        text = "".join(part.text for part in event.content.parts or [] if part.text)
+        if text:
+            messages.append({"type": "partial", "text": text})
+    for call in event.get_function_calls():
+        messages.append({"type": "tool_call", "name": call.name})
+    for response in event.get_function_responses():
+        messages.append({"type": "tool_result", "name": response.name})
+    return messages
+
+
+def final_text(event: Event) -> str:
+    """Return the text an event contributes to the final answer."""
+    if not event.is_final_response() or not event.content:
+        return ""
+    return "".join(part.text for part in event.content.parts or [] if part.text)
+
+
+def encode_message(message: dict[str, Any], sse: bool = False) -> bytes:
+    """Encode one stream message as an NDJSON line or a server-sent event."""
+    data = json.dumps(message, ensure_ascii=False)
+    if sse:
+        return f"event: {message['type']}\ndata: {data}\n\n".encode()
+    return f"{data}\n".encode()
@@ -0,0 +1,129 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Merging of consecutive model audio chunks before they go to the browser.
+
+Gemini streams model audio as many small ``serverContent`` frames, and each
+one otherwise becomes its own websocket message and send syscall. The
+AudioCoalescer collects the PCM of consecutive audio-only frames and releases
+it as one chunk once a byte threshold or a time budget is reached. The relay
+flushes it early whenever anything else has to go out, so audio never
+overtakes turn boundaries, interruptions or other frames.
+"""
+
+import time
+from collections.abc import Callable
+from typing import Any
+
+from app.utils.metrics import LatencyRecorder
+
+
+class AudioCoalescer:
+    """Buffers model audio PCM until a size or time limit is reached."""
+
+    def __init__(
+        self,
+        max_bytes: int = 9600,
+        max_delay: float = 0.03,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        """Initialize the coalescer.
+
+        Args:
+            max_bytes: PCM bytes that trigger a flush, 9600 bytes being
+                200 ms of 24 kHz audio
+            max_delay: Seconds the oldest buffered chunk may wait
+            clock: Monotonic clock, injectable for tests and benchmarks
+        """
+        self.max_bytes = max_bytes
+        self.max_delay = max_delay
+        self.clock = clock
+        self.frames_in = 0
+        self.chunks_out = 0
+        # Time each input frame spent waiting in the buffer
+        self.added_latency = LatencyRecorder()
+        self._mime_type = ""
+        self._chunks: list[bytes] = []
+        self._arrivals: list[float] = []
+        self._size = 0
+        self._source_bytes = 0
+
+    @property
+    def pending(self) -> bool:
+        """Whether audio is waiting to be flushed."""
+        return bool(self._chunks)
+
+    def time_left(self) -> float | None:
+        """Seconds until the buffered audio is due, None when empty."""
+        if not self._arrivals:
+            return None
+        return max(0.0, self._arrivals[0] + self.max_delay - self.clock())
+
+    def snapshot(self) -> dict[str, Any]:
+        """Return frame counters and added latency for logging and metrics."""
+        return {
+            "frames_in": self.frames_in,
+            "chunks_out": self.chunks_out,
+            "added_latency": self.added_latency.summary(),
+        }
+
+    def push(
+        self, mime_type: str, pcm: bytes, source_bytes: int = 0
+    ) -> list[tuple[str, bytes, int]]:
+        """Buffer a chunk of model audio.
+
+        Args:
+            mime_type: Audio mime type, chunks are only merged when it matches
+            pcm: Raw PCM of the chunk
+            source_bytes: Size of the frame the chunk came from
+
+        Returns:
+            Merged (mime type, PCM, source bytes) chunks ready to be sent
+        """
+        ready = []
+        if self._chunks and mime_type != self._mime_type:
+            ready.append(self.flush())
+        self._mime_type = mime_type
+        self._chunks.append(pcm)
+        self._arrivals.append(self.clock())
+        self._size += len(pcm)
+        self._source_bytes += source_bytes
+        self.frames_in += 1
+        if self._size >= self.max_bytes or self.time_left() == 0:
+            ready.append(self.flush())
+        return [chunk for chunk in ready if chunk is not None]
+
+    def flush(self) -> tuple[str, bytes, int] | None:
+        """Release all buffered audio as one chunk, None when empty."""
+        if not self._chunks:
+            return None
+        now = self.clock()
+        for arrival in self._arrivals:
+            self.added_latency.record(now - arrival)
+        chunk = (self._mime_type, b"".join(self._chunks), self._source_bytes)
+        self._chunks.clear()
+        self._arrivals.clear()
+        self._size = 0
+        self._source_bytes = 0
+        self.chunks_out += 1
+        return chunk
+
+    def discard(self) -> int:
+        """Drop all buffered audio, returning the number of frames dropped."""
+        dropped = len(self._chunks)
+        self._chunks.clear()
+        self._arrivals.clear()
+        self._size = 0
+        self._source_bytes = 0
+        return dropped
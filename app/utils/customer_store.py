@@ -0,0 +1,355 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Columnar, memory-mapped store of airline customers and their bookings.
+
+Customers and bookings are kept as NumPy columns, one ``.npy`` file each in a
+store directory. Opening a store memory-maps the files, so startup does not
+depend on the number of customers and all workers on a host share the pages.
+
+Lookups go through sorted key columns searched with ``np.searchsorted``:
+
+* ``phone_keys``: the national number of the customer's phone, so spoken
+  variants such as "0555 123 45 67" and "+90 555 123 45 67" find the same
+  customer;
+* ``ticket_keys``: the digits of the ticket number;
+* ``suffix_keys``: the last five digits of the identity and passport numbers.
+
+Each key column has a matching ``*_rows`` column with the customer or booking
+row of every key. Records are materialized as the same dicts the airline
+tools have always returned.
+"""
+
+import os
+import re
+from collections.abc import Iterable, Mapping
+from typing import Any
+
+import numpy as np
+
+TURKEY_COUNTRY_CODE = "90"
+NATIONAL_NUMBER_DIGITS = 10
+ID_SUFFIX_DIGITS = 5
+
+_NON_DIGITS = re.compile(r"\D")
+
+# Fixed-width text columns, in bytes
+CUSTOMER_TEXT = {"identity_number": 11, "passport": 9}
+BOOKING_TEXT = {
+    "flight_number": 7,
+    "origin": 3,
+    "destination": 3,
+    "departure_time": 5,
+    "arrival_time": 5,
+    "status": 12,
+    "class": 10,
+    "seat": 4,
+}
+
+COLUMNS = (
+    # Customers; bookings of customer i are rows booking_start[i:i + 2]
+    "phone",
+    "name_offsets",
+    "name_blob",
+    *CUSTOMER_TEXT,
+    "booking_start",
+    # Bookings
+    "customer",
+    "ticket",
+    *BOOKING_TEXT,
+    "date",
+    "baggage_kg",
+    # Indexes
+    "phone_keys",
+    "phone_rows",
+    "ticket_keys",
+    "ticket_rows",
+    "suffix_keys",
+    "suffix_rows",
+)
+
+
+def normalize_phone(phone: Any) -> int | None:
+    """Return the national number of a Turkish phone number as an integer.
+
+    Separators, a leading trunk 0 and a +90 or 0090 country code are ignored.
+
+    Args:
+        phone: Phone number as written or spoken, e.g. "+90 (555) 123 45 67"
+
+    Returns:
+        The 10 digit national number, or None if it is not a phone number
+    """
+    digits = _NON_DIGITS.sub("", str(phone))
+    if len(digits) > NATIONAL_NUMBER_DIGITS and digits.startswith("00"):
+        digits = digits[2:]
+    if len(digits) > NATIONAL_NUMBER_DIGITS and digits.startswith(TURKEY_COUNTRY_CODE):
+        digits = digits[len(TURKEY_COUNTRY_CODE) :]
+    digits = digits.lstrip("0")
+    if len(digits) != NATIONAL_NUMBER_DIGITS:
+        return None
+    return int(digits)
+
+
+def format_phone(key: int) -> str:
+    """Return a national number in the stored "05551234567" form."""
+    return f"0{key:0{NATIONAL_NUMBER_DIGITS}d}"
+
+
+def ticket_key(ticket_number: Any) -> int | None:
+    """Return the digits of a ticket number such as "235-1234567890"."""
+    digits = _NON_DIGITS.sub("", str(ticket_number))
+    return int(digits) if digits and len(digits) <= 18 else None
+
+
+def format_ticket(key: int) -> str:
+    """Return a ticket number in the "235-1234567890" form."""
+    digits = f"{key:013d}"
+    return f"{digits[:3]}-{digits[3:]}"
+
+
+def id_suffix_key(text: Any) -> int | None:
+    """Return the last five digits of an ID or passport number as an integer."""
+    suffix = str(text).strip()[-ID_SUFFIX_DIGITS:]
+    if len(suffix) != ID_SUFFIX_DIGITS or not suffix.isdigit():
+        return None
+    return int(suffix)
+
+
+def _suffix_keys(values: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Return the ID suffix keys of a text column and the rows they belong to."""
+    width = values.dtype.itemsize
+    lengths = np.char.str_len(values)
+    chars = values.view(np.uint8).reshape(-1, width)
+    # Gather the last five bytes of every value, wherever it ends
+    take = lengths[:, None] - ID_SUFFIX_DIGITS + np.arange(ID_SUFFIX_DIGITS)
+    valid = lengths >= ID_SUFFIX_DIGITS
+    tail = np.take_along_axis(chars, np.clip(take, 0, width - 1), axis=1)
+    digits = tail.astype(np.int64) - ord("0")
+    valid &= ((digits >= 0) & (digits <= 9)).all(axis=1)
+    keys = (digits * 10 ** np.arange(ID_SUFFIX_DIGITS - 1, -1, -1)).sum(axis=1)
+    rows = np.flatnonzero(valid)
+    return keys[rows].astype(np.uint32), rows
+
+
+def _sorted_index(keys: np.ndarray, rows: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    order = np.argsort(keys, kind="stable")
+    return keys[order], rows[order]
+
+
+def build_indexes(columns: dict[str, np.ndarray]) -> dict[str, np.ndarray]:
+    """Add the sorted lookup columns to a set of data columns.
+
+    Args:
+        columns: Customer and booking data columns, without the indexes
+
+    Returns:
+        The same dict, with the key and row columns of every index added
+    """
+    customers = np.arange(len(columns["phone"]), dtype=np.int64)
+    columns["phone_keys"], columns["phone_rows"] = _sorted_index(
+        columns["phone"], customers
+    )
+    bookings = np.arange(len(columns["ticket"]), dtype=np.int64)
+    columns["ticket_keys"], columns["ticket_rows"] = _sorted_index(
+        columns["ticket"], bookings
+    )
+    id_keys, id_rows = _suffix_keys(columns["identity_number"])
+    passport_keys, passport_rows = _suffix_keys(columns["passport"])
+    columns["suffix_keys"], columns["suffix_rows"] = _sorted_index(
+        np.concatenate([id_keys, passport_keys]),
+        np.concatenate([id_rows, passport_rows]),
+    )
+    return columns
+
+
+class CustomerStore:
+    """Indexed, read-only view of customer and booking columns."""
+
+    def __init__(self, columns: Mapping[str, np.ndarray]) -> None:
+        """Initialize the store.
+
+        Args:
+            columns: Every column in COLUMNS, in memory or memory-mapped
+        """
+        missing = [name for name in COLUMNS if name not in columns]
+        if missing:
+            raise ValueError(f"Customer store is missing columns: {missing}")
+        self.columns = dict(columns)
+
+    @classmethod
+    def from_records(cls, customers: Iterable[Mapping[str, Any]]) -> "CustomerStore":
+        """Build an in-memory store from customer dicts as the tools return them.
+
+        Args:
+            customers: Dicts with name, phone_number, identity_number,
+                passport and a list of flights
+
+        Raises:
+            ValueError: If a phone or ticket number cannot be parsed
+        """
+        customers = list(customers)
+        flights = [flight for customer in customers for flight in customer["flights"]]
+        phones = [normalize_phone(customer["phone_number"]) for customer in customers]
+        tickets = [ticket_key(flight["ticket_number"]) for flight in flights]
+        if None in phones or None in tickets:
+            raise ValueError("Customer records need valid phone and ticket numbers")
+        names = [customer["name"].encode() for customer in customers]
+        counts = [len(customer["flights"]) for customer in customers]
+        columns = {
+            "phone": np.array(phones, dtype=np.uint64),
+            "name_offsets": np.cumsum([0] + [len(name) for name in names]),
+            "name_blob": np.frombuffer(b"".join(names), dtype=np.uint8),
+            "booking_start": np.cumsum([0, *counts]),
+            "customer": np.repeat(np.arange(len(customers)), counts).astype(np.int32),
+            "ticket": np.array(tickets, dtype=np.uint64),
+            "date": np.array([flight["date"] for flight in flights], "datetime64[D]"),
+            "baggage_kg": np.array(
+                [
+                    int(flight["baggage_allowance"].removesuffix("kg"))
+                    for flight in flights
+                ],
+                dtype=np.uint8,
+            ),
+        }
+        for name, width in CUSTOMER_TEXT.items():
+            values = [customer.get(name) or "" for customer in customers]
+            columns[name] = np.array(values, dtype=f"S{width}")
+        for name, width in BOOKING_TEXT.items():
+            columns[name] = np.array([flight[name] for flight in flights], f"S{width}")
+        return cls(build_indexes(columns))
+
+    @classmethod
+    def open(cls, path: str) -> "CustomerStore":
+        """Memory-map a store directory written by ``save``."""
+        return cls(
+            {
+                name: np.load(os.path.join(path, f"{name}.npy"), mmap_mode="r")
+                for name in COLUMNS
+            }
+        )
+
+    def save(self, path: str) -> None:
+        """Write every column to ``<path>/<column>.npy``."""
+        os.makedirs(path, exist_ok=True)
+        for name in COLUMNS:
+            np.save(os.path.join(path, f"{name}.npy"), self.columns[name])
+
+    def __len__(self) -> int:
+        return len(self.columns["phone"])
+
+    def _rows(self, index: str, key: int | None) -> np.ndarray:
+        """Return the rows stored under a key of one of the indexes."""
+        keys = self.columns[f"{index}_keys"]
+        if key is None or key < 0 or key > np.iinfo(keys.dtype).max:
+            return self.columns[f"{index}_rows"][:0]
+        needle = keys.dtype.type(key)
+        start = int(np.searchsorted(keys, needle, side="left"))
+        end = int(np.searchsorted(keys, needle, side="right"))
+        return self.columns[f"{index}_rows"][start:end]
+
+    def customer_row(self, phone_number: Any) -> int | None:
+        """Return the row of the customer with a phone number, if any."""
+        rows = self._rows("phone", normalize_phone(phone_number))
+        return int(rows[0]) if len(rows) else None
+
+    def booking_row(self, ticket_number: Any) -> int | None:
+        """Return the row of the booking with a ticket number, if any."""
+        rows = self._rows("ticket", ticket_key(ticket_number))
+        return int(rows[0]) if len(rows) else None
+
+    def customer_rows_by_id_suffix(self, digits: Any) -> np.ndarray:
+        """Return the rows of customers whose ID or passport ends in digits."""
+        return np.unique(self._rows("suffix", id_suffix_key(digits)))
+
+    def has_id_suffix(self, row: int, digits: Any) -> bool:
+        """Return True if the customer's ID or passport ends in the digits."""
+        return bool(np.any(self._rows("suffix", id_suffix_key(digits)) == row))
+
+    def flight(self, row: int) -> dict[str, Any]:
+        """Materialize one booking as a flight dict."""
+        columns = self.columns
+
+        def text(name: str) -> str:
+            return columns[name][row].decode()
+
+        return {
+            "flight_number": text("flight_number"),
+            "ticket_number": format_ticket(int(columns["ticket"][row])),
+            "origin": text("origin"),
+            "destination": text("destination"),
+            "date": str(columns["date"][row]),
+            "departure_time": text("departure_time"),
+            "arrival_time": text("arrival_time"),
+            "status": text("status"),
+            "class": text("class"),
+            "seat": text("seat"),
+            "baggage_allowance": f"{int(columns['baggage_kg'][row])}kg",
+        }
+
+    def flights(self, row: int) -> list[dict[str, Any]]:
+        """Materialize the bookings of one customer as flight dicts."""
+        start = int(self.columns["booking_start"][row])
+        end = int(self.columns["booking_start"][row + 1])
+        return [self.flight(booking) for booking in range(start, end)]
+
+    def name(self, row: int) -> str:
+        """Return the name of one customer."""
+        offsets = self.columns["name_offsets"]
+        start, end = int(offsets[row]), int(offsets[row + 1])
+        return bytes(self.columns["name_blob"][start:end]).decode()
+
+    def customer(self, row: int) -> dict[str, Any]:
+        """Materialize one customer, with flights, as a customer dict."""
+        columns = self.columns
+        return {
+            "name": self.name(row),
+            "phone_number": format_phone(int(columns["phone"][row])),
+            **{name: columns[name][row].decode() for name in CUSTOMER_TEXT},
+            "flights": self.flights(row),
+        }
+
+    def by_phone(self, phone_number: Any) -> dict[str, Any] | None:
+        """Return the customer with a phone number, or None."""
+        row = self.customer_row(phone_number)
+        return self.customer(row) if row is not None else None
+
+    def by_ticket(self, ticket_number: Any) -> dict[str, Any] | None:
+        """Return the customer holding a ticket, or None."""
+        row = self.booking_row(ticket_number)
+        if row is None:
+            return None
+        return self.customer(int(self.columns["customer"][row]))
+
+    def booking(self, ticket_number: Any) -> dict[str, Any] | None:
+        """Return a ticket's flight dict with the holder's name and phone.
+
+        Only the booking and its holder are read, not the holder's other
+        flights, so tools working on one ticket need no customer lookup.
+        """
+        row = self.booking_row(ticket_number)
+        if row is None:
+            return None
+        customer = int(self.columns["customer"][row])
+        return {
+            **self.flight(row),
+            "name": self.name(customer),
+            "phone_number": format_phone(int(self.columns["phone"][customer])),
+        }
+
+    def by_id_suffix(self, digits: Any) -> list[dict[str, Any]]:
+        """Return the customers whose ID or passport ends in the digits."""
+        return [
+            self.customer(int(row)) for row in self.customer_rows_by_id_suffix(digits)
+        ]
@@ -0,0 +1,286 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Table-driven fares and fees with vectorized batch quoting.
+
+Fee rules and fares are read from CSV tables and compiled into NumPy arrays
+indexed by operation, fare class, route band and days-to-departure bucket, so
+a quote is a handful of array lookups and any number of tickets or
+itineraries is priced in one call.
+
+Fee rules have an operation, fare class, route band, minimum days before
+departure and fee; ``*`` matches any class or band. For every cell the most
+specific matching rule wins, a fare class match outranking a route band
+match, and among equally specific rules the one with the largest minimum
+days still below the cell's bucket.
+
+Route bands come from the airports' regions: flights within Turkey are
+domestic, flights between Turkey, Europe and the Middle East regional, and
+everything else long haul. Connecting itineraries are priced below direct
+ones by STOP_DISCOUNT per stop.
+"""
+
+import csv
+from collections.abc import Mapping, Sequence
+from dataclasses import dataclass
+from typing import Any
+
+import numpy as np
+
+OPERATIONS = ("change", "cancel", "upgrade", "open_ticket")
+FARE_CLASSES = ("economy", "business", "first")
+ROUTE_BANDS = ("domestic", "regional", "long_haul")
+DOMESTIC_REGION = "TR"
+REGIONAL_REGIONS = frozenset({"TR", "EU", "ME"})
+STOP_DISCOUNT = 0.1
+WILDCARD = "*"
+
+
+@dataclass
+class Quotes:
+    """Prices of a batch of quotes, one element per quote, in USD."""
+
+    fee: np.ndarray
+    fare_difference: np.ndarray
+    refund: np.ndarray
+    taxes: np.ndarray
+    total: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.total)
+
+    def row(self, n: int) -> dict[str, int]:
+        """Return one quote as a dict of plain integers."""
+        return {
+            "fee": int(self.fee[n]),
+            "fare_difference": int(self.fare_difference[n]),
+            "refund": int(self.refund[n]),
+            "taxes": int(self.taxes[n]),
+            "total": int(self.total[n]),
+        }
+
+
+def _codes(values: Any, names: tuple[str, ...], kind: str) -> np.ndarray:
+    """Map names (a scalar or an array) to their index in names."""
+    values = np.asarray(values)
+    if np.issubdtype(values.dtype, np.integer):
+        return values
+    values = values.astype(str)
+    order = np.argsort(names)
+    ordered = np.asarray(names)[order]
+    found = np.minimum(np.searchsorted(ordered, values), len(names) - 1)
+    known = ordered[found] == values
+    if not known.all():
+        unknown = sorted(set(values[~known].tolist()))
+        raise ValueError(f"Unknown {kind}: {', '.join(unknown)}")
+    return order[found]
+
+
+class FareEngine:
+    """Compiled fare and fee tables."""
+
+    def __init__(
+        self,
+        fee_rules: Sequence[Mapping[str, str]],
+        fares: Sequence[Mapping[str, str]],
+        regions: Mapping[str, str],
+    ) -> None:
+        """Compile the rule tables.
+
+        Args:
+            fee_rules: Rows with operation, fare_class, route_band, min_days
+                and fee
+            fares: Rows with fare_class, route_band, one-way fare and taxes
+            regions: Region of every airport code
+
+        Raises:
+            ValueError: If a rule names an unknown value or a combination of
+                operation, class, band and days has no rule or fare
+        """
+        # Band of every pair of airports
+        self.airports = tuple(regions)
+        domestic = np.array(
+            [regions[code] == DOMESTIC_REGION for code in self.airports]
+        )
+        regional = np.array(
+            [regions[code] in REGIONAL_REGIONS for code in self.airports]
+        )
+        self.airport_bands = np.where(
+            domestic[:, None] & domestic,
+            ROUTE_BANDS.index("domestic"),
+            np.where(
+                regional[:, None] & regional,
+                ROUTE_BANDS.index("regional"),
+                ROUTE_BANDS.index("long_haul"),
+            ),
+        )
+        self.day_edges = np.array(
+            sorted({int(rule["min_days"]) for rule in fee_rules} | {0}), dtype=np.int64
+        )
+        shape = (len(OPERATIONS), len(FARE_CLASSES), len(ROUTE_BANDS))
+        self.fees = np.full((*shape, len(self.day_edges)), -1, dtype=np.int64)
+
+        def dimension(value: str, names: tuple[str, ...], kind: str) -> Any:
+            if value == WILDCARD:
+                return slice(None)
+            return int(_codes(value, names, kind))
+
+        ranked = sorted(
+            fee_rules,
+            key=lambda rule: (
+                2 * (rule["fare_class"] != WILDCARD) + (rule["route_band"] != WILDCARD),
+                int(rule["min_days"]),
+            ),
+        )
+        for rule in ranked:
+            cells = (
+                dimension(rule["operation"], OPERATIONS, "operation"),
+                dimension(rule["fare_class"], FARE_CLASSES, "fare class"),
+                dimension(rule["route_band"], ROUTE_BANDS, "route band"),
+                self.day_edges >= int(rule["min_days"]),
+            )
+            self.fees[cells[:3]][..., cells[3]] = int(rule["fee"])
+        if (self.fees < 0).any():
+            raise ValueError("Fee rules do not cover every operation, class and band")
+
+        self.fares = np.full(shape[1:], -1, dtype=np.int64)
+        self.taxes = np.full(shape[1:], -1, dtype=np.int64)
+        for row in fares:
+            cell = (
+                int(_codes(row["fare_class"], FARE_CLASSES, "fare class")),
+                int(_codes(row["route_band"], ROUTE_BANDS, "route band")),
+            )
+            self.fares[cell] = int(row["fare"])
+            self.taxes[cell] = int(row["taxes"])
+        if (self.fares < 0).any():
+            raise ValueError("Fares do not cover every class and band")
+
+    @classmethod
+    def from_files(
+        cls, fee_rules_path: str, fares_path: str, airports_path: str
+    ) -> "FareEngine":
+        """Load the fee rules, fares and airport regions from CSV files."""
+        tables = []
+        for path in (fee_rules_path, fares_path, airports_path):
+            with open(path, newline="") as f:
+                tables.append(list(csv.DictReader(f)))
+        fee_rules, fares, airports = tables
+        return cls(fee_rules, fares, {row["code"]: row["region"] for row in airports})
+
+    def route_bands(self, origins: Any, destinations: Any) -> np.ndarray:
+        """Return the route band code of each origin and destination pair.
+
+        Raises:
+            ValueError: If an airport has no region
+        """
+        return self.airport_bands[
+            _codes(origins, self.airports, "airport"),
+            _codes(destinations, self.airports, "airport"),
+        ]
+
+    def day_buckets(self, days_to_departure: Any) -> np.ndarray:
+        """Return the days-to-departure bucket of each quote."""
+        days = np.asarray(days_to_departure, dtype=np.int64)
+        return np.maximum(np.searchsorted(self.day_edges, days, side="right") - 1, 0)
+
+    def fare(self, fare_class: Any, route_band: Any, stops: Any = 0) -> np.ndarray:
+        """Return one-way fares, discounted for connecting itineraries."""
+        base = self.fares[
+            _codes(fare_class, FARE_CLASSES, "fare class"),
+            _codes(route_band, ROUTE_BANDS, "route band"),
+        ]
+        discount = 1 - STOP_DISCOUNT * np.asarray(stops)
+        return np.rint(base * discount).astype(np.int64)
+
+    def quote(
+        self,
+        operation: Any,
+        fare_class: Any,
+        route_band: Any,
+        days_to_departure: Any,
+        new_route_band: Any = None,
+        stops: Any = 0,
+    ) -> Quotes:
+        """Quote a batch of operations on tickets.
+
+        Every argument is a scalar or an array; arrays are broadcast against
+        each other, and scalars alone give a batch of one. Names and codes
+        (indexes into OPERATIONS, FARE_CLASSES and ROUTE_BANDS) are both
+        accepted.
+
+        Args:
+            operation: change, cancel, upgrade or open_ticket
+            fare_class: Fare class of the ticket
+            route_band: Route band of the ticket
+            days_to_departure: Days left until the ticket's departure
+            new_route_band: Route band of the new itinerary of a change,
+                the ticket's band if None
+            stops: Stops of the new itinerary of a change
+
+        Returns:
+            The fee, fare difference, refund, taxes and total of each quote
+
+        Raises:
+            ValueError: If a name is unknown
+        """
+        operation = _codes(operation, OPERATIONS, "operation")
+        fare_class = _codes(fare_class, FARE_CLASSES, "fare class")
+        route_band = _codes(route_band, ROUTE_BANDS, "route band")
+        new_route_band = (
+            route_band
+            if new_route_band is None
+            else _codes(new_route_band, ROUTE_BANDS, "route band")
+        )
+        operation, fare_class, route_band, new_route_band, bucket, stops = (
+            np.broadcast_arrays(
+                *map(
+                    np.atleast_1d,
+                    (
+                        operation,
+                        fare_class,
+                        route_band,
+                        new_route_band,
+                        self.day_buckets(days_to_departure),
+                        stops,
+                    ),
+                )
+            )
+        )
+        fee = self.fees[operation, fare_class, route_band, bucket]
+        paid = self.fares[fare_class, route_band]
+        changed = self.fare(fare_class, new_route_band, stops)
+        upgraded = self.fares[
+            np.minimum(fare_class + 1, len(FARE_CLASSES) - 1), route_band
+        ]
+
+        is_change = operation == OPERATIONS.index("change")
+        is_upgrade = operation == OPERATIONS.index("upgrade")
+        is_cancel = operation == OPERATIONS.index("cancel")
+        fare_difference = np.where(
+            is_change,
+            np.maximum(changed - paid, 0),
+            np.where(is_upgrade, upgraded - paid, 0),
+        )
+        taxes = np.where(
+            is_change,
+            np.maximum(
+                self.taxes[fare_class, new_route_band]
+                - self.taxes[fare_class, route_band],
+                0,
+            ),
+            0,
+        )
+        refund = np.where(is_cancel, np.maximum(paid - fee, 0), 0)
+        total = np.where(is_cancel, fee, fee + fare_difference + taxes)
+        return Quotes(fee, fare_difference, refund, taxes, total)
@@ -0,0 +1,251 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Deterministic fast path for structured chat turns.
+
+Many turns of a scripted support workflow need no reasoning: confirming the
+calling number, reading out digits for verification, picking a listed
+option. The FastPath runs as the agent's first ``before_model_callback`` and
+answers such turns without calling the model:
+
+* each Intent looks at the turn (the user's message, the agent's previous
+  text, the latest tool results and the detected language) and either
+  declines or returns an Action;
+* an Action either answers with a templated reply, or calls a tool the way
+  the model would. The tool runs through the agent as usual (callbacks,
+  session events), and the handler registered for that tool turns its result
+  into the next Action;
+* whenever an intent or handler declines, the request goes to the model
+  unchanged, so anything unmatched is answered as before.
+
+The tool call the fast path is waiting on is kept in the session state, and
+counters record the share of turns served without the model.
+"""
+
+import logging
+from collections.abc import Callable, Mapping
+from dataclasses import asdict, dataclass, field
+from typing import Any
+
+from google.adk.agents.callback_context import CallbackContext
+from google.adk.models.llm_request import LlmRequest
+from google.adk.models.llm_response import LlmResponse
+from google.genai import types
+
+# Session state key holding the tool call the fast path is waiting on
+PENDING_STATE_KEY = "fast_path_pending"
+
+
+@dataclass
+class FastPathStats:
+    """Counters describing the turns the fast path served."""
+
+    turns: int = 0
+    served: int = 0
+    handed_over: int = 0
+    tool_calls: int = 0
+    intents: dict[str, int] = field(default_factory=dict)
+
+
+@dataclass
+class Turn:
+    """What the intents see of the conversation.
+
+    Attributes:
+        message: Text of the user's message being answered
+        agent_text: The agent's last text before the message
+        user_texts: Earlier user messages, newest first
+        results: Latest response of each tool, oldest first
+        language: Language of the conversation, None if unknown
+    """
+
+    message: str
+    agent_text: str = ""
+    user_texts: list[str] = field(default_factory=list)
+    results: dict[str, dict[str, Any]] = field(default_factory=dict)
+    language: str | None = None
+
+    @classmethod
+    def from_contents(cls, contents: list[types.Content]) -> "Turn":
+        """Read the turn from request contents ending with a user message."""
+        texts: list[tuple[str, str]] = []
+        results: dict[str, dict[str, Any]] = {}
+        for content in contents:
+            for part in content.parts or []:
+                if part.text and not part.thought:
+                    texts.append((content.role or "", part.text))
+                elif part.function_response:
+                    response = part.function_response
+                    # Latest result last, so the order follows the conversation
+                    results.pop(response.name or "", None)
+                    results[response.name or ""] = dict(response.response or {})
+        message = texts.pop()[1] if texts and texts[-1][0] == "user" else ""
+        agent_text = next(
+            (text for role, text in reversed(texts) if role == "model"), ""
+        )
+        user_texts = [text for role, text in reversed(texts) if role == "user"]
+        return cls(message, agent_text, user_texts, results)
+
+    def last_result(self) -> tuple[str, dict[str, Any]] | None:
+        """Return the name and response of the most recent tool result."""
+        if not self.results:
+            return None
+        name = next(reversed(self.results))
+        return name, self.results[name]
+
+
+@dataclass
+class Action:
+    """What the fast path does instead of calling the model.
+
+    Attributes:
+        reply: Text answered to the user
+        tool: Name of a tool to call, when there is no reply
+        args: Arguments of the tool call
+    """
+
+    reply: str | None = None
+    tool: str | None = None
+    args: dict[str, Any] = field(default_factory=dict)
+
+
+@dataclass(frozen=True)
+class Intent:
+    """A kind of turn the fast path recognizes.
+
+    Attributes:
+        name: Name used in the counters
+        match: Returns the Action for a turn, or None to decline it
+    """
+
+    name: str
+    match: Callable[[Turn], Action | None]
+
+
+# Turns a tool result into the next Action, given the turn and the call args
+ResultHandler = Callable[[dict[str, Any], Turn, dict[str, Any]], Action | None]
+
+
+class FastPath:
+    """Answers recognized turns with tools and templates instead of the model."""
+
+    def __init__(
+        self,
+        intents: list[Intent],
+        handlers: Mapping[str, ResultHandler],
+        detect_language: Callable[[str], str | None],
+        enabled: bool = True,
+    ) -> None:
+        """Initialize the fast path.
+
+        Args:
+            intents: Intents tried in order on every new user message
+            handlers: Handler of the results of each tool the intents call
+            detect_language: Language of a text, None if it cannot tell
+            enabled: Send every request to the model when False
+        """
+        self.intents = intents
+        self.handlers = handlers
+        self.detect_language = detect_language
+        self.enabled = enabled
+        self.stats = FastPathStats()
+
+    def snapshot(self) -> dict[str, Any]:
+        """Return the counters as a plain dict for logging and metrics."""
+        snapshot = asdict(self.stats)
+        snapshot["served_share"] = (
+            self.stats.served / self.stats.turns if self.stats.turns else 0.0
+        )
+        return snapshot
+
+    def language(self, turn: Turn) -> str | None:
+        """Detect the language from the newest user text that tells it."""
+        for text in (turn.message, *turn.user_texts, turn.agent_text):
+            language = self.detect_language(text)
+            if language:
+                return language
+        return None
+
+    def next_action(
+        self, contents: list[types.Content], pending: dict[str, Any] | None
+    ) -> tuple[str, Action] | None:
+        """Return the intent name and Action for a request, if any.
+
+        Args:
+            contents: Contents of the model request
+            pending: The tool call the fast path is waiting on, if any
+
+        Returns:
+            The intent and its Action, or None to call the model
+        """
+        last = contents[-1] if contents else None
+        if last is None or last.role != "user":
+            return None
+        parts = last.parts or []
+        if any(part.text for part in parts):
+            self.stats.turns += 1
+            turn = Turn.from_contents(contents)
+            turn.language = self.language(turn)
+            for intent in self.intents:
+                action = intent.match(turn)
+                if action:
+                    return intent.name, action
+            return None
+
+        responses = [part.function_response for part in parts if part.function_response]
+        if not pending or len(responses) != 1 or responses[0].name != pending["tool"]:
+            return None
+        handler = self.handlers.get(pending["tool"])
+        turn = Turn.from_contents(contents)
+        turn.language = self.language(turn)
+        action = (
+            handler(dict(responses[0].response or {}), turn, pending["args"])
+            if handler
+            else None
+        )
+        if action is None:
+            self.stats.handed_over += 1
+            return None
+        return pending["intent"], action
+
+    def before_model(
+        self, callback_context: CallbackContext, llm_request: LlmRequest
+    ) -> LlmResponse | None:
+        """Answer the request without the model if a fast path applies."""
+        if not self.enabled:
+            return None
+        pending = callback_context.state.get(PENDING_STATE_KEY)
+        if pending:
+            callback_context.state[PENDING_STATE_KEY] = None
+        found = self.next_action(llm_request.contents, pending)
+        if found is None:
+            return None
+
+        intent, action = found
+        if action.reply is not None:
+            self.stats.served += 1
+            self.stats.intents[intent] = self.stats.intents.get(intent, 0) + 1
+            part = types.Part(text=action.reply)
+        else:
+            self.stats.tool_calls += 1
+            callback_context.state[PENDING_STATE_KEY] = {
+                "intent": intent,
+                "tool": action.tool,
+                "args": action.args,
+            }
+            part = types.Part(
+                function_call=types.FunctionCall(name=action.tool, args=action.args)
+            )
+        logging.debug(f"Fast path {intent} in {callback_context.invocation_id}")
+        return LlmResponse(content=types.Content(role="model", parts=[part]))
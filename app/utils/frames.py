@@ -0,0 +1,139 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Cheap classification of raw Gemini Live frames.
+
+Most frames coming from the model are ``serverContent`` audio chunks that the
+relay only forwards to the browser. Decoding them with ``json.loads`` just to
+find out that nothing needs handling is the dominant CPU cost of the relay, so
+frames are classified by scanning the raw bytes for the quoted control keys.
+
+A JSON string can never contain an unescaped ``"``, so a quoted key such as
+``"toolCall"`` can only show up in the raw bytes as an object key (or a whole
+string value). Base64 audio never contains quotes at all. False positives are
+harmless - the caller simply decodes the frame - and false negatives cannot
+happen for frames produced by a standard JSON encoder.
+
+Inline ``"data"`` payloads are skipped by jumping from their opening quote to
+their closing quote, so the key scan only touches the small structural part
+of each frame instead of the whole base64 body.
+
+Frames that only carry model audio can be unpacked with ``model_audio`` and
+rebuilt with ``model_audio_frame`` when the relay re-encodes or merges them.
+"""
+
+import base64
+import json
+
+CONTROL_KEYS = (
+    "toolCall",
+    "toolCallCancellation",
+    "usageMetadata",
+    "turnComplete",
+    "interrupted",
+    "sessionResumptionUpdate",
+    "inputTranscription",
+    "outputTranscription",
+)
+
+_CONTROL_TOKENS = tuple((key, f'"{key}"'.encode()) for key in CONTROL_KEYS)
+_DATA_KEY = b'"data":'
+
+
+def _structure(frame: bytes) -> bytes:
+    """Return the frame with the values of inline "data" keys cut out."""
+    pos = frame.find(_DATA_KEY)
+    if pos < 0:
+        return frame
+    chunks = []
+    start = 0
+    while pos >= 0:
+        value_start = frame.find(b'"', pos + len(_DATA_KEY))
+        value_end = frame.find(b'"', value_start + 1) if value_start >= 0 else -1
+        if value_end < 0:
+            break
+        chunks.append(frame[start:value_start])
+        start = value_end + 1
+        pos = frame.find(_DATA_KEY, start)
+    chunks.append(frame[start:])
+    return b"".join(chunks)
+
+
+def control_keys(frame: bytes | str) -> tuple[str, ...]:
+    """Return the control keys present in a raw frame without decoding it.
+
+    Args:
+        frame: Raw JSON frame as received from the Gemini websocket
+
+    Returns:
+        The subset of CONTROL_KEYS found in the frame, empty for pure passthrough
+    """
+    if isinstance(frame, str):
+        frame = frame.encode()
+    frame = _structure(frame)
+    return tuple(key for key, token in _CONTROL_TOKENS if token in frame)
+
+
+def needs_decode(frame: bytes | str) -> bool:
+    """Return True if the frame carries anything the relay has to act on."""
+    if isinstance(frame, str):
+        frame = frame.encode()
+    frame = _structure(frame)
+    return any(token in frame for _, token in _CONTROL_TOKENS)
+
+
+def model_audio(frame: bytes | str) -> tuple[str, bytes] | None:
+    """Extract the PCM of a frame that only carries model audio.
+
+    Args:
+        frame: Raw JSON frame as received from the Gemini websocket
+
+    Returns:
+        Tuple of the audio mime type and the PCM of all parts, or None if the
+        frame carries anything besides audio
+    """
+    try:
+        message = json.loads(frame)
+        parts = message["serverContent"]["modelTurn"]["parts"]
+    except (ValueError, TypeError, KeyError):
+        return None
+    if len(message) != 1 or len(message["serverContent"]) != 1 or not parts:
+        return None
+    chunks = []
+    mime_type = ""
+    for part in parts:
+        blob = part.get("inlineData") if len(part) == 1 else None
+        if not isinstance(blob, dict):
+            return None
+        mime_type = str(blob.get("mimeType", ""))
+        if not mime_type.startswith("audio/pcm"):
+            return None
+        chunks.append(base64.b64decode(blob.get("data", "")))
+    return mime_type, b"".join(chunks)
+
+
+def model_audio_frame(mime_type: str, pcm: bytes) -> bytes:
+    """Build a Gemini style serverContent frame carrying one audio chunk.
+
+    The frame is assembled directly; neither the mime type nor base64 output
+    can contain characters that need JSON escaping.
+    """
+    data = base64.b64encode(pcm)
+    return (
+        b'{"serverContent":{"modelTurn":{"parts":[{"inlineData":{"mimeType":"'
+        + mime_type.encode()
+        + b'","data":"'
+        + data
+        + b'"}}]}}}'
+    )
@@ -0,0 +1,249 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Deadline-bounded and hedged model calls for the ADK text agent.
+
+A chat request sets an absolute deadline with ``deadline_scope``. The agent
+run is cancelled when it passes, and every model call made inside the scope
+carries the time left as the HTTP timeout of the upstream request, so a slow
+call fails at the deadline instead of holding the request open.
+
+``HedgedLlm`` wraps the agent's model. When hedging is on and a call has not
+produced its first response by a percentile of recent first-response
+latencies, it sends an identical second call and uses whichever answers
+first; the other is cancelled. Only model calls are hedged: the agent
+executes the tool calls of the winning response alone, so side-effecting
+tools never run twice. Hedges are capped at a fraction of all calls so a
+slow model is not hit with twice the load.
+"""
+
+import asyncio
+import contextlib
+from collections.abc import AsyncGenerator, AsyncIterator
+from contextvars import ContextVar
+from dataclasses import asdict, dataclass
+from typing import Any
+
+from google.adk.models.base_llm import BaseLlm
+from google.adk.models.llm_request import LlmRequest
+from google.adk.models.llm_response import LlmResponse
+from google.genai import types
+from pydantic import PrivateAttr
+
+from app.utils.metrics import LatencyRecorder
+
+_deadline: ContextVar[float | None] = ContextVar("chat_deadline", default=None)
+
+
+def time_remaining() -> float | None:
+    """Return the seconds left before the current deadline, None if unbounded."""
+    deadline = _deadline.get()
+    if deadline is None:
+        return None
+    return deadline - asyncio.get_running_loop().time()
+
+
+@contextlib.asynccontextmanager
+async def deadline_scope(deadline: float | None) -> AsyncIterator[None]:
+    """Bound the block by an absolute event loop time.
+
+    Args:
+        deadline: Event loop time (``loop.time()``) the block must finish by,
+            None for no deadline
+
+    Raises:
+        asyncio.TimeoutError: If the block is still running at the deadline
+    """
+    if deadline is None:
+        yield
+        return
+    # asyncio.timeout_at needs Python 3.11; cancel the task at the deadline
+    task = asyncio.current_task()
+    assert task is not None
+    expired = False
+
+    def expire() -> None:
+        nonlocal expired
+        expired = True
+        task.cancel()
+
+    token = _deadline.set(deadline)
+    handle = asyncio.get_running_loop().call_at(deadline, expire)
+    try:
+        yield
+    except asyncio.CancelledError:
+        if not expired:
+            raise
+        if hasattr(task, "uncancel"):
+            task.uncancel()
+        raise asyncio.TimeoutError from None
+    finally:
+        handle.cancel()
+        _deadline.reset(token)
+
+
+@dataclass
+class HedgeStats:
+    """Counters describing hedged model calls."""
+
+    calls: int = 0
+    hedges: int = 0
+    hedge_wins: int = 0
+    over_budget: int = 0
+
+
+class _Attempt:
+    """One upstream model call and the task waiting for its first response."""
+
+    def __init__(self, model: BaseLlm, llm_request: LlmRequest, stream: bool):
+        self.responses = model.generate_content_async(llm_request, stream=stream)
+        self.first = asyncio.create_task(self._next())
+
+    async def _next(self) -> LlmResponse | None:
+        try:
+            return await anext(self.responses)
+        except StopAsyncIteration:
+            return None
+
+    async def close(self) -> None:
+        if not self.first.done():
+            self.first.cancel()
+            with contextlib.suppress(asyncio.CancelledError, Exception):
+                await self.first
+        await self.responses.aclose()
+
+
+def _copy_request(llm_request: LlmRequest) -> LlmRequest:
+    """Copy a request for a hedge, sharing everything a call does not modify.
+
+    Models only append to the contents list and assign config fields, so
+    copying both one level deep keeps the original call unaffected without
+    paying for a deep copy of instructions and tool declarations.
+    """
+    config = llm_request.config.model_copy() if llm_request.config else None
+    return llm_request.model_copy(
+        update={"contents": list(llm_request.contents), "config": config}
+    )
+
+
+class HedgedLlm(BaseLlm):
+    """Wraps a model, bounding calls by the deadline and hedging slow ones."""
+
+    model: str = ""
+    inner: BaseLlm
+    # Send a second call when the first is slower than this percentile
+    hedge: bool = False
+    percentile: float = 95.0
+    # Until enough latencies are known, hedge after a fixed delay
+    min_samples: int = 20
+    initial_delay: float = 2.0
+    # Largest fraction of calls that may be hedged
+    budget: float = 0.1
+    _latency: LatencyRecorder = PrivateAttr(default_factory=LatencyRecorder)
+    _stats: HedgeStats = PrivateAttr(default_factory=HedgeStats)
+
+    def model_post_init(self, context: Any) -> None:
+        """Report the wrapped model's name, which the agent puts in requests."""
+        self.model = self.model or self.inner.model
+
+    @property
+    def stats(self) -> HedgeStats:
+        """Counters describing hedged model calls."""
+        return self._stats
+
+    def snapshot(self) -> dict[str, Any]:
+        """Return the counters and first-response latency for metrics."""
+        return {
+            **asdict(self._stats),
+            "hedge_delay_ms": self.hedge_delay() * 1000,
+            "first_response": self._latency.summary(),
+        }
+
+    def hedge_delay(self) -> float:
+        """Return how long a call may take before it is hedged, in seconds."""
+        if self._latency.count < self.min_samples:
+            return self.initial_delay
+        return self._latency.percentile(self.percentile) or self.initial_delay
+
+    def _start(self, llm_request: LlmRequest, stream: bool) -> _Attempt:
+        remaining = time_remaining()
+        if remaining is not None:
+            config = llm_request.config or types.GenerateContentConfig()
+            options = config.http_options or types.HttpOptions()
+            config.http_options = options.model_copy(
+                update={"timeout": max(1, int(remaining * 1000))}
+            )
+            llm_request.config = config
+        return _Attempt(self.inner, llm_request, stream)
+
+    async def _first_response(
+        self, llm_request: LlmRequest, stream: bool, attempts: list[_Attempt]
+    ) -> tuple[_Attempt, LlmResponse | None]:
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        attempts.append(self._start(llm_request, stream))
+        if self.hedge:
+            done, _ = await asyncio.wait(
+                {attempts[0].first}, timeout=self.hedge_delay()
+            )
+            if not done and self._stats.hedges >= self.budget * self._stats.calls:
+                self._stats.over_budget += 1
+            elif not done:
+                self._stats.hedges += 1
+                attempts.append(self._start(_copy_request(llm_request), stream))
+
+        pending = {attempt.first for attempt in attempts}
+        while True:
+            for attempt in attempts:
+                first = attempt.first
+                if first.done() and not first.cancelled() and first.exception() is None:
+                    self._latency.record(loop.time() - started)
+                    if attempt is not attempts[0]:
+                        self._stats.hedge_wins += 1
+                    return attempt, attempt.first.result()
+            if not pending:
+                break
+            _, pending = await asyncio.wait(
+                pending, return_when=asyncio.FIRST_COMPLETED
+            )
+        # Every attempt failed; report the first error, the original call's if any
+        errors = [
+            attempt.first.exception()
+            for attempt in attempts
+            if not attempt.first.cancelled()
+        ]
+        error = next((error for error in errors if error is not None), None)
+        if error is None:
+            raise asyncio.CancelledError
+        raise error
+
+    async def generate_content_async(
+        self, llm_request: LlmRequest, stream: bool = False
+    ) -> AsyncGenerator[LlmResponse, None]:
+        """Call the wrapped model, hedging the call if it is slow to answer."""
+        self._stats.calls += 1
+        attempts: list[_Attempt] = []
+        try:
+            winner, first = await self._first_response(llm_request, stream, attempts)
+            for attempt in attempts:
+                if attempt is not winner:
+                    await attempt.close()
+            if first is None:
+                return
+            yield first
+            async for response in winner.responses:
+                yield response
+        finally:
+            for attempt in attempts:
+                await attempt.close()
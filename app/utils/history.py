@@ -0,0 +1,285 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Rolling compaction of the chat history sent to the model.
+
+Every chat request for a user continues the same ADK session, so without
+compaction the prompt grows with the whole conversation. The HistoryCompactor
+runs as the agent's ``before_model_callback`` and rewrites the request
+contents, leaving the stored session untouched:
+
+* the last ``keep_turns`` turns (a user message and everything the agent did
+  to answer it) are kept verbatim;
+* older turns keep their user and model text, while their tool calls and
+  tool responses are collapsed into short facts (the verified customer, the
+  selected ticket, completed actions) that are added to the system
+  instruction and saved in the session state;
+* if the history is still over ``max_tokens``, the oldest turns are dropped
+  until it fits, never the current one.
+
+Token counts are estimated from the size of the contents, which is enough to
+budget the prompt and to report the tokens saved per request.
+"""
+
+import json
+import logging
+from collections import OrderedDict
+from dataclasses import asdict, dataclass
+from typing import Any
+
+from google.adk.agents.callback_context import CallbackContext
+from google.adk.models.llm_request import LlmRequest
+from google.adk.models.llm_response import LlmResponse
+from google.genai import types
+
+# Session state key holding the facts collapsed from old tool calls
+FACTS_STATE_KEY = "history_facts"
+
+# Rough ratio of characters to tokens for mixed text and JSON
+CHARS_PER_TOKEN = 4
+
+# Most completed actions remembered as facts
+MAX_ACTIONS = 10
+
+
+@dataclass
+class CompactionStats:
+    """Counters describing how much history compaction saved."""
+
+    model_calls: int = 0
+    compacted_calls: int = 0
+    tokens_before: int = 0
+    tokens_after: int = 0
+    tool_pairs_collapsed: int = 0
+    turns_dropped: int = 0
+
+
+def estimate_tokens(content: types.Content) -> int:
+    """Estimate the tokens a content takes up in the prompt."""
+    chars = 0
+    for part in content.parts or []:
+        if part.text:
+            chars += len(part.text)
+        elif part.function_call:
+            chars += len(part.function_call.name or "")
+            chars += len(json.dumps(part.function_call.args or {}, default=str))
+        elif part.function_response:
+            chars += len(part.function_response.name or "")
+            chars += len(json.dumps(part.function_response.response or {}, default=str))
+    return -(-chars // CHARS_PER_TOKEN)
+
+
+def split_turns(contents: list[types.Content]) -> list[list[types.Content]]:
+    """Group contents into turns, each starting with a user text message."""
+    turns: list[list[types.Content]] = []
+    for content in contents:
+        starts_turn = content.role == "user" and any(
+            part.text for part in content.parts or []
+        )
+        if starts_turn or not turns:
+            turns.append([])
+        turns[-1].append(content)
+    return turns
+
+
+def collapse_tool_calls(
+    contents: list[types.Content], facts: dict[str, Any]
+) -> tuple[list[types.Content], int]:
+    """Drop tool calls and responses, folding what they established into facts.
+
+    Args:
+        contents: Contents of the turns being compacted, oldest first
+        facts: Facts gathered so far, updated in place
+
+    Returns:
+        The contents reduced to their text parts, and the number of tool
+        call and response pairs collapsed
+    """
+    calls: dict[str, types.FunctionCall] = {}
+    pending: list[types.FunctionCall] = []
+    call: types.FunctionCall | None
+    pairs = 0
+    kept = []
+    for content in contents:
+        text = []
+        for part in content.parts or []:
+            if part.function_call:
+                call = part.function_call
+                if call.id:
+                    calls[call.id] = call
+                pending.append(call)
+            elif part.function_response:
+                response = part.function_response
+                call = calls.pop(response.id, None) if response.id else None
+                if call is None and pending:
+                    call = pending[0]
+                if call is not None and call in pending:
+                    pending.remove(call)
+                _fold_tool_result(
+                    facts,
+                    response.name or "",
+                    dict(call.args or {}) if call else {},
+                    response.response or {},
+                )
+                pairs += 1
+            elif part.text and not part.thought:
+                text.append(types.Part(text=part.text))
+        if text:
+            kept.append(types.Content(role=content.role, parts=text))
+    return kept, pairs
+
+
+def _fold_tool_result(
+    facts: dict[str, Any], name: str, args: dict[str, Any], result: dict[str, Any]
+) -> None:
+    """Record what one tool call established about the conversation."""
+    # ADK wraps results that are not dicts as {"result": ...}
+    payload = result.get("result", result)
+    result = payload if isinstance(payload, dict) else {}
+    status = str(result.get("status", ""))
+    phone_number = args.get("phone_number") or result.get("phone_number")
+    if phone_number and status != "not_found":
+        facts["customer_phone"] = phone_number
+    if result.get("name"):
+        facts["customer_name"] = result["name"]
+    if name == "verify_id_tool":
+        facts["customer_verified"] = status == "verified"
+    if isinstance(result.get("flights"), list):
+        facts["tickets"] = [
+            " ".join(
+                str(flight.get(key, ""))
+                for key in ("ticket_number", "flight_number", "origin", "destination")
+            )
+            + f" on {flight.get('date', '')}"
+            for flight in result["flights"]
+            if isinstance(flight, dict)
+        ]
+    ticket_number = args.get("ticket_number") or result.get("ticket_number")
+    if ticket_number:
+        facts["selected_ticket"] = ticket_number
+        message = result.get("message") or result.get("status") or "done"
+        action = f"{name.removesuffix('_tool')} {ticket_number}: {message}"
+        actions = facts.setdefault("actions", [])
+        # Old turns are folded again on every model call; record each once
+        if action not in actions:
+            actions.append(action)
+            del actions[:-MAX_ACTIONS]
+
+
+def format_facts(facts: dict[str, Any]) -> str:
+    """Render the facts as an instruction for the model."""
+    lines = ["Facts established earlier in this conversation:"]
+    for key, value in facts.items():
+        if isinstance(value, list):
+            value = "; ".join(str(item) for item in value)
+        lines.append(f"- {key.replace('_', ' ')}: {value}")
+    return "\n".join(lines)
+
+
+class HistoryCompactor:
+    """Keeps the prompt of long chat sessions within a token budget."""
+
+    def __init__(
+        self, keep_turns: int = 6, max_tokens: int = 8000, enabled: bool = True
+    ) -> None:
+        """Initialize the policy.
+
+        Args:
+            keep_turns: Most recent turns sent verbatim
+            max_tokens: Estimated token budget for the history
+            enabled: Pass requests through untouched when False
+        """
+        self.keep_turns = max(1, keep_turns)
+        self.max_tokens = max_tokens
+        self.enabled = enabled
+        self.stats = CompactionStats()
+        self._saved: OrderedDict[str, int] = OrderedDict()
+
+    def snapshot(self) -> dict[str, int]:
+        """Return the counters as a plain dict for logging and metrics."""
+        return asdict(self.stats)
+
+    def tokens_saved(self, invocation_id: str) -> int:
+        """Return and forget the tokens saved over one agent run."""
+        return self._saved.pop(invocation_id, 0)
+
+    def compact(
+        self, contents: list[types.Content], facts: dict[str, Any]
+    ) -> tuple[list[types.Content], int, int]:
+        """Apply the policy to the contents of one model request.
+
+        Args:
+            contents: History about to be sent, oldest first
+            facts: Facts gathered so far, updated in place
+
+        Returns:
+            The compacted contents, the collapsed tool pairs and the number
+            of turns dropped for the token budget
+        """
+        turns = split_turns(contents)
+        old, recent = turns[: -self.keep_turns], turns[-self.keep_turns :]
+        compacted = []
+        pairs = 0
+        for turn in old:
+            kept, collapsed = collapse_tool_calls(turn, facts)
+            pairs += collapsed
+            if kept:
+                compacted.append(kept)
+        turns = compacted + recent
+
+        dropped = 0
+        budget = sum(estimate_tokens(c) for turn in turns for c in turn)
+        while len(turns) > 1 and budget > self.max_tokens:
+            turn = turns.pop(0)
+            # Facts from tool calls of recent turns dropped here are kept too
+            collapse_tool_calls(turn, facts)
+            budget -= sum(estimate_tokens(content) for content in turn)
+            dropped += 1
+        return [content for turn in turns for content in turn], pairs, dropped
+
+    def before_model(
+        self, callback_context: CallbackContext, llm_request: LlmRequest
+    ) -> LlmResponse | None:
+        """Compact the request contents; used as the before_model_callback."""
+        if not self.enabled:
+            return None
+        before = sum(estimate_tokens(content) for content in llm_request.contents)
+        facts = dict(callback_context.state.get(FACTS_STATE_KEY) or {})
+        known = json.dumps(facts, sort_keys=True)
+        contents, pairs, dropped = self.compact(llm_request.contents, facts)
+        after = sum(estimate_tokens(content) for content in contents)
+
+        self.stats.model_calls += 1
+        self.stats.tokens_before += before
+        self.stats.tokens_after += after
+        if pairs or dropped:
+            self.stats.compacted_calls += 1
+            self.stats.tool_pairs_collapsed += pairs
+            self.stats.turns_dropped += dropped
+            llm_request.contents = contents
+        if facts:
+            llm_request.append_instructions([format_facts(facts)])
+            if json.dumps(facts, sort_keys=True) != known:
+                callback_context.state[FACTS_STATE_KEY] = facts
+
+        invocation_id = callback_context.invocation_id
+        self._saved[invocation_id] = self._saved.get(invocation_id, 0) + before - after
+        self._saved.move_to_end(invocation_id)
+        while len(self._saved) > 1024:
+            self._saved.popitem(last=False)
+        if before != after:
+            logging.debug(
+                f"Compacted history of {invocation_id}: {before} -> {after} tokens"
+            )
+        return None
@@ -0,0 +1,370 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Itinerary search over a flight timetable with the Connection Scan Algorithm.
+
+A timetable of daily flight patterns is expanded over a date horizon into
+elementary connections, one per flight and day, stored as arrays sorted by
+departure time. A search scans the connections departing after the
+requested time once, in order, keeping for every airport and number of legs
+the earliest arrival and the connection that reached it. A connection can be
+taken when its departure airport was reached with the same or one fewer
+legs early enough to make the airport's minimum connection time; the scan
+stops as soon as departures are later than the best arrival found at the
+destination.
+
+Keeping one label per number of legs yields the fastest direct, one-stop and
+two-stop itineraries of a departure together. Further alternatives come from
+repeating the scan just after the first departure of the itineraries found,
+until ``k`` distinct itineraries are known or the search window closes.
+
+Times are minutes since the Unix epoch in UTC. Timetable times are local to
+the airport and converted with its fixed UTC offset.
+"""
+
+import bisect
+import csv
+from collections.abc import Iterable
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta, timezone
+
+import numpy as np
+
+MINUTES_PER_DAY = 24 * 60
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+_UNREACHED = np.iinfo(np.int64).max
+
+
+@dataclass(frozen=True)
+class Airport:
+    """An airport with its UTC offset and minimum connection time."""
+
+    code: str
+    name: str
+    utc_offset: int
+    min_connection: int
+
+
+@dataclass(frozen=True)
+class Leg:
+    """One flight of an itinerary; times in minutes since the epoch, UTC."""
+
+    flight_number: str
+    origin: str
+    destination: str
+    departure: int
+    arrival: int
+
+
+@dataclass(frozen=True)
+class Itinerary:
+    """A sequence of legs from the origin to the destination."""
+
+    legs: tuple[Leg, ...]
+
+    @property
+    def departure(self) -> int:
+        return self.legs[0].departure
+
+    @property
+    def arrival(self) -> int:
+        return self.legs[-1].arrival
+
+    @property
+    def stops(self) -> int:
+        return len(self.legs) - 1
+
+    @property
+    def duration(self) -> int:
+        """Total travel time in minutes."""
+        return self.arrival - self.departure
+
+    @property
+    def transfer_airports(self) -> list[str]:
+        return [leg.destination for leg in self.legs[:-1]]
+
+    @property
+    def layovers(self) -> list[int]:
+        """Minutes spent at each transfer airport."""
+        return [
+            after.departure - before.arrival
+            for before, after in zip(self.legs, self.legs[1:], strict=False)
+        ]
+
+
+def format_duration(minutes: int) -> str:
+    """Format minutes as "9h 30m", or "3h" on the hour."""
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours}h {minutes}m" if minutes else f"{hours}h"
+
+
+def _minutes(moment: datetime) -> int:
+    return int((moment - _EPOCH).total_seconds() // 60)
+
+
+class ItinerarySearch:
+    """Connection Scan search over an expanded timetable."""
+
+    def __init__(
+        self,
+        airports: Iterable[Airport],
+        flight_numbers: Iterable[str],
+        origins: Iterable[str],
+        destinations: Iterable[str],
+        departures: Iterable[int],
+        arrivals: Iterable[int],
+    ) -> None:
+        """Index elementary connections for searching.
+
+        Args:
+            airports: Every airport the connections touch
+            flight_numbers: Flight number of each connection
+            origins: Departure airport code of each connection
+            destinations: Arrival airport code of each connection
+            departures: Departure of each connection, minutes since epoch UTC
+            arrivals: Arrival of each connection, minutes since epoch UTC
+
+        Raises:
+            ValueError: If a connection uses an unknown airport
+        """
+        self.airports = {airport.code: airport for airport in airports}
+        codes = list(self.airports)
+        index = {code: n for n, code in enumerate(codes)}
+        flight_numbers = np.asarray(list(flight_numbers))
+        try:
+            origin = np.array([index[code] for code in origins], dtype=np.int32)
+            destination = np.array(
+                [index[code] for code in destinations], dtype=np.int32
+            )
+        except KeyError as e:
+            raise ValueError(f"Timetable uses unknown airport {e}") from e
+        departure = np.asarray(list(departures), dtype=np.int64)
+        arrival = np.asarray(list(arrivals), dtype=np.int64)
+        order = np.argsort(departure, kind="stable")
+        self._codes = codes
+        self._index = index
+        self._mct = [self.airports[code].min_connection for code in codes]
+        # Plain lists: the scan reads single elements, which NumPy is slow at
+        self._flight = flight_numbers[order].tolist()
+        self._origin = origin[order].tolist()
+        self._destination = destination[order].tolist()
+        self._departure = departure[order].tolist()
+        self._arrival = arrival[order].tolist()
+        # Connections of every route in departure order, for direct searches
+        self._routes: dict[tuple[int, int], list[int]] = {}
+        for c, route in enumerate(zip(self._origin, self._destination, strict=True)):
+            self._routes.setdefault(route, []).append(c)
+
+    @classmethod
+    def from_files(
+        cls, airports_path: str, timetable_path: str, start: date, days: int
+    ) -> "ItinerarySearch":
+        """Load airports and a daily timetable and expand it over a horizon.
+
+        Args:
+            airports_path: CSV with code, name, utc_offset_minutes and
+                min_connection_minutes
+            timetable_path: CSV with flight_number, origin, destination,
+                local departure "HH:MM", duration_minutes and days, the ISO
+                weekdays (1 is Monday) the flight operates on
+            start: First day of the horizon
+            days: Number of days to expand the timetable over
+        """
+        with open(airports_path, newline="") as f:
+            airports = [
+                Airport(
+                    row["code"],
+                    row["name"],
+                    int(row["utc_offset_minutes"]),
+                    int(row["min_connection_minutes"]),
+                )
+                for row in csv.DictReader(f)
+            ]
+        with open(timetable_path, newline="") as f:
+            flights = list(csv.DictReader(f))
+        offsets = {airport.code: airport.utc_offset for airport in airports}
+        first_day = _minutes(datetime.combine(start, datetime.min.time(), timezone.utc))
+        columns: tuple[list, ...] = ([], [], [], [], [])
+        for day in range(days):
+            weekday = str((start + timedelta(days=day)).isoweekday())
+            midnight = first_day + day * MINUTES_PER_DAY
+            for flight in flights:
+                if weekday not in flight["days"]:
+                    continue
+                hours, minutes = flight["departure"].split(":")
+                departure = (
+                    midnight
+                    + int(hours) * 60
+                    + int(minutes)
+                    - offsets.get(flight["origin"], 0)
+                )
+                for column, value in zip(
+                    columns,
+                    (
+                        flight["flight_number"],
+                        flight["origin"],
+                        flight["destination"],
+                        departure,
+                        departure + int(flight["duration_minutes"]),
+                    ),
+                    strict=True,
+                ):
+                    column.append(value)
+        return cls(airports, *columns)
+
+    def __len__(self) -> int:
+        return len(self._departure)
+
+    def local_minutes(self, code: str, when: datetime) -> int:
+        """Convert a naive local time at an airport to minutes since epoch."""
+        offset = self.airports[code].utc_offset
+        return _minutes(when.replace(tzinfo=timezone.utc)) - offset
+
+    def local_time(self, code: str, minutes: int) -> datetime:
+        """Convert minutes since epoch to a naive local time at an airport."""
+        offset = self.airports[code].utc_offset
+        return (_EPOCH + timedelta(minutes=minutes + offset)).replace(tzinfo=None)
+
+    def _scan(
+        self,
+        origin: int,
+        destination: int,
+        depart_after: int,
+        max_legs: int,
+        until: int,
+    ) -> list[tuple[int, ...]]:
+        """Return the fastest journey for each number of legs, as connections."""
+        size = len(self._codes)
+        # ready[k][stop]: earliest time a flight can be boarded at stop after
+        # arriving there on k legs. via holds the journey that got there as
+        # (connection, previous journey), fixed when the label improves.
+        ready = [[_UNREACHED] * size for _ in range(max_legs + 1)]
+        arrival = [[_UNREACHED] * size for _ in range(max_legs + 1)]
+        via: list[list[tuple | None]] = [[None] * size for _ in range(max_legs + 1)]
+        ready[0][origin] = depart_after
+        # Earliest boarding time at each stop with legs to spare, so most
+        # connections are rejected with a single comparison
+        boarding = [_UNREACHED] * size
+        boarding[origin] = depart_after
+        best = _UNREACHED
+        dep, arr = self._departure, self._arrival
+        orig, dest, mct = self._origin, self._destination, self._mct
+        for c in range(bisect.bisect_left(dep, depart_after), len(dep)):
+            departure = dep[c]
+            if departure > best or departure > until:
+                break
+            stop = orig[c]
+            if boarding[stop] > departure:
+                continue
+            to = dest[c]
+            for legs in range(max_legs, 0, -1):
+                if ready[legs - 1][stop] <= departure and arr[c] < arrival[legs][to]:
+                    arrival[legs][to] = arr[c]
+                    ready[legs][to] = arr[c] + mct[to]
+                    via[legs][to] = (c, via[legs - 1][stop])
+                    if legs < max_legs:
+                        boarding[to] = min(boarding[to], ready[legs][to])
+                    if to == destination:
+                        best = min(best, arr[c])
+
+        journeys = []
+        for legs in range(1, max_legs + 1):
+            journey = via[legs][destination]
+            connections = []
+            while journey is not None:
+                c, journey = journey
+                connections.append(c)
+            if connections:
+                journeys.append(tuple(reversed(connections)))
+        return journeys
+
+    def search(
+        self,
+        origin: str,
+        destination: str,
+        depart_after: int,
+        k: int = 3,
+        direct_only: bool = False,
+        max_stops: int = 2,
+        window: int = MINUTES_PER_DAY,
+        max_duration: int = 2 * MINUTES_PER_DAY,
+    ) -> list[Itinerary]:
+        """Find up to k itineraries departing within a window.
+
+        Args:
+            origin: Origin airport code
+            destination: Destination airport code
+            depart_after: Earliest departure, minutes since epoch UTC
+            k: Number of itineraries to return
+            direct_only: Only return nonstop flights
+            max_stops: Most transfers an itinerary may have
+            window: Minutes after depart_after the first flight may leave in
+            max_duration: Longest total travel time considered, in minutes
+
+        Returns:
+            Itineraries sorted by arrival, then by number of stops
+        """
+        if origin not in self._index or destination not in self._index:
+            return []
+        if origin == destination:
+            return []
+        source, target = self._index[origin], self._index[destination]
+        if direct_only or max_stops == 0:
+            return self._direct(source, target, depart_after, k, window)
+        max_legs = max_stops + 1
+        found: dict[tuple[int, ...], None] = {}
+        start = depart_after
+        last_departure = depart_after + window
+        while len(found) < k and start <= last_departure:
+            journeys = self._scan(source, target, start, max_legs, start + max_duration)
+            journeys = [
+                journey
+                for journey in journeys
+                if self._departure[journey[0]] <= last_departure
+            ]
+            if not journeys:
+                break
+            for journey in journeys:
+                found.setdefault(journey)
+            # The next scan must leave later than every journey found
+            start = min(self._departure[journey[0]] for journey in journeys) + 1
+
+        itineraries = [
+            Itinerary(tuple(self._leg(c) for c in journey)) for journey in found
+        ]
+        itineraries.sort(key=lambda itinerary: (itinerary.arrival, itinerary.stops))
+        return itineraries[:k]
+
+    def _direct(
+        self, origin: int, destination: int, depart_after: int, k: int, window: int
+    ) -> list[Itinerary]:
+        """Return the first k nonstop flights of a route in the window."""
+        route = self._routes.get((origin, destination), [])
+        departures = [self._departure[c] for c in route]
+        first = bisect.bisect_left(departures, depart_after)
+        last = bisect.bisect_right(departures, depart_after + window)
+        itineraries = [
+            Itinerary((self._leg(c),)) for c in route[first : min(last, first + k)]
+        ]
+        itineraries.sort(key=lambda itinerary: itinerary.arrival)
+        return itineraries
+
+    def _leg(self, c: int) -> Leg:
+        return Leg(
+            self._flight[c],
+            self._codes[self._origin[c]],
+            self._codes[self._destination[c]],
+            self._departure[c],
+            self._arrival[c],
+        )
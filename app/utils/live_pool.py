@@ -0,0 +1,189 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Pool of pre-established Gemini Live sessions.
+
+Opening a live session costs a TLS handshake, a websocket upgrade and the
+setup round trip before the first byte of audio can flow. Since every caller
+uses the same LiveConnectConfig, sessions can be opened ahead of time and
+handed to new clients already set up. A background task keeps the pool
+filled up to max_size and discards sessions that have been idle longer than
+idle_ttl.
+"""
+
+import asyncio
+import contextlib
+import logging
+import time
+from collections import deque
+from collections.abc import AsyncIterator, Callable
+from contextlib import AbstractAsyncContextManager
+from dataclasses import asdict, dataclass
+from typing import Any
+
+
+@dataclass
+class LivePoolStats:
+    """Counters describing how the pool served sessions."""
+
+    idle: int = 0
+    hits: int = 0
+    misses: int = 0
+    expired: int = 0
+    refill_failures: int = 0
+
+
+@dataclass
+class _IdleSession:
+    context: AbstractAsyncContextManager[Any]
+    session: Any
+    created_at: float
+
+
+def _is_open(session: Any) -> bool:
+    """Best-effort check that the session's websocket has not been closed."""
+    state = getattr(getattr(session, "_ws", None), "state", None)
+    return state is None or getattr(state, "name", "OPEN") == "OPEN"
+
+
+class LiveSessionPool:
+    """Hands out ready Gemini Live sessions and refills itself in the background."""
+
+    def __init__(
+        self,
+        connect: Callable[[], AbstractAsyncContextManager[Any]],
+        max_size: int = 2,
+        idle_ttl: float = 60.0,
+        refill_interval: float = 5.0,
+    ) -> None:
+        """Initialize the pool.
+
+        Args:
+            connect: Returns a new live connect context manager, e.g.
+                ``lambda: client.aio.live.connect(model=..., config=...)``
+            max_size: Number of idle sessions to keep ready, 0 disables pooling
+            idle_ttl: Seconds an idle session may wait before it is discarded
+            refill_interval: Seconds between background expiry/refill passes
+        """
+        self._connect = connect
+        self.max_size = max_size
+        self.idle_ttl = idle_ttl
+        self.refill_interval = refill_interval
+        self._idle: deque[_IdleSession] = deque()
+        self._wake = asyncio.Event()
+        self._task: asyncio.Task | None = None
+        # Expired sessions being closed in the background
+        self._discards: set[asyncio.Task] = set()
+        self._closed = False
+        self._stats = LivePoolStats()
+
+    @property
+    def stats(self) -> LivePoolStats:
+        """Current counters, including the number of idle sessions."""
+        self._stats.idle = len(self._idle)
+        return self._stats
+
+    def snapshot(self) -> dict[str, int]:
+        """Return the counters as a plain dict for logging and metrics."""
+        return asdict(self.stats)
+
+    def start(self) -> None:
+        """Start filling the pool, so the first caller finds a ready session.
+
+        Must be called from the event loop, e.g. on application startup.
+        """
+        self._ensure_refilling()
+
+    @contextlib.asynccontextmanager
+    async def session(self) -> AsyncIterator[Any]:
+        """Yield a set-up live session, pre-warmed if one is available.
+
+        The session is closed when the context exits; it is never returned to
+        the pool because its conversation state belongs to one client.
+        """
+        entry = self._take_idle()
+        if entry is None:
+            self._stats.misses += 1
+            entry = await self._open()
+        else:
+            self._stats.hits += 1
+        self._ensure_refilling()
+        try:
+            yield entry.session
+        finally:
+            await entry.context.__aexit__(None, None, None)
+
+    async def close(self) -> None:
+        """Stop refilling and close every idle session."""
+        self._closed = True
+        if self._task is not None:
+            self._task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._task
+        while self._idle:
+            await self._discard(self._idle.popleft())
+        if self._discards:
+            await asyncio.gather(*self._discards)
+
+    async def _open(self) -> _IdleSession:
+        context = self._connect()
+        session = await context.__aenter__()
+        return _IdleSession(context, session, time.monotonic())
+
+    async def _discard(self, entry: _IdleSession) -> None:
+        try:
+            await entry.context.__aexit__(None, None, None)
+        except Exception as e:
+            logging.debug(f"Error closing pooled live session: {e!s}")
+
+    def _take_idle(self) -> _IdleSession | None:
+        now = time.monotonic()
+        while self._idle:
+            entry = self._idle.popleft()
+            if now - entry.created_at <= self.idle_ttl and _is_open(entry.session):
+                return entry
+            self._stats.expired += 1
+            task = asyncio.create_task(self._discard(entry))
+            self._discards.add(task)
+            task.add_done_callback(self._discards.discard)
+        return None
+
+    def _ensure_refilling(self) -> None:
+        if self.max_size <= 0 or self._closed:
+            return
+        if self._task is None or self._task.done():
+            self._wake = asyncio.Event()
+            self._task = asyncio.create_task(self._refill_forever())
+        self._wake.set()
+
+    async def _refill_forever(self) -> None:
+        while not self._closed:
+            now = time.monotonic()
+            for entry in [e for e in self._idle if now - e.created_at > self.idle_ttl]:
+                self._idle.remove(entry)
+                self._stats.expired += 1
+                await self._discard(entry)
+
+            while len(self._idle) < self.max_size and not self._closed:
+                try:
+                    entry = await self._open()
+                except Exception as e:
+                    self._stats.refill_failures += 1
+                    logging.warning(f"Failed to pre-warm live session: {e!s}")
+                    break
+                self._idle.append(entry)
+
+            self._wake.clear()
+            with contextlib.suppress(asyncio.TimeoutError):
+                await asyncio.wait_for(self._wake.wait(), self.refill_interval)
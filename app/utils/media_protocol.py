@@ -0,0 +1,113 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Binary media sub-protocol between the browser and the relay.
+
+Clients that offer the ``BINARY_MEDIA_SUBPROTOCOL`` websocket sub-protocol may
+send microphone audio and camera frames as binary websocket messages instead
+of base64 ``realtimeInput`` JSON. Each binary message is a 4 byte header
+followed by the raw media payload:
+
+    byte 0     protocol version (1)
+    byte 1     media kind (1 = 16-bit PCM audio, 2 = JPEG image)
+    bytes 2-3  sample rate in Hz for audio, big endian (0 for images)
+
+Control messages (``setup``, ``clientContent``, ...) stay JSON text messages,
+and clients that do not offer the sub-protocol keep using the JSON protocol.
+
+The same framing carries model audio to clients that negotiated a downlink
+codec (see ``app.utils.audio_codecs``), using the compressed audio kinds
+(3 = mu-law, 4 = A-law, 5 = IMA ADPCM). Those frames are told apart from the
+JSON frames relayed as binary messages by their first byte, which is never
+``{``. A header-only frame of kind 6 tells those clients to flush the model
+audio they have buffered, because the user barged in.
+"""
+
+import base64
+import struct
+
+BINARY_MEDIA_SUBPROTOCOL = "live-media.v1"
+
+PROTOCOL_VERSION = 1
+KIND_AUDIO_PCM = 1
+KIND_IMAGE_JPEG = 2
+KIND_AUDIO_MULAW = 3
+KIND_AUDIO_ALAW = 4
+KIND_AUDIO_IMA_ADPCM = 5
+KIND_CONTROL_FLUSH = 6
+
+HEADER = struct.Struct("!BBH")
+
+
+def negotiate_subprotocol(offered: list[str] | None) -> str | None:
+    """Pick the sub-protocol to accept from the ones offered by the client."""
+    if offered and BINARY_MEDIA_SUBPROTOCOL in offered:
+        return BINARY_MEDIA_SUBPROTOCOL
+    return None
+
+
+def encode_media_frame(kind: int, payload: bytes, sample_rate: int = 0) -> bytes:
+    """Build a binary media frame.
+
+    Args:
+        kind: KIND_AUDIO_PCM or KIND_IMAGE_JPEG
+        payload: Raw PCM samples or JPEG bytes
+        sample_rate: Audio sample rate in Hz, ignored for images
+
+    Returns:
+        The header followed by the payload
+    """
+    return HEADER.pack(PROTOCOL_VERSION, kind, sample_rate) + payload
+
+
+def decode_media_frame(frame: bytes) -> tuple[str, bytes]:
+    """Split a binary media frame into its mime type and payload.
+
+    Args:
+        frame: Binary websocket message received from the client
+
+    Returns:
+        Tuple of the Gemini mime type and the raw payload
+
+    Raises:
+        ValueError: If the header is truncated or unsupported
+    """
+    if len(frame) < HEADER.size:
+        raise ValueError(f"Binary media frame too short: {len(frame)} bytes")
+    version, kind, sample_rate = HEADER.unpack_from(frame)
+    if version != PROTOCOL_VERSION:
+        raise ValueError(f"Unsupported binary media protocol version: {version}")
+    if kind == KIND_AUDIO_PCM:
+        mime_type = f"audio/pcm;rate={sample_rate or 16000}"
+    elif kind == KIND_IMAGE_JPEG:
+        mime_type = "image/jpeg"
+    else:
+        raise ValueError(f"Unsupported binary media kind: {kind}")
+    return mime_type, frame[HEADER.size :]
+
+
+def realtime_input_message(mime_type: str, payload: bytes) -> str:
+    """Build the upstream realtimeInput JSON for a single media chunk.
+
+    The message is assembled directly as a string; neither the mime type nor
+    base64 output can contain characters that need JSON escaping.
+    """
+    data = base64.b64encode(payload).decode("ascii")
+    return (
+        '{"realtimeInput":{"mediaChunks":[{"mimeType":"'
+        + mime_type
+        + '","data":"'
+        + data
+        + '"}]}}'
+    )
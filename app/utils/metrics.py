@@ -0,0 +1,54 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Small in-process metric helpers exposed through the API."""
+
+from collections import deque
+
+
+class LatencyRecorder:
+    """Keeps the most recent latency samples and summarizes them."""
+
+    def __init__(self, max_samples: int = 1024) -> None:
+        """Initialize the recorder.
+
+        Args:
+            max_samples: Number of recent samples kept for percentiles
+        """
+        self._samples: deque[float] = deque(maxlen=max_samples)
+        self.count = 0
+
+    def record(self, seconds: float) -> None:
+        """Record one latency sample, in seconds."""
+        self._samples.append(seconds)
+        self.count += 1
+
+    def percentile(self, q: float) -> float | None:
+        """Return the q-th percentile (0-100) of the recent samples, in seconds."""
+        if not self._samples:
+            return None
+        ordered = sorted(self._samples)
+        index = min(len(ordered) - 1, max(0, round(q / 100 * (len(ordered) - 1))))
+        return ordered[index]
+
+    def summary(self) -> dict[str, float | int | None]:
+        """Return count, last, p50 and p99 in milliseconds."""
+        p50 = self.percentile(50)
+        p99 = self.percentile(99)
+        return {
+            "count": self.count,
+            "last_ms": self._samples[-1] * 1000 if self._samples else None,
+            "p50_ms": p50 * 1000 if p50 is not None else None,
+            "p99_ms": p99 * 1000 if p99 is not None else None,
+        }
@@ -0,0 +1,170 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Bounded, watermark based queues between the relay readers and writers.
+
+Each direction of a live session gets its own RelayQueue so a slow peer on
+one side no longer stalls the reader on the other side. When a queue reaches
+its high watermark it either drops the oldest droppable items (stale
+microphone audio) down to the low watermark, or makes the producer wait until
+the consumer has drained it to the low watermark.
+"""
+
+import asyncio
+from collections import deque
+from dataclasses import asdict, dataclass
+from typing import Any
+
+
+@dataclass
+class RelayQueueStats:
+    """Counters describing the behaviour of a relay queue."""
+
+    depth: int = 0
+    max_depth: int = 0
+    enqueued: int = 0
+    dropped: int = 0
+    blocked: int = 0
+
+
+class RelayQueue:
+    """Bounded FIFO between a single producer and a single consumer."""
+
+    def __init__(
+        self, high_watermark: int, low_watermark: int, drop_oldest: bool = False
+    ) -> None:
+        """Initialize the queue.
+
+        Args:
+            high_watermark: Depth at which the overflow policy kicks in
+            low_watermark: Depth the queue is brought back to under pressure
+            drop_oldest: Drop the oldest droppable items instead of blocking
+        """
+        if not 0 <= low_watermark < high_watermark:
+            raise ValueError(
+                "Watermarks must satisfy 0 <= low_watermark < high_watermark, "
+                f"got low={low_watermark} high={high_watermark}"
+            )
+        self.high_watermark = high_watermark
+        self.low_watermark = low_watermark
+        self.drop_oldest = drop_oldest
+        self._items: deque[tuple[Any, bool]] = deque()
+        self._not_empty = asyncio.Event()
+        self._drained = asyncio.Event()
+        self._drained.set()
+        self._closed = False
+        self._stats = RelayQueueStats()
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    @property
+    def closed(self) -> bool:
+        """Whether close() has been called."""
+        return self._closed
+
+    @property
+    def stats(self) -> RelayQueueStats:
+        """Current counters, including the live queue depth."""
+        self._stats.depth = len(self._items)
+        return self._stats
+
+    def snapshot(self) -> dict[str, int]:
+        """Return the counters as a plain dict for logging and metrics."""
+        return asdict(self.stats)
+
+    async def put(self, item: Any, droppable: bool = False) -> None:
+        """Enqueue an item, applying the overflow policy at the high watermark.
+
+        Args:
+            item: The frame to enqueue
+            droppable: Whether the item may be discarded under pressure
+        """
+        while not self._closed and len(self._items) >= self.high_watermark:
+            if self.drop_oldest and self._drop_stale():
+                break
+            self._stats.blocked += 1
+            self._drained.clear()
+            await self._drained.wait()
+        if self._closed:
+            return
+        self._items.append((item, droppable))
+        self._stats.enqueued += 1
+        self._stats.max_depth = max(self._stats.max_depth, len(self._items))
+        self._not_empty.set()
+
+    async def get(self) -> Any | None:
+        """Dequeue the next item, or return None once closed and drained."""
+        entry = await self.get_entry()
+        return None if entry is None else entry[0]
+
+    async def get_entry(self) -> tuple[Any, bool] | None:
+        """Dequeue the next item with its droppable flag, None once closed."""
+        while not self._items:
+            if self._closed:
+                return None
+            self._not_empty.clear()
+            await self._not_empty.wait()
+        entry = self._items.popleft()
+        if len(self._items) <= self.low_watermark:
+            self._drained.set()
+        return entry
+
+    def drain(self) -> list[tuple[Any, bool]]:
+        """Remove and return every queued item with its droppable flag."""
+        items = list(self._items)
+        self._items.clear()
+        self._drained.set()
+        return items
+
+    def discard_droppable(self) -> int:
+        """Remove every queued droppable item, keeping the others in order.
+
+        Returns:
+            The number of items removed
+        """
+        kept = deque(entry for entry in self._items if not entry[1])
+        discarded = len(self._items) - len(kept)
+        self._items = kept
+        self._stats.dropped += discarded
+        if len(self._items) <= self.low_watermark:
+            self._drained.set()
+        return discarded
+
+    def close(self) -> None:
+        """Stop accepting items and wake up any waiting producer or consumer.
+
+        Items already queued can still be consumed with get().
+        """
+        self._closed = True
+        self._not_empty.set()
+        self._drained.set()
+
+    def _drop_stale(self) -> bool:
+        """Drop the oldest droppable items down to the low watermark.
+
+        Returns:
+            True if the queue is below the high watermark afterwards
+        """
+        excess = len(self._items) - self.low_watermark
+        kept: deque[tuple[Any, bool]] = deque()
+        dropped = 0
+        for entry in self._items:
+            if dropped < excess and entry[1]:
+                dropped += 1
+                continue
+            kept.append(entry)
+        self._items = kept
+        self._stats.dropped += dropped
+        return len(self._items) < self.high_watermark
@@ -0,0 +1,154 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""State needed to reconnect a live conversation without starting over.
+
+Gemini Live periodically sends ``sessionResumptionUpdate`` messages carrying
+a handle that lets a new connection pick up the same conversation. The relay
+keeps the latest resumable handle, a short text history of the conversation
+(client turns and audio transcriptions) as a fallback when no handle is
+available yet, and a bounded buffer of client messages received while the
+model connection is being re-established.
+"""
+
+import json
+from collections import deque
+from typing import Any
+
+from google.genai import types
+
+
+class ResumptionState:
+    """Tracks the resumption handle and the conversation so far."""
+
+    def __init__(self, max_turns: int = 20) -> None:
+        """Initialize the state.
+
+        Args:
+            max_turns: Number of recent turns kept for the replay fallback
+        """
+        self.handle: str | None = None
+        self.history: deque[dict[str, Any]] = deque(maxlen=max_turns)
+        self._user_text: list[str] = []
+        self._model_text: list[str] = []
+
+    def observe_server_message(self, message: dict[str, Any]) -> None:
+        """Update the handle and transcripts from a decoded Gemini message."""
+        update = message.get("sessionResumptionUpdate")
+        if update and update.get("resumable") and update.get("newHandle"):
+            self.handle = update["newHandle"]
+
+        content = message.get("serverContent")
+        if not content:
+            return
+        if text := (content.get("inputTranscription") or {}).get("text"):
+            self._user_text.append(text)
+        if text := (content.get("outputTranscription") or {}).get("text"):
+            self._model_text.append(text)
+        for part in (content.get("modelTurn") or {}).get("parts") or []:
+            if part.get("text") and not part.get("thought"):
+                self._model_text.append(part["text"])
+        if content.get("turnComplete") or content.get("interrupted"):
+            self._flush_turn()
+
+    def observe_client_content(self, client_content: dict[str, Any]) -> None:
+        """Record text turns the client sent with clientContent."""
+        for turn in client_content.get("turns") or []:
+            self.history.append(turn)
+
+    def connect_config(
+        self, config: types.LiveConnectConfig
+    ) -> types.LiveConnectConfig:
+        """Return config with session resumption pointed at the latest handle."""
+        return config.model_copy(
+            update={
+                "session_resumption": types.SessionResumptionConfig(handle=self.handle)
+            }
+        )
+
+    def replay_message(self) -> str | None:
+        """Build a clientContent message re-seeding a session without a handle.
+
+        Returns:
+            The JSON message, or None if a handle is available or nothing
+            has been said yet
+        """
+        self._flush_turn()
+        if self.handle is not None or not self.history:
+            return None
+        return json.dumps(
+            {"clientContent": {"turns": list(self.history), "turnComplete": False}}
+        )
+
+    def _flush_turn(self) -> None:
+        for role, chunks in (("user", self._user_text), ("model", self._model_text)):
+            text = "".join(chunks).strip()
+            if text:
+                self.history.append({"role": role, "parts": [{"text": text}]})
+            chunks.clear()
+
+
+class ReplayBuffer:
+    """Bounded buffer of client messages held while the model reconnects.
+
+    Once more than max_audio_frames audio frames are held, the oldest audio
+    frame is evicted. Control messages are never evicted.
+    """
+
+    def __init__(self, max_audio_frames: int) -> None:
+        """Initialize the buffer.
+
+        Args:
+            max_audio_frames: Number of audio frames kept, oldest evicted first
+        """
+        self.max_audio_frames = max_audio_frames
+        self._items: deque[tuple[str, bool]] = deque()
+        self._audio = 0
+        self.dropped = 0
+        self.replayed = 0
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def append(self, message: str, droppable: bool = False) -> None:
+        """Hold a message, evicting the oldest audio frame if over capacity."""
+        self._items.append((message, droppable))
+        if droppable:
+            self._audio += 1
+            if self._audio > self.max_audio_frames:
+                self._evict_oldest_audio()
+
+    def appendleft(self, message: str, droppable: bool = False) -> None:
+        """Put back a message that could not be delivered."""
+        self._items.appendleft((message, droppable))
+        if droppable:
+            self._audio += 1
+            if self._audio > self.max_audio_frames:
+                self._evict_oldest_audio()
+
+    def popleft(self) -> str:
+        """Remove and return the oldest held message."""
+        message, droppable = self._items.popleft()
+        if droppable:
+            self._audio -= 1
+        self.replayed += 1
+        return message
+
+    def _evict_oldest_audio(self) -> None:
+        for index, (_, droppable) in enumerate(self._items):
+            if droppable:
+                del self._items[index]
+                self._audio -= 1
+                self.dropped += 1
+                return
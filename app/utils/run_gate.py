@@ -0,0 +1,179 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Per-session serialization and coalescing of chat agent runs.
+
+Concurrent chat requests for the same session would otherwise run the agent
+side by side and race on the session's events and state, and a message
+submitted twice would pay for two full agent runs. The RunGate:
+
+* runs at most one agent run per session at a time, later requests waiting
+  in arrival order;
+* hands a request whose normalized text matches a run still in flight for
+  the same session, and which arrived within ``window`` seconds of it, the
+  result of that run instead of starting another one.
+
+A run executes in its own task, so a request that disconnects leaves the run
+to the requests that joined it; the run is cancelled only once every request
+waiting for it is gone.
+"""
+
+import asyncio
+import contextlib
+import time
+import unicodedata
+from collections.abc import AsyncIterator, Awaitable, Callable
+from dataclasses import asdict, dataclass
+from typing import TypeVar
+
+T = TypeVar("T")
+
+
+@dataclass
+class RunGateStats:
+    """Counters describing queued and coalesced chat requests."""
+
+    requests: int = 0
+    runs: int = 0
+    queued: int = 0
+    coalesced: int = 0
+    waiting: int = 0
+    max_waiting: int = 0
+
+
+def normalize_message(text: str) -> str:
+    """Normalize a message so trivially different resubmits compare equal."""
+    return " ".join(unicodedata.normalize("NFKC", text).casefold().split())
+
+
+class _Session:
+    """Lock and number of requests holding or waiting for it."""
+
+    __slots__ = ("lock", "users")
+
+    def __init__(self) -> None:
+        self.lock = asyncio.Lock()
+        self.users = 0
+
+
+class _SharedRun:
+    """Task of an agent run and the number of requests waiting for it."""
+
+    __slots__ = ("started", "task", "waiters")
+
+    def __init__(self, started: float, task: asyncio.Task) -> None:
+        self.started = started
+        self.task = task
+        self.waiters = 0
+
+
+class RunGate:
+    """Serializes agent runs per session and shares duplicate runs."""
+
+    def __init__(
+        self, window: float = 10.0, clock: Callable[[], float] = time.monotonic
+    ) -> None:
+        """Initialize the gate.
+
+        Args:
+            window: Seconds after a run started during which an identical
+                message for the same session joins it, 0 to never coalesce
+            clock: Monotonic clock, injectable for tests
+        """
+        self.window = window
+        self.clock = clock
+        self.stats = RunGateStats()
+        self._sessions: dict[str, _Session] = {}
+        self._inflight: dict[tuple[str, str], _SharedRun] = {}
+
+    def snapshot(self) -> dict[str, int]:
+        """Return the counters as a plain dict for logging and metrics."""
+        return asdict(self.stats)
+
+    @contextlib.asynccontextmanager
+    async def serialize(self, session_key: str) -> AsyncIterator[None]:
+        """Hold the session's turn for the duration of the block."""
+        session = self._sessions.setdefault(session_key, _Session())
+        session.users += 1
+        try:
+            if session.lock.locked():
+                self.stats.queued += 1
+                self.stats.waiting += 1
+                self.stats.max_waiting = max(self.stats.max_waiting, self.stats.waiting)
+                try:
+                    await session.lock.acquire()
+                finally:
+                    self.stats.waiting -= 1
+            else:
+                await session.lock.acquire()
+            try:
+                yield
+            finally:
+                session.lock.release()
+        finally:
+            session.users -= 1
+            if not session.users:
+                del self._sessions[session_key]
+
+    async def run(
+        self, session_key: str, message: str, run: Callable[[], Awaitable[T]]
+    ) -> T:
+        """Run the agent for a message, or join an identical run in flight.
+
+        Args:
+            session_key: Identifies the session the run works on
+            message: Text of the user message
+            run: Starts the agent run and returns its result
+
+        Returns:
+            The result of this run, or of the identical run it joined
+        """
+        self.stats.requests += 1
+        key = (session_key, normalize_message(message))
+        shared = self._inflight.get(key)
+        if shared is not None and self.clock() - shared.started <= self.window:
+            self.stats.coalesced += 1
+        else:
+            shared = _SharedRun(
+                self.clock(), asyncio.ensure_future(self._run(session_key, run))
+            )
+            shared.task.add_done_callback(_retrieve)
+            if self.window > 0:
+                self._inflight[key] = shared
+                shared.task.add_done_callback(lambda task: self._forget(key, shared))
+        shared.waiters += 1
+        try:
+            # A cancelled request must not cancel a run others still wait for
+            return await asyncio.shield(shared.task)
+        finally:
+            shared.waiters -= 1
+            if not shared.waiters and not shared.task.done():
+                # Nobody wants the result; later duplicates start afresh
+                self._forget(key, shared)
+                shared.task.cancel()
+
+    async def _run(self, session_key: str, run: Callable[[], Awaitable[T]]) -> T:
+        async with self.serialize(session_key):
+            self.stats.runs += 1
+            return await run()
+
+    def _forget(self, key: tuple[str, str], shared: _SharedRun) -> None:
+        if self._inflight.get(key) is shared:
+            del self._inflight[key]
+
+
+def _retrieve(task: asyncio.Task) -> None:
+    """Retrieve the outcome so a run nobody awaits is not reported as unhandled."""
+    if not task.cancelled():
+        task.exception()
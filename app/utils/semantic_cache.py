@@ -0,0 +1,404 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Semantic cache of agent answers to repeated questions.
+
+Support questions repeat with small variations ("E4 hata kodu ne demek?",
+"e4 kodu nedir"), and each one costs a retrieval and a full generation.
+The SemanticCache keeps earlier answers with an embedding of their
+normalized question:
+
+* lookups embed the question and take the nearest cached questions by cosine
+  similarity (one matrix-vector product over all entries); the most similar
+  one at or above ``threshold`` is served if it has not expired, belongs to
+  the current corpus version, and has the same tokens with digits (error
+  codes and model numbers) and the same negations and on/off words ("turn
+  on" and "turn off" the timer), which embeddings tell apart poorly;
+* entries expire after ``ttl`` seconds, and the least recently used ones are
+  evicted beyond ``max_entries`` or ``max_bytes``;
+* a new corpus version drops every entry answered from the old one.
+
+As an agent's ``before_model_callback`` and ``after_model_callback`` the cache
+answers the first question of a session without calling the model, and
+stores the final answer of the ones it missed. Follow-up questions depend on
+the conversation and are never served or stored.
+
+The HashingEmbedder is a local deterministic embedder (hashed word and
+character n-grams); any callable mapping texts to an array of vectors can
+replace it.
+"""
+
+import hashlib
+import logging
+import re
+import time
+import unicodedata
+from collections import OrderedDict
+from collections.abc import Callable
+from dataclasses import asdict, dataclass
+from functools import lru_cache
+from typing import Any
+
+import numpy as np
+from google.adk.agents.callback_context import CallbackContext
+from google.adk.models.llm_request import LlmRequest
+from google.adk.models.llm_response import LlmResponse
+from google.genai import types
+
+_PUNCTUATION = re.compile(r"[^\w\s]")
+_DIGIT = re.compile(r"\d")
+# Words that flip the meaning of otherwise identical questions. Apostrophes
+# are dropped, so "don't" and "can't" end in a "t" token.
+_POLARITY = frozenset(
+    "on off not no t never without enable disable start stop open close up down "
+    "increase decrease raise lower ac kapat acik kapali degil yok hic artir azalt "
+    "yukselt dusur".split()
+)
+# Questions are often typed without Turkish letters
+_FOLD = str.maketrans("\u0131\u015f\u011f\u00e7\u00f6\u00fc\u00e2\u00ee", "isgcouai")
+
+# Embeds texts into rows of an array
+Embedder = Callable[[list[str]], np.ndarray]
+
+
+def normalize_question(text: str) -> str:
+    """Normalize a question: casefolded ASCII letters, no punctuation."""
+    text = unicodedata.normalize("NFKC", text).replace("\u0130", "i")
+    text = text.casefold().translate(_FOLD)
+    return " ".join(_PUNCTUATION.sub(" ", text).split())
+
+
+def guard_tokens(question: str) -> frozenset[str]:
+    """Return the tokens of a normalized question with digits or polarity."""
+    return frozenset(
+        token
+        for token in question.split()
+        if token in _POLARITY or _DIGIT.search(token)
+    )
+
+
+@lru_cache(maxsize=65536)
+def _feature(feature: str, dim: int) -> tuple[int, float]:
+    """Hash a feature to a stable index and sign."""
+    digest = int.from_bytes(hashlib.blake2b(feature.encode(), digest_size=8).digest())
+    return digest % dim, 1.0 if digest >> 63 else -1.0
+
+
+class HashingEmbedder:
+    """Deterministic embeddings from hashed words and character trigrams.
+
+    Trigrams match inflected forms of a word ("filtre", "filtreyi"), which
+    matters for Turkish. Short words ("ne", "how", "do") carry little meaning
+    and only count as words, with a lower weight.
+    """
+
+    def __init__(
+        self,
+        dim: int = 512,
+        word_weight: float = 2.0,
+        short_word_weight: float = 0.5,
+        short_word_length: int = 3,
+        normalize: bool = False,
+    ) -> None:
+        """Initialize the embedder.
+
+        Args:
+            dim: Size of the vectors
+            word_weight: Weight of whole words against their trigrams
+            short_word_weight: Weight of short words, which have no trigrams
+            short_word_length: Length up to which a word is short
+            normalize: Normalize texts as questions before embedding them
+        """
+        self.dim = dim
+        self.word_weight = word_weight
+        self.short_word_weight = short_word_weight
+        self.short_word_length = short_word_length
+        self.normalize = normalize
+
+    def features(self, text: str) -> list[tuple[str, float]]:
+        """Return the weighted features of a normalized text."""
+        features = []
+        for word in text.split():
+            if len(word) <= self.short_word_length:
+                features.append((f"w:{word}", self.short_word_weight))
+                continue
+            features.append((f"w:{word}", self.word_weight))
+            padded = f"<{word}>"
+            features.extend(
+                (f"c:{padded[i : i + 3]}", 1.0) for i in range(len(padded) - 2)
+            )
+        return features
+
+    def __call__(self, texts: list[str]) -> np.ndarray:
+        """Embed texts into unit vectors, one row per text."""
+        vectors = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            if self.normalize:
+                text = normalize_question(text)
+            for feature, weight in self.features(text):
+                index, sign = _feature(feature, self.dim)
+                vectors[row, index] += sign * weight
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        return vectors / np.maximum(norms, 1e-12)
+
+
+@dataclass
+class CacheStats:
+    """Counters describing the cache."""
+
+    lookups: int = 0
+    hits: int = 0
+    stores: int = 0
+    evictions: int = 0
+    expirations: int = 0
+    invalidations: int = 0
+
+
+@dataclass
+class CacheHit:
+    """A cached answer served for a question."""
+
+    question: str
+    answer: str
+    similarity: float
+
+
+class SemanticCache:
+    """Nearest-neighbour cache of answers keyed by question embeddings."""
+
+    def __init__(
+        self,
+        embedder: Embedder,
+        threshold: float = 0.8,
+        ttl: float = 86400.0,
+        max_entries: int = 2000,
+        max_bytes: int = 32 * 1024 * 1024,
+        corpus_version: str = "",
+        enabled: bool = True,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        """Initialize an empty cache.
+
+        Args:
+            embedder: Embeds normalized questions into unit vectors
+            threshold: Least cosine similarity of a served question
+            ttl: Seconds an answer is served for
+            max_entries: Most answers kept
+            max_bytes: Most bytes of questions, answers and vectors kept
+            corpus_version: Version of the corpus answers are drawn from
+            enabled: Answer nothing from the cache and store nothing if False
+            clock: Time source, injectable for tests
+        """
+        self.embedder = embedder
+        self.threshold = threshold
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.corpus_version = corpus_version
+        self.enabled = enabled
+        self.clock = clock
+        self.stats = CacheStats()
+        self.bytes = 0
+        self._vectors: np.ndarray | None = None
+        self._live = np.zeros(0, dtype=bool)
+        self._expires = np.zeros(0)
+        self._entries: list[dict[str, Any] | None] = []
+        self._free: list[int] = []
+        # Slots from least to most recently used
+        self._lru: OrderedDict[int, None] = OrderedDict()
+        # Questions missed by an agent run, awaiting its answer
+        self._pending: OrderedDict[str, str] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._lru)
+
+    def snapshot(self) -> dict[str, Any]:
+        """Return the counters as a plain dict for logging and metrics."""
+        return {
+            **asdict(self.stats),
+            "hit_rate": self.stats.hits / self.stats.lookups
+            if self.stats.lookups
+            else 0.0,
+            "entries": len(self),
+            "bytes": self.bytes,
+        }
+
+    def set_corpus_version(self, version: str) -> None:
+        """Switch to a new corpus version, dropping answers from older ones."""
+        if version == self.corpus_version:
+            return
+        self.corpus_version = version
+        for slot in list(self._lru):
+            self._remove(slot)
+            self.stats.invalidations += 1
+
+    def lookup(self, question: str) -> CacheHit | None:
+        """Return the cached answer of the most similar question, if any."""
+        if not self.enabled:
+            return None
+        self.stats.lookups += 1
+        normalized = normalize_question(question)
+        if not normalized or not self._lru:
+            return None
+        self._expire()
+        vector = self.embedder([normalized])[0]
+        slot = self._nearest(vector, guard_tokens(normalized))
+        if slot is None:
+            return None
+        self._lru.move_to_end(slot)
+        self.stats.hits += 1
+        entry = self._entries[slot]
+        assert entry is not None and self._vectors is not None
+        similarity = float(self._vectors[slot] @ vector)
+        return CacheHit(entry["question"], entry["answer"], similarity)
+
+    def store(self, question: str, answer: str) -> None:
+        """Cache the answer to a question, replacing a near duplicate."""
+        normalized = normalize_question(question)
+        if not self.enabled or not normalized or not answer:
+            return
+        vector = self.embedder([normalized])[0]
+        guard = guard_tokens(normalized)
+        duplicate = self._nearest(vector, guard)
+        if duplicate is not None:
+            self._remove(duplicate)
+        size = len(normalized.encode()) + len(answer.encode()) + vector.nbytes
+        if size > self.max_bytes:
+            return
+        while self._lru and (
+            len(self._lru) >= self.max_entries or self.bytes + size > self.max_bytes
+        ):
+            self._remove(next(iter(self._lru)))
+            self.stats.evictions += 1
+
+        slot = self._allocate(vector.shape[0])
+        assert self._vectors is not None
+        self._vectors[slot] = vector
+        self._live[slot] = True
+        self._expires[slot] = self.clock() + self.ttl
+        self._entries[slot] = {
+            "question": normalized,
+            "answer": answer,
+            "guard": guard,
+            "version": self.corpus_version,
+            "size": size,
+        }
+        self._lru[slot] = None
+        self.bytes += size
+        self.stats.stores += 1
+
+    def _nearest(self, vector: np.ndarray, guard: frozenset[str]) -> int | None:
+        """Return the slot of the most similar servable question, if any."""
+        if self._vectors is None or not self._lru:
+            return None
+        similarities = self._vectors @ vector
+        similarities[~self._live] = -np.inf
+        candidates = np.flatnonzero(similarities >= self.threshold)
+        for slot in candidates[np.argsort(-similarities[candidates])]:
+            entry = self._entries[slot]
+            if (
+                entry is not None
+                and entry["guard"] == guard
+                and entry["version"] == self.corpus_version
+            ):
+                return int(slot)
+        return None
+
+    def _expire(self) -> None:
+        """Drop the entries past their time to live."""
+        for slot in np.flatnonzero(self._live & (self._expires <= self.clock())):
+            self._remove(int(slot))
+            self.stats.expirations += 1
+
+    def _allocate(self, dim: int) -> int:
+        """Return a free slot, growing the arrays if there is none."""
+        if self._free:
+            return self._free.pop()
+        if self._vectors is None:
+            self._vectors = np.zeros((0, dim), dtype=np.float32)
+        slot = len(self._entries)
+        if slot == len(self._vectors):
+            capacity = max(16, 2 * slot)
+            grown = np.zeros((capacity, dim), dtype=np.float32)
+            grown[:slot] = self._vectors
+            self._vectors = grown
+            self._live = np.concatenate([self._live, np.zeros(capacity - slot, bool)])
+            self._expires = np.concatenate([self._expires, np.zeros(capacity - slot)])
+        self._entries.append(None)
+        return slot
+
+    def _remove(self, slot: int) -> None:
+        """Free a slot."""
+        entry = self._entries[slot]
+        if entry is None:
+            return
+        self.bytes -= entry["size"]
+        self._entries[slot] = None
+        self._live[slot] = False
+        self._lru.pop(slot, None)
+        self._free.append(slot)
+
+    def before_model(
+        self, callback_context: CallbackContext, llm_request: LlmRequest
+    ) -> LlmResponse | None:
+        """Serve the first question of a session from the cache if possible."""
+        if not self.enabled:
+            return None
+        texts = [
+            (content.role, part.text)
+            for content in llm_request.contents
+            for part in content.parts or []
+            if part.text and not part.thought
+        ]
+        last = llm_request.contents[-1] if llm_request.contents else None
+        # Only a lone question, before any tool call answering it
+        if (
+            len(texts) != 1
+            or texts[0][0] != "user"
+            or last is None
+            or last.role != "user"
+        ):
+            return None
+        if any(part.function_response for part in last.parts or []):
+            return None
+        question = texts[0][1]
+        hit = self.lookup(question)
+        if hit is None:
+            self._pending[callback_context.invocation_id] = question
+            while len(self._pending) > 1024:
+                self._pending.popitem(last=False)
+            return None
+        logging.debug(
+            f"Answered {callback_context.invocation_id} from the semantic cache "
+            f"(similarity {hit.similarity:.2f})"
+        )
+        return LlmResponse(
+            content=types.Content(role="model", parts=[types.Part(text=hit.answer)])
+        )
+
+    def after_model(
+        self, callback_context: CallbackContext, llm_response: LlmResponse
+    ) -> LlmResponse | None:
+        """Store the final answer to a question the cache missed."""
+        question = self._pending.get(callback_context.invocation_id)
+        if question is None or llm_response.partial or not llm_response.content:
+            return None
+        parts = llm_response.content.parts or []
+        if any(part.function_call for part in parts):
+            return None
+        answer = "".join(part.text for part in parts if part.text and not part.thought)
+        del self._pending[callback_context.invocation_id]
+        if answer and not llm_response.error_code:
+            self.store(question, answer)
+        return None
@@ -0,0 +1,459 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Bounded, persistent ADK session service for the text chat endpoint.
+
+The TieredSessionService keeps recently used sessions in a bounded in-memory
+LRU hot tier and persists every change to a local SQLite file, the cold tier:
+
+* the hot tier holds at most ``max_hot`` records, and records unused for
+  ``hot_ttl`` seconds are dropped from it; both fall back to the cold tier;
+* writes are write-behind: changed records are marked dirty and a background
+  task commits them in one transaction every ``flush_interval`` seconds, or
+  as soon as ``max_pending`` records are waiting;
+* worker processes pointed at the same file share sessions. The file is in
+  WAL mode, upserts never replace a newer version of a record, and with
+  ``shared`` enabled a hot hit is checked against the version in the file,
+  so a session continued on another worker is reloaded. A write is visible
+  to other workers once flushed.
+
+The file is read and written in worker threads, never on the event loop.
+
+Session, user and app state are stored as separate records, mirroring the
+``user:`` and ``app:`` state prefixes handled by ADK's InMemorySessionService.
+"""
+
+import asyncio
+import contextlib
+import copy
+import json
+import logging
+import sqlite3
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from collections.abc import Callable
+from dataclasses import asdict, dataclass
+from typing import Any
+
+from google.adk.events.event import Event
+from google.adk.sessions.base_session_service import (
+    BaseSessionService,
+    GetSessionConfig,
+    ListSessionsResponse,
+)
+from google.adk.sessions.session import Session
+from google.adk.sessions.state import State
+
+# Record kinds, stored in the first column of the records table
+SESSION = "s"
+USER_STATE = "u"
+APP_STATE = "a"
+
+Key = tuple[str, str, str, str]
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS records (
+    kind TEXT NOT NULL,
+    app_name TEXT NOT NULL,
+    user_id TEXT NOT NULL,
+    session_id TEXT NOT NULL,
+    update_time REAL NOT NULL,
+    data TEXT NOT NULL,
+    PRIMARY KEY (kind, app_name, user_id, session_id)
+) WITHOUT ROWID
+"""
+_UPSERT = """
+INSERT INTO records VALUES (?, ?, ?, ?, ?, ?)
+ON CONFLICT (kind, app_name, user_id, session_id) DO UPDATE
+SET update_time = excluded.update_time, data = excluded.data
+WHERE excluded.update_time >= records.update_time
+"""
+_DELETE = (
+    "DELETE FROM records WHERE kind = ? AND app_name = ? AND user_id = ? "
+    "AND session_id = ?"
+)
+_WHERE_KEY = "WHERE kind = ? AND app_name = ? AND user_id = ? AND session_id = ?"
+
+
+@dataclass
+class SessionStoreStats:
+    """Counters describing the hot and cold tiers."""
+
+    hot: int = 0
+    pending: int = 0
+    hot_hits: int = 0
+    cold_hits: int = 0
+    misses: int = 0
+    reloads: int = 0
+    evictions: int = 0
+    expirations: int = 0
+    flushes: int = 0
+    rows_written: int = 0
+    flush_errors: int = 0
+
+
+class _Entry:
+    """A record held in the hot tier."""
+
+    __slots__ = ("touched", "updated", "value")
+
+    def __init__(self, value: Any, updated: float, touched: float) -> None:
+        self.value = value
+        self.updated = updated
+        self.touched = touched
+
+
+class TieredSessionService(BaseSessionService):
+    """ADK session service with an LRU hot tier over a SQLite cold tier."""
+
+    def __init__(
+        self,
+        db_path: str,
+        max_hot: int = 10000,
+        hot_ttl: float = 1800.0,
+        flush_interval: float = 0.05,
+        max_pending: int = 1000,
+        shared: bool = True,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        """Initialize the service and create the cold tier if needed.
+
+        Args:
+            db_path: Path of the SQLite file shared by all workers
+            max_hot: Most records kept in memory
+            hot_ttl: Seconds an unused record stays in memory
+            flush_interval: Longest delay before a change is committed
+            max_pending: Dirty records that trigger an immediate commit
+            shared: Check hot hits against the file, for multiple workers
+            clock: Monotonic clock used for the hot tier TTL
+        """
+        self.db_path = db_path
+        self.max_hot = max_hot
+        self.hot_ttl = hot_ttl
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self.shared = shared
+        self.clock = clock
+        self._stats = SessionStoreStats()
+        self._hot: OrderedDict[Key, _Entry] = OrderedDict()
+        # Changes not committed yet; None marks a deletion
+        self._dirty: dict[Key, tuple[Any, float]] = {}
+        self._flushing: dict[Key, tuple[Any, float]] = {}
+        self._flush_lock = asyncio.Lock()
+        self._flusher: asyncio.Task | None = None
+        # Both connections are used from worker threads, one thread at a time
+        self._reader = self._connect()
+        self._writer = self._connect()
+        self._read_lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        with self._writer:
+            self._writer.execute(_SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        # The service may be created before the event loop thread starts
+        connection = sqlite3.connect(self.db_path, timeout=30, check_same_thread=False)
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("PRAGMA synchronous=NORMAL")
+        return connection
+
+    @property
+    def stats(self) -> SessionStoreStats:
+        """Current counters, including the tier sizes."""
+        self._stats.hot = len(self._hot)
+        self._stats.pending = len(self._dirty) + len(self._flushing)
+        return self._stats
+
+    def snapshot(self) -> dict[str, int]:
+        """Return the counters as a plain dict for logging and metrics."""
+        return asdict(self.stats)
+
+    async def create_session(
+        self,
+        *,
+        app_name: str,
+        user_id: str,
+        state: dict[str, Any] | None = None,
+        session_id: str | None = None,
+    ) -> Session:
+        """Create a session and schedule it for persistence."""
+        session_id = (
+            session_id.strip()
+            if session_id and session_id.strip()
+            else str(uuid.uuid4())
+        )
+        session = Session(
+            app_name=app_name,
+            user_id=user_id,
+            id=session_id,
+            state=state or {},
+            last_update_time=time.time(),
+        )
+        key = (SESSION, app_name, user_id, session_id)
+        self._put_hot(key, session, session.last_update_time)
+        await self._mark_dirty(key, session, session.last_update_time)
+        return await self._merge_state(app_name, user_id, copy.deepcopy(session))
+
+    async def get_session(
+        self,
+        *,
+        app_name: str,
+        user_id: str,
+        session_id: str,
+        config: GetSessionConfig | None = None,
+    ) -> Session | None:
+        """Return a copy of the session, loading it from disk if needed."""
+        session = await self._lookup((SESSION, app_name, user_id, session_id))
+        if session is None:
+            return None
+        copied = copy.deepcopy(session)
+        if config:
+            if config.num_recent_events:
+                copied.events = copied.events[-config.num_recent_events :]
+            if config.after_timestamp:
+                copied.events = [
+                    event
+                    for event in copied.events
+                    if event.timestamp >= config.after_timestamp
+                ]
+        return await self._merge_state(app_name, user_id, copied)
+
+    async def list_sessions(
+        self, *, app_name: str, user_id: str
+    ) -> ListSessionsResponse:
+        """List the user's sessions without their events."""
+        await self.flush()
+        rows = await asyncio.to_thread(
+            self._read,
+            "SELECT data FROM records WHERE kind = ? AND app_name = ? AND user_id = ?",
+            (SESSION, app_name, user_id),
+        )
+        sessions = []
+        for (data,) in rows:
+            session = Session.model_validate_json(data)
+            session.events = []
+            sessions.append(await self._merge_state(app_name, user_id, session))
+        return ListSessionsResponse(sessions=sessions)
+
+    async def delete_session(
+        self, *, app_name: str, user_id: str, session_id: str
+    ) -> None:
+        """Delete a session from both tiers."""
+        key = (SESSION, app_name, user_id, session_id)
+        self._hot.pop(key, None)
+        await self._mark_dirty(key, None, time.time())
+
+    async def append_event(self, session: Session, event: Event) -> Event:
+        """Append an event to the caller's session and to the stored one."""
+        await super().append_event(session=session, event=event)
+        if event.partial:
+            return event
+        session.last_update_time = event.timestamp
+        key = (SESSION, session.app_name, session.user_id, session.id)
+        stored = await self._lookup(key)
+        if stored is None:
+            logging.warning(
+                f"Failed to append event to session {session.id}: not found"
+            )
+            return event
+
+        if event.actions and event.actions.state_delta:
+            app_delta = {}
+            user_delta = {}
+            for name, value in event.actions.state_delta.items():
+                if name.startswith(State.APP_PREFIX):
+                    app_delta[name.removeprefix(State.APP_PREFIX)] = value
+                elif name.startswith(State.USER_PREFIX):
+                    user_delta[name.removeprefix(State.USER_PREFIX)] = value
+            if app_delta:
+                await self._update_state(
+                    (APP_STATE, session.app_name, "", ""), app_delta
+                )
+            if user_delta:
+                await self._update_state(
+                    (USER_STATE, session.app_name, session.user_id, ""), user_delta
+                )
+
+        await super().append_event(session=stored, event=event)
+        stored.last_update_time = event.timestamp
+        await self._mark_dirty(key, stored, stored.last_update_time)
+        return event
+
+    async def flush(self) -> None:
+        """Commit every pending change to the cold tier in one transaction."""
+        async with self._flush_lock:
+            if not self._dirty:
+                return
+            self._flushing, self._dirty = self._dirty, {}
+            rows = []
+            deletes = []
+            try:
+                for n, (key, (value, updated)) in enumerate(self._flushing.items()):
+                    if value is None:
+                        deletes.append(key)
+                    else:
+                        rows.append((*key, updated, _dump(value)))
+                    if n % 500 == 499:
+                        # Serializing a large batch should not stall other requests
+                        await asyncio.sleep(0)
+                await asyncio.to_thread(self._write, rows, deletes)
+            except sqlite3.Error as e:
+                self._stats.flush_errors += 1
+                logging.error(f"Failed to persist chat sessions: {e}")
+                # Keep the changes for the next attempt unless superseded
+                self._dirty = {**self._flushing, **self._dirty}
+            except asyncio.CancelledError:
+                # Written again by the next flush; upserts keep the newest
+                self._dirty = {**self._flushing, **self._dirty}
+                raise
+            else:
+                self._stats.flushes += 1
+                self._stats.rows_written += len(rows) + len(deletes)
+            finally:
+                self._flushing = {}
+            self._expire()
+
+    async def close(self) -> None:
+        """Commit pending changes and close the database connections."""
+        if self._flusher is not None:
+            self._flusher.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._flusher
+        await self.flush()
+        self._reader.close()
+        self._writer.close()
+
+    def _read(self, sql: str, parameters: tuple) -> list[tuple]:
+        with self._read_lock:
+            return self._reader.execute(sql, parameters).fetchall()
+
+    def _write(self, rows: list[tuple], deletes: list[Key]) -> None:
+        # A cancelled flush may still be writing when the next one starts
+        with self._write_lock, self._writer:
+            self._writer.executemany(_UPSERT, rows)
+            self._writer.executemany(_DELETE, deletes)
+
+    async def _mark_dirty(self, key: Key, value: Any, updated: float) -> None:
+        self._dirty[key] = (value, updated)
+        if (entry := self._hot.get(key)) is not None:
+            entry.updated = updated
+        if len(self._dirty) >= self.max_pending:
+            await self.flush()
+        elif self._flusher is None or self._flusher.done():
+            self._flusher = asyncio.create_task(self._flush_later())
+
+    async def _flush_later(self) -> None:
+        await asyncio.sleep(self.flush_interval)
+        await self.flush()
+
+    async def _update_state(self, key: Key, delta: dict[str, Any]) -> None:
+        state = await self._lookup(key)
+        state = {**(state or {}), **delta}
+        updated = time.time()
+        self._put_hot(key, state, updated)
+        await self._mark_dirty(key, state, updated)
+
+    async def _merge_state(
+        self, app_name: str, user_id: str, session: Session
+    ) -> Session:
+        app_state = await self._lookup((APP_STATE, app_name, "", "")) or {}
+        for name, value in app_state.items():
+            session.state[State.APP_PREFIX + name] = value
+        user_state = await self._lookup((USER_STATE, app_name, user_id, "")) or {}
+        for name, value in user_state.items():
+            session.state[State.USER_PREFIX + name] = value
+        return session
+
+    async def _lookup(self, key: Key) -> Any:
+        """Find a record in the hot tier, the pending writes or the cold tier."""
+        entry = self._hot.get(key)
+        now = self.clock()
+        if entry is not None and now - entry.touched > self.hot_ttl:
+            del self._hot[key]
+            self._stats.expirations += 1
+            entry = None
+        if entry is not None:
+            current = not self.shared or await self._is_current(key, entry)
+            if self._hot.get(key) is not entry:
+                # Written, reloaded or evicted while the file was read
+                return await self._lookup(key)
+            if current:
+                entry.touched = now
+                self._hot.move_to_end(key)
+                self._stats.hot_hits += 1
+                return entry.value
+            self._stats.reloads += 1
+            del self._hot[key]
+
+        pending = self._dirty.get(key, self._flushing.get(key))
+        if pending is not None:
+            value, updated = pending
+            if value is None:
+                self._stats.misses += 1
+                return None
+        else:
+            rows = await asyncio.to_thread(
+                self._read, f"SELECT update_time, data FROM records {_WHERE_KEY}", key
+            )
+            if key in self._hot or key in self._dirty or key in self._flushing:
+                # Written or loaded while the file was read
+                return await self._lookup(key)
+            if not rows:
+                self._stats.misses += 1
+                return None
+            updated, value = rows[0][0], _load(key[0], rows[0][1])
+            self._stats.cold_hits += 1
+        self._put_hot(key, value, updated)
+        return value
+
+    async def _is_current(self, key: Key, entry: _Entry) -> bool:
+        """Whether no other worker committed a newer version of the record."""
+        if key in self._dirty or key in self._flushing:
+            return True
+        rows = await asyncio.to_thread(
+            self._read, f"SELECT update_time FROM records {_WHERE_KEY}", key
+        )
+        if key in self._dirty or key in self._flushing:
+            return True
+        return bool(rows) and rows[0][0] <= entry.updated
+
+    def _put_hot(self, key: Key, value: Any, updated: float) -> None:
+        self._hot[key] = _Entry(value, updated, self.clock())
+        self._hot.move_to_end(key)
+        while len(self._hot) > self.max_hot:
+            self._hot.popitem(last=False)
+            self._stats.evictions += 1
+
+    def _expire(self) -> None:
+        """Drop the least recently used records once their TTL has passed."""
+        now = self.clock()
+        while self._hot:
+            key, entry = next(iter(self._hot.items()))
+            if now - entry.touched <= self.hot_ttl:
+                break
+            del self._hot[key]
+            self._stats.expirations += 1
+
+
+def _dump(value: Session | dict[str, Any]) -> str:
+    if isinstance(value, Session):
+        return value.model_dump_json()
+    return json.dumps(value)
+
+
+def _load(kind: str, data: str) -> Session | dict[str, Any]:
+    if kind == SESSION:
+        return Session.model_validate_json(data)
+    return json.loads(data)
@@ -0,0 +1,166 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Per-session executor for Gemini Live function calls."""
+
+import asyncio
+import contextvars
+import functools
+import logging
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any
+
+from google.genai import types
+
+
+class ToolExecutor:
+    """Runs the function calls of a live session concurrently and cancellably.
+
+    All function calls of one LiveServerToolCall run concurrently and are
+    answered with a single batched LiveClientToolResponse. Sync tools run on a
+    bounded thread pool owned by the executor rather than the default loop
+    executor, so one slow session cannot starve the others.
+    """
+
+    def __init__(
+        self,
+        tool_functions: dict[str, Callable],
+        max_workers: int = 4,
+        default_timeout: float = 30.0,
+        timeouts: dict[str, float] | None = None,
+    ) -> None:
+        """Initialize the executor.
+
+        Args:
+            tool_functions: Dictionary of available tool functions
+            max_workers: Size of the thread pool used for sync tools
+            default_timeout: Seconds a tool may run before it is abandoned
+            timeouts: Per-tool overrides of default_timeout
+        """
+        self.tool_functions = tool_functions
+        self.default_timeout = default_timeout
+        self.timeouts = timeouts or {}
+        self._pool = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="live-tool"
+        )
+        self._in_flight: dict[str, asyncio.Task] = {}
+        self._closed = False
+
+    @property
+    def in_flight(self) -> int:
+        """Number of function calls currently running."""
+        return len(self._in_flight)
+
+    def _get_func(self, action_label: str | None) -> Callable | None:
+        """Get the tool function for a given action label."""
+        if action_label is None or action_label == "":
+            return None
+        return self.tool_functions.get(action_label)
+
+    async def _call(self, func: Callable, args: dict[str, Any]) -> Any:
+        """Call a tool, running sync functions on the executor's thread pool."""
+        if asyncio.iscoroutinefunction(func):
+            return await func(**args)
+        loop = asyncio.get_running_loop()
+        context = contextvars.copy_context()
+        return await loop.run_in_executor(
+            self._pool, functools.partial(context.run, func, **args)
+        )
+
+    async def _run_one(self, fc: types.FunctionCall, func: Callable) -> dict:
+        """Run one function call and turn its outcome into a response payload."""
+        args = fc.args if fc.args is not None else {}
+        timeout = self.timeouts.get(fc.name or "", self.default_timeout)
+        try:
+            response = await asyncio.wait_for(self._call(func, args), timeout)
+        except asyncio.TimeoutError:
+            logging.warning(f"Tool {fc.name} timed out after {timeout}s")
+            return {"error": f"Tool {fc.name} timed out after {timeout} seconds"}
+        except Exception as e:
+            logging.error(f"Tool {fc.name} failed: {e!s}")
+            return {"error": str(e)}
+        return response if isinstance(response, dict) else {"result": response}
+
+    async def execute(
+        self, tool_call: types.LiveServerToolCall
+    ) -> types.LiveClientToolResponse | None:
+        """Run every function call of a tool call concurrently.
+
+        Args:
+            tool_call: The tool call received from Gemini
+
+        Returns:
+            One response holding the results of all calls that were not
+            cancelled, or None if there is nothing to send back
+        """
+        if self._closed or not tool_call.function_calls:
+            logging.debug("No function calls in tool_call")
+            return None
+
+        calls = []
+        for i, fc in enumerate(tool_call.function_calls):
+            logging.debug(f"Calling tool function: {fc.name} with args: {fc.args}")
+            func = self._get_func(fc.name)
+            if func is None:
+                logging.error(f"Function {fc.name} not found")
+                continue
+            call_id = fc.id or f"{fc.name}-{id(tool_call)}-{i}"
+            task = asyncio.create_task(self._run_one(fc, func))
+            self._in_flight[call_id] = task
+            calls.append((call_id, fc, task))
+
+        try:
+            results = await asyncio.gather(
+                *(task for _, _, task in calls), return_exceptions=True
+            )
+        finally:
+            for call_id, _, _ in calls:
+                self._in_flight.pop(call_id, None)
+
+        function_responses = [
+            types.FunctionResponse(name=fc.name, id=fc.id, response=result)
+            for (_, fc, _), result in zip(calls, results, strict=True)
+            if not isinstance(result, BaseException)
+        ]
+        if not function_responses:
+            return None
+        return types.LiveClientToolResponse(function_responses=function_responses)
+
+    def cancel(self, ids: list[str] | None) -> int:
+        """Cancel in-flight function calls, e.g. on toolCallCancellation.
+
+        Args:
+            ids: Function call ids to cancel
+
+        Returns:
+            Number of calls that were cancelled
+        """
+        cancelled = 0
+        for call_id in ids or []:
+            task = self._in_flight.get(call_id)
+            if task is not None and not task.done():
+                task.cancel()
+                cancelled += 1
+        return cancelled
+
+    async def shutdown(self) -> None:
+        """Cancel all in-flight work and release the thread pool."""
+        self._closed = True
+        tasks = list(self._in_flight.values())
+        for task in tasks:
+            task.cancel()
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
+        self._pool.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,178 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Session scoped memoization of read-only tool results.
+
+Within one conversation the model calls the same lookups again and again,
+e.g. the customer or their flights for the same phone number. A ToolMemo
+keeps the results of read-only tools in the ADK session state, so they
+survive between requests and are dropped with the session:
+
+* ``before_tool`` answers a call from the memo when the tool was already
+  called with the same normalized arguments, skipping the tool; later
+  after_tool callbacks (e.g. result projection) still run on the result;
+* ``after_tool`` stores the results of read-only tools, and a write tool
+  drops the entries of the read-only tools it invalidates;
+* an optional ``context`` function renders a summary of the memo (e.g. the
+  verified customer) into a state key the agent instruction refers to, so
+  the model has it without calling the tools at all.
+
+Hits and misses are counted per tool.
+"""
+
+import json
+import logging
+from collections.abc import Callable, Mapping
+from dataclasses import asdict, dataclass
+from typing import Any
+
+from google.adk.tools.base_tool import BaseTool
+from google.adk.tools.tool_context import ToolContext
+
+# Session state key holding the memoized results
+MEMO_STATE_KEY = "tool_memo"
+
+
+@dataclass
+class MemoStats:
+    """Memo counters of one tool."""
+
+    hits: int = 0
+    misses: int = 0
+    invalidated: int = 0
+
+
+def normalize_value(value: Any) -> Any:
+    """Default argument normalization: trimmed, casefolded strings."""
+    return value.strip().casefold() if isinstance(value, str) else value
+
+
+class ToolMemo:
+    """Memoizes read-only tools in the session state."""
+
+    def __init__(
+        self,
+        read_only: tuple[str, ...],
+        invalidates: Mapping[str, tuple[str, ...]],
+        normalizers: Mapping[str, Callable[[Any], Any]] | None = None,
+        context: Callable[[list[dict[str, Any]]], str] | None = None,
+        context_key: str | None = None,
+        max_entries: int = 32,
+        enabled: bool = True,
+    ) -> None:
+        """Initialize the memo.
+
+        Args:
+            read_only: Names of the tools whose results are memoized
+            invalidates: Read-only tools whose entries each write tool drops
+            normalizers: Normalization of each argument by name, applied
+                before keying; normalize_value for the others
+            context: Renders the entries (dicts with tool, args and result,
+                oldest first) into the text kept under context_key
+            context_key: Session state key of the rendered context
+            max_entries: Most entries kept per session, oldest dropped first
+            enabled: Call every tool when False
+        """
+        self.read_only = frozenset(read_only)
+        self.invalidates = dict(invalidates)
+        self.normalizers = dict(normalizers or {})
+        self.context = context
+        self.context_key = context_key
+        self.max_entries = max_entries
+        self.enabled = enabled
+        self.stats: dict[str, MemoStats] = {}
+
+    def snapshot(self) -> dict[str, dict[str, Any]]:
+        """Return the per tool counters and hit rates for logging and metrics."""
+        snapshot = {}
+        for name, stats in sorted(self.stats.items()):
+            calls = stats.hits + stats.misses
+            snapshot[name] = {
+                **asdict(stats),
+                "hit_rate": stats.hits / calls if calls else 0.0,
+            }
+        return snapshot
+
+    def normalize(self, args: Mapping[str, Any]) -> dict[str, Any]:
+        """Return the arguments normalized for keying."""
+        return {
+            name: self.normalizers.get(name, normalize_value)(value)
+            for name, value in sorted(args.items())
+        }
+
+    def key(self, tool: str, args: Mapping[str, Any]) -> str:
+        """Return the memo key of a call."""
+        return f"{tool}:{json.dumps(self.normalize(args), sort_keys=True, default=str)}"
+
+    def before_tool(
+        self, tool: BaseTool, args: dict[str, Any], tool_context: ToolContext
+    ) -> dict[str, Any] | None:
+        """Answer a read-only call from the memo; used as before_tool_callback."""
+        if not self.enabled or tool.name not in self.read_only:
+            return None
+        stats = self.stats.setdefault(tool.name, MemoStats())
+        entry = (tool_context.state.get(MEMO_STATE_KEY) or {}).get(
+            self.key(tool.name, args)
+        )
+        if entry is None:
+            stats.misses += 1
+            return None
+        stats.hits += 1
+        logging.debug(f"Memoized {tool.name} result reused")
+        return dict(entry["result"])
+
+    def after_tool(
+        self,
+        tool: BaseTool,
+        args: dict[str, Any],
+        tool_context: ToolContext,
+        tool_response: Any,
+    ) -> None:
+        """Store or invalidate results; used as an after_tool_callback.
+
+        Returns None so the callbacks after it still run.
+        """
+        if not self.enabled:
+            return None
+        memo = dict(tool_context.state.get(MEMO_STATE_KEY) or {})
+        changed = False
+        if tool.name in self.read_only and isinstance(tool_response, dict):
+            key = self.key(tool.name, args)
+            if memo.get(key, {}).get("result") != tool_response:
+                memo.pop(key, None)
+                memo[key] = {
+                    "tool": tool.name,
+                    "args": self.normalize(args),
+                    "result": tool_response,
+                }
+                changed = True
+        for name in self.invalidates.get(tool.name, ()):
+            dropped = [key for key, entry in memo.items() if entry["tool"] == name]
+            for key in dropped:
+                del memo[key]
+            if dropped:
+                stats = self.stats.setdefault(name, MemoStats())
+                stats.invalidated += len(dropped)
+                changed = True
+        if not changed:
+            return None
+
+        while len(memo) > self.max_entries:
+            del memo[next(iter(memo))]
+        tool_context.state[MEMO_STATE_KEY] = memo
+        if self.context and self.context_key:
+            context = self.context(list(memo.values()))
+            if context != tool_context.state.get(self.context_key, ""):
+                tool_context.state[self.context_key] = context
+        return None
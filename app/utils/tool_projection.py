@@ -0,0 +1,187 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Declarative projection of tool results before they reach the model.
+
+Tools return everything a caller might want, and every field of every result
+stays in the prompt of the later model calls of the conversation. A
+ToolProjector runs as the agent's ``after_tool_callback`` and replaces each
+result with the fields the model needs at the current conversation stage:
+
+* a Projection names the fields kept or dropped, projects the items of
+  nested lists and dicts, shortens long lists to their first items and a
+  count of the rest;
+* a ProjectionSpec holds the projections of every tool per stage, and the
+  stage transitions, keyed by tool name and result status, that move the
+  conversation on (e.g. from identifying the customer to verified);
+* tools without a projection are passed through untouched.
+
+Tokens of every result before and after projection are counted per tool, and
+per conversation in the session state.
+"""
+
+import json
+import logging
+from collections.abc import Mapping
+from dataclasses import asdict, dataclass, field
+from typing import Any
+
+from google.adk.tools.base_tool import BaseTool
+from google.adk.tools.tool_context import ToolContext
+
+from app.utils.history import CHARS_PER_TOKEN
+
+# Session state keys holding the conversation stage and its token counts
+STAGE_STATE_KEY = "tool_stage"
+TOKENS_STATE_KEY = "tool_tokens"
+
+# Stage every projection falls back to
+ANY_STAGE = "*"
+
+
+@dataclass(frozen=True)
+class Projection:
+    """Fields of a tool result that are sent to the model.
+
+    Attributes:
+        fields: Keys kept, in this order; all keys if None
+        drop: Keys removed
+        items: Projections of nested values (dicts, or lists of dicts) by key
+        max_items: Lists longer than this keep their first items, and a
+            ``<key>_more`` count of the rest
+    """
+
+    fields: tuple[str, ...] | None = None
+    drop: tuple[str, ...] = ()
+    items: Mapping[str, "Projection"] = field(default_factory=dict)
+    max_items: int | None = None
+
+    def apply(self, value: Any) -> Any:
+        """Project a value; anything but a dict is returned unchanged."""
+        if not isinstance(value, dict):
+            return value
+        keys = value if self.fields is None else [k for k in self.fields if k in value]
+        projected = {}
+        for key in keys:
+            if key in self.drop:
+                continue
+            item = value[key]
+            nested = self.items.get(key)
+            more = 0
+            if isinstance(item, list):
+                if self.max_items is not None and len(item) > self.max_items:
+                    more = len(item) - self.max_items
+                    item = item[: self.max_items]
+                item = [nested.apply(entry) for entry in item] if nested else item
+            elif nested:
+                item = nested.apply(item)
+            projected[key] = item
+            if more:
+                projected[f"{key}_more"] = more
+        return projected
+
+
+@dataclass(frozen=True)
+class ProjectionSpec:
+    """Projections of every tool per conversation stage.
+
+    Attributes:
+        stages: Conversation stages, the first being the initial one
+        tools: Projection of each tool name by stage; ANY_STAGE applies
+            to stages without their own
+        transitions: Stage entered after a tool returns a status, keyed by
+            (tool name, status)
+    """
+
+    stages: tuple[str, ...]
+    tools: Mapping[str, Mapping[str, Projection]]
+    transitions: Mapping[tuple[str, str], str] = field(default_factory=dict)
+
+    def projection(self, tool: str, stage: str) -> Projection | None:
+        """Return the projection of a tool at a stage, if any."""
+        by_stage = self.tools.get(tool, {})
+        return by_stage.get(stage, by_stage.get(ANY_STAGE))
+
+
+@dataclass
+class ToolTokenStats:
+    """Token counts of one tool's results before and after projection."""
+
+    calls: int = 0
+    tokens_before: int = 0
+    tokens_after: int = 0
+
+
+def estimate_result_tokens(result: Any) -> int:
+    """Estimate the tokens a tool result takes up in the prompt."""
+    return -(-len(json.dumps(result, default=str)) // CHARS_PER_TOKEN)
+
+
+class ToolProjector:
+    """Applies a ProjectionSpec to the results of an agent's tools."""
+
+    def __init__(self, spec: ProjectionSpec, enabled: bool = True) -> None:
+        """Initialize the projector.
+
+        Args:
+            spec: Projections and stage transitions
+            enabled: Pass results through untouched (still counting their
+                tokens) when False
+        """
+        self.spec = spec
+        self.enabled = enabled
+        self.stats: dict[str, ToolTokenStats] = {}
+
+    def snapshot(self) -> dict[str, dict[str, int]]:
+        """Return the per tool counters as plain dicts for logging and metrics."""
+        return {name: asdict(stats) for name, stats in sorted(self.stats.items())}
+
+    def project(self, tool: str, stage: str, result: Any) -> Any:
+        """Project one tool result at a stage."""
+        projection = self.spec.projection(tool, stage)
+        if not self.enabled or projection is None:
+            return result
+        return projection.apply(result)
+
+    def after_tool(
+        self,
+        tool: BaseTool,
+        args: dict[str, Any],
+        tool_context: ToolContext,
+        tool_response: Any,
+    ) -> dict[str, Any] | None:
+        """Project a tool result; used as the after_tool_callback."""
+        stage = tool_context.state.get(STAGE_STATE_KEY) or self.spec.stages[0]
+        projected = self.project(tool.name, stage, tool_response)
+
+        before = estimate_result_tokens(tool_response)
+        after = estimate_result_tokens(projected)
+        stats = self.stats.setdefault(tool.name, ToolTokenStats())
+        stats.calls += 1
+        stats.tokens_before += before
+        stats.tokens_after += after
+        totals = dict(tool_context.state.get(TOKENS_STATE_KEY) or {})
+        totals["before"] = totals.get("before", 0) + before
+        totals["after"] = totals.get("after", 0) + after
+        tool_context.state[TOKENS_STATE_KEY] = totals
+
+        status = (
+            tool_response.get("status") if isinstance(tool_response, dict) else None
+        )
+        next_stage = self.spec.transitions.get((tool.name, str(status)))
+        if next_stage and next_stage != stage:
+            tool_context.state[STAGE_STATE_KEY] = next_stage
+        if before != after:
+            logging.debug(f"Projected {tool.name} result: {before} -> {after} tokens")
+        return projected if projected is not tool_response else None
@@ -0,0 +1,202 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Voice activity gate for microphone audio sent to Gemini.
+
+The browser streams 16-bit PCM continuously, including long stretches of
+silence. Every frame sent upstream costs bandwidth and audio tokens, so the
+VoiceActivityGate classifies each chunk and holds back silence:
+
+* each chunk is split into short analysis windows whose RMS energy and
+  zero-crossing rate are computed in one vectorized pass;
+* a window is speech when its energy is clearly above the adaptive noise
+  floor, or slightly above it with a high zero-crossing rate (unvoiced
+  consonants such as "s" and "f" are quiet but noisy);
+* after speech the gate stays open for a hangover period, so the model still
+  receives the trailing silence its turn detection needs to end the turn;
+* a short pre-roll of held silence is released when speech starts, so word
+  onsets are not clipped;
+* during long silences a keepalive chunk is still sent now and then.
+
+Time is measured in audio samples rather than wall clock, which keeps the gate
+deterministic for offline evaluation.
+"""
+
+from collections import deque
+from dataclasses import dataclass
+from typing import Generic, TypeVar
+
+import numpy as np
+
+T = TypeVar("T")
+
+
+@dataclass
+class VadStats:
+    """Counters describing how much audio the gate let through."""
+
+    frames: int = 0
+    speech_frames: int = 0
+    sent_frames: int = 0
+    gated_frames: int = 0
+    bytes_in: int = 0
+    bytes_sent: int = 0
+
+
+class VoiceActivityGate(Generic[T]):
+    """Decides which microphone chunks are forwarded upstream.
+
+    Chunks are opaque items (for example the upstream message built for the
+    chunk) paired with their raw PCM, so held pre-roll can be released as is.
+    """
+
+    def __init__(
+        self,
+        sample_rate: int = 16000,
+        window_ms: float = 20.0,
+        min_threshold_db: float = -50.0,
+        margin_db: float = 12.0,
+        unvoiced_margin_db: float = 6.0,
+        unvoiced_zcr: float = 0.25,
+        hangover_ms: float = 1000.0,
+        preroll_ms: float = 200.0,
+        keepalive_ms: float = 2000.0,
+    ) -> None:
+        """Initialize the gate.
+
+        Args:
+            sample_rate: Sample rate of the 16-bit mono PCM in Hz
+            window_ms: Length of the analysis windows
+            min_threshold_db: Lowest speech threshold in dBFS, used while the
+                noise floor is very low
+            margin_db: Energy above the noise floor that counts as speech
+            unvoiced_margin_db: Smaller margin accepted for windows with a high
+                zero-crossing rate
+            unvoiced_zcr: Zero-crossing rate (crossings per sample) above which
+                a quiet window is treated as an unvoiced consonant
+            hangover_ms: Audio still sent after the last speech window
+            preroll_ms: Held silence released in front of new speech
+            keepalive_ms: Longest gap between chunks sent during silence,
+                0 to send nothing while silent
+        """
+        self.sample_rate = sample_rate
+        self.window = max(1, int(sample_rate * window_ms / 1000))
+        self.min_threshold_db = min_threshold_db
+        self.margin_db = margin_db
+        self.unvoiced_margin_db = unvoiced_margin_db
+        self.unvoiced_zcr = unvoiced_zcr
+        self.hangover_samples = int(sample_rate * hangover_ms / 1000)
+        self.preroll_samples = int(sample_rate * preroll_ms / 1000)
+        self.keepalive_samples = int(sample_rate * keepalive_ms / 1000)
+        self.noise_floor_db = min_threshold_db - margin_db
+        self.stats = VadStats()
+        # Whether the last chunk pushed was speech, to spot speech onsets
+        self.speaking = False
+        self._hangover_left = 0
+        self._since_sent = 0
+        self._preroll: deque[tuple[T, int]] = deque()
+        self._preroll_len = 0
+
+    @property
+    def threshold_db(self) -> float:
+        """Current speech threshold in dBFS."""
+        return max(self.min_threshold_db, self.noise_floor_db + self.margin_db)
+
+    def is_speech(self, pcm: bytes) -> bool:
+        """Classify a chunk and update the noise floor estimate.
+
+        Args:
+            pcm: Little-endian 16-bit mono PCM
+
+        Returns:
+            True if any analysis window in the chunk contains speech
+        """
+        samples = np.frombuffer(pcm, dtype="<i2", count=len(pcm) // 2)
+        if not samples.size:
+            return False
+        windows = samples[: samples.size - samples.size % self.window]
+        if not windows.size:
+            windows = samples
+        width = min(self.window, windows.size)
+        frames = windows.astype(np.float32).reshape(-1, width)
+        power = np.mean(frames * frames, axis=1)
+        energy_db = 10 * np.log10(power / (32768.0 * 32768.0) + 1e-10)
+        signs = np.signbit(frames)
+        crossings = np.count_nonzero(signs[:, 1:] != signs[:, :-1], axis=1)
+        zcr = crossings / width
+
+        threshold = self.threshold_db
+        speech = (energy_db > threshold) | (
+            (energy_db > threshold - self.unvoiced_margin_db)
+            & (zcr > self.unvoiced_zcr)
+        )
+        # Track the noise floor from the quietest window of every chunk: follow
+        # a falling floor at once and a rising one slowly, so that pauses
+        # between syllables keep it low while steady noise still pulls it up.
+        quietest = float(energy_db.min())
+        if quietest < self.noise_floor_db:
+            self.noise_floor_db = quietest
+        else:
+            self.noise_floor_db += 0.02 * (quietest - self.noise_floor_db)
+        return bool(speech.any())
+
+    def push(self, pcm: bytes, item: T) -> list[T]:
+        """Feed one chunk and return the items to send upstream now.
+
+        Args:
+            pcm: Little-endian 16-bit mono PCM of the chunk
+            item: What to forward for this chunk
+
+        Returns:
+            Items to send in order, empty while the chunk is held back
+        """
+        samples = len(pcm) // 2
+        self.stats.frames += 1
+        self.stats.bytes_in += len(pcm)
+
+        self.speaking = self.is_speech(pcm)
+        if self.speaking:
+            self.stats.speech_frames += 1
+            self._hangover_left = self.hangover_samples
+            released = list(self._preroll)
+            self._preroll.clear()
+            self._preroll_len = 0
+            return self._send(released, item, len(pcm))
+
+        if self._hangover_left > 0:
+            self._hangover_left -= samples
+            return self._send([], item, len(pcm))
+
+        self._since_sent += samples
+        if self.keepalive_samples and self._since_sent >= self.keepalive_samples:
+            # Held chunks are older than the keepalive; sent later they would
+            # reach the model out of order
+            self._preroll.clear()
+            self._preroll_len = 0
+            return self._send([], item, len(pcm))
+
+        self.stats.gated_frames += 1
+        self._preroll.append((item, len(pcm)))
+        self._preroll_len += samples
+        while self._preroll and self._preroll_len > self.preroll_samples:
+            _, size = self._preroll.popleft()
+            self._preroll_len -= size // 2
+        return []
+
+    def _send(self, released: list[tuple[T, int]], item: T, size: int) -> list[T]:
+        self._since_sent = 0
+        self.stats.sent_frames += 1 + len(released)
+        self.stats.gated_frames -= len(released)
+        self.stats.bytes_sent += size + sum(held for _, held in released)
+        return [held for held, _ in released] + [item]
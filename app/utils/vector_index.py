@@ -0,0 +1,391 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Memory-mapped vector index of manual chunks for in-process retrieval.
+
+The technical agents retrieve manual chunks from a remote RAG corpus. A
+VectorIndex serves the same chunks from the local host: chunk embeddings and
+texts are kept as NumPy columns, one ``.npy`` file each in an index
+directory, memory-mapped on open so all workers on a host share the pages.
+
+Two search modes read the same files:
+
+* brute force: every vector is scored with one matrix product, in blocks of
+  rows so memory stays flat; exact, and fast enough for small corpora;
+* IVF (inverted file): vectors are clustered with spherical k-means when the
+  index is built and stored grouped by cluster, so a query scores only the
+  clusters of its ``nprobe`` nearest centroids, each a contiguous slice of
+  the vector file. Recall is traded for speed with ``nprobe``.
+
+LocalRetrieval wraps an index and an embedder into the retrieval tool the
+agents call. Build an index from chunk files with:
+
+    uv run python -m app.utils.vector_index chunks.jsonl index_dir --lists 256
+
+where each line of ``chunks.jsonl`` is ``{"text": ..., "source": ...}``.
+"""
+
+import argparse
+import json
+import os
+from collections.abc import Callable, Iterable, Mapping
+from typing import Any
+
+import numpy as np
+
+from app.utils.semantic_cache import HashingEmbedder
+
+# Embeds texts into rows of an array of unit vectors
+Embedder = Callable[[list[str]], np.ndarray]
+
+COLUMNS = (
+    # Unit vectors, grouped by list; list i is rows list_start[i:i + 2]
+    "vectors",
+    "centroids",
+    "list_start",
+    # Chunk i is text_blob[text_offsets[i]:text_offsets[i + 1]]
+    "text_offsets",
+    "text_blob",
+    "source_offsets",
+    "source_blob",
+)
+
+# Rows scored per matrix product in brute force search
+BLOCK_ROWS = 65536
+
+
+def _blob(values: list[str]) -> tuple[np.ndarray, np.ndarray]:
+    """Pack strings into UTF-8 offsets and bytes."""
+    encoded = [value.encode() for value in values]
+    offsets = np.cumsum([0] + [len(value) for value in encoded]).astype(np.int64)
+    return offsets, np.frombuffer(b"".join(encoded), dtype=np.uint8)
+
+
+def _top_k(
+    scores: np.ndarray, rows: np.ndarray, k: int
+) -> tuple[np.ndarray, np.ndarray]:
+    """Return the k best scores and their rows, best first."""
+    if len(scores) > k:
+        best = np.argpartition(-scores, k - 1)[:k]
+        scores, rows = scores[best], rows[best]
+    order = np.argsort(-scores, kind="stable")
+    return scores[order], rows[order]
+
+
+def kmeans(
+    vectors: np.ndarray,
+    lists: int,
+    iterations: int = 10,
+    sample: int = 100_000,
+    seed: int = 0,
+) -> np.ndarray:
+    """Cluster unit vectors with spherical k-means; return unit centroids.
+
+    Args:
+        vectors: Unit vectors, one per row
+        lists: Number of clusters
+        iterations: Lloyd iterations
+        sample: Most rows the centroids are trained on
+        seed: Seed of the sample and of the initial centroids
+    """
+    rng = np.random.default_rng(seed)
+    if len(vectors) > sample:
+        vectors = vectors[np.sort(rng.choice(len(vectors), sample, replace=False))]
+    centroids = vectors[rng.choice(len(vectors), lists, replace=False)].copy()
+    for _ in range(iterations):
+        assignment = np.argmax(vectors @ centroids.T, axis=1)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, assignment, vectors)
+        norms = np.linalg.norm(sums, axis=1, keepdims=True)
+        # Empty clusters keep their centroid
+        filled = norms[:, 0] > 0
+        centroids[filled] = sums[filled] / norms[filled]
+    return centroids
+
+
+def assign(vectors: np.ndarray, centroids: np.ndarray) -> np.ndarray:
+    """Return the nearest centroid of every vector, in blocks of rows."""
+    return np.concatenate(
+        [
+            np.argmax(vectors[start : start + BLOCK_ROWS] @ centroids.T, axis=1)
+            for start in range(0, len(vectors), BLOCK_ROWS)
+        ]
+        or [np.zeros(0, dtype=np.int64)]
+    )
+
+
+class VectorIndex:
+    """Read-only nearest-neighbour index of chunk embeddings and texts."""
+
+    def __init__(self, columns: Mapping[str, np.ndarray]) -> None:
+        """Initialize the index.
+
+        Args:
+            columns: Every column in COLUMNS, in memory or memory-mapped
+        """
+        missing = [name for name in COLUMNS if name not in columns]
+        if missing:
+            raise ValueError(f"Vector index is missing columns: {missing}")
+        self.columns = dict(columns)
+        self.vectors = self.columns["vectors"]
+        self.centroids = self.columns["centroids"]
+        self.list_start = self.columns["list_start"]
+
+    @classmethod
+    def from_vectors(
+        cls,
+        vectors: np.ndarray,
+        texts: list[str],
+        sources: list[str] | None = None,
+        lists: int = 1,
+    ) -> "VectorIndex":
+        """Build an in-memory index from unit vectors and their chunks.
+
+        Args:
+            vectors: One unit vector per chunk
+            texts: Chunk texts
+            sources: Document each chunk comes from
+            lists: IVF lists; 1 keeps a single list for brute force only
+
+        Raises:
+            ValueError: If there are not as many texts as vectors
+        """
+        vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+        sources = sources if sources is not None else [""] * len(texts)
+        if not len(vectors) == len(texts) == len(sources):
+            raise ValueError("Vector index needs one text and source per vector")
+        lists = max(1, min(lists, len(vectors)))
+        if lists > 1:
+            centroids = kmeans(vectors, lists)
+            assignment = assign(vectors, centroids)
+        else:
+            centroids = vectors.mean(axis=0, keepdims=True)
+            assignment = np.zeros(len(vectors), dtype=np.int64)
+        order = np.argsort(assignment, kind="stable")
+        counts = np.bincount(assignment, minlength=lists)
+        text_offsets, text_blob = _blob([texts[row] for row in order])
+        source_offsets, source_blob = _blob([sources[row] for row in order])
+        return cls(
+            {
+                "vectors": vectors[order],
+                "centroids": centroids.astype(np.float32),
+                "list_start": np.concatenate([[0], np.cumsum(counts)]),
+                "text_offsets": text_offsets,
+                "text_blob": text_blob,
+                "source_offsets": source_offsets,
+                "source_blob": source_blob,
+            }
+        )
+
+    @classmethod
+    def from_chunks(
+        cls, chunks: Iterable[Mapping[str, str]], embedder: Embedder, lists: int = 1
+    ) -> "VectorIndex":
+        """Embed chunk dicts with ``text`` and ``source`` and index them."""
+        chunks = list(chunks)
+        texts = [chunk["text"] for chunk in chunks]
+        return cls.from_vectors(
+            embedder(texts), texts, [chunk.get("source", "") for chunk in chunks], lists
+        )
+
+    @classmethod
+    def open(cls, path: str) -> "VectorIndex":
+        """Memory-map an index directory written by ``save``."""
+        return cls(
+            {
+                name: np.load(os.path.join(path, f"{name}.npy"), mmap_mode="r")
+                for name in COLUMNS
+            }
+        )
+
+    def save(self, path: str) -> None:
+        """Write every column to ``<path>/<column>.npy``."""
+        os.makedirs(path, exist_ok=True)
+        for name in COLUMNS:
+            np.save(os.path.join(path, f"{name}.npy"), self.columns[name])
+
+    def __len__(self) -> int:
+        return len(self.vectors)
+
+    @property
+    def dim(self) -> int:
+        return self.vectors.shape[1]
+
+    @property
+    def lists(self) -> int:
+        return len(self.centroids)
+
+    def text(self, row: int) -> str:
+        """Return the text of a chunk."""
+        offsets = self.columns["text_offsets"]
+        return bytes(
+            self.columns["text_blob"][offsets[row] : offsets[row + 1]]
+        ).decode()
+
+    def source(self, row: int) -> str:
+        """Return the document a chunk comes from."""
+        offsets = self.columns["source_offsets"]
+        return bytes(
+            self.columns["source_blob"][offsets[row] : offsets[row + 1]]
+        ).decode()
+
+    def search(
+        self, queries: np.ndarray, k: int = 10, nprobe: int | None = None
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """Find the chunks most similar to each query vector.
+
+        Args:
+            queries: Unit query vectors, one per row
+            k: Chunks returned per query
+            nprobe: IVF lists scanned per query; None, 0 or at least the
+                number of lists scans every vector (brute force)
+
+        Returns:
+            Cosine similarities and chunk rows, each of shape (queries, k),
+            best first; rows are -1 where fewer than k chunks were scanned
+
+        Raises:
+            ValueError: If the queries do not have the index's dimension
+        """
+        queries = np.atleast_2d(np.asarray(queries, dtype=np.float32))
+        if queries.shape[1] != self.dim:
+            raise ValueError(
+                f"Query vectors have dimension {queries.shape[1]}, "
+                f"the index has {self.dim}"
+            )
+        scores = np.full((len(queries), k), -np.inf, dtype=np.float32)
+        rows = np.full((len(queries), k), -1, dtype=np.int64)
+        if not nprobe or nprobe >= self.lists:
+            self._brute_force(queries, k, scores, rows)
+        else:
+            self._probe(queries, k, nprobe, scores, rows)
+        return scores, rows
+
+    def _brute_force(
+        self, queries: np.ndarray, k: int, scores: np.ndarray, rows: np.ndarray
+    ) -> None:
+        """Score every vector, merging the best k of each block of rows."""
+        for start in range(0, len(self), BLOCK_ROWS):
+            block = self.vectors[start : start + BLOCK_ROWS] @ queries.T
+            ids = np.arange(start, start + len(block))
+            for query in range(len(queries)):
+                scores[query], rows[query] = _top_k(
+                    np.concatenate([scores[query], block[:, query]]),
+                    np.concatenate([rows[query], ids]),
+                    k,
+                )
+
+    def _probe(
+        self,
+        queries: np.ndarray,
+        k: int,
+        nprobe: int,
+        scores: np.ndarray,
+        rows: np.ndarray,
+    ) -> None:
+        """Score the vectors of the nprobe lists nearest each query."""
+        nearest = np.argpartition(-(queries @ self.centroids.T), nprobe - 1, axis=1)
+        for query, lists in enumerate(nearest[:, :nprobe]):
+            # Each list is a contiguous slice of the vectors, scored in place
+            spans = [(self.list_start[n], self.list_start[n + 1]) for n in lists]
+            found = np.concatenate(
+                [self.vectors[start:end] @ queries[query] for start, end in spans]
+            )
+            ids = np.concatenate([np.arange(start, end) for start, end in spans])
+            found, ids = _top_k(found, ids, k)
+            scores[query, : len(ids)] = found
+            rows[query, : len(ids)] = ids
+
+
+class LocalRetrieval:
+    """Retrieval tool answering queries from a local VectorIndex."""
+
+    def __init__(
+        self,
+        index: VectorIndex,
+        embedder: Embedder,
+        top_k: int = 10,
+        nprobe: int | None = None,
+        max_distance: float | None = None,
+    ) -> None:
+        """Initialize the retrieval.
+
+        Args:
+            index: Index of the manual chunks
+            embedder: The embedder the index was built with
+            top_k: Chunks returned per query
+            nprobe: IVF lists scanned per query; None or 0 scans every vector
+            max_distance: Largest cosine distance of a returned chunk, as
+                the RAG corpus' vector distance threshold
+        """
+        self.index = index
+        self.embedder = embedder
+        self.top_k = top_k
+        self.nprobe = nprobe
+        self.max_distance = max_distance
+
+    @classmethod
+    def open(cls, path: str, **options: Any) -> "LocalRetrieval":
+        """Memory-map an index built by ``main`` with its hashing embedder.
+
+        Args:
+            path: Index directory
+            **options: top_k, nprobe and max_distance
+        """
+        index = VectorIndex.open(path)
+        return cls(index, HashingEmbedder(index.dim, normalize=True), **options)
+
+    def retrieve(self, query: str) -> list[dict[str, Any]]:
+        """Return the chunks nearest a query with their source and score."""
+        scores, rows = self.index.search(
+            self.embedder([query]), self.top_k, self.nprobe
+        )
+        return [
+            {
+                "text": self.index.text(row),
+                "source": self.index.source(row),
+                "score": round(float(score), 4),
+            }
+            for score, row in zip(scores[0], rows[0], strict=True)
+            if row >= 0
+            and (self.max_distance is None or 1 - score <= self.max_distance)
+        ]
+
+    def __call__(self, query: str) -> list[str] | str:
+        """Return the texts of the chunks nearest a query, as RAG retrieval does."""
+        chunks = self.retrieve(query)
+        if not chunks:
+            return f"No matching result found for: {query}"
+        return [chunk["text"] for chunk in chunks]
+
+
+def main() -> None:
+    """Build an index directory from a JSON Lines file of chunks."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("chunks", help="JSON Lines file of {text, source} chunks")
+    parser.add_argument("path", help="Index directory to write")
+    parser.add_argument("--lists", type=int, default=1, help="IVF lists")
+    parser.add_argument("--dim", type=int, default=512, help="Embedding size")
+    args = parser.parse_args()
+    with open(args.chunks, encoding="utf-8") as f:
+        chunks = [json.loads(line) for line in f if line.strip()]
+    index = VectorIndex.from_chunks(
+        chunks, HashingEmbedder(args.dim, normalize=True), args.lists
+    )
+    index.save(args.path)
+    print(f"Indexed {len(index)} chunks in {index.lists} lists into {args.path}")
+
+
+if __name__ == "__main__":
+    main()
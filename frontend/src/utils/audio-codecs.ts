@@ -0,0 +1,117 @@
+/**
+ * Copyright 2024 Google LLC
+ *
+ * Licensed under the Apache License, Version 2.0 (the "License");
+ * you may not use this file except in compliance with the License.
+ * You may obtain a copy of the License at
+ *
+ *     http://www.apache.org/licenses/LICENSE-2.0
+ *
+ * Unless required by applicable law or agreed to in writing, software
+ * distributed under the License is distributed on an "AS IS" BASIS,
+ * WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+ * See the License for the specific language governing permissions and
+ * limitations under the License.
+ */
+
+/**
+ * decoders for model audio sent as binary frames.
+ * must match app/utils/audio_codecs.py and app/utils/media_protocol.py
+ */
+
+export const MEDIA_KIND_AUDIO_MULAW = 3;
+export const MEDIA_KIND_AUDIO_ALAW = 4;
+export const MEDIA_KIND_AUDIO_IMA_ADPCM = 5;
+
+/**
+ * codecs this client can decode, in the order the server should prefer them
+ */
+export const SUPPORTED_AUDIO_CODECS = ["ima-adpcm", "mulaw", "alaw"];
+
+const ADPCM_STEPS = [
+  7, 8, 9, 10, 11, 12, 13, 14, 16, 17, 19, 21, 23, 25, 28, 31, 34, 37, 41, 45,
+  50, 55, 60, 66, 73, 80, 88, 97, 107, 118, 130, 143, 157, 173, 190, 209, 230,
+  253, 279, 307, 337, 371, 408, 449, 494, 544, 598, 658, 724, 796, 876, 963,
+  1060, 1166, 1282, 1411, 1552, 1707, 1878, 2066, 2272, 2499, 2749, 3024, 3327,
+  3660, 4026, 4428, 4871, 5358, 5894, 6484, 7132, 7845, 8630, 9493, 10442,
+  11487, 12635, 13899, 15289, 16818, 18500, 20350, 22385, 24623, 27086, 29794,
+  32767,
+];
+const ADPCM_INDEX_SHIFT = [-1, -1, -1, -1, 2, 4, 6, 8];
+
+const MULAW_TABLE = new Int16Array(256);
+const ALAW_TABLE = new Int16Array(256);
+for (let i = 0; i < 256; i++) {
+  const u = ~i & 0xff;
+  const t = (((u & 0x0f) << 3) + 0x84) << ((u & 0x70) >> 4);
+  MULAW_TABLE[i] = u & 0x80 ? 0x84 - t : t - 0x84;
+
+  const a = i ^ 0x55;
+  const seg = (a & 0x70) >> 4;
+  let v = ((a & 0x0f) << 4) + (seg === 0 ? 8 : 0x108);
+  if (seg > 1) {
+    v <<= seg - 1;
+  }
+  ALAW_TABLE[i] = a & 0x80 ? v : -v;
+}
+
+function decodeCompanded(payload: Uint8Array, table: Int16Array): Int16Array {
+  const out = new Int16Array(payload.length);
+  for (let i = 0; i < payload.length; i++) {
+    out[i] = table[payload[i]];
+  }
+  return out;
+}
+
+/**
+ * decode an IMA ADPCM payload: predictor, step index, padding and sample
+ * count header followed by 4 bit codes, first sample in the high nibble
+ */
+function decodeImaAdpcm(payload: Uint8Array): Int16Array {
+  const view = new DataView(payload.buffer, payload.byteOffset);
+  let predictor = view.getInt16(0);
+  let index = view.getUint8(2);
+  const count = view.getUint32(4);
+  const out = new Int16Array(count);
+  for (let i = 0; i < count; i++) {
+    const byte = payload[8 + (i >> 1)];
+    const code = i % 2 === 0 ? byte >> 4 : byte & 0x0f;
+    const step = ADPCM_STEPS[index];
+    let delta = step >> 3;
+    if (code & 4) delta += step;
+    if (code & 2) delta += step >> 1;
+    if (code & 1) delta += step >> 2;
+    predictor += code & 8 ? -delta : delta;
+    predictor = Math.max(-32768, Math.min(32767, predictor));
+    index = Math.max(0, Math.min(88, index + ADPCM_INDEX_SHIFT[code & 7]));
+    out[i] = predictor;
+  }
+  return out;
+}
+
+/**
+ * decode a binary audio frame (4 byte header followed by the codec payload)
+ * into little-endian 16-bit PCM, or null if the frame is not audio
+ */
+export function decodeAudioFrame(frame: ArrayBuffer): ArrayBuffer | null {
+  if (frame.byteLength < 4) {
+    return null;
+  }
+  const kind = new DataView(frame).getUint8(1);
+  const payload = new Uint8Array(frame, 4);
+  let samples: Int16Array;
+  switch (kind) {
+    case MEDIA_KIND_AUDIO_MULAW:
+      samples = decodeCompanded(payload, MULAW_TABLE);
+      break;
+    case MEDIA_KIND_AUDIO_ALAW:
+      samples = decodeCompanded(payload, ALAW_TABLE);
+      break;
+    case MEDIA_KIND_AUDIO_IMA_ADPCM:
+      samples = decodeImaAdpcm(payload);
+      break;
+    default:
+      return null;
+  }
+  return samples.buffer as ArrayBuffer;
+}
@@ -37,6 +37,7 @@ import {
   type LiveConfig,
 } from "../multimodal-live-types";
 import { blobToJSON, base64ToArrayBuffer } from "./utils";
+import { decodeAudioFrame, SUPPORTED_AUDIO_CODECS } from "./audio-codecs";
 
 /**
  * the events that this client will emit
@@ -55,6 +56,42 @@ interface MultimodalLiveClientEventTypes {
   toolcallcancellation: (toolcallCancellation: ToolCallCancellation) => void;
 }
 
+/**
+ * websocket sub-protocol for sending raw media as binary messages.
+ * must match BINARY_MEDIA_SUBPROTOCOL in app/utils/media_protocol.py
+ */
+export const BINARY_MEDIA_SUBPROTOCOL = "live-media.v1";
+
+const MEDIA_KIND_AUDIO_PCM = 1;
+const MEDIA_KIND_IMAGE_JPEG = 2;
+const MEDIA_KIND_CONTROL_FLUSH = 6;
+
+/**
+ * encode a media chunk as a binary frame: a 4 byte header
+ * (version, kind, sample rate) followed by the raw bytes
+ */
+function encodeMediaFrame(chunk: GenerativeContentBlob): ArrayBuffer | null {
+  let kind: number;
+  let sampleRate = 0;
+  if (chunk.mimeType.startsWith("audio/pcm")) {
+    kind = MEDIA_KIND_AUDIO_PCM;
+    const rate = /rate=(\d+)/.exec(chunk.mimeType);
+    sampleRate = rate ? Number(rate[1]) : 16000;
+  } else if (chunk.mimeType.startsWith("image/jpeg")) {
+    kind = MEDIA_KIND_IMAGE_JPEG;
+  } else {
+    return null;
+  }
+  const payload = new Uint8Array(base64ToArrayBuffer(chunk.data));
+  const frame = new Uint8Array(4 + payload.byteLength);
+  const view = new DataView(frame.buffer);
+  view.setUint8(0, 1);
+  view.setUint8(1, kind);
+  view.setUint16(2, sampleRate);
+  frame.set(payload, 4);
+  return frame.buffer;
+}
+
 export type MultimodalLiveAPIClientConnection = {
   url?: string;
   runId?: string;
@@ -72,6 +109,7 @@ export class MultimodalLiveClient extends EventEmitter<MultimodalLiveClientEvent
   public url: string = "";
   private runId: string;
   private userId?: string;
+  private binaryMedia: boolean = false;
   constructor({ url, userId, runId }: MultimodalLiveAPIClientConnection) {
     super();
     const defaultWsUrl = `${window.location.protocol === 'https:' ? 'wss:' : 'ws:'}//${window.location.host}/ws`;
@@ -96,7 +134,7 @@ export class MultimodalLiveClient extends EventEmitter<MultimodalLiveClientEvent
   }
 
   connect(newRunId?: string): Promise<boolean> {
-    const ws = new WebSocket(this.url);
+    const ws = new WebSocket(this.url, [BINARY_MEDIA_SUBPROTOCOL]);
 
     // Update runId if provided
     if (newRunId) {
@@ -134,11 +172,15 @@ export class MultimodalLiveClient extends EventEmitter<MultimodalLiveClientEvent
         this.emit("open");
 
         this.ws = ws;
+        // older servers don't pick the sub-protocol and keep the JSON protocol
+        this.binaryMedia = ws.protocol === BINARY_MEDIA_SUBPROTOCOL;
         // Send initial setup message with runId
+        // model audio can come back compressed over the binary sub-protocol
         const setupMessage = {
           setup: {
             run_id: this.runId,
             user_id: this.userId,
+            ...(this.binaryMedia ? { audio_codecs: SUPPORTED_AUDIO_CODECS } : {}),
           },
         };
         this._sendDirect(setupMessage);
@@ -180,6 +222,24 @@ export class MultimodalLiveClient extends EventEmitter<MultimodalLiveClientEvent
     return false;
   }
   protected async receive(blob: Blob) {
+    if (this.binaryMedia) {
+      // relayed gemini messages are JSON, encoded audio frames never start with "{"
+      const head = new Uint8Array(await blob.slice(0, 2).arrayBuffer());
+      if (head.length && head[0] !== 0x7b) {
+        if (head[1] === MEDIA_KIND_CONTROL_FLUSH) {
+          // the user talked over the model, drop the audio still buffered
+          this.log("receive.serverContent", "interrupted");
+          this.emit("interrupted");
+          return;
+        }
+        const data = decodeAudioFrame(await blob.arrayBuffer());
+        if (data) {
+          this.emit("audio", data);
+          this.log(`server.audio`, `buffer (${data.byteLength})`);
+        }
+        return;
+      }
+    }
     const response = (await blobToJSON(blob)) as LiveIncomingMessage;
     console.log("Parsed response:", response);
 
@@ -278,6 +338,23 @@ export class MultimodalLiveClient extends EventEmitter<MultimodalLiveClientEvent
             ? "video"
             : "unknown";
 
+    if (this.binaryMedia) {
+      const jsonChunks: GenerativeContentBlob[] = [];
+      for (const chunk of chunks) {
+        const frame = encodeMediaFrame(chunk);
+        if (frame) {
+          this._sendBinary(frame);
+        } else {
+          jsonChunks.push(chunk);
+        }
+      }
+      this.log(`client.realtimeInput`, `${message} (binary)`);
+      if (!jsonChunks.length) {
+        return;
+      }
+      chunks = jsonChunks;
+    }
+
     const data: RealtimeInputMessage = {
       realtimeInput: {
         mediaChunks: chunks,
@@ -331,4 +408,14 @@ export class MultimodalLiveClient extends EventEmitter<MultimodalLiveClientEvent
     const str = JSON.stringify(request);
     this.ws.send(str);
   }
+
+  /**
+   *  used internally to send binary media frames
+   */
+  _sendBinary(frame: ArrayBuffer) {
+    if (!this.ws) {
+      throw new Error("WebSocket is not connected");
+    }
+    this.ws.send(frame);
+  }
 }
@@ -0,0 +1,153 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Benchmark barge-in latency, from user speech onset to model audio stopping.
+
+Drives the relay's GeminiSession against the local fake live endpoint in
+talking mode. The fake model streams its answer ten times faster than real
+time to a client whose downlink only keeps up with twice real time, so audio
+backs up in the relay. The user starts talking into the answer, and the fake
+model reports the interruption after INTERRUPT_DELAY, standing in for
+Gemini's own turn detection.
+
+Model audio stops when the client receives the interruption (or the relay's
+flush message) and drops its playback buffer. Reported per mode are p50/p99
+of the time from speech onset to that point, and the stale audio frames that
+still reached the client in between:
+
+* queued: pending audio is not discarded, as before barge-in handling;
+* interrupted: pending audio is discarded when the model is interrupted;
+* vad: the relay's VAD cuts the turn at speech onset (BARGE_IN_ON_VAD).
+
+The relay module needs Google credentials at import time; throwaway ones
+are used, nothing is sent to Google Cloud.
+
+Usage:
+    uv run python -m tests.benchmarks.bench_barge_in
+"""
+
+import asyncio
+import base64
+import json
+import logging
+from typing import Any
+
+from app.utils.metrics import LatencyRecorder
+from tests.benchmarks.offline import offline_credentials
+from tests.fake_live_server import FakeLiveServer
+
+TALK_CHUNKS = 1000  # 20 s of model audio in 20 ms chunks
+CHUNK_INTERVAL = 0.002
+LINK_DELAY = 0.01  # client downlink time per frame
+INTERRUPT_DELAY = 0.3
+SPEECH_AFTER = 0.5
+TRIALS = 5
+MODES = ("queued", "interrupted", "vad")
+
+# 100 ms of a loud 16 kHz square wave
+SPEECH = base64.b64encode((b"\x40\x1f" * 40 + b"\xc0\xe0" * 40) * 20).decode()
+
+
+class BenchClient:
+    """Client side of the relay websocket with a slow downlink."""
+
+    def __init__(self) -> None:
+        self.incoming: asyncio.Queue = asyncio.Queue()
+        self.onset: float | None = None
+        self.stale = 0
+        self.stopped = asyncio.Event()
+        self.stopped_at = 0.0
+
+    async def receive(self) -> dict:
+        return await self.incoming.get()
+
+    async def send_json(self, data: dict) -> None:
+        pass
+
+    async def send_bytes(self, data: bytes) -> None:
+        await asyncio.sleep(LINK_DELAY)
+        if self.onset is None or self.stopped.is_set():
+            return
+        if b'"interrupted"' in data or not data.startswith(b"{"):
+            self.stopped_at = asyncio.get_running_loop().time()
+            self.stopped.set()
+        elif b'"inlineData"' in data:
+            self.stale += 1
+
+    def send(self, data: dict[str, Any]) -> None:
+        self.incoming.put_nowait(
+            {"type": "websocket.receive", "text": json.dumps(data)}
+        )
+
+
+async def trial(server: Any, mode: str) -> tuple[float, int]:
+    """Run one interrupted answer; return seconds to stop and stale frames."""
+    loop = asyncio.get_running_loop()
+    server.BARGE_IN_ON_VAD = mode == "vad"
+    fake_server = FakeLiveServer(
+        talk_chunks=TALK_CHUNKS,
+        chunk_interval=CHUNK_INTERVAL,
+        interrupt_delay=INTERRUPT_DELAY,
+    )
+    async with fake_server as fake:
+        client = BenchClient()
+        session = server.GeminiSession(None, client, tool_functions={})
+        if mode == "queued":
+            session._discard_model_audio = lambda: 0
+
+        async def connect_and_relay() -> None:
+            async with fake.connect() as live:
+                await session.relay(live)
+
+        run = asyncio.create_task(session.run(connect_and_relay))
+        turn = {"role": "user", "parts": [{"text": "hi"}]}
+        client.send({"clientContent": {"turns": [turn]}})
+        await asyncio.sleep(SPEECH_AFTER)
+        client.onset = loop.time()
+        while not client.stopped.is_set():
+            chunk = {"mimeType": "audio/pcm;rate=16000", "data": SPEECH}
+            client.send({"realtimeInput": {"mediaChunks": [chunk]}})
+            await asyncio.sleep(0.1)
+        client.incoming.put_nowait({"type": "websocket.disconnect"})
+        await run
+    return client.stopped_at - client.onset, client.stale
+
+
+async def main() -> None:
+    offline_credentials()
+    from app import server
+
+    logging.getLogger().setLevel(logging.WARNING)
+    print(
+        f"model at {0.02 / CHUNK_INTERVAL:.0f}x real time, client downlink at "
+        f"{0.02 / LINK_DELAY:.0f}x, model interruption after "
+        f"{INTERRUPT_DELAY * 1000:.0f} ms, {TRIALS} trials"
+    )
+    for mode in MODES:
+        latency = LatencyRecorder()
+        stale = []
+        for _ in range(TRIALS):
+            seconds, frames = await trial(server, mode)
+            latency.record(seconds)
+            stale.append(frames)
+        summary = latency.summary()
+        print(
+            f"{mode:>11}: onset to audio stop p50 {summary['p50_ms']:.0f} ms, "
+            f"p99 {summary['p99_ms']:.0f} ms, "
+            f"stale frames {sum(stale) / len(stale):.0f}"
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,132 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Benchmark time-to-first-byte of the JSON and streaming chat endpoints.
+
+Runs the Turkish Airlines text agent against the local fake model, which
+takes FIRST_CHUNK_DELAY per model call and streams its answer in CHUNKS
+chunks CHUNK_DELAY apart. Every request makes one tool call first, as most
+real requests do. The endpoint functions are called in process, so the
+numbers exclude the network.
+
+Reported per endpoint are p50/p99 time to first byte, time to the first
+answer text and total latency. The JSON endpoint sends everything at once,
+so all three are the same.
+
+Usage:
+    uv run python -m tests.benchmarks.bench_chat_streaming
+"""
+
+import asyncio
+import json
+import logging
+import tempfile
+import time
+from typing import Any
+
+from starlette.requests import Request
+
+from app.utils.metrics import LatencyRecorder
+from tests.benchmarks.offline import offline_credentials
+from tests.fake_llm import FakeLlm
+
+REQUESTS = 20
+FIRST_CHUNK_DELAY = 0.4
+CHUNK_DELAY = 0.08
+CHUNKS = 10
+ANSWER = (
+    "Dear Mr. Eren, you have two upcoming flights: TK1984 from Istanbul to New "
+    "York in five days, and TK2023 back to Istanbul ten days later. Which one "
+    "would you like to manage today?"
+)
+
+
+def recorders() -> dict[str, LatencyRecorder]:
+    return {name: LatencyRecorder() for name in ("ttfb", "first_text", "total")}
+
+
+async def run_json(server: Any, n: int, latency: dict[str, LatencyRecorder]) -> None:
+    started = time.perf_counter()
+    message = server.ChatMessage(message="my flights?", user_id=f"json-{n}")
+    result = await server.turkish_airlines_chat(message)
+    assert result["status"] == "success", result
+    elapsed = time.perf_counter() - started
+    for recorder in latency.values():
+        recorder.record(elapsed)
+
+
+async def run_stream(server: Any, n: int, latency: dict[str, LatencyRecorder]) -> None:
+    started = time.perf_counter()
+    message = server.ChatMessage(message="my flights?", user_id=f"stream-{n}")
+    request = Request({"type": "http", "headers": []})
+    response = await server.turkish_airlines_chat_stream(message, request)
+    first_byte: float | None = None
+    first_text: float | None = None
+    async for chunk in response.body_iterator:
+        now = time.perf_counter() - started
+        if first_byte is None:
+            first_byte = now
+        if first_text is None and json.loads(chunk)["type"] in ("partial", "final"):
+            first_text = now
+    assert first_byte is not None and first_text is not None
+    latency["ttfb"].record(first_byte)
+    latency["first_text"].record(first_text)
+    latency["total"].record(time.perf_counter() - started)
+
+
+async def main() -> None:
+    offline_credentials()
+    from google.adk.runners import Runner
+
+    from app import server
+    from app.utils.session_service import TieredSessionService
+
+    logging.getLogger().setLevel(logging.WARNING)
+    model = FakeLlm(
+        answer=ANSWER,
+        chunks=CHUNKS,
+        first_chunk_delay=FIRST_CHUNK_DELAY,
+        chunk_delay=CHUNK_DELAY,
+        tool_calls=[("get_customer_flights_tool", {"phone_number": "05551234567"})],
+    )
+    print(
+        f"{REQUESTS} requests, model calls take {FIRST_CHUNK_DELAY * 1000:.0f} ms "
+        f"to the first chunk, {CHUNKS} chunks {CHUNK_DELAY * 1000:.0f} ms apart"
+    )
+    with tempfile.TemporaryDirectory() as directory:
+        sessions = TieredSessionService(f"{directory}/chat.db")
+        server.session_service = sessions
+        server.turkish_airlines_runner = Runner(
+            agent=server.root_agent.clone(update={"model": model}),
+            app_name=server.APP_NAME,
+            session_service=sessions,
+        )
+        for name, run in (("json", run_json), ("stream", run_stream)):
+            latency = recorders()
+            for n in range(REQUESTS):
+                await run(server, n, latency)
+            summaries = {key: value.summary() for key, value in latency.items()}
+            print(
+                f"{name:>6}: "
+                + ", ".join(
+                    f"{key} p50 {summary['p50_ms']:.0f} ms / "
+                    f"p99 {summary['p99_ms']:.0f} ms"
+                    for key, summary in summaries.items()
+                )
+            )
+        await sessions.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,128 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Benchmark downlink audio coalescing.
+
+Throughput: relays a stream of small model audio frames over a loopback
+websocket, once frame by frame as before and once merged by the
+AudioCoalescer, and reports input frames per second and messages sent.
+
+Added latency: replays a bursty arrival schedule (Gemini streams audio faster
+than real time, in bursts) against the coalescer on a simulated clock, with
+the time budget flushes the relay performs, and reports p50/p99 added latency.
+
+Usage:
+    uv run python -m tests.benchmarks.bench_coalescing
+"""
+
+import asyncio
+import time
+
+import numpy as np
+from websockets.asyncio.client import connect
+from websockets.asyncio.server import ServerConnection, serve
+
+from app.utils.coalescer import AudioCoalescer
+from app.utils.frames import model_audio, model_audio_frame
+
+MIME = "audio/pcm;rate=24000"
+CHUNK_BYTES = 960  # 20 ms of 24 kHz PCM
+FRAMES = 20_000
+BUDGETS_MS = (20, 40)
+MAX_BYTES = 9600
+
+
+async def relay(frames: list[bytes], budget_ms: float | None) -> tuple[float, int]:
+    """Send the frames over a loopback websocket, returning wall time and sends."""
+    received = asyncio.Event()
+
+    async def sink(ws: ServerConnection) -> None:
+        async for message in ws:
+            if message == b"done":
+                received.set()
+
+    async with serve(sink, "127.0.0.1", 0) as server:
+        port = next(iter(server.sockets)).getsockname()[1]
+        async with connect(f"ws://127.0.0.1:{port}", max_size=None) as ws:
+            coalescer = AudioCoalescer(MAX_BYTES, (budget_ms or 0) / 1000)
+            sends = 0
+            start = time.perf_counter()
+            for frame in frames:
+                if budget_ms is None:
+                    await ws.send(frame)
+                    sends += 1
+                    continue
+                mime_type, pcm = model_audio(frame)
+                for chunk in coalescer.push(mime_type, pcm):
+                    await ws.send(model_audio_frame(chunk[0], chunk[1]))
+                    sends += 1
+            if rest := coalescer.flush():
+                await ws.send(model_audio_frame(rest[0], rest[1]))
+                sends += 1
+            await ws.send(b"done")
+            await received.wait()
+            elapsed = time.perf_counter() - start
+    return elapsed, sends
+
+
+def simulate_latency(budget_ms: float, seed: int = 5) -> tuple[float, float, float]:
+    """Replay bursty arrivals; return p50 and p99 added ms and frames per send."""
+    rng = np.random.default_rng(seed)
+    clock = {"now": 0.0}
+    coalescer = AudioCoalescer(MAX_BYTES, budget_ms / 1000, clock=lambda: clock["now"])
+    now = 0.0
+    for i in range(FRAMES):
+        # bursts of ~25 frames 2-8 ms apart, then a pause between sentences
+        now += rng.uniform(0.002, 0.008) if i % 25 else rng.uniform(0.2, 1.0)
+        left = coalescer.time_left()
+        if left is not None and clock["now"] + left <= now:
+            clock["now"] += left
+            coalescer.flush()
+        clock["now"] = now
+        coalescer.push(MIME, bytes(CHUNK_BYTES))
+    coalescer.flush()
+    p50 = coalescer.added_latency.percentile(50)
+    p99 = coalescer.added_latency.percentile(99)
+    assert p50 is not None and p99 is not None
+    return (
+        p50 * 1000,
+        p99 * 1000,
+        coalescer.frames_in / coalescer.chunks_out,
+    )
+
+
+async def main() -> None:
+    """Run the throughput and latency measurements."""
+    frames = [model_audio_frame(MIME, bytes(CHUNK_BYTES)) for _ in range(FRAMES)]
+    print(f"{FRAMES} model audio frames of {CHUNK_BYTES} PCM bytes")
+    elapsed, sends = await relay(frames, None)
+    base = FRAMES / elapsed
+    print(f"{'frame by frame':<18} {base:9.0f} frames/s  {sends:6d} sends")
+    for budget in BUDGETS_MS:
+        elapsed, sends = await relay(frames, budget)
+        print(
+            f"{f'coalesced {budget} ms':<18} {FRAMES / elapsed:9.0f} frames/s  "
+            f"{sends:6d} sends  ({FRAMES / elapsed / base:.1f}x)"
+        )
+    print("added latency on a bursty arrival schedule:")
+    for budget in BUDGETS_MS:
+        p50, p99, per_send = simulate_latency(budget)
+        print(
+            f"  budget {budget} ms: p50 {p50:5.1f} ms  p99 {p99:5.1f} ms  "
+            f"{per_send:.1f} frames per send"
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,173 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Benchmark customer lookups in the memory-mapped customer store.
+
+Generates CUSTOMERS synthetic customers with one to three bookings each,
+saves them as a store directory and reopens it memory-mapped. Reported are
+the size on disk, the time to open the store and p50/p99 latency of phone
+(as spoken, "+90 5xx xxx xx xx"), ticket and ID suffix lookups, each
+returning a materialized customer dict.
+
+For comparison, the same ticket and ID suffix lookups run as linear scans
+over SCAN_CUSTOMERS customer dicts, which is what the CUSTOMER_DATA dict
+keyed by exact phone string would need for them.
+
+Usage:
+    uv run python -m tests.benchmarks.bench_customer_store
+"""
+
+import os
+import tempfile
+import time
+from collections.abc import Callable
+from typing import Any
+
+import numpy as np
+
+from app.utils.customer_store import (
+    BOOKING_TEXT,
+    CustomerStore,
+    build_indexes,
+    format_phone,
+    format_ticket,
+)
+from app.utils.metrics import LatencyRecorder
+
+CUSTOMERS = 2_000_000
+SCAN_CUSTOMERS = 100_000
+LOOKUPS = 2000
+FIRST_NAMES = ["Ugur", "Gizem", "Ayse", "Mehmet", "Elif", "Can", "Deniz", "Emre"]
+LAST_NAMES = ["Eren", "Kaya", "Yilmaz", "Demir", "Sahin", "Celik", "Aydin"]
+
+
+def synthetic_columns(count: int, rng: np.random.Generator) -> dict[str, np.ndarray]:
+    phones = rng.choice(10**9, size=count, replace=False).astype(np.uint64)
+    phones += np.uint64(5 * 10**9)
+    counts = rng.integers(1, 4, size=count)
+    bookings = int(counts.sum())
+    names = [
+        f"{FIRST_NAMES[i % 8]} {LAST_NAMES[i % 7]}".encode()
+        for i in rng.integers(0, 56, size=count)
+    ]
+    identity = rng.integers(10**10, 10**11, size=count)
+    passport = rng.integers(10**6, 10**7, size=count)
+    columns = {
+        "phone": phones,
+        "name_offsets": np.concatenate([[0], np.cumsum([len(n) for n in names])]),
+        "name_blob": np.frombuffer(b"".join(names), dtype=np.uint8),
+        "identity_number": identity.astype("S11"),
+        "passport": np.char.add(b"P", passport.astype("S8")).astype("S9"),
+        "booking_start": np.concatenate([[0], np.cumsum(counts)]),
+        "customer": np.repeat(np.arange(count), counts).astype(np.int32),
+        "ticket": (2350000000000 + rng.permutation(bookings)).astype(np.uint64),
+        "date": np.datetime64("2025-06-01")
+        + rng.integers(0, 365, size=bookings).astype("timedelta64[D]"),
+        "baggage_kg": np.full(bookings, 30, dtype=np.uint8),
+    }
+    flight_numbers = np.char.add(b"TK", rng.integers(1, 9999, bookings).astype("S4"))
+    text = {
+        "flight_number": flight_numbers,
+        "origin": np.full(bookings, b"IST"),
+        "destination": np.full(bookings, b"JFK"),
+        "departure_time": np.full(bookings, b"14:30"),
+        "arrival_time": np.full(bookings, b"18:45"),
+        "status": np.full(bookings, b"confirmed"),
+        "class": np.full(bookings, b"economy"),
+        "seat": np.full(bookings, b"23A"),
+    }
+    for name, width in BOOKING_TEXT.items():
+        columns[name] = text[name].astype(f"S{width}")
+    return build_indexes(columns)
+
+
+def spoken(phone: str) -> str:
+    return f"+90 {phone[1:4]} {phone[4:7]} {phone[7:9]} {phone[9:]}"
+
+
+def timed(lookup: Callable[[Any], object], keys: list) -> dict:
+    latency = LatencyRecorder(max_samples=len(keys))
+    for key in keys:
+        started = time.perf_counter()
+        lookup(key)
+        latency.record(time.perf_counter() - started)
+    p50, p99 = latency.percentile(50), latency.percentile(99)
+    assert p50 is not None and p99 is not None
+    return {"p50_us": p50 * 1e6, "p99_us": p99 * 1e6}
+
+
+def report(name: str, result: dict) -> None:
+    print(f"{name:>28}: p50 {result['p50_us']:8.1f} us, p99 {result['p99_us']:8.1f} us")
+
+
+def main() -> None:
+    rng = np.random.default_rng(7)
+    started = time.perf_counter()
+    columns = synthetic_columns(CUSTOMERS, rng)
+    built = time.perf_counter() - started
+    with tempfile.TemporaryDirectory() as directory:
+        CustomerStore(columns).save(directory)
+        size = sum(
+            os.path.getsize(os.path.join(directory, name))
+            for name in os.listdir(directory)
+        )
+        started = time.perf_counter()
+        store = CustomerStore.open(directory)
+        opened = time.perf_counter() - started
+        print(
+            f"{CUSTOMERS} customers, {len(columns['ticket'])} bookings: built and "
+            f"indexed in {built:.1f} s, {size / 2**20:.0f} MiB on disk, "
+            f"opened in {opened * 1000:.1f} ms"
+        )
+
+        rows = rng.integers(0, CUSTOMERS, size=LOOKUPS)
+        phones = [spoken(format_phone(int(columns["phone"][row]))) for row in rows]
+        tickets = [
+            format_ticket(int(columns["ticket"][columns["booking_start"][row]]))
+            for row in rows
+        ]
+        suffixes = [columns["identity_number"][row].decode()[-5:] for row in rows]
+        report("store by spoken phone", timed(store.by_phone, phones))
+        report("store by ticket", timed(store.by_ticket, tickets))
+        report("store by ID suffix", timed(store.by_id_suffix, suffixes))
+
+        records = [store.customer(row) for row in range(SCAN_CUSTOMERS)]
+        scan_rows = rng.integers(0, SCAN_CUSTOMERS, size=LOOKUPS // 20)
+        scan_tickets = [
+            records[row]["flights"][0]["ticket_number"] for row in scan_rows
+        ]
+        scan_suffixes = [records[row]["identity_number"][-5:] for row in scan_rows]
+
+        def scan_ticket(ticket: str) -> list:
+            return [
+                customer
+                for customer in records
+                if any(f["ticket_number"] == ticket for f in customer["flights"])
+            ]
+
+        def scan_suffix(digits: str) -> list:
+            return [
+                customer
+                for customer in records
+                if customer["identity_number"].endswith(digits)
+                or customer["passport"].endswith(digits)
+            ]
+
+        print(f"linear scans over {SCAN_CUSTOMERS} customer dicts:")
+        report("scan by ticket", timed(scan_ticket, scan_tickets))
+        report("scan by ID suffix", timed(scan_suffix, scan_suffixes))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Benchmark downlink audio codecs for model audio sent to the browser.
+
+Encodes a stream of Gemini audio frames (100 ms of 24 kHz PCM each, base64
+inside JSON as relayed today) with every downlink codec and reports encoder
+throughput in frames per second on one core, bytes on the wire per frame and
+the signal-to-noise ratio after decoding.
+
+Usage:
+    uv run python -m tests.benchmarks.bench_downlink_codecs
+"""
+
+import base64
+import json
+import time
+
+import numpy as np
+
+from app.utils import audio_codecs
+from app.utils.audio_codecs import (
+    CODEC_ALAW,
+    CODEC_IMA_ADPCM,
+    CODEC_MULAW,
+    DownlinkAudioEncoder,
+    alaw_decode,
+    ima_adpcm_decode,
+    mulaw_decode,
+)
+from app.utils.media_protocol import HEADER
+
+RATE = 24_000
+FRAME_SAMPLES = RATE // 10
+FRAMES = 2_000
+
+
+def build_stream() -> tuple[list[bytes], bytes]:
+    """Build Gemini audio frames carrying a synthetic voice, and their PCM."""
+    rng = np.random.default_rng(3)
+    t = np.arange(FRAMES * FRAME_SAMPLES) / RATE
+    pitch = 140 + 30 * np.sin(2 * np.pi * 0.5 * t)
+    phase = 2 * np.pi * np.cumsum(pitch) / RATE
+    voice = sum(np.sin(k * phase) / k for k in range(1, 8))
+    envelope = 0.5 + 0.5 * np.abs(np.sin(2 * np.pi * 3 * t))
+    signal = 6000 * voice * envelope + rng.normal(0, 200, t.size)
+    pcm = signal.clip(-32768, 32767).astype("<i2").tobytes()
+    frames = []
+    size = FRAME_SAMPLES * 2
+    for i in range(FRAMES):
+        data = base64.b64encode(pcm[i * size : (i + 1) * size]).decode()
+        part = {"inlineData": {"mimeType": f"audio/pcm;rate={RATE}", "data": data}}
+        frames.append(
+            json.dumps({"serverContent": {"modelTurn": {"parts": [part]}}}).encode()
+        )
+    return frames, pcm
+
+
+def snr_db(reference: bytes, decoded: bytes) -> float:
+    """Signal-to-noise ratio of decoded audio against the original."""
+    ref = np.frombuffer(reference, dtype="<i2").astype(np.float64)
+    out = np.frombuffer(decoded, dtype="<i2").astype(np.float64)
+    return 10 * np.log10(np.sum(ref**2) / np.sum((ref - out) ** 2))
+
+
+def measure(
+    name: str, encoder: DownlinkAudioEncoder, stream: list[bytes]
+) -> list[bytes]:
+    """Encode the stream and print frames per second and bytes per frame."""
+    start = time.process_time()
+    encoded = [encoder.encode_frame(frame) or frame for frame in stream]
+    elapsed = time.process_time() - start
+    size = sum(len(frame) for frame in encoded) / len(encoded)
+    print(
+        f"{name:<22} {len(stream) / elapsed:10.0f} frames/s/core  "
+        f"{size:7.0f} bytes/frame",
+        end="",
+    )
+    return encoded
+
+
+if __name__ == "__main__":
+    stream, pcm = build_stream()
+    json_size = sum(len(frame) for frame in stream) / len(stream)
+    print(
+        f"{FRAMES} frames of {FRAME_SAMPLES} samples, JSON {json_size:.0f} bytes/frame"
+    )
+
+    decoders = {
+        CODEC_MULAW: mulaw_decode,
+        CODEC_ALAW: alaw_decode,
+    }
+    for codec in (CODEC_MULAW, CODEC_ALAW):
+        encoded = measure(codec, DownlinkAudioEncoder(codec), stream)
+        decoded = b"".join(decoders[codec](f[HEADER.size :]) for f in encoded)
+        print(f"  SNR {snr_db(pcm, decoded):5.1f} dB")
+
+    variants = [("ima-adpcm (python)", False)]
+    if audio_codecs.audioop is not None:
+        variants.insert(0, ("ima-adpcm (audioop)", True))
+    for name, use_audioop in variants:
+        encoder = DownlinkAudioEncoder(CODEC_IMA_ADPCM)
+        assert encoder._adpcm is not None
+        encoder._adpcm.use_audioop = use_audioop
+        encoded = measure(name, encoder, stream)
+        decoded = b"".join(ima_adpcm_decode(f[HEADER.size :]) for f in encoded)
+        print(f"  SNR {snr_db(pcm, decoded):5.1f} dB")
@@ -0,0 +1,102 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Benchmark batch quoting with the fare and fee rule engine.
+
+Quotes QUOTES random operations (change, cancel, upgrade and open ticket) on
+random tickets, with the fee rules, fares and airports shipped with the
+Turkish Airlines text agent: random fare classes, routes between the known
+airports, days to departure and stops of the new itinerary.
+
+Reported are the time and throughput of one batch call with names (as the
+agent tools pass them) and with integer codes, the time to resolve the route
+bands of every ticket, and the throughput of quoting one ticket per call as a
+tool pricing each option separately would.
+
+Usage:
+    uv run python -m tests.benchmarks.bench_fare_engine
+"""
+
+import os
+import time
+from collections.abc import Callable
+from typing import TypeVar
+
+import numpy as np
+
+from app.utils.fare_engine import FARE_CLASSES, OPERATIONS, FareEngine
+
+T = TypeVar("T")
+
+DATA_DIR = os.path.join("app", "turkish_airlines_text_agent", "data")
+QUOTES = 1_000_000
+SINGLE_QUOTES = 10_000
+
+
+def timed(label: str, count: int, call: Callable[[], T]) -> T:
+    began = time.perf_counter()
+    result = call()
+    elapsed = time.perf_counter() - began
+    print(
+        f"{label:>24}: {elapsed * 1e3:8.1f} ms, {count / elapsed / 1e6:6.2f} M quotes/s"
+    )
+    return result
+
+
+def main() -> None:
+    engine = FareEngine.from_files(
+        os.path.join(DATA_DIR, "fee_rules.csv"),
+        os.path.join(DATA_DIR, "fares.csv"),
+        os.path.join(DATA_DIR, "airports.csv"),
+    )
+    rng = np.random.default_rng(7)
+    airports = np.array(engine.airports)
+    operations = rng.integers(0, len(OPERATIONS), QUOTES)
+    classes = rng.integers(0, len(FARE_CLASSES), QUOTES)
+    origins = airports[rng.integers(0, len(airports), QUOTES)]
+    destinations = airports[rng.integers(0, len(airports), QUOTES)]
+    days = rng.integers(0, 60, QUOTES)
+    stops = rng.integers(0, 3, QUOTES)
+    operation_names = np.array(OPERATIONS)[operations]
+    class_names = np.array(FARE_CLASSES)[classes]
+
+    bands = timed(
+        "route bands", QUOTES, lambda: engine.route_bands(origins, destinations)
+    )
+    by_name = timed(
+        "batch quote, names",
+        QUOTES,
+        lambda: engine.quote(operation_names, class_names, bands, days, stops=stops),
+    )
+    by_code = timed(
+        "batch quote, codes",
+        QUOTES,
+        lambda: engine.quote(operations, classes, bands, days, stops=stops),
+    )
+    assert np.array_equal(by_name.total, by_code.total)
+
+    def one_by_one() -> list[int]:
+        return [
+            engine.quote(
+                operation_names[n], class_names[n], bands[n], days[n], stops=stops[n]
+            ).row(0)["total"]
+            for n in range(SINGLE_QUOTES)
+        ]
+
+    single = timed("one quote per call", SINGLE_QUOTES, one_by_one)
+    assert single == by_code.total[:SINGLE_QUOTES].tolist()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Benchmark the chat turns the airline fast path serves without the model.
+
+Replays scripted Turkish and English support conversations through the JSON
+chat endpoint and the text agent on the local fake model (MODEL_DELAY per
+model call), with the fast path on and off. Each conversation starts with
+the agent's greeting, then mixes the structured turns of the workflow
+(confirming or declining the calling number, giving a phone number, ID
+digits, picking a flight) with free-form requests the model has to answer.
+
+The fake model answers every turn in one call when the fast path is off,
+while the real model makes one call per tool call before answering. Model
+calls saved are therefore counted as the fast path's tool calls plus its
+replies, and latency saved as those calls at the measured model call time.
+
+Usage:
+    uv run python -m tests.benchmarks.bench_fast_path
+"""
+
+import asyncio
+import logging
+import tempfile
+import time
+from typing import Any
+
+from tests.benchmarks.offline import offline_credentials
+from tests.fake_llm import FakeLlm
+
+MODEL_DELAY = 0.4
+REPEATS = 3
+GREETINGS = {
+    "tr": "Merhaba! Ben TÜRK HAVA YOLLARI destek ekibinden Alex. Size nas\u0131l "
+    "yard\u0131mc\u0131 olabilirim? Arad\u0131\u011f\u0131n\u0131z numara üzerinden mi işlem yapmak istiyorsunuz?",
+    "en": "Hello! I'm Alex from TURKISH AIRLINES support team. How can I assist "
+    "you today? Would you like to proceed with the phone number you're calling from?",
+}
+CONVERSATIONS = [
+    ("tr", ["Merhaba", "Evet", "78912", "ikincisi", "Bu uçuşu iptal etmek istiyorum"]),
+    ("tr", ["Merhaba", "Hayir", "0555 987 65 43", "54321", "Bagaj hakkim ne kadar?"]),
+    (
+        "tr",
+        [
+            "Selam",
+            "evet",
+            "11111",
+            "78912",
+            "ilk uçuş",
+            "Saatini değiştirebilir miyim?",
+        ],
+    ),
+    (
+        "en",
+        ["Hi", "Yes please", "78912", "the first one", "Can I upgrade to business?"],
+    ),
+    (
+        "en",
+        ["Hello", "No", "+90 555 987 65 43", "54321", "What is my baggage allowance?"],
+    ),
+    ("en", ["Hello", "yes", "34567", "2", "I need a wheelchair", "Thanks, that's all"]),
+]
+
+
+async def replay(server: Any, enabled: bool) -> tuple[int, int, float]:
+    """Return the turns, model calls and seconds of all conversations."""
+    from google.adk.runners import Runner
+
+    from app.utils.session_service import TieredSessionService
+
+    server.fast_path.enabled = enabled
+    turns = calls = 0
+    elapsed = 0.0
+    with tempfile.TemporaryDirectory() as directory:
+        sessions = TieredSessionService(f"{directory}/chat.db")
+        server.session_service = sessions
+        for n in range(REPEATS):
+            for number, (language, messages) in enumerate(CONVERSATIONS):
+                model = FakeLlm(
+                    answer=GREETINGS[language], first_chunk_delay=MODEL_DELAY
+                )
+                server.turkish_airlines_runner = Runner(
+                    agent=server.root_agent.clone(update={"model": model}),
+                    app_name=server.APP_NAME,
+                    session_service=sessions,
+                )
+                for message in messages:
+                    request = server.ChatMessage(
+                        message=message, user_id=f"{enabled}-{n}-{number}"
+                    )
+                    started = time.perf_counter()
+                    result = await server.turkish_airlines_chat(request)
+                    elapsed += time.perf_counter() - started
+                    assert result["status"] == "success", result
+                turns += len(messages)
+                calls += model.calls
+        await sessions.close()
+    return turns, calls, elapsed
+
+
+async def main() -> None:
+    offline_credentials()
+    from app import server
+
+    logging.getLogger().setLevel(logging.WARNING)
+    turns, off_calls, off_elapsed = await replay(server, enabled=False)
+    server.fast_path.stats = type(server.fast_path.stats)()
+    _, on_calls, on_elapsed = await replay(server, enabled=True)
+    stats = server.fast_path.snapshot()
+
+    per_call = off_elapsed / off_calls
+    saved_calls = stats["served"] + stats["tool_calls"]
+    print(f"{turns} turns in {len(CONVERSATIONS) * REPEATS} conversations")
+    print(
+        f"served without the model: {stats['served']} turns "
+        f"({stats['served_share']:.0%}), by intent {stats['intents']}"
+    )
+    print(
+        f"model calls: {off_calls} with the fast path off (one per turn), "
+        f"{on_calls} with it on"
+    )
+    print(
+        f"mean turn latency: {off_elapsed / turns * 1000:.0f} ms off, "
+        f"{on_elapsed / turns * 1000:.0f} ms on; model calls saved against the "
+        f"real model's tool turns: {saved_calls} "
+        f"(~{saved_calls * per_call:.1f} s at {per_call * 1000:.0f} ms per call)"
+    )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,101 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Benchmark CPU time spent per Gemini frame in receive_from_gemini.
+
+Compares the previous behaviour (``json.loads`` on every frame) with the raw
+byte classifier used by the relay today. The synthetic stream mirrors a live
+conversation: mostly 24 kHz audio chunks with the occasional control frame.
+
+Usage:
+    uv run python -m tests.benchmarks.bench_frames
+"""
+
+import base64
+import json
+import os
+import time
+from collections.abc import Callable
+
+from app.utils.frames import needs_decode
+
+AUDIO_CHUNK_BYTES = 24_000 * 2 // 10  # 100 ms of 16-bit PCM at 24 kHz
+FRAMES = 20_000
+CONTROL_EVERY = 50
+
+
+def build_stream() -> list[bytes]:
+    """Build a synthetic stream of audio frames with sparse control frames."""
+    audio = base64.b64encode(os.urandom(AUDIO_CHUNK_BYTES)).decode()
+    audio_frame = json.dumps(
+        {
+            "serverContent": {
+                "modelTurn": {
+                    "parts": [{"inlineData": {"mimeType": "audio/pcm", "data": audio}}]
+                }
+            }
+        }
+    ).encode()
+    control_frames = [
+        json.dumps({"serverContent": {"turnComplete": True}}).encode(),
+        json.dumps({"usageMetadata": {"totalTokenCount": 1234}}).encode(),
+        json.dumps(
+            {"toolCall": {"functionCalls": [{"id": "1", "name": "user_manual"}]}}
+        ).encode(),
+    ]
+    stream = []
+    for i in range(FRAMES):
+        if i % CONTROL_EVERY == 0:
+            stream.append(control_frames[(i // CONTROL_EVERY) % len(control_frames)])
+        else:
+            stream.append(audio_frame)
+    return stream
+
+
+def parse_every_frame(stream: list[bytes]) -> int:
+    """Previous relay behaviour: decode every frame."""
+    handled = 0
+    for frame in stream:
+        if "toolCall" in json.loads(frame):
+            handled += 1
+    return handled
+
+
+def classify_then_parse(stream: list[bytes]) -> int:
+    """Current relay behaviour: decode only frames carrying control keys."""
+    handled = 0
+    for frame in stream:
+        if needs_decode(frame) and "toolCall" in json.loads(frame):
+            handled += 1
+    return handled
+
+
+def measure(
+    name: str, func: Callable[[list[bytes]], int], stream: list[bytes]
+) -> float:
+    """Run func over the stream and print CPU microseconds per frame."""
+    start = time.process_time()
+    func(stream)
+    elapsed = time.process_time() - start
+    per_frame_us = elapsed / len(stream) * 1e6
+    print(f"{name:<22} {per_frame_us:8.2f} us/frame  ({elapsed:.3f}s CPU)")
+    return per_frame_us
+
+
+if __name__ == "__main__":
+    stream = build_stream()
+    print(f"{len(stream)} frames, audio frame size {len(stream[1])} bytes")
+    before = measure("json.loads every frame", parse_every_frame, stream)
+    after = measure("classify then parse", classify_then_parse, stream)
+    print(f"speedup: {before / after:.1f}x")
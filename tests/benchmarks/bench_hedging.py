@@ -0,0 +1,119 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Benchmark chat latency with and without hedged model calls.
+
+Runs the Turkish Airlines text agent through the JSON chat endpoint against
+the local fake model. Each request makes one tool call, so two model calls.
+Model latency is drawn from a long-tailed distribution: lognormal around
+MEDIAN, with a TAIL share of calls stalling for STALL seconds, as an
+overloaded upstream replica would.
+
+Reported per mode are p50/p99 request latency and the extra model calls that
+hedging cost. The hedged run first warms the latency percentile with
+WARMUP requests that are not counted.
+
+Usage:
+    uv run python -m tests.benchmarks.bench_hedging
+"""
+
+import asyncio
+import logging
+import random
+import tempfile
+import time
+from typing import Any
+
+from tests.benchmarks.offline import offline_credentials
+from tests.fake_llm import FakeLlm
+
+REQUESTS = 400
+WARMUP = 100
+CONCURRENCY = 10
+MEDIAN = 0.05
+SIGMA = 0.3
+TAIL = 0.03
+STALL = 1.5
+
+
+def draw(rng: random.Random) -> float:
+    if rng.random() < TAIL:
+        return STALL
+    return rng.lognormvariate(0, SIGMA) * MEDIAN
+
+
+async def run_requests(server: Any, count: int, prefix: str, latency: Any) -> None:
+    queue = list(range(count))
+
+    async def worker() -> None:
+        while queue:
+            n = queue.pop()
+            started = time.perf_counter()
+            message = server.ChatMessage(message="my flights?", user_id=f"{prefix}-{n}")
+            result = await server.turkish_airlines_chat(message)
+            assert result["status"] == "success", result
+            if latency is not None:
+                latency.record(time.perf_counter() - started)
+
+    await asyncio.gather(*(worker() for _ in range(CONCURRENCY)))
+
+
+async def main() -> None:
+    offline_credentials()
+    from google.adk.runners import Runner
+
+    from app import server
+    from app.utils.hedging import HedgedLlm
+    from app.utils.metrics import LatencyRecorder
+    from app.utils.session_service import TieredSessionService
+
+    logging.getLogger().setLevel(logging.WARNING)
+    print(
+        f"{REQUESTS} requests, {CONCURRENCY} concurrent, model calls lognormal "
+        f"around {MEDIAN * 1000:.0f} ms, {TAIL:.0%} stalling {STALL:.1f} s"
+    )
+    for name, hedge in (("plain", False), ("hedged", True)):
+        rng = random.Random(7)
+        inner = FakeLlm(
+            latency=lambda rng=rng: draw(rng),
+            tool_calls=[("get_customer_flights_tool", {"phone_number": "05551234567"})],
+        )
+        model = HedgedLlm(inner=inner, hedge=hedge, percentile=95, budget=0.1)
+        with tempfile.TemporaryDirectory() as directory:
+            sessions = TieredSessionService(f"{directory}/chat.db")
+            server.session_service = sessions
+            server.turkish_airlines_runner = Runner(
+                agent=server.root_agent.clone(update={"model": model}),
+                app_name=server.APP_NAME,
+                session_service=sessions,
+            )
+            if hedge:
+                await run_requests(server, WARMUP, "warmup", None)
+            calls_before = inner.calls
+            requests = model.stats.calls
+            latency = LatencyRecorder(max_samples=REQUESTS)
+            await run_requests(server, REQUESTS, name, latency)
+            await sessions.close()
+        summary = latency.summary()
+        calls = model.stats.calls - requests
+        extra = (inner.calls - calls_before - calls) / calls
+        print(
+            f"{name:>6}: p50 {summary['p50_ms']:.0f} ms, p99 {summary['p99_ms']:.0f} ms, "
+            f"extra model calls {extra:.1%}, hedge delay "
+            f"{model.hedge_delay() * 1000:.0f} ms"
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
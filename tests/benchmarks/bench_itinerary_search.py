@@ -0,0 +1,110 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Benchmark itinerary search over a synthetic airline network.
+
+Builds CONNECTIONS elementary connections over DAYS days between AIRPORTS
+airports: a few hubs with frequent flights to every spoke, and random
+point-to-point flights between spokes. Random origin/destination pairs are
+then searched for the top 3 itineraries (up to two stops) from a random time,
+and hub to spoke pairs for direct flights only.
+
+Reported are p50/p99 search latency and the average number of itineraries
+found per query.
+
+Usage:
+    uv run python -m tests.benchmarks.bench_itinerary_search
+"""
+
+import time
+
+import numpy as np
+
+from app.utils.itinerary_search import MINUTES_PER_DAY, Airport, ItinerarySearch
+from app.utils.metrics import LatencyRecorder
+
+AIRPORTS = 500
+HUBS = 8
+CONNECTIONS = 100_000
+DAYS = 7
+QUERIES = 500
+
+
+def synthetic_network(rng: np.random.Generator) -> ItinerarySearch:
+    codes = [f"A{n:03d}" for n in range(AIRPORTS)]
+    airports = [
+        Airport(code, code, int(rng.integers(-8, 10)) * 60, int(rng.integers(30, 91)))
+        for code in codes
+    ]
+    # Two thirds of the flights touch a hub, the rest link random spokes
+    hub_flights = CONNECTIONS * 2 // 3
+    hubs = rng.integers(0, HUBS, size=hub_flights)
+    spokes = rng.integers(HUBS, AIRPORTS, size=hub_flights)
+    outbound = rng.random(hub_flights) < 0.5
+    origin = np.concatenate(
+        [np.where(outbound, hubs, spokes), rng.integers(HUBS, AIRPORTS, CONNECTIONS)]
+    )[:CONNECTIONS]
+    destination = np.concatenate(
+        [np.where(outbound, spokes, hubs), rng.integers(HUBS, AIRPORTS, CONNECTIONS)]
+    )[:CONNECTIONS]
+    keep = origin != destination
+    departure = rng.integers(0, DAYS * MINUTES_PER_DAY, size=CONNECTIONS)
+    duration = rng.integers(60, 12 * 60, size=CONNECTIONS)
+    return ItinerarySearch(
+        airports,
+        [f"XX{n}" for n in np.flatnonzero(keep)],
+        [codes[n] for n in origin[keep]],
+        [codes[n] for n in destination[keep]],
+        departure[keep],
+        departure[keep] + duration[keep],
+    )
+
+
+def main() -> None:
+    rng = np.random.default_rng(7)
+    started = time.perf_counter()
+    search = synthetic_network(rng)
+    print(
+        f"{len(search)} connections between {AIRPORTS} airports over {DAYS} days, "
+        f"indexed in {time.perf_counter() - started:.2f} s"
+    )
+    any_pairs = rng.integers(0, AIRPORTS, size=(QUERIES, 2))
+    any_pairs = any_pairs[any_pairs[:, 0] != any_pairs[:, 1]]
+    hub_pairs = np.column_stack(
+        [rng.integers(0, HUBS, QUERIES), rng.integers(HUBS, AIRPORTS, QUERIES)]
+    )
+    for name, pairs, options in (
+        ("top 3", any_pairs, {}),
+        ("direct only", hub_pairs, {"direct_only": True}),
+    ):
+        starts = rng.integers(0, (DAYS - 3) * MINUTES_PER_DAY, size=len(pairs))
+        latency = LatencyRecorder(max_samples=len(pairs))
+        found = 0
+        for (origin, destination), start in zip(pairs, starts, strict=True):
+            began = time.perf_counter()
+            itineraries = search.search(
+                f"A{origin:03d}", f"A{destination:03d}", int(start), k=3, **options
+            )
+            latency.record(time.perf_counter() - began)
+            found += len(itineraries)
+        summary = latency.summary()
+        print(
+            f"{name:>12}: p50 {summary['p50_ms']:.2f} ms, "
+            f"p99 {summary['p99_ms']:.2f} ms, "
+            f"{found / len(pairs):.1f} itineraries per query"
+        )
+
+
+if __name__ == "__main__":
+    main()
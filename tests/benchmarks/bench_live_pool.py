@@ -0,0 +1,64 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Benchmark time-to-ready with and without pre-warmed live sessions.
+
+Runs against the local fake live endpoint with an injected setup delay that
+stands in for the TLS handshake, websocket upgrade and setup round trip.
+Clients arrive one after another with a short think time between them.
+
+Usage:
+    uv run python -m tests.benchmarks.bench_live_pool
+"""
+
+import asyncio
+
+from app.utils.live_pool import LiveSessionPool
+from app.utils.metrics import LatencyRecorder
+from tests.fake_live_server import FakeLiveServer
+
+SETUP_DELAY = 0.15
+CLIENTS = 40
+INTER_ARRIVAL = 0.2
+
+
+async def run(pool_size: int) -> dict:
+    """Measure time-to-ready for CLIENTS sequential callers."""
+    recorder = LatencyRecorder()
+    async with FakeLiveServer(setup_delay=SETUP_DELAY) as server:
+        pool = LiveSessionPool(server.connect, max_size=pool_size, idle_ttl=30)
+        loop = asyncio.get_running_loop()
+        for _ in range(CLIENTS):
+            started = loop.time()
+            async with pool.session():
+                recorder.record(loop.time() - started)
+            await asyncio.sleep(INTER_ARRIVAL)
+        await pool.close()
+        summary = recorder.summary()
+        summary["hits"] = pool.stats.hits
+        return summary
+
+
+async def main() -> None:
+    print(f"{CLIENTS} clients, {SETUP_DELAY * 1000:.0f} ms simulated setup")
+    for pool_size in (0, 2):
+        summary = await run(pool_size)
+        print(
+            f"pool_size={pool_size}: p50 {summary['p50_ms']:.1f} ms, "
+            f"p99 {summary['p99_ms']:.1f} ms, pooled hits {summary['hits']}"
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,216 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Benchmark the semantic answer cache of the technical service agent.
+
+Replays a synthetic log of first questions to the air conditioner agent,
+each in a new session: popular questions (Zipf-distributed) asked again in
+different words, with and without Turkish letters, in Turkish and English,
+and a long tail of one-off questions about specific models and error codes.
+The agent runs with its shipped cache settings on the local fake model, with
+the RAG retrieval replaced by a fake tool; both sleep like their remote
+counterparts, scaled down.
+
+Reported are the hit rate, the hits answered from a different question than
+the one asked, mean latency per question with the cache on and off, and the
+cost of one lookup over a full cache.
+
+Usage:
+    uv run python -m tests.benchmarks.bench_semantic_cache
+"""
+
+import asyncio
+import random
+import time
+
+from app.utils.semantic_cache import HashingEmbedder, SemanticCache
+from tests.benchmarks.offline import offline_credentials
+
+QUERIES = 300
+MODEL_DELAY = 0.02
+RETRIEVAL_DELAY = 0.01
+# Variants of each popular question, most popular first
+QUESTIONS = [
+    [
+        "Klimanin filtresi nasil temizlenir?",
+        "klimanin filtresi nasil temizlenir",
+        "Kliman\u0131n filtresi nas\u0131l temizlenir?",
+        "KLIMANIN FILTRESI NASIL TEMIZLENIR",
+        "Klimanin filtresini nasil temizlerim?",
+    ],
+    [
+        "Zamanlayici nasil ayarlanir?",
+        "Zamanlay\u0131c\u0131 nas\u0131l ayarlan\u0131r?",
+        "zamanlayici nasil ayarlanir",
+        "Klimanin zamanlayicisi nasil ayarlanir?",
+    ],
+    [
+        "E4 hata kodu ne demek?",
+        "e4 hata kodu ne demek",
+        "E4 hata kodu nedir?",
+        "E4 hata kodu ne demek??",
+    ],
+    [
+        "How do I clean the filter?",
+        "how do i clean the filter",
+        "How can I clean the air filter?",
+    ],
+    [
+        "Klima sogutmuyor ne yapmaliyim?",
+        "Klima so\u011futmuyor ne yapmal\u0131y\u0131m?",
+        "klima sogutmuyor ne yapmaliyim",
+    ],
+    [
+        "Klima isitmiyor ne yapmaliyim?",
+        "Klima \u0131s\u0131tm\u0131yor ne yapmal\u0131y\u0131m?",
+    ],
+    [
+        "What does error E5 mean?",
+        "what does error e5 mean",
+    ],
+    [
+        "Kumandanin pili nasil degistirilir?",
+        "Kumandan\u0131n pili nas\u0131l de\u011fi\u015ftirilir?",
+        "kumandanin pilini nasil degistiririm",
+    ],
+    [
+        "Enerji tasarrufu modu nasil acilir?",
+        "enerji tasarrufu modu nasil acilir",
+    ],
+    [
+        "Klima neden su damlatiyor?",
+        "klima neden su damlatiyor",
+        "Klima neden su damlat\u0131yor?",
+    ],
+]
+LONG_TAIL = [
+    "AR{n} modelinin sogutma kapasitesi nedir?",
+    "C{n} hata kodu ne anlama geliyor?",
+    "Does model AR{n} support wifi?",
+    "AR{n} montaj mesafesi ne olmali?",
+]
+
+
+def query_log(seed: int = 7) -> list[tuple[str, str]]:
+    """Return (topic, question) pairs in the order they are asked."""
+    rng = random.Random(seed)
+    weights = [1 / rank for rank in range(1, len(QUESTIONS) + 1)]
+    log = []
+    for n in range(QUERIES):
+        if rng.random() < 0.3:
+            text = rng.choice(LONG_TAIL).format(n=n)
+            log.append((text, text))
+        else:
+            topic = rng.choices(range(len(QUESTIONS)), weights)[0]
+            log.append((str(topic), rng.choice(QUESTIONS[topic])))
+    return log
+
+
+async def replay(
+    log: list[tuple[str, str]], enabled: bool
+) -> tuple[list[float], SemanticCache, list[tuple[str, str]]]:
+    """Return seconds per question, the cache, and the topic of each hit."""
+    from google.adk.runners import InMemoryRunner
+    from google.genai import types
+
+    from app.technical_services_text_agent.technical_service_text_agent import (
+        ANSWER_CACHE_THRESHOLD,
+        RAG_CORPUS_VERSION,
+        technical_service_text_agent,
+    )
+    from tests.fake_llm import FakeLlm
+
+    async def retrieve_rag_documentation(query: str) -> dict:
+        """Retrieve documentation and reference materials."""
+        await asyncio.sleep(RETRIEVAL_DELAY)
+        return {"documents": [f"Manual pages about {query}"]}
+
+    cache = SemanticCache(
+        HashingEmbedder(),
+        threshold=ANSWER_CACHE_THRESHOLD,
+        corpus_version=RAG_CORPUS_VERSION,
+        enabled=enabled,
+    )
+    model = FakeLlm(
+        first_chunk_delay=MODEL_DELAY,
+        tool_calls=[("retrieve_rag_documentation", {"query": "klima"})],
+    )
+    agent = technical_service_text_agent.clone(
+        update={
+            "model": model,
+            "tools": [retrieve_rag_documentation],
+            "before_model_callback": cache.before_model,
+            "after_model_callback": cache.after_model,
+        }
+    )
+    runner = InMemoryRunner(agent=agent, app_name="bench")
+    # Answers name their topic, so hits from another topic can be counted
+    answered: list[tuple[str, str]] = []
+    latencies: list[float] = []
+    for topic, question in log:
+        model.answer = f"answer:{topic}"
+        session = await runner.session_service.create_session(
+            app_name="bench", user_id="u"
+        )
+        started = time.perf_counter()
+        async for event in runner.run_async(
+            user_id="u",
+            session_id=session.id,
+            new_message=types.Content(role="user", parts=[types.Part(text=question)]),
+        ):
+            if event.content and event.content.parts and event.content.parts[0].text:
+                answer = event.content.parts[0].text
+        latencies.append(time.perf_counter() - started)
+        answered.append((topic, answer))
+    return latencies, cache, answered
+
+
+def lookup_cost(entries: int = 2000, lookups: int = 2000) -> float:
+    """Return the microseconds of one missed lookup over a full cache."""
+    cache = SemanticCache(HashingEmbedder(), max_entries=entries)
+    for n in range(entries):
+        cache.store(f"AR{n} modelinin kapasitesi nedir", f"answer {n}")
+    started = time.perf_counter()
+    for n in range(lookups):
+        cache.lookup(f"AR{n} modelinin montaj mesafesi nedir")
+    return (time.perf_counter() - started) / lookups * 1e6
+
+
+def main() -> None:
+    offline_credentials()
+    log = query_log()
+    without, _, _ = asyncio.run(replay(log, enabled=False))
+    with_cache, cache, answered = asyncio.run(replay(log, enabled=True))
+    stats = cache.snapshot()
+    wrong = sum(1 for topic, answer in answered if answer != f"answer:{topic}")
+    saved = sum(without) - sum(with_cache)
+    print(
+        f"{QUERIES} first questions, {len(QUESTIONS)} popular topics, "
+        f"threshold {cache.threshold}"
+    )
+    print(
+        f"hit rate {stats['hit_rate']:.0%} ({stats['hits']} hits), "
+        f"{wrong} answered from another topic, "
+        f"{stats['entries']} entries, {stats['bytes'] / 1024:.0f} KiB"
+    )
+    print(
+        f"mean latency: {sum(without) / QUERIES * 1e3:.1f} ms without the cache, "
+        f"{sum(with_cache) / QUERIES * 1e3:.1f} ms with it "
+        f"({saved / sum(without):.0%} of the time saved)"
+    )
+    print(f"lookup over 2000 entries: {lookup_cost():.0f} us")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Benchmark chat session services at 100k sessions.
+
+Creates SESSIONS sessions holding a short exchange each (a user message and
+a model answer), then reads them back with a skewed access pattern where most
+requests go to a small set of active users. Compares ADK's unbounded
+InMemorySessionService with the TieredSessionService (LRU hot tier over a
+write-behind SQLite file) and reports:
+
+* create + append throughput and get throughput, in operations per second;
+* Python heap still allocated after loading every session (tracemalloc);
+* hot tier hit rate and commits for the tiered service.
+
+Usage:
+    uv run python -m tests.benchmarks.bench_session_service [sessions]
+"""
+
+import asyncio
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from google.adk.events.event import Event
+from google.adk.sessions import BaseSessionService, InMemorySessionService
+from google.genai import types
+
+from app.utils.session_service import TieredSessionService
+
+APP = "bench"
+SESSIONS = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+GETS = 100_000
+MAX_HOT = 10_000
+HOT_USERS = 0.1  # share of users receiving most of the traffic
+HOT_TRAFFIC = 0.9
+
+
+def exchange(n: int) -> list[Event]:
+    """A user question and model answer of typical chat size."""
+    question = f"Can I change the date of booking {n:06d} to next week?"
+    answer = "Yes, you can change it online for a fee. " * 5
+    return [
+        Event(
+            author="user",
+            invocation_id=f"inv-{n}",
+            content=types.Content(role="user", parts=[types.Part(text=question)]),
+        ),
+        Event(
+            author="turkish_airlines_agent",
+            invocation_id=f"inv-{n}",
+            content=types.Content(role="model", parts=[types.Part(text=answer)]),
+        ),
+    ]
+
+
+async def load(service: BaseSessionService) -> float:
+    """Create every session with its exchange; return seconds taken."""
+    start = time.perf_counter()
+    for n in range(SESSIONS):
+        session = await service.create_session(
+            app_name=APP, user_id=f"user-{n}", session_id=f"session_user-{n}"
+        )
+        for event in exchange(n):
+            await service.append_event(session, event)
+    if isinstance(service, TieredSessionService):
+        await service.flush()
+    return time.perf_counter() - start
+
+
+async def read(service: BaseSessionService, rng: random.Random) -> float:
+    """Get sessions with a skewed access pattern; return seconds taken."""
+    hot_users = int(SESSIONS * HOT_USERS)
+    users = [
+        rng.randrange(hot_users)
+        if rng.random() < HOT_TRAFFIC
+        else rng.randrange(SESSIONS)
+        for _ in range(GETS)
+    ]
+    start = time.perf_counter()
+    for n in users:
+        session = await service.get_session(
+            app_name=APP, user_id=f"user-{n}", session_id=f"session_user-{n}"
+        )
+        assert session is not None and len(session.events) == 2
+    return time.perf_counter() - start
+
+
+def make(name: str, directory: str) -> BaseSessionService:
+    if name == "in-memory":
+        return InMemorySessionService()
+    path = os.path.join(directory, f"{name}-{time.monotonic_ns()}.db")
+    return TieredSessionService(path, max_hot=MAX_HOT, shared=name == "tiered-shared")
+
+
+async def main() -> None:
+    print(f"{SESSIONS} sessions, {GETS} gets, hot tier of {MAX_HOT}")
+    with tempfile.TemporaryDirectory() as directory:
+        for name in ("in-memory", "tiered", "tiered-shared"):
+            service = make(name, directory)
+            load_time = await load(service)
+            read_time = await read(service, random.Random(1))
+            line = (
+                f"{name:>13}: create+append {3 * SESSIONS / load_time:,.0f} ops/s, "
+                f"get {GETS / read_time:,.0f} ops/s"
+            )
+            if isinstance(service, TieredSessionService):
+                stats = service.stats
+                lookups = stats.hot_hits + stats.cold_hits
+                line += (
+                    f", hot hits {stats.hot_hits / lookups:.0%}, "
+                    f"{stats.flushes} commits"
+                )
+                await service.close()
+
+            # Heap held by the loaded sessions, measured on a fresh instance
+            tracemalloc.start()
+            service = make(name, directory)
+            await load(service)
+            current, _ = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            print(f"{line}, heap {current / 2**20:,.0f} MiB")
+            if isinstance(service, TieredSessionService):
+                await service.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
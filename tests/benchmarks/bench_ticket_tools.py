@@ -0,0 +1,145 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Benchmark the per-ticket airline tools and the model turns they save.
+
+Tool latency: every per-ticket tool is called with random tickets of a
+synthetic store of CUSTOMERS customers, and p50/p99 latency is reported.
+
+Model turns: each scenario is a chat request naming a ticket, run through
+the text agent on the local fake model (MODEL_DELAY per model call). Before
+the ticket index the per-ticket tools returned constants, so the model had
+to call get_customer_flights_tool first to learn the flight, route and
+class; now the ticket tool alone returns them. Both tool chains start
+with the verify_id_tool call the ticket tools require and are scripted, so
+the model call counts follow from them, and the totals show what each saved
+round trip costs.
+
+Usage:
+    uv run python -m tests.benchmarks.bench_ticket_tools
+"""
+
+import asyncio
+import logging
+import tempfile
+import time
+from types import SimpleNamespace
+from typing import Any
+
+import numpy as np
+
+from app.utils.customer_store import CustomerStore, format_phone, format_ticket
+from app.utils.metrics import LatencyRecorder
+from tests.benchmarks.bench_customer_store import synthetic_columns
+from tests.benchmarks.offline import offline_credentials
+from tests.fake_llm import FakeLlm
+
+CUSTOMERS = 1_000_000
+CALLS = 2000
+MODEL_DELAY = 0.4
+REPEATS = 5
+SCENARIOS = {
+    "baggage": "baggage_info_tool",
+    "cancel": "cancel_flight_tool",
+    "upgrade": "upgrade_request_tool",
+}
+TICKET = "235-1234567890"
+PHONE = "05551234567"
+ID_DIGITS = "78912"
+
+
+def tool_latency(agent: Any, store: CustomerStore) -> None:
+    rng = np.random.default_rng(7)
+    rows = rng.integers(0, len(store), CALLS)
+    tickets = [format_ticket(int(key)) for key in store.columns["ticket"][rows]]
+    # Each call comes from the verified holder of the ticket
+    holders = store.columns["phone"][store.columns["customer"][rows]]
+    contexts = [
+        SimpleNamespace(
+            state={agent.VERIFIED_PHONES_STATE_KEY: [format_phone(int(key))]}
+        )
+        for key in holders
+    ]
+    print(f"tool latency over {CUSTOMERS} customers:")
+    for name in (*SCENARIOS.values(), "open_ticket_tool", "special_assistance_tool"):
+        tool = getattr(agent, name)
+        latency = LatencyRecorder(max_samples=CALLS)
+        for ticket, context in zip(tickets, contexts, strict=True):
+            started = time.perf_counter()
+            tool(ticket, context)
+            latency.record(time.perf_counter() - started)
+        p50, p99 = latency.percentile(50), latency.percentile(99)
+        assert p50 is not None and p99 is not None
+        print(f"{name:>26}: p50 {p50 * 1e6:.1f} us, p99 {p99 * 1e6:.1f} us")
+
+
+async def model_turns(server: Any, tool: str, chain: list[str]) -> tuple[int, float]:
+    from google.adk.runners import Runner
+
+    from app.utils.session_service import TieredSessionService
+
+    args = {
+        "verify_id_tool": {"phone_number": PHONE, "id_last_5_digits": ID_DIGITS},
+        "get_customer_flights_tool": {"phone_number": PHONE},
+        tool: {"ticket_number": TICKET},
+    }
+    model = FakeLlm(
+        first_chunk_delay=MODEL_DELAY,
+        tool_calls=[(name, args[name]) for name in chain],
+    )
+    with tempfile.TemporaryDirectory() as directory:
+        sessions = TieredSessionService(f"{directory}/chat.db")
+        server.session_service = sessions
+        server.turkish_airlines_runner = Runner(
+            agent=server.root_agent.clone(update={"model": model}),
+            app_name=server.APP_NAME,
+            session_service=sessions,
+        )
+        started = time.perf_counter()
+        for n in range(REPEATS):
+            message = server.ChatMessage(message=TICKET, user_id=f"{tool}-{n}")
+            result = await server.turkish_airlines_chat(message)
+            assert result["status"] == "success", result
+        elapsed = (time.perf_counter() - started) / REPEATS
+        await sessions.close()
+    return model.calls // REPEATS, elapsed
+
+
+async def main() -> None:
+    offline_credentials()
+    from app import server
+    from app.turkish_airlines_text_agent import turkish_airlines_text_agent as agent
+
+    logging.getLogger().setLevel(logging.WARNING)
+    seeded = agent.customer_store
+    agent.customer_store = CustomerStore(
+        synthetic_columns(CUSTOMERS, np.random.default_rng(7))
+    )
+    tool_latency(agent, agent.customer_store)
+    agent.customer_store = seeded
+
+    print(f"model turns per scenario, {MODEL_DELAY * 1000:.0f} ms per model call:")
+    for scenario, tool in SCENARIOS.items():
+        before = await model_turns(
+            server, tool, ["verify_id_tool", "get_customer_flights_tool", tool]
+        )
+        after = await model_turns(server, tool, ["verify_id_tool", tool])
+        print(
+            f"{scenario:>8}: {before[0]} model calls / {before[1] * 1000:.0f} ms "
+            f"before, {after[0]} / {after[1] * 1000:.0f} ms with the ticket index"
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
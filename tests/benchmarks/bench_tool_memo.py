@@ -0,0 +1,135 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Benchmark the session memo of the airline agent's read-only tools.
+
+Replays the tool calls of scripted support conversations through the agent's
+tool memo callbacks and the real tools: the model looking the customer and
+their flights up again on later turns, with the phone number written
+differently, fee and baggage questions asked twice, and a cancellation that
+invalidates the customer's entries half way through.
+
+Reported are the hit rate per tool, the tool time with and without the
+memo, and the size of the verified customer context the instruction carries
+once the customer is verified, which lets the model skip those lookups. The
+tools read an in-process index, so the memo saves repeated work rather than
+tool time; the model round trips it saves depend on the model.
+
+Usage:
+    uv run python -m tests.benchmarks.bench_tool_memo
+"""
+
+import contextlib
+import inspect
+import io
+import time
+from types import ModuleType, SimpleNamespace
+from typing import Any, cast
+
+from google.adk.tools.base_tool import BaseTool
+from google.adk.tools.tool_context import ToolContext
+
+from app.utils.tool_memo import ToolMemo
+from tests.benchmarks.offline import offline_credentials
+
+REPEATS = 200
+CONVERSATION = [
+    ("get_customer_info_tool", {"phone_number": "05551234567"}),
+    ("verify_id_tool", {"phone_number": "05551234567", "id_last_5_digits": "78912"}),
+    ("get_customer_flights_tool", {"phone_number": "05551234567"}),
+    ("get_customer_info_tool", {"phone_number": "0555 123 45 67"}),
+    ("calculate_fee_tool", {"ticket_number": "235-1234567890", "operation": "change"}),
+    ("get_customer_flights_tool", {"phone_number": "+90 555 123 4567"}),
+    ("calculate_fee_tool", {"ticket_number": "2351234567890", "operation": "cancel"}),
+    ("baggage_info_tool", {"ticket_number": "235-1234567890"}),
+    ("verify_id_tool", {"phone_number": "05551234567", "id_last_5_digits": "78912"}),
+    ("cancel_flight_tool", {"ticket_number": "235-1234567890"}),
+    ("get_customer_flights_tool", {"phone_number": "05551234567"}),
+    ("baggage_info_tool", {"ticket_number": "235-9876543210"}),
+    ("baggage_info_tool", {"ticket_number": "235 9876543210"}),
+    ("get_customer_flights_tool", {"phone_number": "05551234567"}),
+]
+
+
+def call(
+    agent: ModuleType, name: str, args: dict[str, Any], context: ToolContext
+) -> Any:
+    """Call an agent tool, passing the tool context to the tools taking one."""
+    tool = getattr(agent, name)
+    if "tool_context" in inspect.signature(tool).parameters:
+        return tool(**args, tool_context=context)
+    return tool(**args)
+
+
+def replay(agent: ModuleType, memo: ToolMemo) -> float:
+    """Return the seconds spent answering every call of every conversation."""
+    elapsed = 0.0
+    for _ in range(REPEATS):
+        context = cast(ToolContext, SimpleNamespace(state={}))
+        for name, args in CONVERSATION:
+            tool = cast(BaseTool, SimpleNamespace(name=name))
+            started = time.perf_counter()
+            result = memo.before_tool(tool, args, context)
+            if result is None:
+                result = call(agent, name, args, context)
+            memo.after_tool(tool, args, context, result)
+            elapsed += time.perf_counter() - started
+    return elapsed
+
+
+def main() -> None:
+    offline_credentials()
+    from app.turkish_airlines_text_agent import turkish_airlines_text_agent as agent
+
+    def memo(enabled: bool) -> ToolMemo:
+        return ToolMemo(
+            read_only=agent.READ_ONLY_TOOLS,
+            invalidates=agent.tool_memo.invalidates,
+            normalizers=agent.tool_memo.normalizers,
+            context=agent.describe_verified_customer,
+            context_key="verified_customer",
+            enabled=enabled,
+        )
+
+    memoized = memo(enabled=True)
+    with contextlib.redirect_stdout(io.StringIO()):
+        without = replay(agent, memo(enabled=False))
+        with_memo = replay(agent, memoized)
+
+    calls = REPEATS * len(CONVERSATION)
+    print(f"{REPEATS} conversations of {len(CONVERSATION)} tool calls")
+    for name, stats in memoized.snapshot().items():
+        print(
+            f"{name:>26}: hit rate {stats['hit_rate']:.0%} "
+            f"({stats['hits']} hits, {stats['misses']} misses, "
+            f"{stats['invalidated']} invalidated)"
+        )
+    print(
+        f"tool time per call: {without / calls * 1e6:.0f} us without the memo, "
+        f"{with_memo / calls * 1e6:.0f} us with it"
+    )
+    context = cast(ToolContext, SimpleNamespace(state={}))
+    for name, args in CONVERSATION[:3]:
+        tool = cast(BaseTool, SimpleNamespace(name=name))
+        with contextlib.redirect_stdout(io.StringIO()):
+            result = call(agent, name, args, context)
+            memoized.after_tool(tool, args, context, result)
+    print(
+        "verified customer context in the instruction: "
+        f"{len(context.state['verified_customer'])} characters"
+    )
+
+
+if __name__ == "__main__":
+    main()
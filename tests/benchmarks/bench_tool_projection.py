@@ -0,0 +1,120 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Benchmark the prompt tokens saved by projecting airline tool results.
+
+Replays a scripted support conversation (identify and verify the customer,
+list the flights, look for a new flight, price and make the change, ask
+about baggage, then cancel the return flight) through the Turkish Airlines
+tools and the agent's tool projector, with projection on and off.
+
+Reported are the estimated tokens of each tool response before and after
+projection, and for the whole conversation the tokens of tool results in
+the prompt: every result stays in the prompt of every later model call, so
+each call after a tool resends all results so far.
+
+Usage:
+    uv run python -m tests.benchmarks.bench_tool_projection
+"""
+
+import inspect
+from types import ModuleType, SimpleNamespace
+from typing import cast
+
+from google.adk.tools.base_tool import BaseTool
+from google.adk.tools.tool_context import ToolContext
+
+from app.utils.tool_projection import ToolProjector, estimate_result_tokens
+from tests.benchmarks.offline import offline_credentials
+
+PHONE = "05551234567"
+TICKET = "235-1234567890"
+RETURN_TICKET = "235-9876543210"
+
+
+def conversation(agent: ModuleType) -> list[tuple[str, dict]]:
+    day = (agent.datetime.now() + agent.timedelta(days=5)).strftime("%Y-%m-%d")
+    return [
+        ("get_customer_info_tool", {"phone_number": PHONE}),
+        ("verify_id_tool", {"phone_number": PHONE, "id_last_5_digits": "78912"}),
+        ("get_customer_flights_tool", {"phone_number": PHONE}),
+        (
+            "change_flight_tool",
+            {
+                "ticket_number": TICKET,
+                "new_time": "10:00",
+                "origin": "IST",
+                "destination": "JFK",
+                "date": day,
+            },
+        ),
+        (
+            "suggest_alternatives_tool",
+            {"origin": "IST", "destination": "JFK", "date": day},
+        ),
+        ("calculate_fee_tool", {"ticket_number": TICKET, "operation": "change"}),
+        ("baggage_info_tool", {"ticket_number": TICKET}),
+        ("transfer_support_tool", {"ticket_number": TICKET}),
+        ("calculate_fee_tool", {"ticket_number": RETURN_TICKET, "operation": "cancel"}),
+        ("cancel_flight_tool", {"ticket_number": RETURN_TICKET}),
+    ]
+
+
+def replay(
+    agent: ModuleType, projector: ToolProjector, calls: list[tuple[str, dict]]
+) -> tuple[int, int]:
+    """Return the tool result tokens of the last and of all prompts."""
+    context = cast(ToolContext, SimpleNamespace(state={}))
+    in_prompt = total = 0
+    for name, args in calls:
+        tool = getattr(agent, name)
+        # Ticket tools read the verified caller from the tool context
+        if "tool_context" in inspect.signature(tool).parameters:
+            result = tool(**args, tool_context=context)
+        else:
+            result = tool(**args)
+        projected = projector.after_tool(
+            cast(BaseTool, SimpleNamespace(name=name)), args, context, result
+        )
+        in_prompt += estimate_result_tokens(result if projected is None else projected)
+        total += in_prompt
+    return in_prompt, total
+
+
+def main() -> None:
+    offline_credentials()
+    from app.turkish_airlines_text_agent import turkish_airlines_text_agent as agent
+
+    calls = conversation(agent)
+    projected = ToolProjector(agent.TOOL_PROJECTIONS)
+    verbatim = ToolProjector(agent.TOOL_PROJECTIONS, enabled=False)
+    after = replay(agent, projected, calls)
+    before = replay(agent, verbatim, calls)
+
+    print(f"{'tool':>26} {'calls':>5} {'tokens before':>14} {'after':>7}")
+    for name, stats in projected.snapshot().items():
+        print(
+            f"{name:>26} {stats['calls']:>5} "
+            f"{stats['tokens_before'] / stats['calls']:>14.0f} "
+            f"{stats['tokens_after'] / stats['calls']:>7.0f}"
+        )
+    print(
+        f"conversation of {len(calls)} tool calls: tool results in the last "
+        f"prompt {before[0]} -> {after[0]} tokens, summed over all prompts "
+        f"{before[1]} -> {after[1]} tokens ({1 - after[1] / before[1]:.0%} less)"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Benchmark the voice activity gate on recorded microphone audio.
+
+Replays 16-bit mono PCM through the VoiceActivityGate in 2048 sample chunks,
+as the browser worklet sends them, and reports how much audio would still go
+upstream, how much of the speech survives and the CPU cost per chunk.
+
+Without an argument a synthetic call recording is used: a customer talking in
+bursts of voiced syllables and fricatives with long pauses over room noise.
+Pass a 16 kHz mono 16-bit WAV file to replay a real recording instead; speech
+recall is only reported for the synthetic recording, which has ground truth.
+
+Usage:
+    uv run python -m tests.benchmarks.bench_vad [recording.wav]
+"""
+
+import sys
+import time
+import wave
+
+import numpy as np
+
+from app.utils.vad import VoiceActivityGate
+
+RATE = 16_000
+CHUNK = 2048
+CALL_SECONDS = 600
+
+
+def synthetic_call(seed: int = 7) -> tuple[np.ndarray, np.ndarray]:
+    """Build a call recording and a per-sample speech mask."""
+    rng = np.random.default_rng(seed)
+    total = CALL_SECONDS * RATE
+    audio = rng.normal(0, 32768 * 10 ** (-60 / 20), total)
+    speech = np.zeros(total, dtype=bool)
+    pos = int(rng.uniform(1, 3) * RATE)
+    while pos < total:
+        length = min(int(rng.uniform(1, 5) * RATE), total - pos)
+        t = np.arange(length) / RATE
+        pitch = rng.uniform(100, 220)
+        voiced = sum(np.sin(2 * np.pi * pitch * k * t) / k for k in range(1, 6))
+        syllables = np.clip(np.sin(2 * np.pi * rng.uniform(3, 5) * t), 0, None)
+        fricatives = rng.normal(0, 0.3, length) * (syllables < 0.05)
+        level = 32768 * 10 ** (rng.uniform(-30, -18) / 20)
+        audio[pos : pos + length] += level * (voiced * syllables + fricatives)
+        speech[pos : pos + length] = True
+        pos += length + int(rng.uniform(2, 12) * RATE)
+    return np.clip(audio, -32768, 32767).astype("<i2"), speech
+
+
+def read_wav(path: str) -> np.ndarray:
+    """Read a 16-bit mono WAV file."""
+    with wave.open(path) as wav:
+        if wav.getsampwidth() != 2 or wav.getnchannels() != 1:
+            raise SystemExit("expected a 16-bit mono WAV file")
+        if wav.getframerate() != RATE:
+            print(f"warning: {wav.getframerate()} Hz recording, gate assumes {RATE}")
+        return np.frombuffer(wav.readframes(wav.getnframes()), dtype="<i2")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        samples, mask = read_wav(sys.argv[1]), None
+    else:
+        samples, mask = synthetic_call()
+
+    chunks = [samples[i : i + CHUNK].tobytes() for i in range(0, len(samples), CHUNK)]
+    gate: VoiceActivityGate[int] = VoiceActivityGate(sample_rate=RATE)
+    sent: set[int] = set()
+    start = time.process_time()
+    for n, chunk in enumerate(chunks):
+        sent.update(gate.push(chunk, n))
+    elapsed = time.process_time() - start
+
+    stats = gate.stats
+    seconds = len(samples) / RATE
+    print(f"{len(chunks)} chunks, {seconds:.0f}s of audio")
+    print(
+        f"sent {stats.sent_frames} chunks ({stats.bytes_sent / stats.bytes_in:.1%} "
+        f"of upstream audio), {stats.speech_frames} classified as speech"
+    )
+    if mask is not None:
+        speech_chunks = [
+            n for n in range(len(chunks)) if mask[n * CHUNK : (n + 1) * CHUNK].any()
+        ]
+        recall = sum(n in sent for n in speech_chunks) / len(speech_chunks)
+        print(
+            f"speech share {len(speech_chunks) / len(chunks):.1%}, "
+            f"speech chunks sent {recall:.2%}"
+        )
+    per_chunk_us = elapsed / len(chunks) * 1e6
+    print(
+        f"{per_chunk_us:.1f} us CPU per chunk, "
+        f"{seconds / elapsed:.0f}x faster than real time"
+    )
@@ -0,0 +1,42 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Offline setup for benchmarks that import the application modules."""
+
+import json
+import os
+import tempfile
+
+
+def offline_credentials() -> None:
+    """Point google.auth at throwaway credentials unless real ones are set.
+
+    The agent modules resolve Google credentials at import time. Throwaway
+    ones written to a temporary file let them import without a Google Cloud
+    account; benchmarks replace every remote call with a local fake.
+    """
+    os.environ.setdefault("GOOGLE_CLOUD_PROJECT", "bench-project")
+    if "GOOGLE_APPLICATION_CREDENTIALS" in os.environ:
+        return
+    with tempfile.NamedTemporaryFile("w", suffix=".json", delete=False) as f:
+        json.dump(
+            {
+                "type": "authorized_user",
+                "client_id": "bench",
+                "client_secret": "bench",
+                "refresh_token": "bench",
+            },
+            f,
+        )
+    os.environ["GOOGLE_APPLICATION_CREDENTIALS"] = f.name
@@ -0,0 +1,178 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Local fake of the Gemini Live websocket endpoint for tests and benchmarks.
+
+The fake speaks enough of the BidiGenerateContent protocol for the relay:
+it answers the setup message with ``setupComplete`` (after an injectable
+delay standing in for TLS, upgrade and setup), answers microphone input with
+a small audio chunk, and answers ``clientContent`` with a text turn followed
+by ``turnComplete``. It can also hand out session resumption handles and drop
+connections abnormally to exercise reconnects.
+
+In talking mode ``clientContent`` starts a long spoken answer instead, streamed
+faster than real time, which audible microphone input interrupts after a
+detection delay the way Gemini's own turn detection does.
+"""
+
+import asyncio
+import base64
+import contextlib
+import json
+from collections.abc import AsyncIterator
+from typing import Any
+
+from google import genai
+from google.genai import types
+from google.genai.live import AsyncSession
+from websockets.asyncio.client import connect as ws_connect
+from websockets.asyncio.server import ServerConnection, serve
+from websockets.exceptions import ConnectionClosed
+
+AUDIO_CHUNK = base64.b64encode(bytes(960)).decode()
+
+
+class FakeLiveServer:
+    """Minimal stand-in for the Gemini Live endpoint."""
+
+    def __init__(
+        self,
+        setup_delay: float = 0.0,
+        resumable: bool = False,
+        talk_chunks: int = 0,
+        chunk_interval: float = 0.0,
+        interrupt_delay: float = 0.3,
+    ) -> None:
+        """Initialize the fake.
+
+        Args:
+            setup_delay: Seconds to wait before answering the setup message
+            resumable: Send a sessionResumptionUpdate after setup
+            talk_chunks: Audio chunks in the answer to clientContent, 0 to
+                answer with a short text turn
+            chunk_interval: Seconds between the audio chunks of an answer
+            interrupt_delay: Seconds from audible input during an answer to
+                the interrupted message
+        """
+        self.setup_delay = setup_delay
+        self.resumable = resumable
+        self.talk_chunks = talk_chunks
+        self.chunk_interval = chunk_interval
+        self.interrupt_delay = interrupt_delay
+        self.setups: list[dict[str, Any]] = []
+        self.received: list[dict[str, Any]] = []
+        self.connections = 0
+        self._open: set[ServerConnection] = set()
+        self._server: Any = None
+        self._client = genai.Client(api_key="fake-key")
+
+    @property
+    def url(self) -> str:
+        """Websocket URL of the fake endpoint."""
+        port = self._server.sockets[0].getsockname()[1]
+        return f"ws://127.0.0.1:{port}/ws"
+
+    async def __aenter__(self) -> "FakeLiveServer":
+        self._server = await serve(self._handle, "127.0.0.1", 0)
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        self._server.close()
+        await self._server.wait_closed()
+
+    async def drop_connections(self) -> None:
+        """Close every open connection with an internal error close code."""
+        for ws in list(self._open):
+            await ws.close(code=1011, reason="fake upstream failure")
+
+    @contextlib.asynccontextmanager
+    async def connect(
+        self, config: types.LiveConnectConfig | None = None, **_: Any
+    ) -> AsyncIterator[AsyncSession]:
+        """Drop-in replacement for ``client.aio.live.connect``."""
+        setup: dict[str, Any] = {"model": "fake-live-model"}
+        if config is not None and config.session_resumption is not None:
+            setup["sessionResumption"] = {"handle": config.session_resumption.handle}
+        async with ws_connect(self.url) as ws:
+            await ws.send(json.dumps({"setup": setup}))
+            await ws.recv(decode=False)
+            yield AsyncSession(api_client=self._client._api_client, websocket=ws)
+
+    async def _handle(self, ws: ServerConnection) -> None:
+        self.connections += 1
+        self._open.add(ws)
+        with contextlib.suppress(ConnectionClosed):
+            self.setups.append(json.loads(await ws.recv()))
+            await asyncio.sleep(self.setup_delay)
+            await ws.send(json.dumps({"setupComplete": {}}))
+            if self.resumable:
+                update = {
+                    "newHandle": f"handle-{self.connections}",
+                    "resumable": True,
+                }
+                await ws.send(json.dumps({"sessionResumptionUpdate": update}).encode())
+            talking: asyncio.Task | None = None
+            interrupts: set[asyncio.Task] = set()
+            async for message in ws:
+                data = json.loads(message)
+                self.received.append(data)
+                if self.talk_chunks and "clientContent" in data:
+                    talking = asyncio.create_task(self._talk(ws))
+                elif self.talk_chunks and "realtimeInput" in data:
+                    if talking and not talking.done() and _audible(data):
+                        task = asyncio.create_task(self._interrupt(ws, talking))
+                        interrupts.add(task)
+                        task.add_done_callback(interrupts.discard)
+                else:
+                    for reply in self._replies(data):
+                        await ws.send(json.dumps(reply).encode())
+        self._open.discard(ws)
+
+    async def _talk(self, ws: ServerConnection) -> None:
+        part = {"inlineData": {"mimeType": "audio/pcm;rate=24000", "data": AUDIO_CHUNK}}
+        chunk = json.dumps({"serverContent": {"modelTurn": {"parts": [part]}}})
+        with contextlib.suppress(ConnectionClosed):
+            for _ in range(self.talk_chunks):
+                await ws.send(chunk.encode())
+                await asyncio.sleep(self.chunk_interval)
+            await ws.send(
+                json.dumps({"serverContent": {"turnComplete": True}}).encode()
+            )
+
+    async def _interrupt(self, ws: ServerConnection, talking: asyncio.Task) -> None:
+        await asyncio.sleep(self.interrupt_delay)
+        if talking.cancel():
+            with contextlib.suppress(ConnectionClosed):
+                await ws.send(
+                    json.dumps({"serverContent": {"interrupted": True}}).encode()
+                )
+
+    def _replies(self, data: dict[str, Any]) -> list[dict[str, Any]]:
+        if "realtimeInput" in data:
+            part = {
+                "inlineData": {"mimeType": "audio/pcm;rate=24000", "data": AUDIO_CHUNK}
+            }
+            return [{"serverContent": {"modelTurn": {"parts": [part]}}}]
+        if "clientContent" in data:
+            return [
+                {"serverContent": {"modelTurn": {"parts": [{"text": "ok"}]}}},
+                {"serverContent": {"turnComplete": True}},
+            ]
+        return []
+
+
+def _audible(data: dict[str, Any]) -> bool:
+    """Whether realtimeInput carries audio other than digital silence."""
+    chunks = data["realtimeInput"].get("mediaChunks") or []
+    return any(base64.b64decode(chunk.get("data", "")).strip(b"\0") for chunk in chunks)
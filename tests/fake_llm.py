@@ -0,0 +1,95 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Scripted stand-in for the Gemini model behind the ADK text agents.
+
+The FakeLlm first asks for the scripted tool calls, one model call each, and
+then answers with a fixed text. Its latency is injectable: a delay before the
+first chunk, fixed or drawn from a distribution per call, and between streamed
+chunks, so tests and benchmarks can exercise streaming, deadline and hedging
+behaviour of the chat endpoints without Vertex AI.
+"""
+
+import asyncio
+from collections.abc import AsyncGenerator, Callable
+from typing import Any
+
+from google.adk.models.base_llm import BaseLlm
+from google.adk.models.llm_request import LlmRequest
+from google.adk.models.llm_response import LlmResponse
+from google.genai import types
+from pydantic import Field
+
+
+class FakeLlm(BaseLlm):
+    """Minimal scripted model for agent tests and benchmarks."""
+
+    model: str = "fake-llm"
+    answer: str = "Your flight TK1984 to New York is confirmed."
+    # Tool calls (name, args) made before answering each user message
+    tool_calls: list[tuple[str, dict[str, Any]]] = Field(default_factory=list)
+    chunks: int = 4
+    first_chunk_delay: float = 0.0
+    # Draws the delay before the first chunk of each call, if set
+    latency: Callable[[], float] | None = None
+    chunk_delay: float = 0.0
+    calls: int = 0
+    last_request: LlmRequest | None = None
+
+    async def generate_content_async(
+        self, llm_request: LlmRequest, stream: bool = False
+    ) -> AsyncGenerator[LlmResponse, None]:
+        """Return the next tool call, or the answer in one or more chunks."""
+        self.calls += 1
+        self.last_request = llm_request
+        await asyncio.sleep(self.latency() if self.latency else self.first_chunk_delay)
+        made = _tool_responses_since_user_text(llm_request.contents)
+        if made < len(self.tool_calls):
+            name, args = self.tool_calls[made]
+            call = types.FunctionCall(name=name, args=args)
+            yield LlmResponse(
+                content=types.Content(
+                    role="model", parts=[types.Part(function_call=call)]
+                )
+            )
+            return
+
+        words = self.answer.split(" ")
+        size = -(-len(words) // self.chunks)
+        chunks = [
+            " ".join(words[i : i + size]) + " " for i in range(0, len(words), size)
+        ]
+        if stream:
+            for n, chunk in enumerate(chunks):
+                if n:
+                    await asyncio.sleep(self.chunk_delay)
+                yield LlmResponse(
+                    content=types.Content(role="model", parts=[types.Part(text=chunk)]),
+                    partial=True,
+                )
+        else:
+            await asyncio.sleep(self.chunk_delay * (len(chunks) - 1))
+        yield LlmResponse(
+            content=types.Content(role="model", parts=[types.Part(text=self.answer)])
+        )
+
+
+def _tool_responses_since_user_text(contents: list[types.Content]) -> int:
+    count = 0
+    for content in reversed(contents):
+        parts = content.parts or []
+        if content.role == "user" and any(part.text for part in parts):
+            break
+        count += sum(1 for part in parts if part.function_response)
+    return count
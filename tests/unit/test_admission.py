@@ -0,0 +1,182 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+
+import pytest
+
+from app.utils.admission import AdmissionController, AdmissionRejected, CircuitBreaker
+
+
+async def _hold(
+    controller: AdmissionController, release: asyncio.Event, order: list[int], n: int
+) -> None:
+    async with controller.admit():
+        order.append(n)
+        await release.wait()
+
+
+@pytest.mark.asyncio
+async def test_waiters_are_admitted_in_arrival_order() -> None:
+    """Queued callers get freed slots first come, first served."""
+    controller = AdmissionController(max_concurrent=1, max_queue=10)
+    order: list[int] = []
+    releases = [asyncio.Event() for _ in range(4)]
+    tasks = []
+    for n, release in enumerate(releases):
+        tasks.append(asyncio.create_task(_hold(controller, release, order, n)))
+        await asyncio.sleep(0)
+
+    assert order == [0]
+    assert controller.stats.waiting == 3
+    for release in releases:
+        release.set()
+        await asyncio.sleep(0.01)
+    await asyncio.gather(*tasks)
+
+    assert order == [0, 1, 2, 3]
+    stats = controller.stats
+    assert (stats.active, stats.admitted, stats.queued, stats.rejected) == (0, 4, 3, 0)
+
+
+@pytest.mark.asyncio
+async def test_waiters_are_told_their_position() -> None:
+    """Queued callers hear their position and an estimated wait as it moves."""
+    controller = AdmissionController(
+        max_concurrent=1, max_queue=10, default_session_seconds=60.0
+    )
+    first, second = asyncio.Event(), asyncio.Event()
+    holder = asyncio.create_task(_hold(controller, first, [], 0))
+    await asyncio.sleep(0)
+    queued = asyncio.create_task(_hold(controller, second, [], 1))
+    await asyncio.sleep(0)
+    updates: list[tuple[int, float]] = []
+
+    async def on_wait(position: int, estimated_wait: float) -> None:
+        updates.append((position, estimated_wait))
+
+    async def third() -> None:
+        async with controller.admit(on_wait=on_wait):
+            pass
+
+    waiter = asyncio.create_task(third())
+    await asyncio.sleep(0.01)
+    assert updates == [(2, 120.0)]
+
+    first.set()
+    await asyncio.sleep(0.01)
+    assert updates[-1][0] == 1
+
+    second.set()
+    await asyncio.gather(holder, queued, waiter)
+
+
+@pytest.mark.asyncio
+async def test_full_queue_and_timeout_reject() -> None:
+    """Callers beyond the queue limit or the wait limit are rejected."""
+    controller = AdmissionController(max_concurrent=1, max_queue=1, queue_timeout=0.05)
+    release = asyncio.Event()
+    holder = asyncio.create_task(_hold(controller, release, [], 0))
+    await asyncio.sleep(0)
+    waiter = asyncio.create_task(_hold(controller, asyncio.Event(), [], 1))
+    await asyncio.sleep(0)
+
+    with pytest.raises(AdmissionRejected) as rejected:
+        async with controller.admit():
+            pass
+    assert rejected.value.reason == "queue_full"
+
+    with pytest.raises(AdmissionRejected) as timed_out:
+        await waiter
+    assert timed_out.value.reason == "timeout"
+
+    release.set()
+    await holder
+    stats = controller.stats
+    assert (stats.active, stats.waiting, stats.rejected) == (0, 0, 2)
+    assert (stats.rejected_queue_full, stats.rejected_timeout) == (1, 1)
+
+
+@pytest.mark.asyncio
+async def test_cancelled_waiter_leaves_the_queue() -> None:
+    """A caller that disconnects while queued does not hold up the queue."""
+    controller = AdmissionController(max_concurrent=1, max_queue=10)
+    release = asyncio.Event()
+    holder = asyncio.create_task(_hold(controller, release, [], 0))
+    await asyncio.sleep(0)
+    waiter = asyncio.create_task(_hold(controller, asyncio.Event(), [], 1))
+    await asyncio.sleep(0)
+
+    waiter.cancel()
+    await asyncio.gather(waiter, return_exceptions=True)
+    release.set()
+    await holder
+
+    assert controller.stats.waiting == 0
+    assert controller.stats.active == 0
+
+
+@pytest.mark.asyncio
+async def test_breaker_sheds_load_while_upstream_fails() -> None:
+    """Sessions are rejected while the breaker is open, and one trial closes it."""
+    breaker = CircuitBreaker(
+        error_rate=0.5, window=4, min_requests=4, open_seconds=0.05
+    )
+    controller = AdmissionController(max_concurrent=5, max_queue=5, breaker=breaker)
+    for success in (True, False, True, False):
+        controller.record_upstream(success)
+    assert breaker.state == "open"
+
+    with pytest.raises(AdmissionRejected) as rejected:
+        async with controller.admit():
+            pass
+    assert rejected.value.reason == "circuit_open"
+
+    await asyncio.sleep(0.06)
+    assert breaker.state == "half_open"
+    assert breaker.allow()
+    assert not breaker.allow()
+    breaker.record(True)
+    assert breaker.state == "closed"
+    assert controller.snapshot()["rejected_circuit_open"] == 1
+
+
+@pytest.mark.asyncio
+async def test_abandoned_trial_is_released() -> None:
+    """A half-open trial cancelled before any outcome lets the next one through."""
+    breaker = CircuitBreaker(
+        error_rate=0.5, window=2, min_requests=2, open_seconds=0.05
+    )
+    controller = AdmissionController(max_concurrent=1, max_queue=0, breaker=breaker)
+    controller.record_upstream(False)
+    controller.record_upstream(False)
+    await asyncio.sleep(0.06)
+    assert breaker.state == "half_open"
+
+    trial = asyncio.create_task(_hold(controller, asyncio.Event(), [], 0))
+    await asyncio.sleep(0)
+    # Rejected for capacity without taking the trial
+    with pytest.raises(AdmissionRejected) as rejected:
+        async with controller.admit():
+            pass
+    assert rejected.value.reason == "queue_full"
+    trial.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await trial
+
+    assert breaker.state == "half_open"
+    async with controller.admit():
+        controller.record_upstream(True)
+    assert breaker.state == "closed"
+    assert controller.stats.active == 0
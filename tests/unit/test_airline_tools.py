@@ -0,0 +1,231 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from collections.abc import Generator
+from types import ModuleType, SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+import pytest
+from google.auth.credentials import Credentials
+
+from app.utils.fast_path import Turn
+from app.utils.tool_projection import estimate_result_tokens
+
+
+@pytest.fixture
+def agent() -> Generator[ModuleType, None, None]:
+    """Import the Turkish Airlines text agent without Google credentials."""
+    credentials = MagicMock(spec=Credentials)
+    with patch("google.auth.default", return_value=(credentials, "mock-project-id")):
+        from app.turkish_airlines_text_agent import turkish_airlines_text_agent
+
+        yield turkish_airlines_text_agent
+
+
+def verified_context(agent: ModuleType, *phones: str) -> SimpleNamespace:
+    """Return a tool context in which the phone numbers passed verification."""
+    return SimpleNamespace(state={agent.VERIFIED_PHONES_STATE_KEY: list(phones)})
+
+
+def test_customer_tools_accept_spoken_phone_numbers(agent: ModuleType) -> None:
+    """Phone tools find the customer however the number is written."""
+    info = agent.get_customer_info_tool("+90 555 123 45 67")
+    assert info["status"] == "found"
+    assert info["flights"] == agent.CUSTOMER_DATA["05551234567"]["flights"]
+    context = SimpleNamespace(state={})
+    assert agent.verify_id_tool("05551234567", "11111", context)["status"] == "invalid"
+    assert context.state == {}
+    assert (
+        agent.verify_id_tool("0555 123 45 67", "78912", context)["status"] == "verified"
+    )
+    assert agent.verify_id_tool("05551234567", "34567", context)["status"] == "verified"
+    assert context.state == {agent.VERIFIED_PHONES_STATE_KEY: ["05551234567"]}
+    assert agent.get_customer_flights_tool("05550000000")["status"] == "not_found"
+
+
+def test_ticket_tools_answer_from_the_booking(agent: ModuleType) -> None:
+    """Per-ticket tools report the booked flight without a customer lookup."""
+    ticket = "235-2468101214"
+    context = verified_context(agent, "05559876543", "05551234567")
+    baggage = agent.baggage_info_tool(ticket, context)
+    assert "passenger" not in baggage
+    assert baggage["flight_number"] == "TK2468"
+    assert baggage["baggage_allowance"] == "40kg checked, 8kg cabin"
+    assert agent.upgrade_request_tool(ticket, context)["available_classes"] == ["First"]
+    assert agent.transfer_support_tool(ticket, context)["transfer_airport"] is None
+    assert agent.cancel_flight_tool("235-9876543210", context)["destination"] == "IST"
+
+    # Fees come from the rule tables for the booked class, route and date
+    cancel = agent.calculate_fee_tool(ticket, "cancel", context)
+    assert (
+        cancel["calculated_fee"]
+        == agent.cancel_flight_tool(ticket, context)["cancellation_fee"]
+    )
+    assert cancel["breakdown"]["refund_amount"] > 0
+    upgrade = agent.calculate_fee_tool(ticket, "upgrade", context)
+    assert (
+        upgrade["calculated_fee"]
+        == agent.upgrade_request_tool(ticket, context)["upgrade_fee"]
+    )
+    assert (
+        agent.calculate_fee_tool(ticket, "Open ticket", context)["operation"]
+        == "open_ticket"
+    )
+    assert (
+        agent.calculate_fee_tool(ticket, "refund", context)["status"]
+        == "unsupported_operation"
+    )
+
+    for tool in (
+        agent.cancel_flight_tool,
+        agent.open_ticket_tool,
+        agent.baggage_info_tool,
+        agent.upgrade_request_tool,
+        agent.special_assistance_tool,
+        agent.transfer_support_tool,
+    ):
+        assert tool("235-0000000000", context)["status"] == "not_found"
+    assert (
+        agent.calculate_fee_tool("235-0000000000", "cancel", context)["status"]
+        == "not_found"
+    )
+
+
+def test_ticket_tools_refuse_unverified_callers(agent: ModuleType) -> None:
+    """Tickets are served only to the customer verified as their holder."""
+    ticket = "235-2468101214"  # Held by 05559876543
+    day = (agent.datetime.now().date() + agent.timedelta(days=5)).isoformat()
+    calls = {
+        "cancel_flight_tool": (ticket,),
+        "open_ticket_tool": (ticket,),
+        "baggage_info_tool": (ticket,),
+        "upgrade_request_tool": (ticket,),
+        "special_assistance_tool": (ticket,),
+        "transfer_support_tool": (ticket,),
+        "calculate_fee_tool": (ticket, "cancel"),
+        "change_flight_tool": (ticket, "15:00", "IST", "JFK", day),
+    }
+    for name, args in calls.items():
+        tool = getattr(agent, name)
+        refused = tool(*args, SimpleNamespace(state={}))
+        assert refused["status"] == "not_verified", name
+        assert "flight_number" not in refused
+        # Another verified customer's ticket reads as missing
+        other = tool(*args, verified_context(agent, "05551234567"))
+        assert other["status"] == "not_found", name
+        assert "flight_number" not in other
+
+    # Verifying the holder in the conversation opens their tickets
+    context = SimpleNamespace(state={})
+    assert agent.verify_id_tool("05551234567", "78912", context)["status"] == "verified"
+    assert agent.baggage_info_tool(ticket, context)["status"] == "not_found"
+    agent.verify_id_tool("05559876543", "32109", context)
+    assert agent.baggage_info_tool(ticket, context)["flight_number"] == "TK2468"
+
+
+def test_flight_alternatives_come_from_the_timetable(agent: ModuleType) -> None:
+    """Change options follow the requested time, route and direct_only."""
+    day = agent.datetime.now().date() + agent.timedelta(days=5)
+    context = verified_context(agent, "05551234567")
+    changes = agent.change_flight_tool(
+        "235-1234567890",
+        "15:00",
+        "ist",
+        "JFK",
+        day.isoformat(),
+        context,
+        direct_only=True,
+    )
+    assert changes["status"] == "Flight change options"
+    departures = [option["departure"] for option in changes["alternatives"]]
+    assert departures and all(
+        departure >= f"{day.isoformat()} 15:00" for departure in departures
+    )
+    assert all(option["direct"] for option in changes["alternatives"])
+    for option in changes["alternatives"]:
+        assert (
+            option["price_difference"]
+            == option["change_fee"] + option["fare_difference"]
+        )
+
+    alternatives = agent.suggest_alternatives_tool("ESB", "LAX", day.isoformat())
+    assert alternatives["alternatives"]
+    for option in alternatives["alternatives"]:
+        assert option["segments"][0]["from"] == "ESB"
+        assert option["segments"][-1]["to"] == "LAX"
+        assert option["stops"] == len(option["transfer_airports"])
+
+    invalid = agent.change_flight_tool(
+        "235-1234567890", "15:00", "IST", "JFK", "soon", context
+    )
+    assert invalid["status"] == "invalid_request"
+
+
+def test_tool_results_are_projected_for_the_model(agent: ModuleType) -> None:
+    """Identity numbers never reach the model; flights only once verified."""
+    spec = agent.TOOL_PROJECTIONS
+    info = agent.get_customer_info_tool("05551234567")
+    identify = spec.projection("get_customer_info_tool", "identify").apply(info)
+    assert identify == {
+        "status": "found",
+        "name": info["name"],
+        "phone_number": "05551234567",
+        "flight_count": 2,
+    }
+    verified = spec.projection("get_customer_info_tool", "verified").apply(info)
+    assert "identity_number" not in verified and "passport" not in verified
+    assert verified["flights"][0]["ticket_number"] == "235-1234567890"
+    assert "seat" not in verified["flights"][0]
+
+    day = agent.datetime.now().date() + agent.timedelta(days=5)
+    changes = agent.change_flight_tool(
+        "235-1234567890",
+        "10:00",
+        "IST",
+        "JFK",
+        day.isoformat(),
+        verified_context(agent, "05551234567"),
+    )
+    projected = spec.projection("change_flight_tool", "verified").apply(changes)
+    assert "info" not in projected
+    for option in projected["alternatives"]:
+        assert "segments" not in option and "message" not in option
+        assert "price_difference" in option
+    assert estimate_result_tokens(projected) < estimate_result_tokens(changes) / 2
+
+
+def test_fast_path_reads_language_and_choices(agent: ModuleType) -> None:
+    """Turkish and English turns are told apart and choices are strict."""
+    assert agent.detect_language("Evet") == "tr"
+    assert agent.detect_language("Yes please") == "en"
+    assert agent.detect_language("78912") is None
+    assert agent.address_name("Gizem Kaya") == "Gizem"
+
+    flights = agent.get_customer_flights_tool("05551234567")
+    turn = Turn(
+        message="", results={"get_customer_flights_tool": flights}, language="en"
+    )
+    for message, flight in (
+        ("2", "TK2023"),
+        ("ikincisi", "TK2023"),
+        ("the first one", "TK1984"),
+        ("TK2023 please", "TK2023"),
+    ):
+        turn.message = message
+        assert agent.choose_flight(turn).reply.startswith(
+            f"You selected flight {flight}"
+        )
+    for message in ("3", "cancel the second one", "1 or 2"):
+        turn.message = message
+        assert agent.choose_flight(turn) is None
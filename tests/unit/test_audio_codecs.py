@@ -0,0 +1,145 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import base64
+import json
+
+import numpy as np
+import pytest
+
+from app.utils import audio_codecs
+from app.utils.audio_codecs import (
+    ADPCM_HEADER,
+    DownlinkAudioEncoder,
+    ImaAdpcmEncoder,
+    alaw_decode,
+    alaw_encode,
+    ima_adpcm_decode,
+    mulaw_decode,
+    mulaw_encode,
+    negotiate_codec,
+)
+from app.utils.media_protocol import HEADER, KIND_AUDIO_IMA_ADPCM, KIND_AUDIO_MULAW
+
+
+def _speech(samples: int = 4800, seed: int = 0) -> bytes:
+    rng = np.random.default_rng(seed)
+    t = np.arange(samples) / 24000
+    signal = 8000 * np.sin(2 * np.pi * 220 * t) + rng.normal(0, 800, samples)
+    edges = np.array([-32768, 32767, 0, -1, 1])
+    return np.concatenate([signal, edges]).clip(-32768, 32767).astype("<i2").tobytes()
+
+
+def _snr_db(reference: bytes, decoded: bytes) -> float:
+    ref = np.frombuffer(reference, dtype="<i2").astype(np.float64)
+    out = np.frombuffer(decoded, dtype="<i2").astype(np.float64)
+    return 10 * np.log10(np.sum(ref**2) / np.sum((ref - out) ** 2))
+
+
+def test_g711_matches_reference_implementation() -> None:
+    """mu-law and A-law encode and decode exactly like the C reference."""
+    if audio_codecs.audioop is None:
+        pytest.skip("audioop is not available")
+    pcm = _speech()
+    codes = bytes(range(256))
+    assert mulaw_encode(pcm) == audio_codecs.audioop.lin2ulaw(pcm, 2)
+    assert alaw_encode(pcm) == audio_codecs.audioop.lin2alaw(pcm, 2)
+    assert mulaw_decode(codes) == audio_codecs.audioop.ulaw2lin(codes, 2)
+    assert alaw_decode(codes) == audio_codecs.audioop.alaw2lin(codes, 2)
+
+
+def test_g711_round_trip_quality() -> None:
+    """Companded audio halves the size and keeps speech quality."""
+    pcm = _speech()
+    for encode, decode in ((mulaw_encode, mulaw_decode), (alaw_encode, alaw_decode)):
+        encoded = encode(pcm)
+        assert len(encoded) == len(pcm) // 2
+        assert _snr_db(pcm, decode(encoded)) > 30
+
+
+def test_adpcm_frames_decode_independently() -> None:
+    """Each ADPCM frame carries the encoder state needed to decode it alone."""
+    pcm = _speech(samples=4801)
+    encoder = ImaAdpcmEncoder(use_audioop=False)
+    frames = [encoder.encode(pcm[i : i + 962]) for i in range(0, len(pcm), 962)]
+
+    decoded = b"".join(ima_adpcm_decode(frame) for frame in frames)
+    assert len(decoded) == len(pcm)
+    assert _snr_db(pcm, decoded) > 15
+    _, _, count = ADPCM_HEADER.unpack_from(frames[1])
+    assert count == 481
+    assert ima_adpcm_decode(frames[2]) == decoded[2 * 962 : 3 * 962]
+
+    # A model chunk may hold more samples than fit in 16 bits
+    long = _speech(samples=70000)
+    payload = ImaAdpcmEncoder().encode(long)
+    _, _, count = ADPCM_HEADER.unpack_from(payload)
+    assert count == len(long) // 2 > 65535
+    assert _snr_db(long, ima_adpcm_decode(payload)) > 15
+
+
+def test_adpcm_python_encoder_matches_audioop() -> None:
+    """The pure Python fallback produces the same stream as audioop."""
+    if audio_codecs.audioop is None:
+        pytest.skip("audioop is not available")
+    pcm = _speech(samples=4803)
+    fast, slow = ImaAdpcmEncoder(), ImaAdpcmEncoder(use_audioop=False)
+    for i in range(0, len(pcm), 1202):
+        assert fast.encode(pcm[i : i + 1202]) == slow.encode(pcm[i : i + 1202])
+
+
+def test_negotiate_codec() -> None:
+    """The server preference wins among the codecs offered by the client."""
+    assert negotiate_codec(["mulaw", "ima-adpcm"]) == "ima-adpcm"
+    assert negotiate_codec(["alaw", "opus"]) == "alaw"
+    assert negotiate_codec(["mulaw", "ima-adpcm"], enabled=["mulaw"]) == "mulaw"
+    assert negotiate_codec(["opus"]) is None
+    assert negotiate_codec(None) is None
+
+
+def test_downlink_encoder_only_touches_audio_frames() -> None:
+    """Audio-only frames become binary frames, anything else is left alone."""
+    pcm = _speech(samples=2400)
+    audio_frame = json.dumps(
+        {
+            "serverContent": {
+                "modelTurn": {
+                    "parts": [
+                        {
+                            "inlineData": {
+                                "mimeType": "audio/pcm;rate=24000",
+                                "data": base64.b64encode(pcm).decode(),
+                            }
+                        }
+                    ]
+                }
+            }
+        }
+    ).encode()
+    text_frame = json.dumps(
+        {"serverContent": {"modelTurn": {"parts": [{"text": "hello"}]}}}
+    ).encode()
+
+    encoder = DownlinkAudioEncoder("mulaw")
+    frame = encoder.encode_frame(audio_frame)
+    assert frame is not None
+    assert HEADER.unpack_from(frame) == (1, KIND_AUDIO_MULAW, 24000)
+    assert frame[HEADER.size :] == mulaw_encode(pcm)
+    assert encoder.encode_frame(text_frame) is None
+
+    adpcm = DownlinkAudioEncoder("ima-adpcm").encode_frame(audio_frame)
+    assert adpcm is not None
+    assert adpcm[1] == KIND_AUDIO_IMA_ADPCM
+    assert len(adpcm) < len(audio_frame) / 5
+    assert encoder.snapshot()["frames"] == 1
@@ -0,0 +1,57 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from app.utils.barge_in import BINARY_FLUSH_FRAME, ModelTurn
+from app.utils.media_protocol import HEADER, KIND_CONTROL_FLUSH
+
+
+def active(turn: ModelTurn) -> bool:
+    """Read turn.active without mypy narrowing it across method calls."""
+    return turn.active
+
+
+def test_barge_in_mutes_rest_of_turn() -> None:
+    """After a barge-in the turn's output is dropped until the model ends it."""
+    turn = ModelTurn()
+    assert not active(turn)
+    assert turn.output()
+    assert active(turn)
+
+    turn.barge_in(discarded=3)
+    assert not turn.output()
+    assert not turn.output()
+
+    turn.interrupted(discarded=0)
+    assert not active(turn)
+    assert turn.output()
+    assert turn.stats.turns == 2
+    assert turn.stats.vad_barge_ins == 1
+    assert turn.stats.interruptions == 1
+    assert turn.stats.discarded_frames == 5
+
+
+def test_turn_complete_ends_turn() -> None:
+    """turnComplete ends the turn, so speech afterwards is not a barge-in."""
+    turn = ModelTurn()
+    turn.output()
+    turn.complete()
+    assert not active(turn)
+    assert not turn.muted
+    assert turn.stats.discarded_frames == 0
+
+
+def test_binary_flush_frame_is_header_only() -> None:
+    """Binary clients get a header-only media frame of the flush kind."""
+    assert len(BINARY_FLUSH_FRAME) == HEADER.size
+    assert HEADER.unpack(BINARY_FLUSH_FRAME) == (1, KIND_CONTROL_FLUSH, 0)
@@ -0,0 +1,86 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from app.utils.coalescer import AudioCoalescer
+from app.utils.frames import model_audio, model_audio_frame
+
+MIME = "audio/pcm;rate=24000"
+
+
+class _Clock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_chunks_merge_until_byte_threshold() -> None:
+    """Consecutive chunks are released together once enough bytes arrived."""
+    coalescer = AudioCoalescer(max_bytes=3000, max_delay=1.0, clock=_Clock())
+    assert coalescer.push(MIME, b"a" * 1000, 10) == []
+    assert coalescer.push(MIME, b"b" * 1000, 10) == []
+    assert coalescer.push(MIME, b"c" * 1000, 10) == [
+        (MIME, b"a" * 1000 + b"b" * 1000 + b"c" * 1000, 30)
+    ]
+    assert not coalescer.pending
+    assert coalescer.snapshot()["frames_in"] == 3
+    assert coalescer.snapshot()["chunks_out"] == 1
+
+
+def test_time_budget_and_added_latency() -> None:
+    """The oldest chunk never waits longer than the time budget."""
+    clock = _Clock()
+    coalescer = AudioCoalescer(max_bytes=10_000, max_delay=0.03, clock=clock)
+    assert coalescer.time_left() is None
+    coalescer.push(MIME, b"a" * 960)
+    clock.now = 0.01
+    assert coalescer.push(MIME, b"b" * 960) == []
+    left = coalescer.time_left()
+    assert left is not None and abs(left - 0.02) < 1e-9
+
+    clock.now = 0.03
+    merged = coalescer.push(MIME, b"c" * 960)
+    assert merged == [(MIME, b"a" * 960 + b"b" * 960 + b"c" * 960, 0)]
+    latency = coalescer.snapshot()["added_latency"]
+    assert latency["count"] == 3
+    assert abs(latency["p99_ms"] - 30) < 1e-6
+
+
+def test_mime_change_flushes_first() -> None:
+    """Chunks with a different sample rate are never merged together."""
+    coalescer = AudioCoalescer(clock=_Clock())
+    coalescer.push(MIME, b"a" * 10)
+    ready = coalescer.push("audio/pcm;rate=16000", b"b" * 10)
+    assert ready == [(MIME, b"a" * 10, 0)]
+    assert coalescer.flush() == ("audio/pcm;rate=16000", b"b" * 10, 0)
+    assert coalescer.flush() is None
+
+
+def test_discard_drops_buffered_audio() -> None:
+    """Discarded audio is never flushed."""
+    coalescer = AudioCoalescer(clock=_Clock())
+    coalescer.push(MIME, b"a" * 10)
+    coalescer.push(MIME, b"b" * 10)
+    assert coalescer.discard() == 2
+    assert not coalescer.pending
+    assert coalescer.time_left() is None
+    assert coalescer.flush() is None
+
+
+def test_model_audio_frames_round_trip() -> None:
+    """Merged audio is rebuilt as a frame the client already understands."""
+    frame = model_audio_frame(MIME, bytes(range(200)))
+    assert model_audio(frame) == (MIME, bytes(range(200)))
+    assert model_audio(b'{"serverContent":{"turnComplete":true}}') is None
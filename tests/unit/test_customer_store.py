@@ -0,0 +1,99 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from typing import Any
+
+import numpy as np
+import pytest
+
+from app.utils.customer_store import CustomerStore, normalize_phone
+
+
+def _customer(phone: str, name: str, ticket: str, passport: str) -> dict[str, Any]:
+    return {
+        "name": name,
+        "phone_number": phone,
+        "identity_number": f"123456{phone[-5:]}",
+        "passport": passport,
+        "flights": [
+            {
+                "flight_number": "TK1984",
+                "ticket_number": ticket,
+                "origin": "IST",
+                "destination": "JFK",
+                "date": "2025-06-01",
+                "departure_time": "14:30",
+                "arrival_time": "18:45",
+                "status": "confirmed",
+                "class": "economy",
+                "seat": "23A",
+                "baggage_allowance": "30kg",
+            }
+        ],
+    }
+
+
+@pytest.mark.parametrize(
+    "phone",
+    ["05551234567", "0555 123 45 67", "+90 555 123 45 67", "0090 (555) 123-4567"],
+)
+def test_normalize_phone_accepts_spoken_variants(phone: str) -> None:
+    """Separators, trunk 0 and country code do not change the key."""
+    assert normalize_phone(phone) == 5551234567
+
+
+def test_normalize_phone_rejects_other_numbers() -> None:
+    """Too short or too long numbers are not phone numbers."""
+    assert normalize_phone("555 12 34") is None
+    assert normalize_phone("+44 20 7946 0958 123") is None
+
+
+def test_lookups_survive_save_and_open(tmp_path: Any) -> None:
+    """A saved store is memory-mapped and answers every index."""
+    customers = [
+        _customer("05551234567", "Ugur Eren", "235-1234567890", "P1234567"),
+        _customer("05559876543", "Gizem Kaya", "235-2468101214", "P7634567"),
+    ]
+    CustomerStore.from_records(customers).save(str(tmp_path))
+    store = CustomerStore.open(str(tmp_path))
+    assert isinstance(store.columns["phone_keys"], np.memmap)
+    assert len(store) == 2
+
+    assert store.by_phone("+90 555 987 65 43") == customers[1]
+    assert store.by_phone("05550000000") is None
+    assert store.by_ticket("2351234567890") == customers[0]
+    assert store.by_ticket("not a ticket") is None
+
+    # "34567" ends Ugur's ID and Gizem's passport
+    names = [customer["name"] for customer in store.by_id_suffix("34567")]
+    assert names == ["Ugur Eren", "Gizem Kaya"]
+    assert store.has_id_suffix(0, "34567")
+    assert not store.has_id_suffix(0, "76543")
+    assert not store.has_id_suffix(0, "abcde")
+
+
+def test_booking_reads_only_the_ticket() -> None:
+    """A ticket resolves to its flight and holder without other flights."""
+    customer = _customer("05551234567", "Ugur Eren", "235-1234567890", "P1234567")
+    second = {**customer["flights"][0], "ticket_number": "235-9876543210"}
+    customer["flights"].append({**second, "class": "business", "seat": "2A"})
+    store = CustomerStore.from_records([customer])
+
+    booking = store.booking("235 9876543210")
+    assert booking == {
+        **customer["flights"][1],
+        "name": "Ugur Eren",
+        "phone_number": "05551234567",
+    }
+    assert store.booking("235-0000000000") is None
@@ -0,0 +1,115 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from collections.abc import Sequence
+
+import numpy as np
+import pytest
+
+from app.utils.fare_engine import FareEngine
+
+REGIONS = {"IST": "TR", "ESB": "TR", "LHR": "EU", "JFK": "NA"}
+FARES = [
+    {"fare_class": fare_class, "route_band": band, "fare": fare, "taxes": "50"}
+    for fare_class, base in (("economy", 100), ("business", 300), ("first", 600))
+    for band, fare in (
+        ("domestic", str(base)),
+        ("regional", str(2 * base)),
+        ("long_haul", str(10 * base)),
+    )
+]
+RULES = [
+    ("change", "*", "*", "0", "250"),
+    ("change", "*", "*", "7", "150"),
+    ("change", "*", "domestic", "0", "60"),
+    ("change", "business", "*", "0", "100"),
+    ("change", "first", "*", "0", "0"),
+    ("cancel", "*", "*", "0", "500"),
+    ("cancel", "*", "*", "30", "150"),
+    ("upgrade", "*", "*", "0", "50"),
+    ("open_ticket", "*", "*", "0", "200"),
+]
+
+
+def rules(rows: Sequence[tuple[str, ...]]) -> list[dict[str, str]]:
+    """Build fee rule rows from tuples."""
+    columns = ("operation", "fare_class", "route_band", "min_days", "fee")
+    return [dict(zip(columns, row, strict=True)) for row in rows]
+
+
+@pytest.fixture
+def engine() -> FareEngine:
+    """A fare engine over a small rule set."""
+    return FareEngine(rules(RULES), FARES, REGIONS)
+
+
+def test_most_specific_rule_wins(engine: FareEngine) -> None:
+    """Class rules outrank band rules, which outrank catch-all rules."""
+    quotes = engine.quote(
+        "change",
+        ["economy", "economy", "economy", "business", "business", "first"],
+        ["long_haul", "long_haul", "domestic", "domestic", "long_haul", "regional"],
+        [3, 10, 3, 3, 40, 1],
+    )
+    assert quotes.fee.tolist() == [250, 150, 60, 100, 100, 0]
+    assert engine.route_bands(
+        ["IST", "IST", "LHR"], ["ESB", "LHR", "JFK"]
+    ).tolist() == [
+        0,
+        1,
+        2,
+    ]
+
+
+def test_batch_quotes_every_operation(engine: FareEngine) -> None:
+    """One call prices changes, cancellations, upgrades and open tickets."""
+    quotes = engine.quote(
+        ["change", "change", "cancel", "cancel", "upgrade", "open_ticket"],
+        "economy",
+        "regional",
+        [3, 3, 3, 45, 3, 3],
+        new_route_band=[
+            "long_haul",
+            "long_haul",
+            "regional",
+            "regional",
+            "regional",
+            "regional",
+        ],
+        stops=[0, 1, 0, 0, 0, 0],
+    )
+    assert len(quotes) == 6
+    # Long haul fare 1000, less 10% per stop, against the 200 paid
+    assert quotes.fare_difference.tolist() == [800, 700, 0, 0, 400, 0]
+    assert quotes.refund.tolist() == [0, 0, 0, 50, 0, 0]
+    assert quotes.total.tolist() == [1050, 950, 500, 150, 450, 200]
+    # Refunds never go below zero
+    assert engine.quote("cancel", "economy", "domestic", 0).row(0) == {
+        "fee": 500,
+        "fare_difference": 0,
+        "refund": 0,
+        "taxes": 0,
+        "total": 500,
+    }
+
+
+def test_rejects_incomplete_or_unknown_rules() -> None:
+    """Uncovered cells and unknown names are configuration errors."""
+    with pytest.raises(ValueError, match="do not cover"):
+        FareEngine(rules(RULES[:-1]), FARES, REGIONS)
+    with pytest.raises(ValueError, match="Unknown operation: refund"):
+        FareEngine(rules([*RULES, ("refund", "*", "*", "0", "0")]), FARES, REGIONS)
+    engine = FareEngine(rules(RULES), FARES, REGIONS)
+    with pytest.raises(ValueError, match="Unknown airport: XXX"):
+        engine.route_bands("IST", np.array(["XXX"]))
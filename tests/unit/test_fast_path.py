@@ -0,0 +1,129 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from types import SimpleNamespace
+from typing import Any, cast
+
+from google.adk.agents.callback_context import CallbackContext
+from google.adk.models.llm_request import LlmRequest
+from google.genai import types
+
+from app.utils.fast_path import PENDING_STATE_KEY, Action, FastPath, Intent, Turn
+
+
+def text(role: str, value: str) -> types.Content:
+    return types.Content(role=role, parts=[types.Part(text=value)])
+
+
+def tool_response(name: str, response: dict[str, Any]) -> types.Content:
+    part = types.Part.from_function_response(name=name, response=response)
+    return types.Content(role="user", parts=[part])
+
+
+def callback_context() -> CallbackContext:
+    return cast(CallbackContext, SimpleNamespace(state={}, invocation_id="i1"))
+
+
+def answer(
+    path: FastPath, context: CallbackContext, contents: list[types.Content]
+) -> types.Part:
+    """Return the first part of the fast path's answer, which must exist."""
+    response = path.before_model(context, LlmRequest(contents=contents))
+    assert response is not None and response.content and response.content.parts
+    return response.content.parts[0]
+
+
+def confirm(turn: Turn) -> Action | None:
+    if "number?" not in turn.agent_text or turn.message != "yes":
+        return None
+    return Action(tool="lookup", args={"phone": "1"})
+
+
+def greet(result: dict[str, Any], turn: Turn, args: dict[str, Any]) -> Action | None:
+    if result.get("status") != "found":
+        return None
+    return Action(reply=f"{turn.language}: hello {result['name']} ({args['phone']})")
+
+
+def fast_path() -> FastPath:
+    return FastPath(
+        intents=[Intent("confirm", confirm)],
+        handlers={"lookup": greet},
+        detect_language=lambda value: "en" if value == "hi" else None,
+    )
+
+
+def test_turn_reads_the_conversation() -> None:
+    """Turns see the message, the agent's last text and the latest results."""
+    turn = Turn.from_contents(
+        [
+            text("user", "hi"),
+            text("model", "Use this number?"),
+            tool_response("lookup", {"status": "old"}),
+            tool_response("verify", {"status": "ok"}),
+            tool_response("lookup", {"status": "found"}),
+            text("user", "yes"),
+        ]
+    )
+    assert turn.message == "yes"
+    assert turn.agent_text == "Use this number?"
+    assert turn.user_texts == ["hi"]
+    assert turn.results == {"verify": {"status": "ok"}, "lookup": {"status": "found"}}
+    assert turn.last_result() == ("lookup", {"status": "found"})
+
+
+def test_fast_path_calls_tool_then_replies() -> None:
+    """A matched turn calls its tool, and the tool result is templated."""
+    path = fast_path()
+    context = callback_context()
+    contents = [
+        text("user", "hi"),
+        text("model", "Use this number?"),
+        text("user", "yes"),
+    ]
+
+    part = answer(path, context, contents)
+    call = part.function_call
+    assert call is not None and (call.name, call.args) == ("lookup", {"phone": "1"})
+    assert context.state[PENDING_STATE_KEY]["tool"] == "lookup"
+
+    contents += [
+        types.Content(role="model", parts=[part]),
+        tool_response("lookup", {"status": "found", "name": "Ada"}),
+    ]
+    assert answer(path, context, contents).text == "en: hello Ada (1)"
+    assert not context.state[PENDING_STATE_KEY]
+    assert path.snapshot()["served"] == 1
+    assert path.snapshot()["intents"] == {"confirm": 1}
+
+
+def test_unmatched_turns_go_to_the_model() -> None:
+    """Declined intents, declined results and stray tool results fall through."""
+    path = fast_path()
+    context = callback_context()
+    contents = [text("model", "Use this number?"), text("user", "no")]
+    assert path.before_model(context, LlmRequest(contents=contents)) is None
+
+    contents[-1] = text("user", "yes")
+    call = types.Content(role="model", parts=[answer(path, context, contents)])
+    contents += [call, tool_response("lookup", {"status": "not_found"})]
+    assert path.before_model(context, LlmRequest(contents=contents)) is None
+    # Results of tools the model called are not the fast path's business
+    assert path.before_model(context, LlmRequest(contents=contents)) is None
+
+    snapshot = path.snapshot()
+    assert (snapshot["turns"], snapshot["served"], snapshot["handed_over"]) == (2, 0, 1)
+    disabled = fast_path()
+    disabled.enabled = False
+    assert disabled.before_model(context, LlmRequest(contents=contents[:2])) is None
@@ -0,0 +1,58 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import base64
+import json
+
+from app.utils.frames import control_keys, needs_decode
+
+
+def _audio_frame(text: str = "") -> bytes:
+    part: dict = {"inlineData": {"mimeType": "audio/pcm", "data": ""}}
+    part["inlineData"]["data"] = base64.b64encode(bytes(range(256)) * 8).decode()
+    parts = [part]
+    if text:
+        parts.append({"text": text})
+    return json.dumps({"serverContent": {"modelTurn": {"parts": parts}}}).encode()
+
+
+def test_audio_frame_is_passthrough() -> None:
+    """Plain audio chunks should not need decoding."""
+    assert control_keys(_audio_frame()) == ()
+    assert not needs_decode(_audio_frame())
+
+
+def test_control_frames_are_detected() -> None:
+    """Tool calls, cancellations, usage and turn completion are all detected."""
+    tool_call = json.dumps({"toolCall": {"functionCalls": []}})
+    cancellation = json.dumps({"toolCallCancellation": {"ids": ["1"]}})
+    usage = json.dumps({"usageMetadata": {"totalTokenCount": 3}})
+    turn = json.dumps({"serverContent": {"turnComplete": True}})
+
+    assert control_keys(tool_call.encode()) == ("toolCall",)
+    assert control_keys(cancellation.encode()) == ("toolCallCancellation",)
+    assert control_keys(usage) == ("usageMetadata",)
+    assert control_keys(turn.encode()) == ("turnComplete",)
+
+
+def test_quoted_key_inside_text_is_not_a_control_key() -> None:
+    """Escaped quotes inside transcribed text must not trigger a decode."""
+    assert not needs_decode(_audio_frame(text='say "toolCall" please'))
+
+
+def test_control_key_after_audio_payload_is_detected() -> None:
+    """Keys following a skipped inline payload are still found."""
+    frame = json.loads(_audio_frame())
+    frame["serverContent"]["turnComplete"] = True
+    assert control_keys(json.dumps(frame).encode()) == ("turnComplete",)
@@ -0,0 +1,178 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+from collections.abc import AsyncGenerator
+
+import pytest
+from google.adk.agents.llm_agent import LlmAgent
+from google.adk.models.llm_request import LlmRequest
+from google.adk.models.llm_response import LlmResponse
+from google.adk.runners import InMemoryRunner
+from google.genai import types
+from pydantic import Field
+
+from app.utils.hedging import HedgedLlm, deadline_scope
+from tests.fake_llm import FakeLlm
+
+
+def _request(text: str = "hi") -> LlmRequest:
+    return LlmRequest(
+        model="fake-llm",
+        contents=[types.Content(role="user", parts=[types.Part(text=text)])],
+    )
+
+
+class _FailingLlm(FakeLlm):
+    """Fails calls with scripted errors after their latency; None answers."""
+
+    errors: list[BaseException | None] = Field(default_factory=list)
+
+    async def generate_content_async(
+        self, llm_request: LlmRequest, stream: bool = False
+    ) -> AsyncGenerator[LlmResponse, None]:
+        """Raise the call's error, or answer like the FakeLlm."""
+        error = self.errors[self.calls]
+        if error is None:
+            async for response in super().generate_content_async(llm_request, stream):
+                yield response
+            return
+        self.calls += 1
+        await asyncio.sleep(self.latency() if self.latency else 0)
+        raise error
+
+
+def _text(content: types.Content | None) -> str:
+    assert content and content.parts and content.parts[0].text is not None
+    return content.parts[0].text
+
+
+async def _answer(model: HedgedLlm) -> str:
+    responses = [r async for r in model.generate_content_async(_request())]
+    return _text(responses[-1].content)
+
+
+@pytest.mark.asyncio
+async def test_slow_call_is_hedged() -> None:
+    """A call slower than the hedge delay is sent again and the faster wins."""
+    latencies = iter([5.0, 0.01, 5.0])
+    inner = FakeLlm(latency=lambda: next(latencies))
+    model = HedgedLlm(inner=inner, hedge=True, initial_delay=0.05, budget=0.5)
+    assert model.model == "fake-llm"
+
+    loop = asyncio.get_running_loop()
+    started = loop.time()
+    assert await _answer(model) == inner.answer
+    assert loop.time() - started < 1
+    assert inner.calls == 2
+    assert model.stats.hedges == 1
+    assert model.stats.hedge_wins == 1
+
+    # The budget allows one hedge in two calls, so the next slow call waits
+    with pytest.raises(asyncio.TimeoutError):
+        async with deadline_scope(loop.time() + 0.2):
+            await _answer(model)
+    assert inner.calls == 3
+    assert model.stats.over_budget == 1
+
+
+@pytest.mark.asyncio
+async def test_failed_and_cancelled_attempts_are_skipped() -> None:
+    """A cancelled call loses to its hedge, and the first real error is raised."""
+    latencies = iter([0.1, 0.2, 0.1, 0.01])
+    inner = _FailingLlm(
+        latency=lambda: next(latencies),
+        errors=[asyncio.CancelledError(), RuntimeError("upstream down")],
+    )
+    model = HedgedLlm(inner=inner, hedge=True, initial_delay=0.05, budget=1)
+    with pytest.raises(RuntimeError, match="upstream down"):
+        await _answer(model)
+
+    inner.calls = 0
+    inner.errors = [asyncio.CancelledError(), None]
+    assert await _answer(model) == inner.answer
+    assert model.stats.hedge_wins == 1
+
+
+@pytest.mark.asyncio
+async def test_deadline_scope_times_out_only_its_block() -> None:
+    """The deadline raises a timeout; other cancellations pass through."""
+    loop = asyncio.get_running_loop()
+    with pytest.raises(asyncio.TimeoutError):
+        async with deadline_scope(loop.time() + 0.01):
+            await asyncio.sleep(1)
+    # The task is usable again after the timeout
+    await asyncio.sleep(0)
+    async with deadline_scope(loop.time() + 1):
+        await asyncio.sleep(0)
+
+    async def wait() -> None:
+        async with deadline_scope(loop.time() + 1):
+            await asyncio.sleep(1)
+
+    task = asyncio.create_task(wait())
+    await asyncio.sleep(0)
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+
+
+@pytest.mark.asyncio
+async def test_deadline_reaches_upstream_request() -> None:
+    """Model calls under a deadline carry the time left as HTTP timeout."""
+    inner = FakeLlm()
+    model = HedgedLlm(inner=inner)
+    async with deadline_scope(asyncio.get_running_loop().time() + 2):
+        await _answer(model)
+    first = inner.last_request
+    assert first is not None and first.config.http_options is not None
+    timeout = first.config.http_options.timeout
+    assert timeout is not None and 1500 < timeout <= 2000
+
+    await _answer(model)
+    second = inner.last_request
+    assert second is not None and second.config.http_options is None
+
+
+@pytest.mark.asyncio
+async def test_hedging_does_not_repeat_tool_calls() -> None:
+    """Only the winning response's tool call is executed."""
+    cancelled: list[str] = []
+
+    def cancel_flight(ticket_number: str) -> dict:
+        """Cancel a flight."""
+        cancelled.append(ticket_number)
+        return {"status": "cancelled"}
+
+    latencies = iter([0.3, 0.01, 0.3, 0.01])
+    inner = FakeLlm(
+        latency=lambda: next(latencies, 0.0),
+        tool_calls=[("cancel_flight", {"ticket_number": "TK123"})],
+    )
+    model = HedgedLlm(inner=inner, hedge=True, initial_delay=0.05, budget=1)
+    agent = LlmAgent(name="agent", model=model, tools=[cancel_flight])
+    runner = InMemoryRunner(agent=agent, app_name="app")
+    session = await runner.session_service.create_session(app_name="app", user_id="u")
+    events = [
+        event
+        async for event in runner.run_async(
+            user_id="u",
+            session_id=session.id,
+            new_message=types.Content(role="user", parts=[types.Part(text="cancel")]),
+        )
+    ]
+
+    assert cancelled == ["TK123"]
+    assert _text(events[-1].content) == inner.answer
+    assert model.stats.hedge_wins == 2
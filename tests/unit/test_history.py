@@ -0,0 +1,153 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from types import SimpleNamespace
+from typing import cast
+
+from google.adk.agents.callback_context import CallbackContext
+from google.adk.models.llm_request import LlmRequest
+from google.genai import types
+
+from app.utils.history import FACTS_STATE_KEY, HistoryCompactor, split_turns
+
+
+def _text(role: str, text: str) -> types.Content:
+    return types.Content(role=role, parts=[types.Part(text=text)])
+
+
+def _part(content: types.Content) -> types.Part:
+    assert content.parts
+    return content.parts[0]
+
+
+def _context() -> CallbackContext:
+    return cast(CallbackContext, SimpleNamespace(state={}, invocation_id="inv-1"))
+
+
+def _tool(name: str, args: dict, response: dict, call_id: str) -> list[types.Content]:
+    call = types.FunctionCall(id=call_id, name=name, args=args)
+    result = types.FunctionResponse(id=call_id, name=name, response=response)
+    return [
+        types.Content(role="model", parts=[types.Part(function_call=call)]),
+        types.Content(role="user", parts=[types.Part(function_response=result)]),
+    ]
+
+
+def _conversation() -> list[types.Content]:
+    flight = {
+        "ticket_number": "235-1234567890",
+        "flight_number": "TK1984",
+        "origin": "IST",
+        "destination": "JFK",
+        "date": "2025-01-01",
+        "seat": "23A",
+    }
+    return [
+        _text("user", "Hi, yes use my number"),
+        *_tool(
+            "get_customer_info_tool",
+            {"phone_number": "05551234567"},
+            {"status": "found", "phone_number": "05551234567", "flights": [flight]},
+            "c1",
+        ),
+        _text("model", "Could you give me the last five digits of your ID?"),
+        _text("user", "78912"),
+        *_tool(
+            "verify_id_tool",
+            {"phone_number": "05551234567", "id_last_5_digits": "78912"},
+            {"status": "verified", "name": "Gizem Kaya"},
+            "c2",
+        ),
+        _text("model", "Thank you, you are verified."),
+        _text("user", "How much baggage can I take?"),
+        *_tool(
+            "baggage_info_tool",
+            {"ticket_number": "235-1234567890"},
+            {"message": "Baggage allowance: 30kg checked."},
+            "c3",
+        ),
+        _text("model", "You can take 30kg."),
+        _text("user", "And can I upgrade?"),
+    ]
+
+
+def test_old_tool_calls_become_facts() -> None:
+    """Turns before the last N keep their text, tool pairs turn into facts."""
+    compactor = HistoryCompactor(keep_turns=2)
+    facts: dict = {}
+    contents, pairs, dropped = compactor.compact(_conversation(), facts)
+
+    assert (pairs, dropped) == (2, 0)
+    assert len(split_turns(contents)) == 4
+    # Old turns are text only, the last two turns are untouched
+    assert [_part(c).text for c in contents[:5]] == [
+        "Hi, yes use my number",
+        "Could you give me the last five digits of your ID?",
+        "78912",
+        "Thank you, you are verified.",
+        "How much baggage can I take?",
+    ]
+    call = _part(contents[5]).function_call
+    assert call is not None and call.name == "baggage_info_tool"
+    assert facts == {
+        "customer_phone": "05551234567",
+        "tickets": ["235-1234567890 TK1984 IST JFK on 2025-01-01"],
+        "customer_name": "Gizem Kaya",
+        "customer_verified": True,
+    }
+
+
+def test_token_budget_drops_oldest_turns() -> None:
+    """Over budget the oldest turns go, but never the current one."""
+    compactor = HistoryCompactor(keep_turns=1, max_tokens=10)
+    facts: dict = {}
+    contents, _, dropped = compactor.compact(_conversation(), facts)
+
+    assert dropped == 3
+    assert contents == [_text("user", "And can I upgrade?")]
+    assert facts["selected_ticket"] == "235-1234567890"
+    assert facts["actions"] == [
+        "baggage_info 235-1234567890: Baggage allowance: 30kg checked."
+    ]
+
+
+def test_before_model_reports_tokens_saved() -> None:
+    """The callback rewrites the request, saves facts and counts tokens saved."""
+    compactor = HistoryCompactor(keep_turns=1)
+    request = LlmRequest(contents=_conversation())
+    context = _context()
+
+    assert compactor.before_model(context, request) is None
+    assert len(split_turns(request.contents)) == 4
+    assert context.state[FACTS_STATE_KEY]["customer_verified"] is True
+    instruction = request.config.system_instruction
+    assert isinstance(instruction, str)
+    assert "customer verified: True" in instruction
+
+    saved = compactor.tokens_saved("inv-1")
+    assert saved > 0
+    assert saved == compactor.stats.tokens_before - compactor.stats.tokens_after
+    assert compactor.tokens_saved("inv-1") == 0
+
+
+def test_repeated_model_calls_record_each_action_once() -> None:
+    """Folding the same old turns on every model call adds no duplicate facts."""
+    compactor = HistoryCompactor(keep_turns=1)
+    context = _context()
+    for _ in range(4):
+        compactor.before_model(context, LlmRequest(contents=_conversation()))
+
+    assert context.state[FACTS_STATE_KEY]["actions"] == [
+        "baggage_info 235-1234567890: Baggage allowance: 30kg checked."
+    ]
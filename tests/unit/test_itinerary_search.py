@@ -0,0 +1,102 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from datetime import date, datetime
+from typing import Any
+
+import pytest
+
+from app.utils.itinerary_search import ItinerarySearch
+
+AIRPORTS = """code,name,utc_offset_minutes,min_connection_minutes
+IST,Istanbul,180,60
+FRA,Frankfurt,60,45
+LHR,London Heathrow,0,75
+JFK,New York JFK,-300,90
+"""
+TIMETABLE = """flight_number,origin,destination,departure,duration_minutes,days
+TK1,IST,JFK,14:30,660,1234567
+TK3,IST,FRA,08:00,180,1234567
+LH1,FRA,JFK,09:30,540,1234567
+LH3,FRA,JFK,10:00,540,1234567
+TK5,IST,LHR,07:00,240,6
+BA1,LHR,JFK,09:45,480,6
+"""
+
+
+@pytest.fixture
+def search(tmp_path: Any) -> ItinerarySearch:
+    (tmp_path / "airports.csv").write_text(AIRPORTS)
+    (tmp_path / "timetable.csv").write_text(TIMETABLE)
+    return ItinerarySearch.from_files(
+        str(tmp_path / "airports.csv"),
+        str(tmp_path / "timetable.csv"),
+        start=date(2025, 6, 2),
+        days=7,
+    )
+
+
+def _flights(
+    search: ItinerarySearch, origin: str, when: datetime, **kwargs: Any
+) -> list[list[str]]:
+    itineraries = search.search(
+        origin, "JFK", search.local_minutes(origin, when), **kwargs
+    )
+    return [[leg.flight_number for leg in itinerary.legs] for itinerary in itineraries]
+
+
+def test_connections_honor_minimum_connection_time(search: ItinerarySearch) -> None:
+    """TK3 lands in FRA at 09:00 local, too late for LH1 at 09:30 with the
+    45 minute connection time, so it connects to LH3 at 10:00."""
+    itineraries = search.search(
+        "IST", "JFK", search.local_minutes("IST", datetime(2025, 6, 3, 6, 0)), k=2
+    )
+    assert [[leg.flight_number for leg in it.legs] for it in itineraries] == [
+        ["TK3", "LH3"],
+        ["TK1"],
+    ]
+    assert itineraries[0].transfer_airports == ["FRA"]
+    assert itineraries[0].layovers == [60]
+    assert search.local_time("JFK", itineraries[0].arrival) == datetime(
+        2025, 6, 3, 13, 0
+    )
+
+
+def test_requested_time_and_direct_only(search: ItinerarySearch) -> None:
+    """Flights before the requested time are skipped; direct_only drops stops."""
+    late = search.search(
+        "IST",
+        "JFK",
+        search.local_minutes("IST", datetime(2025, 6, 3, 15, 0)),
+        k=1,
+        direct_only=True,
+    )
+    assert [leg.flight_number for leg in late[0].legs] == ["TK1"]
+    assert search.local_time("IST", late[0].departure) == datetime(2025, 6, 4, 14, 30)
+    assert _flights(
+        search, "IST", datetime(2025, 6, 3, 6, 0), k=3, direct_only=True
+    ) == [["TK1"]]
+    assert _flights(search, "FRA", datetime(2025, 6, 3, 6, 0), k=3, max_stops=0) == [
+        ["LH1"],
+        ["LH3"],
+    ]
+
+
+def test_weekday_only_flights(search: ItinerarySearch) -> None:
+    """The Saturday-only London routing only shows up on Saturdays."""
+    saturday = _flights(search, "IST", datetime(2025, 6, 7, 6, 0), k=3)
+    assert saturday[0] == ["TK5", "BA1"]
+    weekday = _flights(search, "IST", datetime(2025, 6, 5, 6, 0), k=3)
+    assert ["TK5", "BA1"] not in weekday
+    assert search.search("IST", "XXX", 0) == []
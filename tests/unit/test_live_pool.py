@@ -0,0 +1,105 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+import json
+import time
+
+import pytest
+
+from app.utils.live_pool import LiveSessionPool
+from tests.fake_live_server import FakeLiveServer
+
+
+async def _wait_for_idle(pool: LiveSessionPool, count: int) -> None:
+    for _ in range(200):
+        if pool.stats.idle >= count:
+            return
+        await asyncio.sleep(0.01)
+    raise AssertionError(f"pool never reached {count} idle sessions")
+
+
+@pytest.mark.asyncio
+async def test_prewarmed_session_skips_setup_latency() -> None:
+    """After the first miss, clients get an already set-up session."""
+    async with FakeLiveServer(setup_delay=0.1) as server:
+        pool = LiveSessionPool(server.connect, max_size=1, idle_ttl=30)
+
+        start = time.perf_counter()
+        async with pool.session():
+            cold = time.perf_counter() - start
+        await _wait_for_idle(pool, 1)
+
+        start = time.perf_counter()
+        async with pool.session() as session:
+            warm = time.perf_counter() - start
+            await session._ws.send(json.dumps({"clientContent": {"turns": []}}))
+            reply = json.loads(await session._ws.recv(decode=False))
+            assert reply["serverContent"]["modelTurn"]["parts"][0]["text"] == "ok"
+        await pool.close()
+
+    assert pool.stats.misses == 1
+    assert pool.stats.hits == 1
+    assert cold >= 0.1
+    assert warm < 0.05
+
+
+@pytest.mark.asyncio
+async def test_started_pool_serves_the_first_client_warm() -> None:
+    """Filling starts with the application, before any client arrives."""
+    async with FakeLiveServer(setup_delay=0.1) as server:
+        pool = LiveSessionPool(server.connect, max_size=1, idle_ttl=30)
+        pool.start()
+        await _wait_for_idle(pool, 1)
+        async with pool.session():
+            pass
+        await pool.close()
+
+    assert (pool.stats.hits, pool.stats.misses) == (1, 0)
+
+
+@pytest.mark.asyncio
+async def test_idle_sessions_expire_after_ttl() -> None:
+    """Sessions idle for longer than the TTL are not handed out."""
+    async with FakeLiveServer() as server:
+        pool = LiveSessionPool(
+            server.connect, max_size=1, idle_ttl=0.05, refill_interval=60
+        )
+        async with pool.session():
+            pass
+        await _wait_for_idle(pool, 1)
+        await asyncio.sleep(0.1)
+
+        async with pool.session():
+            pass
+        await pool.close()
+        assert not pool._discards
+
+    assert pool.stats.expired == 1
+    assert pool.stats.hits == 0
+    assert pool.stats.misses == 2
+
+
+@pytest.mark.asyncio
+async def test_disabled_pool_connects_on_demand_only() -> None:
+    """With max_size 0 no session is opened ahead of time."""
+    async with FakeLiveServer() as server:
+        pool = LiveSessionPool(server.connect, max_size=0)
+        async with pool.session():
+            pass
+        await asyncio.sleep(0.05)
+        await pool.close()
+
+    assert server.connections == 1
+    assert pool.stats.idle == 0
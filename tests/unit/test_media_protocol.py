@@ -0,0 +1,74 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import base64
+import json
+
+import pytest
+
+from app.utils.media_protocol import (
+    BINARY_MEDIA_SUBPROTOCOL,
+    KIND_AUDIO_PCM,
+    KIND_IMAGE_JPEG,
+    decode_media_frame,
+    encode_media_frame,
+    negotiate_subprotocol,
+    realtime_input_message,
+)
+
+
+def test_negotiate_subprotocol() -> None:
+    """Only clients offering the binary sub-protocol get it."""
+    assert negotiate_subprotocol(["other", BINARY_MEDIA_SUBPROTOCOL]) == (
+        BINARY_MEDIA_SUBPROTOCOL
+    )
+    assert negotiate_subprotocol([]) is None
+    assert negotiate_subprotocol(None) is None
+
+
+def test_round_trip_audio_and_image() -> None:
+    """Frames decode back to the Gemini mime type and the raw payload."""
+    pcm = bytes(range(64))
+    assert decode_media_frame(encode_media_frame(KIND_AUDIO_PCM, pcm, 16000)) == (
+        "audio/pcm;rate=16000",
+        pcm,
+    )
+    jpeg = b"\xff\xd8\xff\xe0"
+    assert decode_media_frame(encode_media_frame(KIND_IMAGE_JPEG, jpeg)) == (
+        "image/jpeg",
+        jpeg,
+    )
+
+
+def test_invalid_frames_are_rejected() -> None:
+    """Truncated headers and unknown kinds raise ValueError."""
+    with pytest.raises(ValueError):
+        decode_media_frame(b"\x01")
+    with pytest.raises(ValueError):
+        decode_media_frame(encode_media_frame(9, b"x"))
+
+
+def test_realtime_input_message_matches_json_protocol() -> None:
+    """The upstream message is the same realtimeInput the JSON clients send."""
+    message = json.loads(realtime_input_message("audio/pcm;rate=16000", b"\x00\x01"))
+    assert message == {
+        "realtimeInput": {
+            "mediaChunks": [
+                {
+                    "mimeType": "audio/pcm;rate=16000",
+                    "data": base64.b64encode(b"\x00\x01").decode(),
+                }
+            ]
+        }
+    }
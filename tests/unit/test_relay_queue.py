@@ -0,0 +1,95 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+
+import pytest
+
+from app.utils.relay_queue import RelayQueue
+
+
+@pytest.mark.asyncio
+async def test_drop_oldest_discards_stale_audio_only() -> None:
+    """Under pressure the oldest droppable items go, control messages stay."""
+    queue = RelayQueue(high_watermark=4, low_watermark=2, drop_oldest=True)
+    await queue.put("setup", droppable=False)
+    for i in range(3):
+        await queue.put(f"audio-{i}", droppable=True)
+    await queue.put("audio-3", droppable=True)
+
+    items = [await queue.get() for _ in range(len(queue))]
+    assert items == ["setup", "audio-2", "audio-3"]
+    assert queue.stats.dropped == 2
+    assert queue.stats.max_depth == 4
+
+
+@pytest.mark.asyncio
+async def test_blocking_queue_waits_for_low_watermark() -> None:
+    """A non-dropping queue blocks the producer until drained to the low mark."""
+    queue = RelayQueue(high_watermark=3, low_watermark=1)
+    for i in range(3):
+        await queue.put(i)
+
+    producer = asyncio.create_task(queue.put(3))
+    await asyncio.sleep(0)
+    assert not producer.done()
+
+    assert await queue.get() == 0
+    await asyncio.sleep(0)
+    assert not producer.done()
+    assert await queue.get() == 1
+    await asyncio.wait_for(producer, timeout=1)
+
+    assert queue.stats.blocked == 1
+    assert queue.stats.dropped == 0
+    assert [await queue.get() for _ in range(2)] == [2, 3]
+
+
+@pytest.mark.asyncio
+async def test_close_drains_then_ends() -> None:
+    """Queued items survive close(); get() then returns None."""
+    queue = RelayQueue(high_watermark=2, low_watermark=0)
+    await queue.put("a")
+    queue.close()
+    await queue.put("ignored")
+
+    assert await queue.get() == "a"
+    assert await queue.get() is None
+    assert queue.snapshot()["enqueued"] == 1
+
+
+@pytest.mark.asyncio
+async def test_discard_droppable_keeps_control_frames() -> None:
+    """Discarding pending audio keeps the other items and wakes the producer."""
+    queue = RelayQueue(high_watermark=3, low_watermark=1)
+    await queue.put("audio-0", droppable=True)
+    await queue.put("transcript")
+    await queue.put("audio-1", droppable=True)
+    producer = asyncio.create_task(queue.put("interrupted"))
+    await asyncio.sleep(0)
+    assert not producer.done()
+
+    assert queue.discard_droppable() == 2
+    await asyncio.wait_for(producer, timeout=1)
+    assert [await queue.get() for _ in range(len(queue))] == [
+        "transcript",
+        "interrupted",
+    ]
+    assert queue.stats.dropped == 2
+
+
+def test_invalid_watermarks() -> None:
+    """The low watermark has to be below the high watermark."""
+    with pytest.raises(ValueError):
+        RelayQueue(high_watermark=2, low_watermark=2)
@@ -0,0 +1,79 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import json
+
+from google.genai import types
+
+from app.utils.resumption import ReplayBuffer, ResumptionState
+
+
+def test_tracks_latest_resumable_handle() -> None:
+    """Only resumable updates replace the handle."""
+    state = ResumptionState()
+    state.observe_server_message(
+        {"sessionResumptionUpdate": {"newHandle": "h1", "resumable": True}}
+    )
+    state.observe_server_message(
+        {"sessionResumptionUpdate": {"newHandle": "h2", "resumable": False}}
+    )
+    assert state.handle == "h1"
+
+    config = state.connect_config(types.LiveConnectConfig())
+    assert config.session_resumption is not None
+    assert config.session_resumption.handle == "h1"
+    assert state.replay_message() is None
+
+
+def test_history_replay_without_handle() -> None:
+    """Without a handle the conversation is re-seeded from transcripts."""
+    state = ResumptionState()
+    state.observe_client_content(
+        {"turns": [{"role": "user", "parts": [{"text": "Hi"}]}]}
+    )
+    state.observe_server_message(
+        {"serverContent": {"inputTranscription": {"text": "My AC shows E4"}}}
+    )
+    state.observe_server_message(
+        {"serverContent": {"outputTranscription": {"text": "Let me check."}}}
+    )
+    state.observe_server_message({"serverContent": {"turnComplete": True}})
+
+    replay = json.loads(state.replay_message() or "{}")
+    assert replay["clientContent"]["turnComplete"] is False
+    assert [turn["role"] for turn in replay["clientContent"]["turns"]] == [
+        "user",
+        "user",
+        "model",
+    ]
+    assert replay["clientContent"]["turns"][2]["parts"][0]["text"] == "Let me check."
+
+
+def test_replay_buffer_evicts_oldest_audio_only() -> None:
+    """Control messages survive while the oldest audio frames are evicted."""
+    buffer = ReplayBuffer(max_audio_frames=2)
+    buffer.append("audio-0", droppable=True)
+    buffer.append("text", droppable=False)
+    buffer.append("audio-1", droppable=True)
+    buffer.append("audio-2", droppable=True)
+    buffer.appendleft("in-flight")
+
+    assert [buffer.popleft() for _ in range(len(buffer))] == [
+        "in-flight",
+        "text",
+        "audio-1",
+        "audio-2",
+    ]
+    assert buffer.dropped == 1
+    assert buffer.replayed == 4
@@ -0,0 +1,128 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+
+import pytest
+
+from app.utils.run_gate import RunGate, normalize_message
+
+
+def test_normalize_message() -> None:
+    """Case, spacing and compatibility forms do not make messages differ."""
+    assert normalize_message("  Cancel   my FLIGHT\n") == "cancel my flight"
+    assert normalize_message("\uff34\uff2b1980") == normalize_message("tk1980")
+
+
+@pytest.mark.asyncio
+async def test_runs_for_one_session_never_overlap() -> None:
+    """Different messages for a session run one after another, in order."""
+    gate = RunGate()
+    order: list[str] = []
+
+    async def run(name: str) -> str:
+        order.append(f"start {name}")
+        await asyncio.sleep(0.01)
+        order.append(f"end {name}")
+        return name
+
+    results = await asyncio.gather(
+        *(gate.run("s1", name, lambda name=name: run(name)) for name in "abc"),
+        gate.run("s2", "d", lambda: run("d")),
+    )
+    assert results == ["a", "b", "c", "d"]
+    session_one = [step for step in order if step[-1] in "abc"]
+    assert session_one == [
+        "start a", "end a", "start b", "end b", "start c", "end c"
+    ]  # fmt: skip
+    # s2 ran alongside s1
+    assert order.index("start d") < order.index("end a")
+    assert gate.stats.queued == 2
+    assert gate.stats.max_waiting == 2
+    assert gate.stats.waiting == 0
+    assert gate._sessions == {}
+
+
+@pytest.mark.asyncio
+async def test_duplicate_in_flight_message_shares_run() -> None:
+    """A resubmit within the window gets the first run's result."""
+    now = [0.0]
+    gate = RunGate(window=5, clock=lambda: now[0])
+    calls = 0
+
+    async def run() -> int:
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return calls
+
+    first = asyncio.create_task(gate.run("s1", "Hello", run))
+    await asyncio.sleep(0)
+    second = asyncio.create_task(gate.run("s1", "hello ", run))
+    await asyncio.sleep(0)
+    now[0] = 6
+    late = asyncio.create_task(gate.run("s1", "hello", run))
+    assert await asyncio.gather(first, second, late) == [1, 1, 2]
+    assert gate.stats.coalesced == 1
+    assert gate.stats.runs == 2
+
+    # Finished runs are not reused, and failures reach every joined request
+    async def fail() -> int:
+        await asyncio.sleep(0.01)
+        raise RuntimeError("model down")
+
+    assert await gate.run("s1", "hello", run) == 3
+    results = await asyncio.gather(
+        gate.run("s1", "again", fail),
+        gate.run("s1", "Again", run),
+        return_exceptions=True,
+    )
+    assert all(isinstance(result, RuntimeError) for result in results)
+    assert gate._inflight == {}
+
+
+@pytest.mark.asyncio
+async def test_cancelled_originator_leaves_the_run_to_duplicates() -> None:
+    """A request that disconnects does not cancel a run others joined."""
+    gate = RunGate(window=5)
+    started = asyncio.Event()
+    cancelled = []
+
+    async def run() -> str:
+        started.set()
+        try:
+            await asyncio.sleep(0.05)
+        except asyncio.CancelledError:
+            cancelled.append(True)
+            raise
+        return "answer"
+
+    first = asyncio.create_task(gate.run("s1", "hello", run))
+    await started.wait()
+    second = asyncio.create_task(gate.run("s1", "hello", run))
+    third = asyncio.create_task(gate.run("s1", "hello", run))
+    await asyncio.sleep(0)
+    first.cancel()
+    assert await asyncio.gather(second, third) == ["answer", "answer"]
+    assert first.cancelled()
+    assert gate.stats.runs == 1
+
+    # Once nobody waits for it, the run is cancelled
+    started.clear()
+    alone = asyncio.create_task(gate.run("s1", "other", run))
+    await started.wait()
+    alone.cancel()
+    await asyncio.sleep(0.01)
+    assert cancelled == [True]
+    assert gate._inflight == {} and gate._sessions == {}
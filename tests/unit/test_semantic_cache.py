@@ -0,0 +1,130 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import pytest
+from google.adk.agents import LlmAgent
+from google.adk.runners import InMemoryRunner
+from google.genai import types
+
+from app.utils.semantic_cache import HashingEmbedder, SemanticCache
+from tests.fake_llm import FakeLlm
+
+
+class Clock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def cached_answer(cache: SemanticCache, question: str) -> str | None:
+    hit = cache.lookup(question)
+    return None if hit is None else hit.answer
+
+
+def test_similar_questions_share_an_answer() -> None:
+    """Rephrased questions hit; other topics and other error codes miss."""
+    cache = SemanticCache(HashingEmbedder())
+    cache.store("Klimanin filtresi nasil temizlenir?", "Filtreyi suyla yikayin.")
+    cache.store("What does error E4 mean?", "E4 is a sensor fault.")
+
+    hit = cache.lookup("KLIMANIN FILTRESI NASIL TEMIZLENIR")
+    assert hit is not None and hit.answer == "Filtreyi suyla yikayin."
+    assert cached_answer(cache, "what does error e4 mean") == "E4 is a sensor fault."
+    assert cache.lookup("What does error E5 mean?") is None
+    assert cache.lookup("How do I set the timer?") is None
+    assert cache.snapshot()["hit_rate"] == 0.5
+
+
+def test_opposite_questions_do_not_share_an_answer() -> None:
+    """Negations and on/off words keep near-identical questions apart."""
+    cache = SemanticCache(HashingEmbedder(), threshold=0.8)
+    cache.store("How do I turn on the timer?", "Press the timer button.")
+    cache.store("Why is the fan running?", "The fan dries the coil.")
+
+    assert cached_answer(cache, "how do i turn on the timer") == (
+        "Press the timer button."
+    )
+    assert cache.lookup("How do I turn off the timer?") is None
+    assert cache.lookup("Why is the fan not running?") is None
+
+
+def test_entries_expire_are_evicted_and_follow_the_corpus() -> None:
+    """TTL, LRU order and a corpus version change all drop answers."""
+    clock = Clock()
+    cache = SemanticCache(HashingEmbedder(), ttl=10, max_entries=2, clock=clock)
+    cache.store("filter cleaning steps", "a")
+    cache.store("timer setup steps", "b")
+    assert cached_answer(cache, "filter cleaning steps") == "a"
+    cache.store("remote control battery", "c")
+    assert cache.lookup("timer setup steps") is None
+    assert cached_answer(cache, "filter cleaning steps") == "a"
+
+    clock.now = 11
+    assert cache.lookup("filter cleaning steps") is None
+    cache.store("filter cleaning steps", "a")
+    cache.set_corpus_version("2")
+    assert len(cache) == 0 and cache.bytes == 0
+    snapshot = cache.snapshot()
+    assert (snapshot["evictions"], snapshot["expirations"]) == (1, 2)
+    assert snapshot["invalidations"] == 1
+
+
+@pytest.mark.asyncio
+async def test_agent_answers_repeated_first_questions_from_the_cache() -> None:
+    """A cached answer skips retrieval and the model; follow-ups are not cached."""
+    retrieved: list[str] = []
+
+    def retrieve_rag_documentation(query: str) -> dict:
+        """Retrieve documentation."""
+        retrieved.append(query)
+        return {"documents": ["Clean the filter every two weeks."]}
+
+    model = FakeLlm(
+        answer="Clean the filter every two weeks.",
+        tool_calls=[("retrieve_rag_documentation", {"query": "filter"})],
+    )
+    cache = SemanticCache(HashingEmbedder())
+    agent = LlmAgent(
+        name="agent",
+        model=model,
+        tools=[retrieve_rag_documentation],
+        before_model_callback=cache.before_model,
+        after_model_callback=cache.after_model,
+    )
+    runner = InMemoryRunner(agent=agent, app_name="app")
+
+    async def ask(session_id: str, text: str) -> str:
+        events = [
+            event
+            async for event in runner.run_async(
+                user_id="u",
+                session_id=session_id,
+                new_message=types.Content(role="user", parts=[types.Part(text=text)]),
+            )
+        ]
+        content = events[-1].content
+        assert content and content.parts and content.parts[0].text is not None
+        return content.parts[0].text
+
+    first = await runner.session_service.create_session(app_name="app", user_id="u")
+    second = await runner.session_service.create_session(app_name="app", user_id="u")
+    assert await ask(first.id, "How do I clean the filter?") == model.answer
+    assert (model.calls, len(cache)) == (2, 1)
+    assert await ask(second.id, "how do i clean the filter") == model.answer
+    assert model.calls == 2 and len(retrieved) == 1
+
+    await ask(second.id, "How do I clean the filter?")
+    assert model.calls == 4 and len(cache) == 1
@@ -12,15 +12,21 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import asyncio
+import base64
 import json
 import logging
 import os
+import time
 from collections.abc import Generator
+from typing import Any, cast
 from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
+from fastapi import WebSocket
 from fastapi.testclient import TestClient
 from google.auth.credentials import Credentials
+from google.genai import types
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
@@ -142,3 +148,585 @@ def test_websocket_error_handling() -> None:
             with client.websocket_connect("/ws"):
                 pass
         assert str(exc.value) == "Connection failed"
+
+
+@pytest.mark.asyncio
+async def test_websocket_binary_media() -> None:
+    """Binary media frames are forwarded upstream as realtimeInput JSON."""
+    from app.server import app
+    from app.utils.media_protocol import (
+        BINARY_MEDIA_SUBPROTOCOL,
+        KIND_AUDIO_PCM,
+        encode_media_frame,
+    )
+
+    mock_session = AsyncMock()
+    mock_session._ws = AsyncMock()
+
+    async def recv_until_client_leaves(decode: bool = False) -> bytes | None:
+        # Keep the Gemini side open; the relay cancels this when the client
+        # hangs up at the end of the test.
+        await asyncio.sleep(5)
+        return None
+
+    mock_session._ws.recv.side_effect = recv_until_client_leaves
+
+    with patch("app.server.genai_client") as mock_genai:
+        mock_genai.aio.live.connect.return_value.__aenter__.return_value = mock_session
+        client = TestClient(app)
+        with client.websocket_connect(
+            "/ws", subprotocols=[BINARY_MEDIA_SUBPROTOCOL]
+        ) as websocket:
+            assert websocket.accepted_subprotocol == BINARY_MEDIA_SUBPROTOCOL
+            data = websocket.receive_json()
+            assert data["status"] == "Backend is ready for conversation"
+
+            pcm = bytes(range(256))
+            websocket.send_bytes(encode_media_frame(KIND_AUDIO_PCM, pcm, 16000))
+            for _ in range(200):
+                if mock_session._ws.send.await_count:
+                    break
+                await asyncio.sleep(0.01)
+
+    sent = json.loads(mock_session._ws.send.await_args.args[0])
+    chunk = sent["realtimeInput"]["mediaChunks"][0]
+    assert chunk["mimeType"] == "audio/pcm;rate=16000"
+    assert base64.b64decode(chunk["data"]) == pcm
+
+
+class _FakeClientSocket:
+    """Client side websocket driven by the test."""
+
+    def __init__(self) -> None:
+        self.incoming: asyncio.Queue = asyncio.Queue()
+        self.statuses: list[str] = []
+        self.frames: list[bytes] = []
+
+    async def receive(self) -> dict:
+        return await self.incoming.get()
+
+    async def send_json(self, data: dict) -> None:
+        self.statuses.append(data["status"])
+
+    async def send_bytes(self, data: bytes) -> None:
+        self.frames.append(data)
+
+    def send_text_frame(self, data: dict) -> None:
+        self.incoming.put_nowait(
+            {"type": "websocket.receive", "text": json.dumps(data)}
+        )
+
+    @property
+    def websocket(self) -> WebSocket:
+        """The fake, typed as the WebSocket the server takes."""
+        return cast(WebSocket, self)
+
+
+async def _wait_until(condition: Any, timeout: float = 5.0) -> None:
+    for _ in range(int(timeout / 0.01)):
+        if condition():
+            return
+        await asyncio.sleep(0.01)
+    raise AssertionError("condition not met in time")
+
+
+@pytest.mark.asyncio
+async def test_dropped_model_connection_is_resumed() -> None:
+    """A dropped model connection resumes with the handle and replays input."""
+    from app import server
+    from app.utils.live_pool import LiveSessionPool
+    from tests.fake_live_server import FakeLiveServer
+
+    audio = {
+        "realtimeInput": {
+            "mediaChunks": [{"mimeType": "audio/pcm;rate=16000", "data": "AAAA"}]
+        }
+    }
+    async with FakeLiveServer(resumable=True) as fake:
+        client = _FakeClientSocket()
+        with (
+            patch.object(
+                server, "live_pool", LiveSessionPool(fake.connect, max_size=0)
+            ),
+            patch.object(server, "genai_client") as mock_genai,
+            patch.object(server, "gcp_logger", None),
+            # The silent test audio must reach the model
+            patch.object(server, "VAD_ENABLED", False),
+        ):
+            mock_genai.aio.live.connect.side_effect = fake.connect
+            run = asyncio.create_task(
+                server.get_connect_and_run_callable(client.websocket)()
+            )
+
+            client.send_text_frame({"setup": {"run_id": "r", "user_id": "u"}})
+            client.send_text_frame(audio)
+            await _wait_until(lambda: len(fake.received) == 1)
+
+            await fake.drop_connections()
+            client.send_text_frame(audio)
+            client.send_text_frame(audio)
+            await _wait_until(lambda: len(fake.received) == 3)
+
+            client.incoming.put_nowait({"type": "websocket.disconnect"})
+            await asyncio.wait_for(run, timeout=5)
+
+    assert fake.setups[1]["setup"]["sessionResumption"] == {"handle": "handle-1"}
+    assert client.statuses[-1] == "Backend is ready for conversation"
+    assert server.reconnect_time.count >= 1
+
+
+@pytest.mark.asyncio
+async def test_in_flight_message_is_kept_only_for_a_resume() -> None:
+    """A message cut off mid-send is replayed, flags intact, only on reconnect."""
+    from app.server import GeminiSession
+
+    async def send_forever(message: str) -> None:
+        await asyncio.sleep(5)
+
+    for reconnecting in (True, False):
+        model = AsyncMock()
+        model._ws.send.side_effect = send_forever
+        relay = GeminiSession(model, _FakeClientSocket().websocket, {})
+        await relay.upstream.put("audio", droppable=True)
+        sender = asyncio.create_task(relay.send_to_gemini())
+        await _wait_until(lambda model=model: model._ws.send.await_count == 1)
+        relay.reconnecting = reconnecting
+        sender.cancel()
+        await asyncio.gather(sender, return_exceptions=True)
+
+        if reconnecting:
+            assert list(relay.replay_buffer._items) == [("audio", True)]
+        else:
+            assert len(relay.replay_buffer) == 0
+
+
+@pytest.mark.asyncio
+async def test_tool_response_goes_to_the_resumed_session() -> None:
+    """A tool call in flight across a resume answers on the new connection."""
+    from app.server import GeminiSession
+
+    started, release = asyncio.Event(), asyncio.Event()
+
+    async def lookup(value: str) -> dict:
+        started.set()
+        await release.wait()
+        return {"value": value}
+
+    old, new = AsyncMock(), AsyncMock()
+    relay = GeminiSession(old, _FakeClientSocket().websocket, {"lookup": lookup})
+    call = types.FunctionCall(id="1", name="lookup", args={"value": "x"})
+    task = asyncio.create_task(
+        relay._handle_tool_call(types.LiveServerToolCall(function_calls=[call]))
+    )
+    await started.wait()
+    relay.session = new
+    release.set()
+    await task
+
+    old.send.assert_not_awaited()
+    new.send.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_model_audio_uses_negotiated_codec() -> None:
+    """Model audio reaches binary clients encoded with the codec they offered."""
+    from app import server
+    from app.utils.live_pool import LiveSessionPool
+    from app.utils.media_protocol import BINARY_MEDIA_SUBPROTOCOL, HEADER
+    from tests.fake_live_server import FakeLiveServer
+
+    async with FakeLiveServer() as fake:
+        client = _FakeClientSocket()
+        with (
+            patch.object(
+                server, "live_pool", LiveSessionPool(fake.connect, max_size=0)
+            ),
+            patch.object(server, "gcp_logger", None),
+            patch.object(server, "VAD_ENABLED", False),
+        ):
+            run = asyncio.create_task(
+                server.get_connect_and_run_callable(
+                    client.websocket, BINARY_MEDIA_SUBPROTOCOL
+                )()
+            )
+            client.send_text_frame(
+                {"setup": {"run_id": "r", "user_id": "u", "audio_codecs": ["mulaw"]}}
+            )
+            client.send_text_frame(
+                {
+                    "realtimeInput": {
+                        "mediaChunks": [
+                            {"mimeType": "audio/pcm;rate=16000", "data": "AAAA"}
+                        ]
+                    }
+                }
+            )
+            turn = {"role": "user", "parts": [{"text": "hi"}]}
+            client.send_text_frame({"clientContent": {"turns": [turn]}})
+            await _wait_until(lambda: len(client.frames) >= 3)
+
+            client.incoming.put_nowait({"type": "websocket.disconnect"})
+            await asyncio.wait_for(run, timeout=5)
+
+    audio, text = client.frames[0], client.frames[1]
+    # 480 samples of 24 kHz PCM become 480 mu-law bytes behind the media header
+    assert HEADER.unpack_from(audio) == (1, 3, 24000)
+    assert len(audio) == HEADER.size + 480
+    assert json.loads(text)["serverContent"]["modelTurn"]["parts"] == [{"text": "ok"}]
+
+
+@pytest.mark.asyncio
+async def test_model_audio_is_coalesced_until_next_frame() -> None:
+    """Consecutive model audio frames reach the client as one message."""
+    from app import server
+    from app.utils.frames import model_audio
+    from app.utils.live_pool import LiveSessionPool
+    from tests.fake_live_server import FakeLiveServer
+
+    audio = {
+        "realtimeInput": {
+            "mediaChunks": [{"mimeType": "audio/pcm;rate=16000", "data": "AAAA"}]
+        }
+    }
+    async with FakeLiveServer() as fake:
+        client = _FakeClientSocket()
+        with (
+            patch.object(
+                server, "live_pool", LiveSessionPool(fake.connect, max_size=0)
+            ),
+            patch.object(server, "gcp_logger", None),
+            patch.object(server, "VAD_ENABLED", False),
+            patch.object(server, "DOWNLINK_COALESCE_MS", 5000),
+        ):
+            run = asyncio.create_task(
+                server.get_connect_and_run_callable(client.websocket)()
+            )
+            client.send_text_frame({"setup": {"run_id": "r", "user_id": "u"}})
+            for _ in range(3):
+                client.send_text_frame(audio)
+            await _wait_until(lambda: len(fake.received) == 3)
+            turn = {"role": "user", "parts": [{"text": "hi"}]}
+            client.send_text_frame({"clientContent": {"turns": [turn]}})
+            await _wait_until(lambda: len(client.frames) >= 3)
+
+            client.incoming.put_nowait({"type": "websocket.disconnect"})
+            await asyncio.wait_for(run, timeout=5)
+
+    merged = model_audio(client.frames[0])
+    assert merged == ("audio/pcm;rate=24000", bytes(3 * 960))
+    assert "modelTurn" in json.loads(client.frames[1])["serverContent"]
+    assert json.loads(client.frames[2])["serverContent"]["turnComplete"]
+
+
+class _SlowClientSocket(_FakeClientSocket):
+    """Client whose downlink takes a while for every frame."""
+
+    async def send_bytes(self, data: bytes) -> None:
+        await asyncio.sleep(0.02)
+        self.frames.append(data)
+
+
+# 100 ms of a loud 16 kHz square wave
+_SPEECH = base64.b64encode((b"\x40\x1f" * 40 + b"\xc0\xe0" * 40) * 20).decode()
+
+
+def _is_audio(frame: bytes) -> bool:
+    return b'"inlineData"' in frame
+
+
+@pytest.mark.asyncio
+async def test_model_interruption_discards_queued_audio() -> None:
+    """Audio queued for a slow client is dropped once the model is interrupted."""
+    from app import server
+    from app.utils.live_pool import LiveSessionPool
+    from tests.fake_live_server import FakeLiveServer
+
+    speech = {
+        "realtimeInput": {
+            "mediaChunks": [{"mimeType": "audio/pcm;rate=16000", "data": _SPEECH}]
+        }
+    }
+    async with FakeLiveServer(
+        talk_chunks=50, chunk_interval=0.005, interrupt_delay=0.05
+    ) as fake:
+        client = _SlowClientSocket()
+        with (
+            patch.object(
+                server, "live_pool", LiveSessionPool(fake.connect, max_size=0)
+            ),
+            patch.object(server, "gcp_logger", None),
+        ):
+            run = asyncio.create_task(
+                server.get_connect_and_run_callable(client.websocket)()
+            )
+            client.send_text_frame({"setup": {"run_id": "r", "user_id": "u"}})
+            turn = {"role": "user", "parts": [{"text": "hi"}]}
+            client.send_text_frame({"clientContent": {"turns": [turn]}})
+            await _wait_until(lambda: len(client.frames) >= 1)
+            client.send_text_frame(speech)
+            await _wait_until(lambda: b'"interrupted"' in client.frames[-1])
+            (session,) = server.active_sessions
+            stats = session.turn.stats
+
+            client.incoming.put_nowait({"type": "websocket.disconnect"})
+            await asyncio.wait_for(run, timeout=5)
+
+    audio = [frame for frame in client.frames if _is_audio(frame)]
+    assert len(audio) < 20
+    assert stats.interruptions == 1
+    assert stats.discarded_frames > 0
+
+
+@pytest.mark.asyncio
+async def test_vad_barge_in_flushes_before_model_interrupts() -> None:
+    """Speech over the model flushes the client without waiting for the model."""
+    from app import server
+    from app.utils.barge_in import JSON_FLUSH_FRAME
+    from app.utils.live_pool import LiveSessionPool
+    from tests.fake_live_server import FakeLiveServer
+
+    speech = {
+        "realtimeInput": {
+            "mediaChunks": [{"mimeType": "audio/pcm;rate=16000", "data": _SPEECH}]
+        }
+    }
+    fake_server = FakeLiveServer(
+        talk_chunks=100, chunk_interval=0.01, interrupt_delay=0.5
+    )
+    async with fake_server as fake:
+        client = _FakeClientSocket()
+        with (
+            patch.object(
+                server, "live_pool", LiveSessionPool(fake.connect, max_size=0)
+            ),
+            patch.object(server, "gcp_logger", None),
+            patch.object(server, "BARGE_IN_ON_VAD", True),
+        ):
+            run = asyncio.create_task(
+                server.get_connect_and_run_callable(client.websocket)()
+            )
+            client.send_text_frame({"setup": {"run_id": "r", "user_id": "u"}})
+            turn = {"role": "user", "parts": [{"text": "hi"}]}
+            client.send_text_frame({"clientContent": {"turns": [turn]}})
+            await _wait_until(lambda: len(client.frames) >= 5)
+            client.send_text_frame(speech)
+            await _wait_until(
+                lambda: sum(b'"interrupted"' in frame for frame in client.frames) == 2
+            )
+            frames = list(client.frames)
+            (session,) = server.active_sessions
+            stats = session.turn.stats
+
+            client.incoming.put_nowait({"type": "websocket.disconnect"})
+            await asyncio.wait_for(run, timeout=5)
+
+    flushed = frames.index(JSON_FLUSH_FRAME)
+    # The rest of the turn is muted until the model reports the interruption
+    assert not any(_is_audio(frame) for frame in frames[flushed + 1 :])
+    assert json.loads(frames[-1]) == {"serverContent": {"interrupted": True}}
+    assert stats.vad_barge_ins == 1
+    assert stats.interruptions == 1
+
+
+def _chat_runner(tmp_path: Any, **model_args: Any) -> tuple[Any, Any]:
+    """Build a runner for the text agent on a fake model and a fresh store."""
+    from google.adk.runners import Runner
+
+    from app import server
+    from app.utils.session_service import TieredSessionService
+    from tests.fake_llm import FakeLlm
+
+    sessions = TieredSessionService(str(tmp_path / "chat.db"))
+    agent = server.root_agent.clone(update={"model": FakeLlm(**model_args)})
+    runner = Runner(agent=agent, app_name=server.APP_NAME, session_service=sessions)
+    return runner, sessions
+
+
+def test_chat_stream_sends_progress_before_final(tmp_path: Any) -> None:
+    """The streaming endpoint emits tool markers and text chunks as they come."""
+    from app import server
+
+    runner, sessions = _chat_runner(
+        tmp_path,
+        tool_calls=[("get_customer_flights_tool", {"phone_number": "05551234567"})],
+    )
+    with (
+        patch.object(server, "turkish_airlines_runner", runner),
+        patch.object(server, "session_service", sessions),
+    ):
+        client = TestClient(server.app)
+        with client.stream(
+            "POST",
+            "/api/turkish-airlines/chat/stream",
+            json={"message": "my flights?", "user_id": "u1"},
+        ) as response:
+            assert response.headers["content-type"] == "application/x-ndjson"
+            messages = [json.loads(line) for line in response.iter_lines() if line]
+
+    assert [m["type"] for m in messages] == [
+        "tool_call",
+        "tool_result",
+        "partial",
+        "partial",
+        "partial",
+        "partial",
+        "final",
+    ]
+    assert messages[0]["name"] == "get_customer_flights_tool"
+    streamed = "".join(m["text"] for m in messages if m["type"] == "partial")
+    assert streamed.strip() == messages[-1]["response"]
+    assert messages[-1]["status"] == "success"
+    assert server.chat_stream_ttfb.count >= 1
+
+
+def test_chat_stream_as_server_sent_events(tmp_path: Any) -> None:
+    """Clients accepting text/event-stream get server-sent events."""
+    from app import server
+
+    runner, sessions = _chat_runner(tmp_path, chunks=1)
+    with (
+        patch.object(server, "turkish_airlines_runner", runner),
+        patch.object(server, "session_service", sessions),
+    ):
+        client = TestClient(server.app)
+        response = client.post(
+            "/api/turkish-airlines/chat/stream",
+            json={"message": "hi", "user_id": "u2"},
+            headers={"Accept": "text/event-stream"},
+        )
+
+    assert response.headers["content-type"].startswith("text/event-stream")
+    events = response.text.strip().split("\n\n")
+    assert [event.split("\n")[0] for event in events] == [
+        "event: partial",
+        "event: final",
+    ]
+    final = json.loads(events[-1].split("\n")[1].removeprefix("data: "))
+    assert final["response"] == "Your flight TK1984 to New York is confirmed."
+
+
+@pytest.mark.asyncio
+async def test_chat_double_submit_shares_one_run(tmp_path: Any) -> None:
+    """Concurrent posts for a session queue up, and a resubmit joins its twin."""
+    from app import server
+    from app.utils.run_gate import RunGate
+
+    runner, sessions = _chat_runner(tmp_path, first_chunk_delay=0.05)
+    model = runner.agent.model
+    gate = RunGate()
+    with (
+        patch.object(server, "turkish_airlines_runner", runner),
+        patch.object(server, "session_service", sessions),
+        patch.object(server, "chat_run_gate", gate),
+    ):
+        responses = await asyncio.gather(
+            server.turkish_airlines_chat(
+                server.ChatMessage(message="Where is my flight?", user_id="u3")
+            ),
+            server.turkish_airlines_chat(
+                server.ChatMessage(message="where is my  flight?", user_id="u3")
+            ),
+            server.turkish_airlines_chat(
+                server.ChatMessage(message="Thanks", user_id="u3")
+            ),
+        )
+
+    assert [response["status"] for response in responses] == ["success"] * 3
+    assert responses[0]["response"] == responses[1]["response"]
+    assert model.calls == 2
+    assert gate.snapshot()["coalesced"] == 1
+    assert gate.snapshot()["queued"] == 1
+    session = await sessions.get_session(
+        app_name=server.APP_NAME, user_id="u3", session_id="session_u3"
+    )
+    user_texts = [
+        event.content.parts[0].text
+        for event in session.events
+        if event.author == "user"
+    ]
+    assert user_texts == ["Where is my flight?", "Thanks"]
+    await sessions.close()
+
+
+def test_chat_reports_missed_deadline(tmp_path: Any) -> None:
+    """A run slower than the deadline is cancelled and reported as such."""
+    from app import server
+
+    runner, sessions = _chat_runner(tmp_path, first_chunk_delay=5)
+    with (
+        patch.object(server, "turkish_airlines_runner", runner),
+        patch.object(server, "session_service", sessions),
+        patch.object(server, "CHAT_DEADLINE_SECONDS", 0.1),
+    ):
+        client = TestClient(server.app)
+        started = time.perf_counter()
+        response = client.post(
+            "/api/turkish-airlines/chat", json={"message": "hi", "user_id": "u4"}
+        )
+        elapsed = time.perf_counter() - started
+
+    assert elapsed < 2
+    assert response.json()["status"] == "error"
+    assert response.json()["reason"] == "deadline_exceeded"
+
+
+def test_chat_fast_path_answers_structured_turns(tmp_path: Any) -> None:
+    """Confirming the number, ID digits and picking a flight skip the model."""
+    from app import server
+
+    greeting = (
+        "Hello! I'm Alex from TURKISH AIRLINES support team. Would you like to "
+        "proceed with the phone number you're calling from?"
+    )
+    runner, sessions = _chat_runner(tmp_path, answer=greeting)
+    with (
+        patch.object(server, "turkish_airlines_runner", runner),
+        patch.object(server, "session_service", sessions),
+    ):
+        client = TestClient(server.app)
+        replies = [
+            client.post(
+                "/api/turkish-airlines/chat", json={"message": message, "user_id": "u5"}
+            ).json()["response"]
+            for message in ("Hello", "Yes please", "78912", "the second one")
+        ]
+        assert runner.agent.model.calls == 1
+        assert "last five digits" in replies[1]
+        assert "TK1984" in replies[2] and "TK2023" in replies[2]
+        assert replies[3].startswith("You selected flight TK2023")
+
+        client.post(
+            "/api/turkish-airlines/chat",
+            json={"message": "Can I cancel it?", "user_id": "u5"},
+        )
+        assert runner.agent.model.calls == 2
+
+
+def test_chat_memoizes_lookups_and_keeps_verified_customer(tmp_path: Any) -> None:
+    """Repeated lookups reuse the session's results; the model knows the customer."""
+    from app import server
+    from app.turkish_airlines_text_agent import turkish_airlines_text_agent as agent
+
+    runner, sessions = _chat_runner(
+        tmp_path,
+        answer="Would you like to proceed with the phone number you're calling from?",
+        tool_calls=[("get_customer_flights_tool", {"phone_number": "0555 123 45 67"})],
+    )
+    hits = agent.tool_memo.stats.get("get_customer_flights_tool")
+    before = hits.hits if hits else 0
+    with (
+        patch.object(server, "turkish_airlines_runner", runner),
+        patch.object(server, "session_service", sessions),
+    ):
+        client = TestClient(server.app)
+        for message in ("Hello", "Yes", "78912", "What are my flights?"):
+            client.post(
+                "/api/turkish-airlines/chat", json={"message": message, "user_id": "u6"}
+            )
+
+    # Looked up on the first turn, by the fast path after verification and
+    # by the model on the last turn: only the first call ran the tool
+    assert agent.tool_memo.stats["get_customer_flights_tool"].hits - before == 2
+    instruction = runner.agent.model.last_request.config.system_instruction
+    assert "VERIFIED CUSTOMER" in instruction
+    assert "TK2023 JFK-IST" in instruction
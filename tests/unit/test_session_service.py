@@ -0,0 +1,180 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import threading
+from pathlib import Path
+
+import pytest
+from google.adk.events.event import Event
+from google.adk.events.event_actions import EventActions
+from google.adk.sessions import Session
+from google.genai import types
+
+from app.utils.session_service import TieredSessionService
+
+APP = "app"
+
+
+class _Clock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _event(text: str, state_delta: dict | None = None) -> Event:
+    return Event(
+        author="user",
+        invocation_id="inv",
+        content=types.Content(role="user", parts=[types.Part(text=text)]),
+        actions=EventActions(state_delta=state_delta or {}),
+    )
+
+
+async def _load(service: TieredSessionService, user_id: str) -> Session:
+    session = await service.get_session(app_name=APP, user_id=user_id, session_id="a")
+    assert session is not None
+    return session
+
+
+def _texts(session: Session) -> list[str | None]:
+    return [
+        e.content.parts[0].text for e in session.events if e.content and e.content.parts
+    ]
+
+
+@pytest.mark.asyncio
+async def test_events_and_state_survive_eviction(tmp_path: Path) -> None:
+    """Sessions evicted from the hot tier are read back from disk."""
+    service = TieredSessionService(str(tmp_path / "s.db"), max_hot=2)
+    session = await service.create_session(app_name=APP, user_id="u0", session_id="a")
+    delta = {"user:name": "Ada", "app:greeting": "hi", "temp:x": 1, "seat": "4A"}
+    await service.append_event(session, _event("hello", delta))
+    for n in range(1, 5):
+        await service.create_session(app_name=APP, user_id=f"u{n}", session_id="a")
+    assert service.stats.evictions > 0
+
+    # Still pending, then committed
+    for _ in range(2):
+        loaded = await _load(service, "u0")
+        assert _texts(loaded) == ["hello"]
+        assert loaded.state == {"seat": "4A", "user:name": "Ada", "app:greeting": "hi"}
+        await service.flush()
+        service._hot.clear()
+
+    other = await _load(service, "u1")
+    assert other.state == {"app:greeting": "hi"}
+    assert service.stats.cold_hits > 0
+    await service.close()
+
+
+@pytest.mark.asyncio
+async def test_hot_tier_ttl(tmp_path: Path) -> None:
+    """Records unused for longer than the TTL leave memory on the next flush."""
+    clock = _Clock()
+    service = TieredSessionService(str(tmp_path / "s.db"), hot_ttl=10, clock=clock)
+    await service.create_session(app_name=APP, user_id="u", session_id="a")
+    await service.flush()
+    assert service.stats.hot == 1
+
+    clock.now = 11
+    await service.create_session(app_name=APP, user_id="v", session_id="a")
+    await service.flush()
+    assert service.stats.hot == 1
+    assert service.stats.expirations == 1
+    assert await service.get_session(app_name=APP, user_id="u", session_id="a")
+    await service.close()
+
+
+@pytest.mark.asyncio
+async def test_workers_share_sessions(tmp_path: Path) -> None:
+    """A session continued by another worker is reloaded, not overwritten."""
+    path = str(tmp_path / "s.db")
+    first = TieredSessionService(path)
+    second = TieredSessionService(path)
+    session = await first.create_session(app_name=APP, user_id="u", session_id="a")
+    await first.append_event(session, _event("one"))
+    await first.flush()
+
+    elsewhere = await _load(second, "u")
+    await second.append_event(elsewhere, _event("two"))
+    await second.flush()
+
+    loaded = await _load(first, "u")
+    assert _texts(loaded) == ["one", "two"]
+    assert first.stats.reloads == 1
+    await first.close()
+    await second.close()
+
+
+@pytest.mark.asyncio
+async def test_list_and_delete(tmp_path: Path) -> None:
+    """Deleted sessions disappear from both tiers and from listings."""
+    path = str(tmp_path / "s.db")
+    service = TieredSessionService(path)
+    for session_id in ("a", "b"):
+        session = await service.create_session(
+            app_name=APP, user_id="u", session_id=session_id
+        )
+        await service.append_event(session, _event(session_id))
+    await service.delete_session(app_name=APP, user_id="u", session_id="a")
+    assert await service.get_session(app_name=APP, user_id="u", session_id="a") is None
+
+    listed = await service.list_sessions(app_name=APP, user_id="u")
+    assert [(s.id, s.events) for s in listed.sessions] == [("b", [])]
+    await service.close()
+
+    reopened = TieredSessionService(path)
+    assert await reopened.get_session(app_name=APP, user_id="u", session_id="a") is None
+    assert await reopened.get_session(app_name=APP, user_id="u", session_id="b")
+    await reopened.close()
+
+
+@pytest.mark.asyncio
+async def test_file_is_read_off_the_event_loop(tmp_path: Path) -> None:
+    """Hot hits checked against the file and cold reads run in threads."""
+    service = TieredSessionService(str(tmp_path / "s.db"))
+    await service.create_session(app_name=APP, user_id="u", session_id="a")
+    await service.flush()
+    loop_thread = threading.get_ident()
+    threads = []
+    read = service._read
+
+    def record(sql: str, parameters: tuple) -> list[tuple]:
+        threads.append(threading.get_ident())
+        return read(sql, parameters)
+
+    service._read = record  # type: ignore[method-assign]
+    assert await service.get_session(app_name=APP, user_id="u", session_id="a")
+    service._hot.clear()
+    assert await service.get_session(app_name=APP, user_id="u", session_id="a")
+    assert service.stats.hot_hits and service.stats.cold_hits
+    assert threads and loop_thread not in threads
+    await service.close()
+
+
+@pytest.mark.asyncio
+async def test_close_waits_for_the_cancelled_flusher(tmp_path: Path) -> None:
+    """Closing stops the pending flush and still commits its changes."""
+    path = str(tmp_path / "s.db")
+    service = TieredSessionService(path, flush_interval=60)
+    await service.create_session(app_name=APP, user_id="u", session_id="a")
+    flusher = service._flusher
+    await service.close()
+    assert flusher is not None and flusher.cancelled()
+
+    reopened = TieredSessionService(path)
+    assert await reopened.get_session(app_name=APP, user_id="u", session_id="a")
+    await reopened.close()
@@ -0,0 +1,113 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+import threading
+import time
+
+import pytest
+from google.genai import types
+
+from app.utils.tool_executor import ToolExecutor
+
+
+def _tool_call(*calls: tuple[str, str, dict]) -> types.LiveServerToolCall:
+    return types.LiveServerToolCall(
+        function_calls=[
+            types.FunctionCall(id=call_id, name=name, args=args)
+            for call_id, name, args in calls
+        ]
+    )
+
+
+def _responses(
+    response: types.LiveClientToolResponse | None,
+) -> list[types.FunctionResponse]:
+    assert response is not None
+    assert response.function_responses is not None
+    return response.function_responses
+
+
+def slow_lookup(value: str) -> dict:
+    time.sleep(0.2)
+    return {"value": value}
+
+
+async def never_returns() -> dict:
+    await asyncio.sleep(60)
+    return {}
+
+
+@pytest.mark.asyncio
+async def test_calls_run_concurrently_in_one_response() -> None:
+    """Independent sync calls overlap and come back in a single response."""
+    # Each call waits for the other to start, so only overlapping calls pass
+    barrier = threading.Barrier(2, timeout=5)
+
+    def meet(value: str) -> dict:
+        barrier.wait()
+        return {"value": value}
+
+    executor = ToolExecutor({"meet": meet}, max_workers=4)
+    response = await executor.execute(
+        _tool_call(("1", "meet", {"value": "a"}), ("2", "meet", {"value": "b"}))
+    )
+    await executor.shutdown()
+
+    responses = _responses(response)
+    assert [r.id for r in responses] == ["1", "2"]
+    assert [r.response for r in responses] == [
+        {"value": "a"},
+        {"value": "b"},
+    ]
+
+
+@pytest.mark.asyncio
+async def test_timeout_returns_error_response() -> None:
+    """A tool exceeding its timeout is answered with an error."""
+    executor = ToolExecutor({"hang": never_returns}, timeouts={"hang": 0.05})
+    response = await executor.execute(_tool_call(("1", "hang", {})))
+    await executor.shutdown()
+
+    error = _responses(response)[0].response
+    assert error is not None
+    assert "timed out" in error["error"]
+
+
+@pytest.mark.asyncio
+async def test_cancelled_calls_are_left_out() -> None:
+    """Cancelled calls get no response while the others still answer."""
+    executor = ToolExecutor({"hang": never_returns, "lookup": slow_lookup})
+    task = asyncio.create_task(
+        executor.execute(_tool_call(("1", "hang", {}), ("2", "lookup", {"value": "x"})))
+    )
+    await asyncio.sleep(0.01)
+    assert executor.in_flight == 2
+    assert executor.cancel(["1"]) == 1
+
+    response = await task
+    await executor.shutdown()
+    assert [r.id for r in _responses(response)] == ["2"]
+
+
+@pytest.mark.asyncio
+async def test_shutdown_cancels_in_flight_work() -> None:
+    """Disconnects cancel whatever is still running."""
+    executor = ToolExecutor({"hang": never_returns})
+    task = asyncio.create_task(executor.execute(_tool_call(("1", "hang", {}))))
+    await asyncio.sleep(0.01)
+    await executor.shutdown()
+
+    assert await task is None
+    assert executor.in_flight == 0
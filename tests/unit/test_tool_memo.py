@@ -0,0 +1,101 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from types import SimpleNamespace
+from typing import Any, cast
+
+from google.adk.tools.base_tool import BaseTool
+from google.adk.tools.tool_context import ToolContext
+
+from app.utils.tool_memo import MEMO_STATE_KEY, ToolMemo
+
+
+def describe(entries: list[dict[str, Any]]) -> str:
+    return ", ".join(entry["result"]["name"] for entry in entries)
+
+
+def memo(**options: Any) -> ToolMemo:
+    return ToolMemo(
+        read_only=("lookup",),
+        invalidates={"cancel": ("lookup",)},
+        normalizers={"phone": lambda phone: phone.replace(" ", "")},
+        context=describe,
+        context_key="known",
+        **options,
+    )
+
+
+def call(
+    memo: ToolMemo, state: dict[str, Any], name: str, args: dict, result: dict
+) -> dict[str, Any]:
+    """Run a tool call through the memo callbacks; return the result used."""
+    tool = cast(BaseTool, SimpleNamespace(name=name))
+    context = cast(ToolContext, SimpleNamespace(state=state))
+    cached = memo.before_tool(tool, args, context)
+    response = result if cached is None else cached
+    memo.after_tool(tool, args, context, response)
+    return response
+
+
+def test_repeated_calls_are_answered_from_the_session() -> None:
+    """Calls with the same normalized arguments reuse the stored result."""
+    tools = memo()
+    state: dict[str, Any] = {}
+    first = call(tools, state, "lookup", {"phone": "555 1234"}, {"name": "Ada"})
+    again = call(tools, state, "lookup", {"phone": "5551234"}, {"name": "changed"})
+    other = call(tools, state, "lookup", {"phone": "5550000"}, {"name": "Bo"})
+    assert first == again == {"name": "Ada"}
+    assert other == {"name": "Bo"}
+    assert len(state[MEMO_STATE_KEY]) == 2
+    assert state["known"] == "Ada, Bo"
+    assert tools.snapshot()["lookup"] == {
+        "hits": 1,
+        "misses": 2,
+        "invalidated": 0,
+        "hit_rate": 1 / 3,
+    }
+
+
+def test_write_tools_invalidate_entries() -> None:
+    """A write drops the entries of the tools it invalidates."""
+    tools = memo()
+    state: dict[str, Any] = {}
+    call(tools, state, "lookup", {"phone": "1"}, {"name": "Ada"})
+    call(tools, state, "cancel", {"ticket": "T1"}, {"status": "Cancelled"})
+    assert state[MEMO_STATE_KEY] == {}
+    assert state["known"] == ""
+    assert call(tools, state, "lookup", {"phone": "1"}, {"name": "Ada 2"}) == {
+        "name": "Ada 2"
+    }
+    assert tools.snapshot()["lookup"]["invalidated"] == 1
+
+
+def test_memo_bounds_and_switch() -> None:
+    """The oldest entries go first, and a disabled memo calls every tool."""
+    tools = memo(max_entries=2)
+    state: dict[str, Any] = {}
+    for n in range(3):
+        call(tools, state, "lookup", {"phone": str(n)}, {"name": str(n)})
+    assert [entry["args"]["phone"] for entry in state[MEMO_STATE_KEY].values()] == [
+        "1",
+        "2",
+    ]
+
+    disabled = memo(enabled=False)
+    state = {}
+    call(disabled, state, "lookup", {"phone": "1"}, {"name": "Ada"})
+    assert call(disabled, state, "lookup", {"phone": "1"}, {"name": "Bo"}) == {
+        "name": "Bo"
+    }
+    assert state == {}
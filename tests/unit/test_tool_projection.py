@@ -0,0 +1,111 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from types import SimpleNamespace
+from typing import Any, cast
+
+from google.adk.tools.base_tool import BaseTool
+from google.adk.tools.tool_context import ToolContext
+
+from app.utils.tool_projection import (
+    STAGE_STATE_KEY,
+    TOKENS_STATE_KEY,
+    Projection,
+    ProjectionSpec,
+    ToolProjector,
+)
+
+FLIGHTS = [{"ticket_number": f"T{n}", "seat": f"{n}A"} for n in range(4)]
+SPEC = ProjectionSpec(
+    stages=("identify", "verified"),
+    tools={
+        "info": {
+            "identify": Projection(fields=("status", "name")),
+            "verified": Projection(
+                drop=("passport",),
+                items={"flights": Projection(fields=("ticket_number",))},
+                max_items=2,
+            ),
+        },
+        "verify": {"*": Projection(fields=("status",))},
+    },
+    transitions={("verify", "verified"): "verified"},
+)
+
+
+def call(
+    projector: ToolProjector, state: dict[str, Any], name: str, result: dict
+) -> dict[str, Any]:
+    """Run the after_tool callback the way the agent does."""
+    tool = cast(BaseTool, SimpleNamespace(name=name))
+    context = cast(ToolContext, SimpleNamespace(state=state))
+    projected = projector.after_tool(tool, {}, context, result)
+    return result if projected is None else projected
+
+
+def apply(tool: str, stage: str, result: dict[str, Any]) -> dict[str, Any]:
+    """Project a result with the projection SPEC picks for the tool and stage."""
+    projection = SPEC.projection(tool, stage)
+    assert projection is not None
+    return projection.apply(result)
+
+
+def test_projection_keeps_drops_and_shortens() -> None:
+    """Fields, nested items and long lists are cut down declaratively."""
+    result = {"status": "found", "name": "A", "passport": "P1", "flights": FLIGHTS}
+    assert apply("info", "identify", result) == {
+        "status": "found",
+        "name": "A",
+    }
+    assert apply("info", "verified", result) == {
+        "status": "found",
+        "name": "A",
+        "flights": [{"ticket_number": "T0"}, {"ticket_number": "T1"}],
+        "flights_more": 2,
+    }
+    assert SPEC.projection("verify", "verified") is SPEC.tools["verify"]["*"]
+    assert SPEC.projection("other", "identify") is None
+
+
+def test_projector_follows_the_conversation_stage() -> None:
+    """Results are projected for the stage reached by earlier tool results."""
+    projector = ToolProjector(SPEC)
+    state: dict[str, Any] = {}
+    result = {"status": "found", "name": "A", "passport": "P1", "flights": FLIGHTS}
+    assert call(projector, state, "info", result) == {"status": "found", "name": "A"}
+    assert call(projector, state, "verify", {"status": "invalid", "x": 1}) == {
+        "status": "invalid"
+    }
+    assert STAGE_STATE_KEY not in state
+    call(projector, state, "verify", {"status": "verified", "name": "A"})
+    assert state[STAGE_STATE_KEY] == "verified"
+    assert "passport" not in call(projector, state, "info", result)
+    assert call(projector, state, "other", {"a": 1}) == {"a": 1}
+
+    snapshot = projector.snapshot()
+    assert snapshot["info"]["calls"] == 2
+    assert snapshot["info"]["tokens_after"] < snapshot["info"]["tokens_before"]
+    assert snapshot["other"]["tokens_after"] == snapshot["other"]["tokens_before"]
+    assert state[TOKENS_STATE_KEY]["before"] == sum(
+        stats["tokens_before"] for stats in snapshot.values()
+    )
+
+
+def test_disabled_projector_only_counts() -> None:
+    """With projection off results pass through but are still counted."""
+    projector = ToolProjector(SPEC, enabled=False)
+    state: dict[str, Any] = {}
+    result = {"status": "found", "name": "A", "passport": "P1"}
+    assert call(projector, state, "info", result) is result
+    assert projector.snapshot()["info"]["calls"] == 1
@@ -0,0 +1,102 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import numpy as np
+
+from app.utils.vad import VoiceActivityGate
+
+RATE = 16000
+CHUNK = 2048  # samples per chunk sent by the browser worklet (128 ms)
+
+
+def _pcm(signal: np.ndarray) -> bytes:
+    return np.clip(signal, -32768, 32767).astype("<i2").tobytes()
+
+
+def _noise(level_db: float, seed: int = 0) -> bytes:
+    rng = np.random.default_rng(seed)
+    return _pcm(rng.normal(0, 32768 * 10 ** (level_db / 20), CHUNK))
+
+
+def _tone(level_db: float, freq: float = 200.0) -> bytes:
+    t = np.arange(CHUNK) / RATE
+    amplitude = 32768 * 10 ** (level_db / 20) * np.sqrt(2)
+    return _pcm(amplitude * np.sin(2 * np.pi * freq * t))
+
+
+def test_silence_is_held_and_speech_released_with_preroll() -> None:
+    """Silence is gated, speech onsets bring their pre-roll, hangover follows."""
+    gate: VoiceActivityGate[str] = VoiceActivityGate(
+        hangover_ms=256, preroll_ms=256, keepalive_ms=0
+    )
+    sent = []
+    for n in range(10):
+        sent += gate.push(_noise(-70, seed=n), f"silence-{n}")
+    assert sent == []
+
+    assert gate.push(_tone(-20), "speech") == ["silence-8", "silence-9", "speech"]
+    # Two chunks of hangover keep the trailing silence for turn detection
+    assert gate.push(_noise(-70, seed=20), "tail-1") == ["tail-1"]
+    assert gate.push(_noise(-70, seed=21), "tail-2") == ["tail-2"]
+    assert gate.push(_noise(-70, seed=22), "after") == []
+
+    stats = gate.stats
+    assert (stats.frames, stats.speech_frames) == (14, 1)
+    assert stats.sent_frames == 5
+    assert stats.gated_frames == 9
+    assert stats.bytes_sent == 5 * CHUNK * 2
+
+
+def test_keepalive_thins_out_long_silence() -> None:
+    """During long silences one chunk per keepalive period still goes out."""
+    gate: VoiceActivityGate[int] = VoiceActivityGate(keepalive_ms=512)
+    sent = []
+    for n in range(16):
+        sent += gate.push(_noise(-70, seed=n), n)
+    assert sent == [3, 7, 11, 15]
+
+
+def test_speech_after_keepalive_keeps_chunks_in_order() -> None:
+    """Chunks held before a keepalive are not released after it."""
+    gate: VoiceActivityGate[int] = VoiceActivityGate(preroll_ms=256, keepalive_ms=512)
+    sent = []
+    for n in range(5):
+        sent += gate.push(_noise(-70, seed=n), n)
+    sent += gate.push(_tone(-20), 5)
+    assert sent == [3, 4, 5]
+
+
+def test_quiet_unvoiced_sounds_count_as_speech() -> None:
+    """Quiet noisy windows pass thanks to their zero-crossing rate."""
+    gate: VoiceActivityGate[str] = VoiceActivityGate(
+        keepalive_ms=0, hangover_ms=0, preroll_ms=0
+    )
+    for n in range(30):
+        gate.push(_noise(-55, seed=n), "room")
+    threshold = gate.threshold_db
+
+    # A low hum just under the threshold stays gated, a hiss at the same level
+    # is taken for a fricative.
+    level = threshold - 3
+    assert gate.push(_tone(level, freq=100.0), "hum") == []
+    assert gate.push(_noise(level, seed=99), "hiss") == ["hiss"]
+
+
+def test_noise_floor_adapts_to_steady_background() -> None:
+    """Steady background noise is eventually treated as silence."""
+    gate: VoiceActivityGate[int] = VoiceActivityGate(keepalive_ms=0, hangover_ms=0)
+    passed = [bool(gate.push(_tone(-35, freq=50.0), n)) for n in range(300)]
+    assert passed[0]
+    assert not any(passed[-50:])
+    assert gate.push(_tone(-10), 300)[-1] == 300
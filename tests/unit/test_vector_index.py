@@ -0,0 +1,126 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import importlib
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+import numpy as np
+import pytest
+from google.auth.credentials import Credentials
+
+from app.utils.semantic_cache import HashingEmbedder
+from app.utils.vector_index import LocalRetrieval, VectorIndex
+
+CHUNKS = [
+    {"text": "Filtreyi iki haftada bir suyla yikayin.", "source": "manual.pdf#12"},
+    {
+        "text": "Zamanlayiciyi kumandadaki TIMER tusuyla ayarlayin.",
+        "source": "manual.pdf#8",
+    },
+    {"text": "E4 hatasi ic unite sensor arizasini gosterir.", "source": "errors.pdf#2"},
+    {"text": "Kumandanin pillerini AAA pillerle degistirin.", "source": "manual.pdf#3"},
+]
+
+
+def clustered(n: int, dim: int = 32, seed: int = 0) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    centers = rng.standard_normal((20, dim))
+    vectors = centers[rng.integers(0, 20, n)] + rng.standard_normal((n, dim))
+    return (vectors / np.linalg.norm(vectors, axis=1, keepdims=True)).astype("f4")
+
+
+def test_retrieval_serves_chunks_from_a_memory_mapped_index(tmp_path: Path) -> None:
+    """A saved index is memory-mapped and answers with the nearest chunks."""
+    embedder = HashingEmbedder(256, normalize=True)
+    VectorIndex.from_chunks(CHUNKS, embedder).save(str(tmp_path))
+    retrieval = LocalRetrieval.open(str(tmp_path), top_k=2)
+    assert isinstance(retrieval.index.vectors, np.memmap)
+
+    chunks = retrieval.retrieve("Filtreyi nasil yikarim?")
+    assert chunks[0]["source"] == "manual.pdf#12"
+    assert len(chunks) == 2 and chunks[0]["score"] > chunks[1]["score"]
+    assert retrieval("e4 hatasi nedir")[0] == CHUNKS[2]["text"]
+    retrieval.max_distance = 0.0
+    missing = retrieval("e4 hatasi nedir")
+    assert isinstance(missing, str) and missing.startswith("No matching result")
+
+
+def test_ivf_search_approximates_brute_force() -> None:
+    """Probing every list is exact; probing a few keeps most neighbours."""
+    vectors = clustered(3000)
+    index = VectorIndex.from_vectors(vectors, [str(n) for n in range(3000)], lists=16)
+    queries = clustered(50, seed=1)
+    exact_scores, exact = index.search(queries, k=10)
+    _, probed = index.search(queries, k=10, nprobe=16)
+    _, approximate = index.search(queries, k=10, nprobe=4)
+
+    assert np.array_equal(probed, exact)
+    assert np.allclose(exact_scores[:, 0], (queries @ index.vectors.T).max(axis=1))
+    recall = np.mean(
+        [len(set(a) & set(b)) / 10 for a, b in zip(approximate, exact, strict=True)]
+    )
+    assert recall > 0.8
+    assert index.text(int(exact[0, 0])) == str(int(np.argmax(vectors @ queries[0])))
+    _, few = VectorIndex.from_vectors(vectors[:3], ["a", "b", "c"]).search(queries, 5)
+    assert (few[:, 3:] == -1).all()
+    with pytest.raises(ValueError):
+        index.search(np.ones((1, 8)))
+
+
+def test_text_agent_retrieves_from_the_local_index(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """RAG_BACKEND=local swaps the Vertex AI retrieval for the local index."""
+    VectorIndex.from_chunks(CHUNKS, HashingEmbedder(512, normalize=True)).save(
+        str(tmp_path)
+    )
+    credentials = MagicMock(spec=Credentials)
+    with patch("google.auth.default", return_value=(credentials, "mock-project-id")):
+        module = importlib.import_module(
+            "app.technical_services_text_agent.technical_service_text_agent"
+        )
+        monkeypatch.setenv("RAG_BACKEND", "local")
+        monkeypatch.setenv("RAG_INDEX_PATH", str(tmp_path))
+        try:
+            local = importlib.reload(module)
+            tool = local.technical_service_text_agent.tools[0]
+            assert tool.__name__ == "retrieve_rag_documentation"
+            assert tool("Zamanlayici nasil ayarlanir")[0] == CHUNKS[1]["text"]
+        finally:
+            monkeypatch.delenv("RAG_BACKEND")
+            importlib.reload(module)
+    assert module.retrieval_tool is module.ask_vertex_retrieval
+
+
+def test_live_agent_runs_only_local_retrieval(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """The live relay gets a function for local retrieval and none for Vertex."""
+    VectorIndex.from_chunks(CHUNKS, HashingEmbedder(512, normalize=True)).save(
+        str(tmp_path)
+    )
+    credentials = MagicMock(spec=Credentials)
+    with patch("google.auth.default", return_value=(credentials, "mock-project-id")):
+        module = importlib.import_module("app.technical_agent")
+        monkeypatch.setenv("RAG_BACKEND", "local")
+        monkeypatch.setenv("RAG_INDEX_PATH", str(tmp_path))
+        try:
+            local = importlib.reload(module)
+            retrieve = local.tool_functions["user_manual"]
+            assert retrieve("Zamanlayici nasil ayarlanir")[0] == CHUNKS[1]["text"]
+        finally:
+            monkeypatch.delenv("RAG_BACKEND")
+            importlib.reload(module)
+    assert module.tool_functions == {}